@@ -7,7 +7,7 @@ FEATURES:
 - Real-time log monitoring (instant detection)
 - Streaming responses (send as AI generates)
 - Grok-4 Fast API (ultra-fast responses)
-- Parallel processing (multiple requests at once)
+- Parallel processing (bounded, fair: per-player rate limits, ops first, duplicates coalesced)
 - Response caching (instant for repeated questions)
 - Smart chunking (breaks responses into chat-sized pieces)
 
@@ -21,13 +21,22 @@ SPEED OPTIMIZATIONS:
 import asyncio
 import aiohttp
 import re
-import subprocess
 import json
 import os
+import sys
 from datetime import datetime
+from pathlib import Path
 from collections import deque
 from dotenv import load_dotenv
 
+# Shared pooled RCON connections (project root)
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from rcon_pool import get_rcon_pool, RconError
+from chat_stream import stream_to_chat
+from ai_response_cache import ResponseCache
+from log_hub import follow_logs_async, DEFAULT_LOG_SOURCE
+from ai_scheduler import get_ai_scheduler, SchedulerRejected
+
 # Load environment variables
 load_dotenv(".env.grok")
 
@@ -36,6 +45,8 @@ XAI_API_KEY = os.getenv("XAI_API_KEY", "your-xai-api-key-here")
 RCON_HOST = os.getenv("MINECRAFT_RCON_HOST", "localhost")
 RCON_PORT = int(os.getenv("MINECRAFT_RCON_PORT", 25575))
 RCON_PASSWORD = os.getenv("MINECRAFT_RCON_PASSWORD", "titan123")
+# Server log source, shared through the log hub when one is running
+LOG_SOURCE = os.getenv("MINECRAFT_LOG_SOURCE", DEFAULT_LOG_SOURCE)
 
 # Model selection (Grok models)
 MODELS = {
@@ -44,17 +55,25 @@ MODELS = {
     "balanced": "grok-beta",       # Same model (optimized for speed + quality)
 }
 
-# Cache for instant responses
-response_cache = {}
+# Cache for instant responses (normalized + similarity matching, bounded, persisted)
+response_cache = ResponseCache(
+    path=Path(__file__).resolve().parent / "ai-response-cache.sqlite",
+    max_entries=int(os.getenv("RESPONSE_CACHE_SIZE") or 5000)
+)
 recent_messages = deque(maxlen=100)
 
 class MinecraftRCON:
-    """Async RCON client for sending messages"""
+    """Async RCON client for sending messages (pooled, batched)"""
     
-    async def send_message(self, message):
-        """Send message to Minecraft chat"""
-        cmd = f'say §b[Console]§f {message}'
-        
+    def __init__(self):
+        self.pool = get_rcon_pool(RCON_HOST, RCON_PORT, RCON_PASSWORD)
+    
+    @staticmethod
+    def _say(message):
+        return f'say §b[Console]§f {message}'
+    
+    async def _send_docker(self, cmd):
+        """Fallback when native RCON is unreachable"""
         try:
             process = await asyncio.create_subprocess_exec(
                 'docker', 'exec', 'titan-hub', 'rcon-cli', cmd,
@@ -65,28 +84,51 @@ class MinecraftRCON:
         except Exception as e:
             print(f"RCON Error: {e}")
     
-    async def send_chunked(self, full_response, chunk_size=60):
-        """Send long response in chunks (chat-friendly)"""
-        words = full_response.split()
+    async def send_message(self, message):
+        """Send message to Minecraft chat"""
+        cmd = self._say(message)
+        
+        try:
+            # Coalesced with other messages sent in the same burst
+            await self.pool.enqueue(cmd)
+        except RconError:
+            await self._send_docker(cmd)
+        except Exception as e:
+            print(f"RCON Error: {e}")
+    
+    @staticmethod
+    def _chunk(full_response, chunk_size=60):
+        """Split a response into chat-sized lines on word boundaries"""
+        chunks = []
         current_chunk = []
         current_length = 0
         
-        for word in words:
+        for word in full_response.split():
             word_length = len(word) + 1  # +1 for space
             
             if current_length + word_length > chunk_size and current_chunk:
-                # Send current chunk
-                await self.send_message(' '.join(current_chunk))
-                await asyncio.sleep(0.5)  # Small delay between chunks
+                chunks.append(' '.join(current_chunk))
                 current_chunk = []
                 current_length = 0
             
             current_chunk.append(word)
             current_length += word_length
         
-        # Send remaining
         if current_chunk:
-            await self.send_message(' '.join(current_chunk))
+            chunks.append(' '.join(current_chunk))
+        return chunks
+    
+    async def send_chunked(self, full_response, chunk_size=60):
+        """Send long response in chunks (chat-friendly), all lines as one ordered batch"""
+        commands = [self._say(chunk) for chunk in self._chunk(full_response, chunk_size)]
+        
+        try:
+            await self.pool.command_many(commands)
+        except RconError:
+            for cmd in commands:
+                await self._send_docker(cmd)
+        except Exception as e:
+            print(f"RCON Error: {e}")
 
 
 class FastAI:
@@ -96,25 +138,25 @@ class FastAI:
         self.api_key = api_key
         self.base_url = "https://api.x.ai/v1/chat/completions"
     
-    async def ask(self, question, player_name, model="smart", stream=True):
+    async def ask_stream(self, question, player_name, model="smart"):
         """
-        Ask AI a question with streaming response
+        Ask AI a question, yielding the response as it is generated
         
         Args:
             question: User's question
             player_name: Player who asked
             model: Model to use (fast/smart/balanced)
-            stream: Whether to stream response
         
-        Returns:
-            Response text (or yields chunks if streaming)
+        Yields:
+            Response text chunks (a cache hit yields the whole answer at once)
         """
         
         # Check cache first (instant response!)
-        cache_key = f"{model}:{question.lower()}"
-        if cache_key in response_cache:
+        cached = await asyncio.to_thread(response_cache.get, question, model)
+        if cached is not None:
             print(f"✓ Cache hit for: {question[:50]}...")
-            return response_cache[cache_key]
+            yield cached
+            return
         
         # Build request
         headers = {
@@ -139,10 +181,11 @@ Server: Titan (built for 20k players)
             ],
             "max_tokens": 150,  # Short responses for speed
             "temperature": 0.7,
-            "stream": stream
+            "stream": True
         }
         
         # Make request
+        full_response = ""
         async with aiohttp.ClientSession() as session:
             async with session.post(
                 self.base_url,
@@ -151,39 +194,42 @@ Server: Titan (built for 20k players)
                 timeout=aiohttp.ClientTimeout(total=30)
             ) as response:
                 
-                if stream:
-                    # Stream response chunks
-                    full_response = ""
-                    async for line in response.content:
-                        if line:
-                            line_text = line.decode('utf-8').strip()
-                            if line_text.startswith('data: '):
-                                data = line_text[6:]
-                                if data == '[DONE]':
-                                    break
-                                try:
-                                    chunk = json.loads(data)
-                                    if 'choices' in chunk and len(chunk['choices']) > 0:
-                                        delta = chunk['choices'][0].get('delta', {})
-                                        content = delta.get('content', '')
-                                        if content:
-                                            full_response += content
-                                            yield content  # Stream to caller
-                                except:
-                                    pass
-                    
-                    # Cache the response
-                    response_cache[cache_key] = full_response
-                    return full_response
-                else:
-                    # Non-streaming (faster for simple responses)
-                    data = await response.json()
-                    if 'choices' in data and len(data['choices']) > 0:
-                        answer = data['choices'][0]['message']['content']
-                        response_cache[cache_key] = answer
-                        return answer
-                    
-        return "Error: No response from AI"
+                # Stream response chunks (server-sent events)
+                async for line in response.content:
+                    if line:
+                        line_text = line.decode('utf-8').strip()
+                        if line_text.startswith('data: '):
+                            data = line_text[6:]
+                            if data == '[DONE]':
+                                break
+                            try:
+                                chunk = json.loads(data)
+                                if 'choices' in chunk and len(chunk['choices']) > 0:
+                                    delta = chunk['choices'][0].get('delta', {})
+                                    content = delta.get('content', '')
+                                    if content:
+                                        full_response += content
+                                        yield content  # Stream to caller
+                            except ValueError:
+                                pass
+        
+        if not full_response:
+            raise Exception("No response from AI")
+        
+        # Cache the response
+        await asyncio.to_thread(response_cache.put, question, full_response, model)
+    
+    async def ask(self, question, player_name, model="smart"):
+        """
+        Ask AI a question and wait for the complete response
+        
+        Returns:
+            Response text
+        """
+        parts = []
+        async for content in self.ask_stream(question, player_name, model=model):
+            parts.append(content)
+        return "".join(parts)
 
 
 class LogMonitor:
@@ -193,21 +239,18 @@ class LogMonitor:
         self.rcon = rcon
         self.ai = ai
         self.processing = set()  # Prevent duplicate processing
+        self.scheduler = get_ai_scheduler()
+        # Held per reply (on the scheduler loop) so concurrent answers don't interleave
+        self.chat_lock = asyncio.Lock()
     
     async def monitor(self):
         """Monitor Minecraft logs in real-time"""
         print("📊 Monitoring Minecraft chat...")
         
-        # Follow docker logs in real-time
-        process = await asyncio.create_subprocess_exec(
-            'docker', 'logs', '-f', 'titan-hub',
-            stdout=asyncio.subprocess.PIPE,
-            stderr=asyncio.subprocess.STDOUT
-        )
-        
-        async for line in process.stdout:
+        # Follow logs in real-time (shared follower via the log hub)
+        async for line in follow_logs_async(LOG_SOURCE):
             try:
-                log_line = line.decode('utf-8').strip()
+                log_line = line.strip()
                 
                 # Parse chat messages: [20:49:26 INFO]: [Not Secure] <galion.studio> hello
                 match = re.search(r'\[Not Secure\] <([^>]+)> (.+)', log_line)
@@ -245,21 +288,30 @@ class LogMonitor:
         if is_for_ai:
             print(f"\n💬 {player_name}: {message}")
             
-            # Show thinking indicator
-            await self.rcon.send_message("🤔 Thinking...")
-            
             # Determine model based on question complexity
             model = "fast" if len(message) < 30 else "smart"
             
-            # Get AI response
+            async def answer():
+                # Show thinking indicator once a slot is free (between other replies)
+                async with self.chat_lock:
+                    await self.rcon.send_message("🤔 Thinking...")
+                
+                # Stream AI response - each chat line is sent as soon as it is generated,
+                # holding the chat from the first line to the last
+                return await stream_to_chat(
+                    self.ai.ask_stream(message, player_name, model=model),
+                    self.rcon.send_message,
+                    max_length=60,
+                    lock=self.chat_lock
+                )
+            
             try:
-                response = await self.ai.ask(message, player_name, model=model, stream=False)
+                # Concurrency cap, per-player rate limit, ops first; an identical
+                # question already in flight shares its (already broadcast) answer
+                response = await self.scheduler.submit(message, answer, player=player_name, namespace=model)
                 
                 print(f"🤖 Console: {response}")
                 
-                # Send response
-                await self.rcon.send_chunked(response)
-                
                 # Log interaction
                 recent_messages.append({
                     "player": player_name,
@@ -267,6 +319,11 @@ class LogMonitor:
                     "response": response,
                     "time": datetime.now().isoformat()
                 })
+            
+            except SchedulerRejected as e:
+                print(f"⏳ Skipped {player_name}: {e}")
+                if e.notify:
+                    await self.rcon.send_message(f"⏳ {e}")
                 
             except Exception as e:
                 print(f"AI Error: {e}")
@@ -11,10 +11,17 @@ import subprocess
 import re
 import time
 import requests
-import threading
 import os
+import sys
+import threading
+from pathlib import Path
 from dotenv import load_dotenv
 
+# Shared log fan-out hub and AI scheduler (project root)
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from log_hub import follow_logs, DEFAULT_LOG_SOURCE
+from ai_scheduler import get_ai_scheduler, SchedulerRejected
+
 # ========================================
 # CONFIGURATION (EDIT THESE)
 # ========================================
@@ -28,10 +35,16 @@ API_KEY = os.getenv("XAI_API_KEY", "your-xai-api-key-here")
 # Trigger words (player types these to talk to AI)
 TRIGGERS = ["console", "@ai", "hey console"]
 
+# Server log source (shared through the log hub when one is running)
+LOG_SOURCE = os.getenv("MINECRAFT_LOG_SOURCE", DEFAULT_LOG_SOURCE)
+
 # ========================================
 # CORE FUNCTIONS
 # ========================================
 
+# Held while one answer is posted, so concurrent answers don't interleave in chat
+chat_lock = threading.Lock()
+
 def send_to_minecraft(message):
     """Send message to Minecraft chat as [Console]"""
     try:
@@ -86,16 +99,8 @@ def monitor_chat():
     """Monitor Minecraft logs for chat messages"""
     print("📊 Monitoring chat...")
     
-    # Start tailing logs
-    process = subprocess.Popen(
-        ['docker', 'logs', '-f', 'titan-hub'],
-        stdout=subprocess.PIPE,
-        stderr=subprocess.STDOUT,
-        universal_newlines=True,
-        bufsize=1
-    )
-    
-    for line in process.stdout:
+    # Follow logs (one shared follower via the log hub)
+    for line in follow_logs(LOG_SOURCE):
         # Parse chat: [20:49:26 INFO]: [Not Secure] <galion.studio> hello
         match = re.search(r'<([^>]+)> (.+)', line)
         
@@ -107,17 +112,32 @@ def monitor_chat():
             if any(trigger in message.lower() for trigger in TRIGGERS):
                 print(f"\n💬 {player}: {message}")
                 
-                # Process in background thread (don't block log monitoring)
-                threading.Thread(
-                    target=handle_question,
-                    args=(player, message)
-                ).start()
+                # Queue for a bounded worker (don't block log monitoring); spam is
+                # rate limited per player and identical questions share one answer
+                try:
+                    future = get_ai_scheduler().submit_nowait(
+                        message, lambda player=player, message=message: handle_question(player, message), player=player
+                    )
+                except SchedulerRejected as e:
+                    print(f"⏳ Skipped {player}: {e}")
+                    if e.notify:
+                        send_to_minecraft(f"⏳ {e}")
+                    continue
+                
+                future.add_done_callback(lambda f, player=player: report_failure(player, f))
+
+def report_failure(player, future):
+    """Log asks that were shed from the queue or failed"""
+    error = future.exception()
+    if error is not None:
+        print(f"⏳ {player}: {error}")
 
 def handle_question(player, question):
     """Handle AI question in background"""
     
     # Show thinking
-    send_to_minecraft("🤔...")
+    with chat_lock:
+        send_to_minecraft("🤔...")
     
     # Get AI response (FAST!)
     start = time.time()
@@ -126,8 +146,9 @@ def handle_question(player, question):
     
     print(f"🤖 Grok Response ({elapsed:.2f}s): {answer}")
     
-    # Send to Minecraft (break into chunks if needed)
-    send_chunked(answer)
+    # Send to Minecraft (break into chunks if needed), one whole answer at a time
+    with chat_lock:
+        send_chunked(answer)
 
 def send_chunked(text, chunk_size=70):
     """Send long text in chat-friendly chunks"""
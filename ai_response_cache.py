@@ -0,0 +1,455 @@
+#!/usr/bin/env python3
+"""
+AI Response Cache for Grok / OpenRouter Answers
+Normalized, similarity-aware, persistent cache so common questions never hit the paid API twice
+
+Features:
+- Prompt normalization (case, unicode, punctuation, whitespace, filler words)
+- Optional similarity lookup with local hashed embeddings (no network, no model download)
+- TTL expiry and LRU size eviction
+- Pluggable persistence: in-memory only, or SQLite (WAL) surviving restarts
+- Namespaces so answers for different system prompts never mix
+
+Usage:
+    cache = ResponseCache(path=Path("data/ai-cache.sqlite"), similarity=0.9)
+    # get/put may write to SQLite: from async code, run them off the event loop
+    answer = await asyncio.to_thread(cache.get, "How do I craft a bed?", "minecraft")
+    if answer is None:
+        answer = await ask_api(...)
+        await asyncio.to_thread(cache.put, "How do I craft a bed?", answer, "minecraft")
+"""
+
+import hashlib
+import math
+import re
+import sqlite3
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+
+# Words that change nothing about what is being asked
+_FILLER_WORDS = {
+    "please", "pls", "plz", "hey", "hi", "hello", "yo", "console", "ai", "grok",
+    "um", "uh", "just", "quick", "question", "thanks", "thank", "ty"
+}
+
+# Frequent words ignored for similarity (they make every question look alike)
+_STOP_WORDS = {
+    "a", "an", "the", "i", "you", "me", "my", "we", "it", "is", "are", "was", "be",
+    "do", "does", "did", "can", "could", "would", "should", "to", "of", "in", "on",
+    "for", "with", "and", "or", "what", "whats", "how", "hows", "there", "this", "that",
+    "way", "get", "some", "any", "about", "tell"
+}
+
+_TOKEN_PATTERN = re.compile(r"[a-z0-9_]+")
+
+EMBEDDING_DIMENSIONS = 1024
+
+
+def normalize_prompt(text: str) -> str:
+    """
+    Canonical form of a prompt for exact cache lookups
+
+    "  Hey Console, how do I CRAFT a bed?? " -> "how do i craft a bed"
+    """
+    text = unicodedata.normalize("NFKC", text).lower()
+    # Minecraft color codes (§a, &a) carry no meaning
+    text = re.sub(r"[§&][0-9a-fk-or]", " ", text)
+    tokens = _TOKEN_PATTERN.findall(text)
+    return " ".join(token for token in tokens if token not in _FILLER_WORDS)
+
+
+def _stem(token: str) -> str:
+    """Very light suffix stripping so crafting/crafted/crafts all match craft"""
+    for suffix in ("ing", "ed", "es", "s"):
+        if len(token) > len(suffix) + 2 and token.endswith(suffix):
+            return token[:-len(suffix)]
+    return token
+
+
+def _feature_index(feature: str) -> int:
+    digest = hashlib.blake2b(feature.encode("utf-8"), digest_size=4).digest()
+    return int.from_bytes(digest, "little") % EMBEDDING_DIMENSIONS
+
+
+def content_words(normalized: str) -> List[str]:
+    """Stemmed words of a normalized prompt that carry meaning"""
+    return [_stem(w) for w in normalized.split() if w not in _STOP_WORDS]
+
+
+def hash_embedding(normalized: str) -> Dict[int, float]:
+    """
+    Sparse, L2-normalized hashed embedding of a normalized prompt
+
+    Content-word unigrams and bigrams carry most of the weight, character
+    trigrams add tolerance for typos and word forms. Stop words are ignored.
+
+    Returns:
+        {dimension: weight}
+    """
+    words = content_words(normalized)
+    vector: Dict[int, float] = {}
+
+    def add(feature: str, weight: float):
+        index = _feature_index(feature)
+        vector[index] = vector.get(index, 0.0) + weight
+
+    for word in words:
+        add(f"w:{word}", 1.0)
+        padded = f" {word} "
+        for i in range(len(padded) - 2):
+            add(f"c:{padded[i:i + 3]}", 0.25)
+    for first, second in zip(words, words[1:]):
+        add(f"b:{first} {second}", 0.5)
+
+    norm = math.sqrt(sum(w * w for w in vector.values()))
+    if norm == 0:
+        return {}
+    return {index: weight / norm for index, weight in vector.items()}
+
+
+def cosine(a: Dict[int, float], b: Dict[int, float]) -> float:
+    """Cosine similarity of two normalized sparse vectors"""
+    if len(a) > len(b):
+        a, b = b, a
+    return sum(weight * b.get(index, 0.0) for index, weight in a.items())
+
+
+@dataclass
+class CacheEntry:
+    """One cached answer"""
+    key: str
+    namespace: str
+    normalized: str
+    response: str
+    created: float
+    last_hit: float
+    hits: int = 0
+    embedding: Dict[int, float] = field(default_factory=dict, repr=False)
+
+
+class MemoryBackend:
+    """Persistence backend that keeps nothing (cache lives for the process only)"""
+
+    def load(self) -> Iterable[CacheEntry]:
+        return []
+
+    def save(self, entry: CacheEntry):
+        pass
+
+    def touch(self, entry: CacheEntry):
+        pass
+
+    def delete(self, keys: List[str]):
+        pass
+
+    def clear(self):
+        pass
+
+    def close(self):
+        pass
+
+
+class SQLiteBackend:
+    """
+    SQLite persistence (WAL, one small write per insert / hit)
+
+    Usage:
+        cache = ResponseCache(backend=SQLiteBackend(Path("data/ai-cache.sqlite")))
+    """
+
+    def __init__(self, path: Path):
+        """
+        Open (and create) the cache database
+
+        Args:
+            path: SQLite file
+        """
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS ai_responses (
+                key TEXT PRIMARY KEY,
+                namespace TEXT NOT NULL,
+                normalized TEXT NOT NULL,
+                response TEXT NOT NULL,
+                created REAL NOT NULL,
+                last_hit REAL NOT NULL,
+                hits INTEGER NOT NULL DEFAULT 0
+            )
+        """)
+        self._conn.commit()
+
+    def load(self) -> Iterable[CacheEntry]:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT key, namespace, normalized, response, created, last_hit, hits "
+                "FROM ai_responses ORDER BY last_hit"
+            ).fetchall()
+        return [CacheEntry(*row) for row in rows]
+
+    def save(self, entry: CacheEntry):
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO ai_responses "
+                "(key, namespace, normalized, response, created, last_hit, hits) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (entry.key, entry.namespace, entry.normalized, entry.response,
+                 entry.created, entry.last_hit, entry.hits)
+            )
+            self._conn.commit()
+
+    def touch(self, entry: CacheEntry):
+        with self._lock:
+            self._conn.execute(
+                "UPDATE ai_responses SET last_hit = ?, hits = ? WHERE key = ?",
+                (entry.last_hit, entry.hits, entry.key)
+            )
+            self._conn.commit()
+
+    def delete(self, keys: List[str]):
+        if not keys:
+            return
+        with self._lock:
+            self._conn.executemany("DELETE FROM ai_responses WHERE key = ?", [(k,) for k in keys])
+            self._conn.commit()
+
+    def clear(self):
+        with self._lock:
+            self._conn.execute("DELETE FROM ai_responses")
+            self._conn.commit()
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+class ResponseCache:
+    """
+    Normalized + similarity-aware AI response cache
+
+    Lookup order:
+    1. Exact match on the normalized prompt (within the namespace)
+    2. Nearest cached prompt by hashed-embedding cosine, if >= similarity
+
+    Usage:
+        cache = ResponseCache(path=Path("data/ai-cache.sqlite"))
+        cache.put("how do i craft a bed", "3 wool + 3 planks", namespace="minecraft")
+        cache.get("How do I craft a bed?", namespace="minecraft")
+    """
+
+    def __init__(
+        self,
+        path: Optional[Path] = None,
+        backend=None,
+        ttl: float = 7 * 24 * 3600,
+        max_entries: int = 5000,
+        similarity: Optional[float] = 0.9
+    ):
+        """
+        Initialize cache
+
+        Args:
+            path: SQLite file for persistence (shortcut for backend=SQLiteBackend(path))
+            backend: Persistence backend (default: memory only)
+            ttl: Seconds an answer stays valid (None = forever)
+            max_entries: Entries kept before least-recently-used ones are evicted
+            similarity: Minimum cosine for a similarity hit (None disables similarity lookup)
+        """
+        if backend is None:
+            backend = SQLiteBackend(path) if path else MemoryBackend()
+        self.backend = backend
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.similarity = similarity
+
+        self._lock = threading.RLock()
+        # key -> entry, least recently used first
+        self._entries: "OrderedDict[str, CacheEntry]" = OrderedDict()
+        # (namespace, content word) -> keys of prompts containing it (similarity candidates)
+        self._postings: Dict[Tuple[str, str], set] = {}
+
+        # Statistics
+        self.stats = {
+            "exact_hits": 0,
+            "similar_hits": 0,
+            "misses": 0,
+            "evictions": 0,
+            "expired": 0
+        }
+
+        self._load()
+
+    @staticmethod
+    def _key(namespace: str, normalized: str) -> str:
+        return hashlib.sha256(f"{namespace}\x00{normalized}".encode("utf-8")).hexdigest()
+
+    def _index(self, entry: CacheEntry):
+        for word in set(content_words(entry.normalized)):
+            self._postings.setdefault((entry.namespace, word), set()).add(entry.key)
+
+    def _remove(self, key: str):
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        for word in set(content_words(entry.normalized)):
+            keys = self._postings.get((entry.namespace, word))
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._postings[(entry.namespace, word)]
+
+    def _load(self):
+        """Warm the in-memory index from the backend"""
+        expired = []
+        now = time.time()
+        for entry in self.backend.load():
+            if self._is_expired(entry, now):
+                expired.append(entry.key)
+                continue
+            entry.embedding = hash_embedding(entry.normalized)
+            self._entries[entry.key] = entry
+            self._index(entry)
+        self.backend.delete(expired)
+        self._evict()
+
+    def _is_expired(self, entry: CacheEntry, now: float) -> bool:
+        return self.ttl is not None and now - entry.created > self.ttl
+
+    def _evict(self) -> List[str]:
+        evicted = []
+        while len(self._entries) > self.max_entries:
+            key = next(iter(self._entries))
+            self._remove(key)
+            evicted.append(key)
+        self.stats["evictions"] += len(evicted)
+        self.backend.delete(evicted)
+        return evicted
+
+    def _nearest(self, namespace: str, normalized: str, now: float) -> Tuple[Optional[CacheEntry], float]:
+        # Only prompts sharing at least one content word can be similar enough
+        candidates = set()
+        for word in set(content_words(normalized)):
+            candidates.update(self._postings.get((namespace, word), ()))
+        if not candidates:
+            return None, 0.0
+
+        embedding = hash_embedding(normalized)
+        scored = sorted(
+            ((cosine(embedding, self._entries[key].embedding), key) for key in candidates),
+            reverse=True
+        )
+        for score, key in scored:
+            entry = self._entries[key]
+            if not self._is_expired(entry, now):
+                return entry, score
+            self._remove(key)
+            self.stats["expired"] += 1
+            self.backend.delete([key])
+        return None, 0.0
+
+    def _hit(self, entry: CacheEntry, now: float) -> str:
+        entry.hits += 1
+        entry.last_hit = now
+        self._entries.move_to_end(entry.key)
+        self.backend.touch(entry)
+        return entry.response
+
+    def get(self, prompt: str, namespace: str = "default") -> Optional[str]:
+        """
+        Look up a cached answer
+
+        Args:
+            prompt: Question as asked
+            namespace: Cache namespace (e.g. system prompt family)
+
+        Returns:
+            Cached answer or None
+        """
+        normalized = normalize_prompt(prompt)
+        if not normalized:
+            return None
+
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(self._key(namespace, normalized))
+            if entry is not None:
+                if not self._is_expired(entry, now):
+                    self.stats["exact_hits"] += 1
+                    return self._hit(entry, now)
+                self._remove(entry.key)
+                self.stats["expired"] += 1
+                self.backend.delete([entry.key])
+
+            if self.similarity is not None:
+                best, score = self._nearest(namespace, normalized, now)
+                if best is not None and score >= self.similarity:
+                    self.stats["similar_hits"] += 1
+                    return self._hit(best, now)
+
+            self.stats["misses"] += 1
+            return None
+
+    def put(self, prompt: str, response: str, namespace: str = "default"):
+        """
+        Store an answer
+
+        Args:
+            prompt: Question as asked
+            response: Answer to cache
+            namespace: Cache namespace
+        """
+        normalized = normalize_prompt(prompt)
+        if not normalized or not response:
+            return
+
+        now = time.time()
+        entry = CacheEntry(
+            key=self._key(namespace, normalized),
+            namespace=namespace,
+            normalized=normalized,
+            response=response,
+            created=now,
+            last_hit=now,
+            embedding=hash_embedding(normalized)
+        )
+        with self._lock:
+            self._remove(entry.key)
+            self._entries[entry.key] = entry
+            self._index(entry)
+            self.backend.save(entry)
+            self._evict()
+
+    def clear(self):
+        """Drop every cached answer (memory and backend)"""
+        with self._lock:
+            self._entries.clear()
+            self._postings.clear()
+            self.backend.clear()
+
+    def close(self):
+        """Close the persistence backend"""
+        self.backend.close()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get_stats(self) -> Dict:
+        """Get cache statistics"""
+        lookups = self.stats["exact_hits"] + self.stats["similar_hits"] + self.stats["misses"]
+        return {
+            **self.stats,
+            "entries": len(self._entries),
+            "hit_rate": (
+                (self.stats["exact_hits"] + self.stats["similar_hits"]) / lookups
+                if lookups > 0 else 0
+            )
+        }
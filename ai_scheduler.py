@@ -0,0 +1,472 @@
+#!/usr/bin/env python3
+"""
+AI Request Scheduler for the Chat Bridges
+Keeps chat spam from turning into hundreds of simultaneous AI API calls
+
+Features:
+- Global concurrency cap: at most N upstream requests (and chat replies) at once
+- Per-player token buckets: a burst of questions, then a steady rate per player
+- Ops / admins jump the queue and are never rate limited
+- Bounded queue with load shedding: when full, new normal asks are rejected and
+  priority asks displace the newest normal one; asks that waited too long are dropped
+- Coalescing: identical questions already queued or running share one upstream request
+- Usable from asyncio code and from plain threads (one shared scheduler per process)
+
+Usage:
+    scheduler = get_ai_scheduler()
+    reply = await scheduler.submit(question, lambda: ai.ask(question, player), player=player)
+    future = scheduler.submit_nowait(question, lambda: ask_grok(question), player=player)  # from threads
+"""
+
+import asyncio
+import concurrent.futures
+import heapq
+import itertools
+import json
+import os
+import threading
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Set
+
+from ai_response_cache import normalize_prompt
+
+
+# Defaults; the shared scheduler reads AI_* overrides when it is created
+# (after the bridge has loaded .env.grok)
+MAX_CONCURRENCY = 4
+QUEUE_SIZE = 32
+QUEUE_MAX_WAIT = 30.0  # seconds before a queued ask is stale
+PLAYER_RATE = 4.0  # questions per minute, sustained
+PLAYER_BURST = 3  # questions allowed back-to-back
+
+# Ops file of the hub server (itzg image keeps it in /data = ./worlds/hub)
+OPS_FILE = Path(__file__).resolve().parent / "worlds" / "hub" / "ops.json"
+
+# Idle buckets are forgotten once this many players are tracked
+MAX_TRACKED_PLAYERS = 1000
+# Seconds between "AI is busy" notices worth showing in chat
+BUSY_NOTICE_INTERVAL = 10.0
+
+
+class SchedulerRejected(Exception):
+    """An ask was not (or no longer) scheduled"""
+
+    def __init__(self, message: str, retry_after: float = 0.0):
+        super().__init__(message)
+        self.retry_after = retry_after
+        self.notify = True  # worth telling the player (False for repeats within a burst)
+
+
+class RateLimited(SchedulerRejected):
+    """The player asked faster than their token bucket allows"""
+
+
+class QueueFull(SchedulerRejected):
+    """The queue was full, or the ask was displaced by a priority ask"""
+
+
+class QueueTimeout(SchedulerRejected):
+    """The ask waited in the queue longer than the maximum wait"""
+
+
+class TokenBucket:
+    """Token bucket: `burst` tokens, refilled at `rate` per second"""
+
+    def __init__(self, rate: float, burst: int):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+        self.warned = False
+
+    def _refill(self, now: float):
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def take(self) -> float:
+        """Take one token; returns 0 on success, else seconds until one is available"""
+        now = time.monotonic()
+        self._refill(now)
+        if self.tokens >= 1.0:
+            self.tokens -= 1.0
+            return 0.0
+        return (1.0 - self.tokens) / self.rate if self.rate > 0 else float("inf")
+
+    def full(self) -> bool:
+        self._refill(time.monotonic())
+        return self.tokens >= self.burst
+
+
+class OpsList:
+    """
+    Players with priority: server ops plus configured admins
+
+    ops.json is re-read when it changes, so /op and /deop apply without a restart.
+    """
+
+    def __init__(self, path: Optional[Path] = None, extra: Optional[str] = None):
+        """
+        Args:
+            path: ops.json (default: MINECRAFT_OPS_FILE or the hub world's)
+            extra: Comma-separated admin names (default: AI_PRIORITY_PLAYERS)
+        """
+        self.path = Path(path or os.getenv("MINECRAFT_OPS_FILE") or OPS_FILE)
+        if extra is None:
+            extra = os.getenv("AI_PRIORITY_PLAYERS", "")
+        self.extra = {name.strip().lower() for name in extra.split(",") if name.strip()}
+        self._ops: Set[str] = set()
+        self._mtime: Optional[float] = None
+
+    def _reload(self):
+        try:
+            mtime = self.path.stat().st_mtime
+        except OSError:
+            self._ops, self._mtime = set(), None
+            return
+        if mtime == self._mtime:
+            return
+        try:
+            entries = json.loads(self.path.read_text(encoding="utf-8"))
+            self._ops = {entry["name"].lower() for entry in entries if entry.get("name")}
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            print(f"[!] Could not read {self.path}: {e}")
+        self._mtime = mtime
+
+    def is_op(self, player: str) -> bool:
+        name = player.lower()
+        if name in self.extra:
+            return True
+        self._reload()
+        return name in self._ops
+
+
+@dataclass(eq=False)
+class _Job:
+    key: str
+    player: str
+    priority: bool
+    func: Callable[[], Any]
+    future: asyncio.Future
+    seq: int
+    enqueued: float = field(default_factory=time.monotonic)
+    followers: int = 0
+
+
+class AIScheduler:
+    """
+    Fair, bounded front door for AI requests
+
+    `func` is the whole unit of work for one ask (API call and chat reply).
+    It may be a coroutine function (run on the scheduler loop) or a blocking
+    function (run in a worker thread). Up to `concurrency` asks run at once,
+    so callers posting to a shared chat serialize each reply themselves
+    (the bridges hold a chat lock per reply).
+
+    Usage:
+        scheduler = AIScheduler(concurrency=4, queue_size=32)
+        reply = await scheduler.submit("how do I craft a bed", ask, player="Steve")
+    """
+
+    def __init__(
+        self,
+        concurrency: int = MAX_CONCURRENCY,
+        queue_size: int = QUEUE_SIZE,
+        max_wait: float = QUEUE_MAX_WAIT,
+        player_rate: float = PLAYER_RATE,
+        player_burst: int = PLAYER_BURST,
+        is_priority: Optional[Callable[[str], bool]] = None
+    ):
+        """
+        Initialize scheduler
+
+        Args:
+            concurrency: Asks running at once
+            queue_size: Asks waiting at most (beyond that, asks are shed)
+            max_wait: Seconds an ask may wait before it is dropped as stale
+            player_rate: Sustained asks per minute per player
+            player_burst: Asks a player may make back-to-back
+            is_priority: Returns True for players that skip rate limits and jump the queue
+                         (default: OpsList, server ops plus AI_PRIORITY_PLAYERS)
+        """
+        self.concurrency = concurrency
+        self.queue_size = queue_size
+        self.max_wait = max_wait
+        self.player_rate = player_rate / 60.0
+        self.player_burst = player_burst
+        self.is_priority = is_priority or OpsList().is_op
+
+        self._queue: List[tuple] = []  # heap of (0 priority / 1 normal, seq, job)
+        self._inflight: Dict[str, _Job] = {}  # queued or running, by coalescing key
+        self._buckets: Dict[str, TokenBucket] = {}
+        self._seq = itertools.count()
+        self._running = 0
+        self._busy_noticed = float("-inf")
+
+        # Private event loop thread, shared by async and sync callers
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._run_loop, name="ai-scheduler", daemon=True)
+        self._thread.start()
+        self._ready: Optional[asyncio.Condition] = None
+        self._workers = asyncio.run_coroutine_threadsafe(self._start_workers(), self._loop).result()
+
+        # Statistics
+        self.stats = {
+            "submitted": 0,
+            "accepted": 0,
+            "completed": 0,
+            "failed": 0,
+            "coalesced": 0,
+            "priority": 0,
+            "rate_limited": 0,
+            "shed": 0,
+            "expired": 0,
+            "wait_ms_total": 0.0,
+            "wait_ms_max": 0.0
+        }
+
+    def _run_loop(self):
+        asyncio.set_event_loop(self._loop)
+        self._loop.run_forever()
+
+    async def _start_workers(self) -> List[asyncio.Task]:
+        self._ready = asyncio.Condition()
+        return [asyncio.ensure_future(self._worker()) for _ in range(self.concurrency)]
+
+    # ------------------------------------------------------------------
+    # Admission (runs on the scheduler loop)
+    # ------------------------------------------------------------------
+
+    def _bucket(self, player: str) -> TokenBucket:
+        bucket = self._buckets.get(player)
+        if bucket is None:
+            if len(self._buckets) >= MAX_TRACKED_PLAYERS:
+                self._buckets = {name: b for name, b in self._buckets.items() if not b.full()}
+            bucket = self._buckets[player] = TokenBucket(self.player_rate, self.player_burst)
+        return bucket
+
+    def _busy(self, error: SchedulerRejected) -> SchedulerRejected:
+        """Shed / expiry errors come in bursts under load: only one per interval is shown"""
+        now = time.monotonic()
+        error.notify = now - self._busy_noticed >= BUSY_NOTICE_INTERVAL
+        if error.notify:
+            self._busy_noticed = now
+        return error
+
+    def _shed(self, job: _Job, error: SchedulerRejected):
+        self._inflight.pop(job.key, None)
+        if not job.future.done():
+            job.future.set_exception(error)
+        self.stats["shed"] += 1
+
+    async def _admit(self, key: str, func: Callable[[], Any], player: str, priority: Optional[bool]) -> asyncio.Future:
+        self.stats["submitted"] += 1
+
+        # An identical ask is already queued or running: share its answer (no token spent)
+        job = self._inflight.get(key)
+        if job is not None:
+            job.followers += 1
+            self.stats["coalesced"] += 1
+            return job.future
+
+        if priority is None:
+            priority = self.is_priority(player)
+        if not priority:
+            bucket = self._bucket(player)
+            wait = bucket.take()
+            if wait:
+                self.stats["rate_limited"] += 1
+                error = RateLimited(f"{player} is asking too fast, try again in {wait:.0f}s", retry_after=wait)
+                error.notify, bucket.warned = not bucket.warned, True
+                raise error
+            bucket.warned = False
+
+        if len(self._queue) >= self.queue_size:
+            # Make room for an admin by dropping the newest normal ask; otherwise shed this one
+            normal = [entry for entry in self._queue if entry[0] == 1]
+            if not priority or not normal:
+                self.stats["shed"] += 1
+                raise self._busy(QueueFull("AI is busy, please ask again in a moment", retry_after=self.max_wait))
+            newest = max(normal, key=lambda entry: entry[1])
+            self._queue.remove(newest)
+            heapq.heapify(self._queue)
+            self._shed(newest[2], self._busy(QueueFull("AI is busy, your question was dropped", retry_after=self.max_wait)))
+
+        job = _Job(key, player, priority, func, self._loop.create_future(), next(self._seq))
+        self._inflight[key] = job
+        heapq.heappush(self._queue, (0 if priority else 1, job.seq, job))
+        self.stats["accepted"] += 1
+        self.stats["priority"] += priority
+        async with self._ready:
+            self._ready.notify()
+        return job.future
+
+    # ------------------------------------------------------------------
+    # Execution (runs on the scheduler loop)
+    # ------------------------------------------------------------------
+
+    async def _worker(self):
+        while True:
+            async with self._ready:
+                await self._ready.wait_for(lambda: self._queue)
+                _, _, job = heapq.heappop(self._queue)
+
+            waited = time.monotonic() - job.enqueued
+            if waited > self.max_wait:
+                # The asker has moved on; answering now would only add noise
+                self._inflight.pop(job.key, None)
+                self.stats["expired"] += 1
+                job.future.set_exception(self._busy(QueueTimeout(f"AI is busy, {job.player}'s question timed out")))
+                continue
+
+            self.stats["wait_ms_total"] += waited * 1000
+            self.stats["wait_ms_max"] = max(self.stats["wait_ms_max"], waited * 1000)
+            self._running += 1
+            try:
+                if asyncio.iscoroutinefunction(job.func):
+                    result = await job.func()
+                else:
+                    result = await self._loop.run_in_executor(None, job.func)
+                    if asyncio.iscoroutine(result):
+                        result = await result
+                job.future.set_result(result)
+                self.stats["completed"] += 1
+            except Exception as e:
+                job.future.set_exception(e)
+                self.stats["failed"] += 1
+            finally:
+                self._running -= 1
+                self._inflight.pop(job.key, None)
+
+    # ------------------------------------------------------------------
+    # Public API (thread-safe)
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def coalesce_key(question: str, namespace: str = "default") -> str:
+        """Key under which identical questions share one request"""
+        return f"{namespace}\x00{normalize_prompt(question)}"
+
+    @staticmethod
+    async def _result(job_future: asyncio.Future) -> Any:
+        # Shielded: a caller giving up does not cancel the ask for coalesced followers
+        return await asyncio.shield(job_future)
+
+    async def _submit(self, key: str, func: Callable[[], Any], player: str, priority: Optional[bool]) -> Any:
+        return await self._result(await self._admit(key, func, player, priority))
+
+    async def submit(
+        self,
+        question: str,
+        func: Callable[[], Any],
+        player: str,
+        namespace: str = "default",
+        priority: Optional[bool] = None
+    ) -> Any:
+        """
+        Run an ask under the scheduler's limits from any event loop
+
+        Args:
+            question: Question text (identical questions in the same namespace are coalesced)
+            func: Does the work; coroutine function or blocking function, called without arguments
+            player: Player who asked (rate limit and priority)
+            namespace: Keeps asks with different prompts/models apart
+            priority: Override the ops check
+
+        Returns:
+            What func returned (for coalesced asks, the first asker's result)
+
+        Raises:
+            SchedulerRejected: Rate limited, shed or expired in the queue
+        """
+        future = asyncio.run_coroutine_threadsafe(
+            self._submit(self.coalesce_key(question, namespace), func, player, priority), self._loop
+        )
+        return await asyncio.wrap_future(future)
+
+    def submit_nowait(
+        self,
+        question: str,
+        func: Callable[[], Any],
+        player: str,
+        namespace: str = "default",
+        priority: Optional[bool] = None
+    ) -> concurrent.futures.Future:
+        """
+        Queue an ask from synchronous code without waiting for it to run
+
+        Rate limits and a full queue are checked before returning, so a
+        rejection on arrival raises here; a later shed or expiry ends up in
+        the returned future.
+
+        Returns:
+            Future with func's result
+
+        Raises:
+            SchedulerRejected: Rate limited or shed on arrival
+        """
+        job_future = asyncio.run_coroutine_threadsafe(
+            self._admit(self.coalesce_key(question, namespace), func, player, priority), self._loop
+        ).result()
+        return asyncio.run_coroutine_threadsafe(self._result(job_future), self._loop)
+
+    def submit_sync(
+        self,
+        question: str,
+        func: Callable[[], Any],
+        player: str,
+        namespace: str = "default",
+        priority: Optional[bool] = None,
+        timeout: Optional[float] = None
+    ) -> Any:
+        """Run an ask under the scheduler's limits from synchronous code (blocks until done)"""
+        return self.submit_nowait(question, func, player, namespace, priority).result(timeout)
+
+    def close(self):
+        """Stop the workers; queued asks are rejected"""
+        async def shutdown():
+            for worker in self._workers:
+                worker.cancel()
+            for _, _, job in self._queue:
+                if not job.future.done():
+                    job.future.set_exception(QueueFull("AI scheduler stopped"))
+            self._queue.clear()
+            self._inflight.clear()
+
+        asyncio.run_coroutine_threadsafe(shutdown(), self._loop).result(5)
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join(timeout=5)
+
+    def get_stats(self) -> Dict:
+        """Get scheduler statistics"""
+        started = self.stats["completed"] + self.stats["failed"] + self._running
+        return {
+            **self.stats,
+            "queued": len(self._queue),
+            "running": self._running,
+            "players_tracked": len(self._buckets),
+            "avg_wait_ms": round(self.stats["wait_ms_total"] / started, 1) if started else 0.0
+        }
+
+
+# Global instance
+_scheduler: Optional[AIScheduler] = None
+_scheduler_lock = threading.Lock()
+
+
+def get_ai_scheduler(**kwargs) -> AIScheduler:
+    """Get the process-wide AI scheduler (settings apply on first call only; kwargs override AI_* env)"""
+    global _scheduler
+    with _scheduler_lock:
+        if _scheduler is None:
+            settings = {
+                "concurrency": int(os.getenv("AI_MAX_CONCURRENCY", MAX_CONCURRENCY)),
+                "queue_size": int(os.getenv("AI_QUEUE_SIZE", QUEUE_SIZE)),
+                "max_wait": float(os.getenv("AI_QUEUE_MAX_WAIT", QUEUE_MAX_WAIT)),
+                "player_rate": float(os.getenv("AI_PLAYER_RATE", PLAYER_RATE)),
+                "player_burst": int(os.getenv("AI_PLAYER_BURST", PLAYER_BURST))
+            }
+            settings.update(kwargs)
+            _scheduler = AIScheduler(**settings)
+        return _scheduler
@@ -11,7 +11,7 @@ Features:
 - Error handling
 
 Endpoints:
-  POST /chat          - Send AI chat message
+  POST /chat          - Send AI chat message (stream=true for NDJSON token streaming)
   POST /command       - Execute Minecraft command
   POST /project/cmd   - Execute project command
   GET /status         - Get system status
@@ -20,10 +20,13 @@ Endpoints:
 
 from fastapi import FastAPI, HTTPException, BackgroundTasks
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
 from typing import Optional, Dict, Any, List
 import asyncio
+import json
 import os
+import time
 from dotenv import load_dotenv
 import uvicorn
 
@@ -32,6 +35,7 @@ try:
     from grok_client import GrokClient
     from rcon_client import RconClient
     from project_controller import ProjectController
+    from chat_stream import chunk_stream, SentenceChunker
 except ImportError:
     # Try importing from current directory
     import sys
@@ -39,6 +43,7 @@ except ImportError:
     from grok_client import GrokClient
     from rcon_client import RconClient
     from project_controller import ProjectController
+    from chat_stream import chunk_stream, SentenceChunker
 
 
 # Load environment
@@ -54,6 +59,8 @@ class ChatRequest(BaseModel):
     message: str
     player_name: Optional[str] = "Console"
     system_prompt: Optional[str] = None
+    stream: bool = False          # Stream tokens as NDJSON while the answer generates
+    broadcast: bool = False       # Also say each finished sentence in Minecraft chat
 
 
 class ChatResponse(BaseModel):
@@ -138,7 +145,14 @@ async def startup_event():
     openrouter_api_key = os.getenv("OPENROUTER_API_KEY", "")
     if openrouter_api_key and openrouter_api_key != "your-openrouter-api-key-here":
         try:
-            grok_client = GrokClient(api_key=openrouter_api_key)
+            similarity = os.getenv("RESPONSE_CACHE_SIMILARITY", "0.9")
+            grok_client = GrokClient(
+                api_key=openrouter_api_key,
+                cache_size=int(os.getenv("RESPONSE_CACHE_SIZE") or 5000),
+                cache_path=os.getenv("RESPONSE_CACHE_PATH", "ai-response-cache.sqlite") or None,
+                cache_ttl=float(os.getenv("RESPONSE_CACHE_TTL") or 7 * 24 * 3600),
+                cache_similarity=float(similarity) if similarity else None
+            )
             print("✓ Grok AI initialized (via OpenRouter)")
         except Exception as e:
             print(f"⚠ Grok AI failed: {e}")
@@ -194,6 +208,63 @@ async def root():
     }
 
 
+async def _queued_deltas(queue: asyncio.Queue):
+    """Async iterator over a delta queue (None ends the stream)"""
+    while True:
+        delta = await queue.get()
+        if delta is None:
+            return
+        yield delta
+
+
+async def _stream_chat(request: ChatRequest, start_time: float):
+    """
+    NDJSON body for a streamed /chat request
+    
+    Lines: {"delta": "..."} per token batch, then
+    {"done": true, "response": "...", "execution_time": ...} or {"error": "..."}
+    """
+    if request.system_prompt:
+        deltas = grok_client.ask_stream(request.message, system=request.system_prompt)
+    else:
+        deltas = grok_client.ask_minecraft_stream(request.message, request.player_name)
+    
+    # Raw tokens go to the HTTP client; finished sentences go to Minecraft chat
+    broadcast_queue: Optional[asyncio.Queue] = None
+    broadcaster = None
+    if request.broadcast and rcon_client:
+        broadcast_queue = asyncio.Queue()
+        
+        async def broadcast():
+            async for line in chunk_stream(_queued_deltas(broadcast_queue)):
+                await rcon_client.say(line, prefix="[AI]")
+        
+        broadcaster = asyncio.create_task(broadcast())
+    
+    parts = []
+    try:
+        async for delta in deltas:
+            parts.append(delta)
+            if broadcast_queue:
+                broadcast_queue.put_nowait(delta)
+            yield json.dumps({"delta": delta}) + "\n"
+        
+        if broadcaster:
+            broadcast_queue.put_nowait(None)
+            await broadcaster
+        
+        yield json.dumps({
+            "done": True,
+            "response": "".join(parts),
+            "execution_time": time.time() - start_time
+        }) + "\n"
+    
+    except Exception as e:
+        if broadcaster:
+            broadcaster.cancel()
+        yield json.dumps({"error": f"Chat error: {str(e)}"}) + "\n"
+
+
 @app.post("/chat", response_model=ChatResponse)
 async def chat(request: ChatRequest):
     """
@@ -203,14 +274,20 @@ async def chat(request: ChatRequest):
         request: Chat request with message and optional player name
     
     Returns:
-        AI response with execution time
+        AI response with execution time, or an NDJSON token stream if request.stream
     """
     if not grok_client:
         raise HTTPException(status_code=503, detail="Grok AI not available")
     
-    import time
     start_time = time.time()
     
+    if request.stream:
+        return StreamingResponse(
+            _stream_chat(request, start_time),
+            media_type="application/x-ndjson",
+            headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+        )
+    
     try:
         # Ask Grok
         if request.system_prompt:
@@ -226,6 +303,11 @@ async def chat(request: ChatRequest):
         
         execution_time = time.time() - start_time
         
+        if request.broadcast and rcon_client:
+            # Chat-sized lines, as the stream path sends them (one long `say` exceeds the RCON payload limit)
+            chunker = SentenceChunker()
+            await rcon_client.say_many(chunker.feed(response) + chunker.flush(), prefix="[AI]")
+        
         return ChatResponse(
             response=response,
             execution_time=execution_time
@@ -400,7 +482,7 @@ async def clear_cache():
     if not grok_client:
         raise HTTPException(status_code=503, detail="Grok AI not available")
     
-    grok_client.clear_cache()
+    await asyncio.to_thread(grok_client.clear_cache)
     return {"success": True, "message": "Cache cleared"}
 
 
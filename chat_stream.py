@@ -0,0 +1,167 @@
+#!/usr/bin/env python3
+"""
+Streaming AI Replies into Minecraft Chat
+Turns a token stream into chat-sized lines as soon as each one is ready
+
+Features:
+- Sentence-boundary chunking of streamed deltas
+- Hard wrap on word boundaries for long sentences (Minecraft chat is narrow)
+- Short sentences are held back and merged so chat isn't spammed with fragments
+- stream_to_chat() pushes each line to RCON the moment it completes
+- Optional chat lock held from a reply's first line to its last (concurrent replies don't interleave)
+
+Usage:
+    deltas = grok_client.ask_minecraft_stream(question, player)
+    answer = await stream_to_chat(deltas, lambda line: rcon_client.say(line, prefix="[AI]"))
+"""
+
+import asyncio
+import re
+from typing import AsyncIterator, Awaitable, Callable, List, Optional
+
+# End of sentence: terminal punctuation (optionally closed by quotes/brackets) followed by whitespace
+_SENTENCE_END = re.compile(r'[.!?…:;]+["\')\]]*\s+|\n+')
+
+
+class SentenceChunker:
+    """
+    Incremental chunker for streamed text
+
+    Usage:
+        chunker = SentenceChunker(max_length=100)
+        for delta in deltas:
+            for line in chunker.feed(delta):
+                send(line)
+        for line in chunker.flush():
+            send(line)
+    """
+
+    def __init__(self, max_length: int = 100, min_length: int = 30):
+        """
+        Initialize chunker
+
+        Args:
+            max_length: Longest line sent to chat
+            min_length: Sentences shorter than this wait to be merged with the next one
+        """
+        self.max_length = max_length
+        self.min_length = min_length
+        self._buffer = ""
+
+    def _wrap(self, text: str) -> List[str]:
+        """Split text longer than max_length on word boundaries"""
+        lines = []
+        while len(text) > self.max_length:
+            cut = text.rfind(" ", 0, self.max_length + 1)
+            if cut <= 0:
+                cut = self.max_length
+            lines.append(text[:cut].strip())
+            text = text[cut:].strip()
+        if text:
+            lines.append(text)
+        return lines
+
+    def feed(self, delta: str) -> List[str]:
+        """
+        Add streamed text
+
+        Args:
+            delta: Next piece of the response
+
+        Returns:
+            Lines that are complete and can be sent now
+        """
+        self._buffer += delta
+        ready = []
+
+        while True:
+            # Last sentence end that still fits a line (or the first one at all)
+            cut = None
+            for match in _SENTENCE_END.finditer(self._buffer):
+                if cut is not None and match.end() > self.max_length:
+                    break
+                cut = match.end()
+                if cut >= self.min_length:
+                    break
+
+            if cut is not None and len(self._buffer[:cut].strip()) >= self.min_length:
+                text, self._buffer = self._buffer[:cut].strip(), self._buffer[cut:]
+                ready.extend(self._wrap(text))
+                continue
+
+            if len(self._buffer) > self.max_length:
+                # No sentence end in sight - send what fills a line
+                cut = self._buffer.rfind(" ", 0, self.max_length + 1)
+                if cut <= 0:
+                    cut = self.max_length
+                ready.append(self._buffer[:cut].strip())
+                self._buffer = self._buffer[cut:].lstrip()
+                continue
+
+            return [line for line in ready if line]
+
+    def flush(self) -> List[str]:
+        """Return whatever is left once the stream has ended"""
+        text, self._buffer = self._buffer.strip(), ""
+        return self._wrap(text) if text else []
+
+
+async def chunk_stream(
+    deltas: AsyncIterator[str],
+    max_length: int = 100,
+    min_length: int = 30
+) -> AsyncIterator[str]:
+    """
+    Re-chunk a delta stream into chat lines
+
+    Args:
+        deltas: Async iterator of streamed text pieces
+        max_length: Longest line
+        min_length: Minimum length before a sentence is emitted on its own
+
+    Yields:
+        Chat-sized lines, in order, as soon as each is complete
+    """
+    chunker = SentenceChunker(max_length, min_length)
+    async for delta in deltas:
+        for line in chunker.feed(delta):
+            yield line
+    for line in chunker.flush():
+        yield line
+
+
+async def stream_to_chat(
+    deltas: AsyncIterator[str],
+    send: Callable[[str], Awaitable],
+    max_length: int = 100,
+    min_length: int = 30,
+    lock: Optional[asyncio.Lock] = None
+) -> str:
+    """
+    Send a streamed AI reply to chat line by line while it generates
+
+    Args:
+        deltas: Async iterator of streamed text pieces
+        send: Coroutine function sending one line (e.g. an RCON say)
+        max_length: Longest line
+        min_length: Minimum length before a sentence is sent on its own
+        lock: Chat lock shared by concurrent replies; taken when the first line
+            is ready and held until the last, so other replies keep generating
+            but wait to post
+
+    Returns:
+        Full reply text
+    """
+    lines = []
+    held = False
+    try:
+        async for line in chunk_stream(deltas, max_length, min_length):
+            if lock is not None and not held:
+                await lock.acquire()
+                held = True
+            lines.append(line)
+            await send(line)
+    finally:
+        if held:
+            lock.release()
+    return " ".join(lines)
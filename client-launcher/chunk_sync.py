@@ -0,0 +1,191 @@
+#!/usr/bin/env python3
+"""
+Block-level delta downloads from the Titan mod sync server
+Rebuilds an updated mod from the chunks of the old local copy plus only the missing chunks
+
+How it works:
+1. After every download we keep the server's chunk list for that file
+2. On update, look the new chunk list up in an index of every installed file's chunks
+   (a renamed jar - foo-1.2.jar -> foo-1.3.jar - reuses the chunks of the old one)
+3. Chunks we already have are copied from whichever local file holds them
+4. Missing chunks are fetched in batches from /api/chunks/batch
+5. Every fetched chunk and the whole file are SHA256-verified before replacing the old file
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import requests
+
+
+# Chunks per /api/chunks/batch request (server allows up to 256)
+BATCH_SIZE = 64
+
+
+def load_chunk_list(state_dir: Path, filename: str) -> Optional[List[Dict]]:
+    """Load the chunk list stored for a local file (None if unknown)"""
+    try:
+        return json.loads((state_dir / f"{filename}.json").read_text())
+    except (OSError, ValueError):
+        return None
+
+
+def save_chunk_list(state_dir: Path, filename: str, chunks: List[Dict]):
+    """Store the chunk list of a freshly downloaded file"""
+    state_dir.mkdir(parents=True, exist_ok=True)
+    (state_dir / f"{filename}.json").write_text(json.dumps(chunks))
+
+
+class LocalChunks:
+    """
+    Chunks held by installed files, by hash - the delta source for any update
+
+    Usage:
+        local = LocalChunks.load(CHUNK_STATE_DIR, MODS_DIR)
+        chunks = delta_download(session, SERVER, remote, MODS_DIR / "foo-1.3.jar", local)
+        local.replace(MODS_DIR / "foo-1.3.jar", chunks)
+    """
+
+    def __init__(self):
+        self._sources: Dict[str, List[Tuple[Path, int, int]]] = {}
+
+    @classmethod
+    def load(cls, state_dir: Path, files_dir: Path) -> "LocalChunks":
+        """Index every file in files_dir that has a stored chunk list"""
+        local = cls()
+        for list_file in state_dir.glob("*.json"):
+            path = files_dir / list_file.name[:-len(".json")]
+            chunks = load_chunk_list(state_dir, path.name)
+            if chunks and path.exists():
+                local.add(path, chunks)
+        return local
+
+    def add(self, path: Path, chunks: List[Dict]):
+        """Record the chunks of a local file"""
+        for chunk in chunks:
+            self._sources.setdefault(chunk["hash"], []).append((path, chunk["offset"], chunk["size"]))
+
+    def replace(self, path: Path, chunks: List[Dict]):
+        """A local file was rewritten: drop its old chunks, record the new ones"""
+        for chunk_hash in list(self._sources):
+            sources = [s for s in self._sources[chunk_hash] if s[0] != path]
+            if sources:
+                self._sources[chunk_hash] = sources
+            else:
+                del self._sources[chunk_hash]
+        self.add(path, chunks)
+
+    def get(self, chunk_hash: str) -> Optional[Tuple[Path, int, int]]:
+        """(path, offset, size) of a local copy of the chunk, or None"""
+        sources = self._sources.get(chunk_hash)
+        return sources[0] if sources else None
+
+    def __contains__(self, chunk_hash: str) -> bool:
+        return chunk_hash in self._sources
+
+    def __len__(self) -> int:
+        return len(self._sources)
+
+
+def fetch_chunk_list(session: requests.Session, server: str, filename: str, kind: str = "mods") -> Optional[Dict]:
+    """Fetch a file's chunk list from the server (None if unsupported)"""
+    resp = session.get(f"{server}/api/{kind}/chunks/{filename}", timeout=30)
+    if resp.status_code != 200:
+        return None
+    return resp.json()
+
+
+def delta_download(
+    session: requests.Session,
+    server: str,
+    remote: Dict,
+    dest: Path,
+    local: LocalChunks,
+    log=print
+) -> List[Dict]:
+    """
+    Write the server's version of a file to dest, downloading only missing chunks
+
+    Args:
+        session: HTTP session (connection reuse)
+        server: Server base URL
+        remote: Chunk list response from fetch_chunk_list()
+        dest: Local file to create or replace (may be one of the sources)
+        local: Chunks of installed files
+        log: Logging callback
+
+    Returns:
+        New chunk list (store it with save_chunk_list, then local.replace())
+    """
+    new_chunks = remote["chunks"]
+
+    missing = []
+    seen = set()
+    for chunk in new_chunks:
+        if chunk["hash"] not in local and chunk["hash"] not in seen:
+            seen.add(chunk["hash"])
+            missing.append(chunk)
+
+    missing_bytes = sum(c["size"] for c in missing)
+    log(f"[DELTA] {dest.name}: reusing {len(new_chunks) - len(missing)}/{len(new_chunks)} chunks, "
+        f"fetching {missing_bytes / 1024:.1f} KB of {remote['size'] / 1024:.1f} KB")
+
+    with tempfile.TemporaryFile() as spool:
+        # 1. Fetch missing chunks into a spool file (verified per chunk)
+        spool_offsets = {}
+        for start in range(0, len(missing), BATCH_SIZE):
+            batch = missing[start:start + BATCH_SIZE]
+            resp = session.post(
+                f"{server}/api/chunks/batch",
+                json={"hashes": [c["hash"] for c in batch]},
+                stream=True,
+                timeout=60
+            )
+            resp.raise_for_status()
+            raw = resp.raw
+            raw.decode_content = True
+            for chunk in batch:
+                data = raw.read(chunk["size"])
+                if hashlib.sha256(data).hexdigest() != chunk["hash"]:
+                    raise ValueError(f"Chunk {chunk['hash'][:12]} failed verification")
+                spool_offsets[chunk["hash"]] = spool.tell()
+                spool.write(data)
+            resp.close()
+
+        # 2. Assemble the new file from local chunks + spooled chunks
+        expected = remote["checksum"].split(":", 1)[-1]
+        sha256 = hashlib.sha256()
+        fd, tmp_name = tempfile.mkstemp(dir=dest.parent, prefix=f".{dest.name}.", suffix=".part")
+        sources = {}
+        try:
+            with os.fdopen(fd, 'wb') as out:
+                for chunk in new_chunks:
+                    if chunk["hash"] in spool_offsets:
+                        spool.seek(spool_offsets[chunk["hash"]])
+                        data = spool.read(chunk["size"])
+                    else:
+                        path, offset, size = local.get(chunk["hash"])
+                        if path not in sources:
+                            sources[path] = open(path, 'rb')
+                        sources[path].seek(offset)
+                        data = sources[path].read(size)
+                    sha256.update(data)
+                    out.write(data)
+            for source in sources.values():
+                source.close()
+
+            if sha256.hexdigest() != expected:
+                raise ValueError(f"{dest.name} failed checksum verification after delta update")
+
+            os.replace(tmp_name, dest)
+        except BaseException:
+            for source in sources.values():
+                source.close()
+            Path(tmp_name).unlink(missing_ok=True)
+            raise
+
+    return new_chunks
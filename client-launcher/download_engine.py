@@ -0,0 +1,438 @@
+#!/usr/bin/env python3
+"""
+Shared Download Engine for the Galion/Titan launchers
+Parallel, resumable, checksum-verified downloads with flat memory use
+
+Features:
+- Bounded pool of concurrent connections shared by all files
+- Large files split into HTTP Range segments downloaded in parallel
+- Streamed straight to a .part file on disk (no whole-file buffers)
+- Resume after interruption (completed segments recorded in a .part.json sidecar)
+- SHA256 verification against the manifest's "sha256:" field, hashed in order
+  as segments complete (read back from the OS page cache)
+- Atomic rename into place only after verification
+- Segment hooks so consumers (e.g. streaming ZIP extraction) can use data early
+"""
+
+import hashlib
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+
+
+STREAM_CHUNK_SIZE = 1024 * 1024
+
+
+class DownloadError(Exception):
+    """Download failed after all retries (or failed verification)"""
+
+    def __init__(self, message: str, status_code: Optional[int] = None):
+        super().__init__(message)
+        self.status_code = status_code  # HTTP status if the server rejected the request
+
+
+@dataclass
+class DownloadJob:
+    """One file to download"""
+    url: str
+    dest: Path
+    size: Optional[int] = None        # Known size (small files skip the size probe)
+    checksum: Optional[str] = None    # "sha256:<hex>" or bare hex
+    name: str = ""
+    tail_first: bool = False          # Fetch the end first (ZIP central directory)
+    in_place: bool = False            # Write to dest directly (no .part rename)
+
+    def __post_init__(self):
+        self.dest = Path(self.dest)
+        if not self.name:
+            self.name = self.dest.name
+
+
+@dataclass
+class _FileState:
+    job: DownloadJob
+    size: int
+    ranged: bool
+    segments: List[tuple]                  # (start, end_exclusive)
+    done: set = field(default_factory=set)
+    hashed_upto: int = 0                   # Index of next segment to hash
+    hasher: object = field(default_factory=hashlib.sha256)
+    lock: threading.Lock = field(default_factory=threading.Lock)
+    failed: Optional[Exception] = None
+    last_sidecar_write: float = 0.0
+
+    @property
+    def part_path(self) -> Path:
+        if self.job.in_place:
+            return self.job.dest
+        return self.job.dest.with_name(self.job.dest.name + ".part")
+
+    @property
+    def sidecar_path(self) -> Path:
+        return self.job.dest.with_name(self.job.dest.name + ".part.json")
+
+
+def _expected_sha256(checksum: Optional[str]) -> Optional[str]:
+    if not checksum:
+        return None
+    return checksum.split(":", 1)[1] if checksum.startswith("sha256:") else checksum
+
+
+class DownloadEngine:
+    """
+    Parallel, resumable downloader
+
+    Usage:
+        engine = DownloadEngine(max_connections=8)
+        engine.download_many([
+            DownloadJob(url, Path("mods/a.jar"), size=1234, checksum="sha256:...")
+        ])
+    """
+
+    def __init__(
+        self,
+        max_connections: int = 8,
+        segment_size: int = 8 * 1024 * 1024,
+        retries: int = 3,
+        timeout: int = 30,
+        log: Callable[[str], None] = print
+    ):
+        """
+        Initialize download engine
+
+        Args:
+            max_connections: Max concurrent HTTP connections across all files
+            segment_size: Range segment size for large files
+            retries: Attempts per segment before the file fails
+            timeout: Connect/read timeout in seconds
+            log: Logging callback
+        """
+        self.max_connections = max_connections
+        self.segment_size = segment_size
+        self.retries = retries
+        self.timeout = timeout
+        self.log = log
+
+        # requests.Session is not thread-safe - one per worker thread
+        self._local = threading.local()
+
+        # Progress across the current batch
+        self._progress_lock = threading.Lock()
+        self._bytes_done = 0
+        self._bytes_total = 0
+
+        # Statistics
+        self.stats = {
+            "files_downloaded": 0,
+            "bytes_downloaded": 0,
+            "bytes_resumed": 0,
+            "segment_retries": 0
+        }
+
+    def _session(self) -> requests.Session:
+        session = getattr(self._local, "session", None)
+        if session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=4, pool_maxsize=self.max_connections)
+            session.mount("http://", adapter)
+            session.mount("https://", adapter)
+            self._local.session = session
+        return session
+
+    # ------------------------------------------------------------------
+    # Planning
+    # ------------------------------------------------------------------
+
+    def _probe(self, job: DownloadJob) -> tuple:
+        """
+        Get (size, supports_ranges) with a 1-byte Range request
+        (works on servers that don't answer HEAD, e.g. FastAPI GET routes)
+        """
+        with self._session().get(job.url, headers={"Range": "bytes=0-0"}, stream=True,
+                                 timeout=self.timeout) as resp:
+            resp.raise_for_status()
+            if resp.status_code == 206:
+                # Content-Range: bytes 0-0/<total>
+                total = resp.headers.get("content-range", "").rpartition("/")[2]
+                if total.isdigit():
+                    return int(total), True
+            return int(resp.headers.get("content-length", 0)) or job.size, False
+
+    def _plan(self, job: DownloadJob) -> _FileState:
+        """Split a job into segments, restoring progress from a previous run"""
+        job.dest.parent.mkdir(parents=True, exist_ok=True)
+
+        if job.size is not None and job.size <= self.segment_size:
+            # Small file with known size: a single GET, no probe round-trip
+            return _FileState(job=job, size=job.size, ranged=False, segments=[(0, job.size)])
+
+        size, ranged = self._probe(job)
+
+        if not size or not ranged:
+            # Unknown size or no Range support: one plain stream, restarted on retry
+            return _FileState(job=job, size=size or 0, ranged=False, segments=[(0, size or 0)])
+
+        segments = [
+            (start, min(start + self.segment_size, size))
+            for start in range(0, size, self.segment_size)
+        ]
+        state = _FileState(job=job, size=size, ranged=True, segments=segments)
+
+        # Resume: trust completed segments only if the sidecar matches this download
+        try:
+            sidecar = json.loads(state.sidecar_path.read_text())
+            if (sidecar.get("url") == job.url and sidecar.get("size") == size
+                    and sidecar.get("segment_size") == self.segment_size
+                    and state.part_path.exists() and state.part_path.stat().st_size == size):
+                state.done = set(sidecar.get("done", []))
+        except (OSError, ValueError):
+            pass
+
+        if not state.done:
+            # Preallocate so segments can be written at their offsets
+            with open(state.part_path, 'wb') as f:
+                f.truncate(size)
+        else:
+            resumed = sum(end - start for i, (start, end) in enumerate(segments) if i in state.done)
+            self.stats["bytes_resumed"] += resumed
+            self.log(f"[DOWNLOAD] Resuming {job.name}: {resumed / 1024 / 1024:.1f} MB already on disk")
+
+        return state
+
+    # ------------------------------------------------------------------
+    # Transfer
+    # ------------------------------------------------------------------
+
+    def _add_progress(self, count: int, progress: Optional[Callable[[int, int], None]]):
+        with self._progress_lock:
+            self._bytes_done += count
+            done, total = self._bytes_done, self._bytes_total
+        if progress:
+            progress(done, total)
+
+    def _fetch_segment(self, state: _FileState, index: int, progress, on_segment) -> None:
+        """Download one segment (with retries) into the .part file"""
+        start, end = state.segments[index]
+
+        for attempt in range(1, self.retries + 1):
+            if state.failed:
+                return
+            written = 0
+            try:
+                headers = {"Range": f"bytes={start}-{end - 1}"} if state.ranged else {}
+                with self._session().get(state.job.url, headers=headers, stream=True,
+                                         timeout=self.timeout) as resp:
+                    if state.ranged and resp.status_code != 206:
+                        raise DownloadError(f"Server ignored Range request (HTTP {resp.status_code})")
+                    resp.raise_for_status()
+
+                    mode = 'r+b' if state.ranged else 'wb'
+                    with open(state.part_path, mode) as f:
+                        f.seek(start)
+                        for chunk in resp.iter_content(chunk_size=STREAM_CHUNK_SIZE):
+                            f.write(chunk)
+                            written += len(chunk)
+                            self._add_progress(len(chunk), progress)
+
+                if state.ranged and written != end - start:
+                    raise DownloadError(f"Short segment ({written}/{end - start} bytes)")
+                if not state.ranged:
+                    state.size = written
+                    state.segments[index] = (0, written)
+
+                self.stats["bytes_downloaded"] += written
+                self._segment_done(state, index)
+                if on_segment:
+                    on_segment(state.job, *state.segments[index])
+                return
+
+            except (requests.RequestException, DownloadError, OSError) as e:
+                self._add_progress(-written, progress)
+                if attempt == self.retries:
+                    state.failed = DownloadError(f"{state.job.name}: {e}")
+                    return
+                self.stats["segment_retries"] += 1
+                time.sleep(min(2 ** attempt * 0.5, 5))
+
+    def _segment_done(self, state: _FileState, index: int):
+        """Record a finished segment, hash what is now contiguous, persist progress"""
+        with state.lock:
+            state.done.add(index)
+            self._hash_ready(state)
+
+            # Persist progress for resume (throttled - at most once a second)
+            now = time.time()
+            if state.ranged and now - state.last_sidecar_write > 1.0:
+                state.last_sidecar_write = now
+                self._write_sidecar(state)
+
+    def _hash_ready(self, state: _FileState):
+        """Hash every completed segment contiguous with what was hashed so far"""
+        if state.hashed_upto not in state.done:
+            return
+        with open(state.part_path, 'rb') as f:
+            while state.hashed_upto in state.done and state.hashed_upto < len(state.segments):
+                start, end = state.segments[state.hashed_upto]
+                f.seek(start)
+                remaining = end - start
+                while remaining:
+                    data = f.read(min(STREAM_CHUNK_SIZE, remaining))
+                    if not data:
+                        break
+                    state.hasher.update(data)
+                    remaining -= len(data)
+                state.hashed_upto += 1
+
+    def _write_sidecar(self, state: _FileState):
+        try:
+            state.sidecar_path.write_text(json.dumps({
+                "url": state.job.url,
+                "size": state.size,
+                "segment_size": self.segment_size,
+                "done": sorted(state.done)
+            }))
+        except OSError:
+            pass
+
+    def _finalize(self, state: _FileState):
+        """Verify checksum and atomically move the .part file into place"""
+        if state.failed:
+            if state.ranged:
+                self._write_sidecar(state)
+            raise state.failed
+
+        with state.lock:
+            self._hash_ready(state)
+
+        expected = _expected_sha256(state.job.checksum)
+        actual = state.hasher.hexdigest()
+        if expected and actual != expected.lower():
+            state.part_path.unlink(missing_ok=True)
+            state.sidecar_path.unlink(missing_ok=True)
+            raise DownloadError(f"{state.job.name}: checksum mismatch (expected {expected[:12]}…, got {actual[:12]}…)")
+
+        if not state.job.in_place:
+            os.replace(state.part_path, state.job.dest)
+        state.sidecar_path.unlink(missing_ok=True)
+        self.stats["files_downloaded"] += 1
+
+    # ------------------------------------------------------------------
+    # Public API
+    # ------------------------------------------------------------------
+
+    def download_many(
+        self,
+        jobs: List[DownloadJob],
+        progress: Optional[Callable[[int, int], None]] = None,
+        on_file_done: Optional[Callable[[DownloadJob, Optional[Exception]], None]] = None,
+        on_segment: Optional[Callable[[DownloadJob, int, int], None]] = None
+    ) -> Dict[Path, Optional[Exception]]:
+        """
+        Download many files over a bounded pool of connections
+
+        Args:
+            jobs: Files to download
+            progress: Called with (bytes_done, bytes_total) as data arrives
+            on_file_done: Called with (job, error_or_None) as each file completes
+            on_segment: Called with (job, start, end) when a byte range is on disk
+
+        Returns:
+            {dest: None on success or the exception}
+        """
+        results: Dict[Path, Optional[Exception]] = {}
+        states: List[_FileState] = []
+
+        def plan(job: DownloadJob):
+            try:
+                return self._plan(job)
+            except (requests.RequestException, OSError) as e:
+                response = getattr(e, "response", None)
+                return DownloadError(f"{job.name}: {e}", getattr(response, "status_code", None))
+
+        # Size probes run concurrently too - no per-file round-trip chain
+        with ThreadPoolExecutor(max_workers=self.max_connections, thread_name_prefix="download-plan") as pool:
+            for job, planned in zip(jobs, pool.map(plan, jobs)):
+                if isinstance(planned, _FileState):
+                    states.append(planned)
+                else:
+                    results[job.dest] = planned
+                    if on_file_done:
+                        on_file_done(job, planned)
+
+        with self._progress_lock:
+            self._bytes_total = sum(s.size for s in states)
+            self._bytes_done = sum(
+                end - start for s in states for i, (start, end) in enumerate(s.segments) if i in s.done
+            )
+
+        remaining = {id(s): len(s.segments) - len(s.done) for s in states}
+        remaining_lock = threading.Lock()
+
+        def finish(state: _FileState):
+            try:
+                self._finalize(state)
+                results[state.job.dest] = None
+            except (DownloadError, OSError) as e:
+                results[state.job.dest] = e
+            if on_file_done:
+                on_file_done(state.job, results[state.job.dest])
+
+        # Fully resumed files only need verification
+        for state in states:
+            if remaining[id(state)] == 0:
+                finish(state)
+
+        with ThreadPoolExecutor(max_workers=self.max_connections, thread_name_prefix="download") as pool:
+            futures = {}
+            for state in states:
+                order = list(range(len(state.segments)))
+                if state.job.tail_first and len(order) > 2:
+                    # Last two segments first - covers the ZIP end-of-central-directory window
+                    order = order[-2:] + order[:-2]
+                for index in order:
+                    if index not in state.done:
+                        futures[pool.submit(self._fetch_segment, state, index, progress, on_segment)] = state
+                    elif on_segment:
+                        on_segment(state.job, *state.segments[index])
+
+            for future in as_completed(futures):
+                state = futures[future]
+                with remaining_lock:
+                    remaining[id(state)] -= 1
+                    last = remaining[id(state)] == 0
+                if last:
+                    finish(state)
+
+        return results
+
+    def download(
+        self,
+        url: str,
+        dest: Path,
+        size: Optional[int] = None,
+        checksum: Optional[str] = None,
+        progress: Optional[Callable[[int, int], None]] = None
+    ) -> Path:
+        """
+        Download a single file (segmented and resumable if the server allows)
+
+        Raises:
+            DownloadError: If the download or verification failed
+        """
+        job = DownloadJob(url=url, dest=Path(dest), size=size, checksum=checksum)
+        error = self.download_many([job], progress=progress)[job.dest]
+        if error:
+            raise error
+        return job.dest
+
+    def get_stats(self) -> Dict:
+        """Get download statistics"""
+        return dict(self.stats)
@@ -44,10 +44,10 @@ import os
 import threading
 import webbrowser
 import time
-import zipfile
-import io
 import uuid
 import minecraft_launcher_lib
+from download_engine import DownloadEngine, DownloadError
+from zip_stream import download_and_extract
 
 # Configuration
 SERVER_ADDRESS = "mc.galion.studio"
@@ -710,49 +710,41 @@ class GalionLauncher:
             self._update_progress("Downloading client files...", 30)
             self._log("[DOWNLOAD] Downloading... (This may take a few minutes)")
             
-            # Download the ZIP file
-            response = requests.get(GITHUB_RELEASE_URL, stream=True, timeout=60)
+            # Download to a temp file on disk (parallel ranges, resumable) and
+            # extract members on a thread pool as soon as their bytes arrive
+            last_percent = [-1]
             
-            if response.status_code == 404:
-                self._log("[DOWNLOAD] ✗ GitHub release not found (404)")
-                self._log("[DOWNLOAD] The client may not be published yet")
-                self._update_progress("", 0)
-                return False
-            
-            if response.status_code != 200:
-                self._log(f"[DOWNLOAD] ✗ Download failed (HTTP {response.status_code})")
-                self._update_progress("", 0)
-                return False
-            
-            # Get file size for progress
-            total_size = int(response.headers.get('content-length', 0))
-            self._log(f"[DOWNLOAD] Size: {total_size / 1024 / 1024:.1f} MB")
-            
-            # Download with progress
-            downloaded = 0
-            chunks = []
+            def on_progress(downloaded, total_size):
+                if total_size > 0:
+                    percent = downloaded * 100 // total_size
+                    if percent != last_percent[0]:
+                        last_percent[0] = percent
+                        progress = 40 + percent * 45 // 100  # 40-85%
+                        self._update_progress(f"Downloading + extracting... {downloaded // 1024 // 1024}/{total_size // 1024 // 1024} MB", progress)
             
             self._update_progress("Downloading...", 40)
+            self._log("[EXTRACT] Extracting client files while downloading...")
             
-            for chunk in response.iter_content(chunk_size=8192):
-                if chunk:
-                    chunks.append(chunk)
-                    downloaded += len(chunk)
-                    if total_size > 0:
-                        progress = 40 + int((downloaded / total_size) * 30)  # 40-70%
-                        if downloaded % (1024 * 1024) == 0:  # Every MB
-                            self._update_progress(f"Downloading... {downloaded // 1024 // 1024}/{total_size // 1024 // 1024} MB", progress)
-            
-            self._log(f"[DOWNLOAD] ✓ Downloaded {downloaded / 1024 / 1024:.1f} MB")
-            
-            # Extract ZIP
-            self._update_progress("Extracting files...", 75)
-            self._log("[EXTRACT] Extracting client files...")
-            
-            zip_data = b''.join(chunks)
-            with zipfile.ZipFile(io.BytesIO(zip_data)) as zip_file:
-                zip_file.extractall(CLIENT_DIR)
+            try:
+                stats = download_and_extract(
+                    GITHUB_RELEASE_URL,
+                    CLIENT_DIR,
+                    engine=DownloadEngine(log=self._log, timeout=60),
+                    progress=on_progress,
+                    log=self._log
+                )
+            except DownloadError as e:
+                if e.status_code == 404:
+                    self._log("[DOWNLOAD] ✗ GitHub release not found (404)")
+                    self._log("[DOWNLOAD] The client may not be published yet")
+                else:
+                    self._log(f"[DOWNLOAD] ✗ Download failed: {e}")
+                    self._log("[DOWNLOAD] Run again to resume where it stopped")
+                self._update_progress("", 0)
+                return False
             
+            self._log(f"[EXTRACT] ✓ {stats['members_extracted']} files written, "
+                      f"{stats['members_skipped']} already up to date")
             self._log(f"[EXTRACT] ✓ Extracted to: {CLIENT_DIR}")
             
             # Verify client executable
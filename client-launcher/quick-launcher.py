@@ -16,12 +16,17 @@ import os
 from dotenv import load_dotenv
 import asyncio
 import threading
+import chunk_sync
+from download_engine import DownloadEngine, DownloadJob
 
 # Config
 SERVER = "http://localhost:8080"
 MC_VERSION = "1.21.1"
 MINECRAFT_DIR = str(Path.home() / "AppData" / "Roaming" / ".minecraft")
 MODS_DIR = Path(MINECRAFT_DIR) / "mods"
+SYNC_STATE_FILE = MODS_DIR / ".titan-sync.json"
+CHUNK_STATE_DIR = MODS_DIR / ".titan-chunks"
+DOWNLOAD_CONNECTIONS = 8
 
 # Hide console
 if sys.platform == "win32":
@@ -223,25 +228,7 @@ class QuickLauncher:
             MODS_DIR.mkdir(parents=True, exist_ok=True)
             
             try:
-                self._log(f"[MOD SYNC] Fetching manifest...")
-                manifest = requests.get(f"{SERVER}/manifest.json", timeout=3).json()
-                mods = manifest.get("mods", [])
-                self._log(f"[MOD SYNC] Found {len(mods)} mods on server")
-                
-                for i, mod in enumerate(mods):
-                    mod_file = MODS_DIR / mod["name"]
-                    if not mod_file.exists():
-                        self._update(f"Downloading {mod['name']}...", f"{i+1}/{len(mods)}")
-                        self._log(f"[MOD {i+1}/{len(mods)}] Downloading: {mod['name']}")
-                        self._log(f"[MOD {i+1}/{len(mods)}] Size: {mod.get('size', 0) / 1024:.2f} KB")
-                        
-                        data = requests.get(f"{SERVER}{mod['url']}").content
-                        mod_file.write_bytes(data)
-                        
-                        self._log(f"[MOD {i+1}/{len(mods)}] ✓ Downloaded: {mod['name']}")
-                    else:
-                        self._log(f"[MOD {i+1}/{len(mods)}] ✓ Already have: {mod['name']}")
-                
+                self._sync_mods()
                 self._log(f"[MOD SYNC] Complete! All mods ready.")
             except Exception as e:
                 self._log(f"[MOD SYNC] Server offline or error: {e}")
@@ -299,6 +286,160 @@ class QuickLauncher:
             messagebox.showerror("Error", str(e))
             self.btn.config(state=tk.NORMAL)
     
+    def _load_sync_state(self):
+        """Last synced manifest version + checksums of mods we installed"""
+        try:
+            return json.loads(SYNC_STATE_FILE.read_text())
+        except:
+            return {"version": None, "mods": {}}
+    
+    def _save_sync_state(self, state):
+        try:
+            SYNC_STATE_FILE.write_text(json.dumps(state))
+        except:
+            pass
+    
+    def _sync_mods(self):
+        """
+        Delta mod sync: ask the server what changed since our last version,
+        so a one-mod update transfers a few hundred bytes and no folder scan.
+        Falls back to the full manifest on first run or unknown version.
+        """
+        state = self._load_sync_state()
+        installed = state.get("mods", {})
+        
+        delta = None
+        if state.get("version"):
+            self._log(f"[MOD SYNC] Checking changes since version {state['version']}...")
+            resp = requests.get(f"{SERVER}/api/mods/manifest/diff", params={"since": state["version"]}, timeout=3)
+            if resp.status_code == 200:
+                delta = resp.json()
+                if delta.get("reset"):
+                    self._log(f"[MOD SYNC] Version unknown to server - full sync")
+                    delta = None
+        
+        if delta is not None:
+            version = delta["version"]
+            to_download = delta["added"] + delta["changed"]
+            removed = delta["removed"]
+        else:
+            self._log("[MOD SYNC] Fetching manifest...")
+            resp = requests.get(f"{SERVER}/api/mods/manifest", timeout=3)
+            if resp.status_code == 404:
+                # Legacy simple-mod-server: existence check only
+                manifest = requests.get(f"{SERVER}/manifest.json", timeout=3).json()
+                mods = [{**m, "file": m["name"]} for m in manifest.get("mods", [])]
+                version = None
+                to_download = [m for m in mods if not (MODS_DIR / m["file"]).exists()]
+            else:
+                manifest = resp.json()
+                mods = manifest.get("mods", [])
+                version = manifest.get("version")
+                to_download = [
+                    m for m in mods
+                    if not (MODS_DIR / m["file"]).exists() or installed.get(m["file"]) != m.get("checksum")
+                ]
+            server_files = {m["file"] for m in mods}
+            removed = [name for name in installed if name not in server_files]
+            self._log(f"[MOD SYNC] Found {len(mods)} mods on server")
+        
+        self._log(f"[MOD SYNC] {len(to_download)} to download, {len(removed)} to remove")
+        
+        # Chunks of every installed file, removed ones included: a version bump
+        # renames the jar, and the new one is rebuilt from the old one's chunks
+        local_chunks = chunk_sync.LocalChunks.load(CHUNK_STATE_DIR, MODS_DIR)
+        
+        session = requests.Session()
+        full_downloads = []
+        failed = []
+        for mod in to_download:
+            if self._delta_update(session, mod, MODS_DIR / mod["file"], local_chunks):
+                installed[mod["file"]] = mod.get("checksum")
+                self._log(f"[MOD SYNC] ✓ Delta-updated: {mod['file']}")
+            else:
+                full_downloads.append(mod)
+        
+        if full_downloads:
+            total_mb = sum(m.get("size", 0) for m in full_downloads) / 1024 / 1024
+            self._log(f"[MOD SYNC] Downloading {len(full_downloads)} mods ({total_mb:.2f} MB) over {DOWNLOAD_CONNECTIONS} connections")
+            by_dest = {MODS_DIR / m["file"]: m for m in full_downloads}
+            finished = []
+            
+            def on_file_done(job, error):
+                finished.append(job)
+                if error:
+                    self._log(f"[MOD {len(finished)}/{len(full_downloads)}] ✗ {job.name}: {error}")
+                else:
+                    self._log(f"[MOD {len(finished)}/{len(full_downloads)}] ✓ Downloaded: {job.name}")
+            
+            last_percent = [-1]
+            
+            def on_progress(done, total):
+                percent = done * 100 // total if total else 0
+                if percent != last_percent[0]:
+                    last_percent[0] = percent
+                    self._update(f"Downloading mods... {percent}%", f"{done / 1024 / 1024:.1f}/{total / 1024 / 1024:.1f} MB")
+            
+            engine = DownloadEngine(max_connections=DOWNLOAD_CONNECTIONS, log=self._log)
+            results = engine.download_many(
+                [
+                    DownloadJob(f"{SERVER}{m['url']}", dest, size=m.get("size"), checksum=m.get("checksum"))
+                    for dest, m in by_dest.items()
+                ],
+                progress=on_progress,
+                on_file_done=on_file_done
+            )
+            
+            for dest, error in results.items():
+                if error is None:
+                    mod = by_dest[dest]
+                    installed[mod["file"]] = mod.get("checksum")
+                    self._remember_chunks(session, mod)
+            
+            failed = [dest.name for dest, error in results.items() if error]
+        
+        # Only now - removed mods were delta sources for the downloads above
+        for name in removed:
+            (MODS_DIR / name).unlink(missing_ok=True)
+            (CHUNK_STATE_DIR / f"{name}.json").unlink(missing_ok=True)
+            installed.pop(name, None)
+            self._log(f"[MOD SYNC] ✗ Removed: {name}")
+        
+        if failed:
+            # Keep what we got; unsynced mods are retried next launch
+            self._save_sync_state({"version": None, "mods": installed})
+            raise Exception(f"{len(failed)} mod(s) failed to download: {', '.join(failed)}")
+        
+        if version is not None:
+            self._save_sync_state({"version": version, "mods": installed})
+    
+    def _delta_update(self, session, mod, mod_file, local_chunks):
+        """Build a new or changed mod from local chunks plus only the missing ones (False = do a full download)"""
+        if not local_chunks:
+            return False
+        try:
+            remote = chunk_sync.fetch_chunk_list(session, SERVER, mod["file"])
+            if remote is None or remote["checksum"] != mod.get("checksum"):
+                return False
+            if not any(chunk["hash"] in local_chunks for chunk in remote["chunks"]):
+                return False  # nothing to reuse - the parallel full download is faster
+            chunks = chunk_sync.delta_download(session, SERVER, remote, mod_file, local_chunks, log=self._log)
+            chunk_sync.save_chunk_list(CHUNK_STATE_DIR, mod["file"], chunks)
+            local_chunks.replace(mod_file, chunks)
+            return True
+        except Exception as e:
+            self._log(f"[DELTA] {mod['file']}: {e} - falling back to full download")
+            return False
+    
+    def _remember_chunks(self, session, mod):
+        """Keep the chunk list of a downloaded mod so its next update can be a delta"""
+        try:
+            remote = chunk_sync.fetch_chunk_list(session, SERVER, mod["file"])
+            if remote and remote["checksum"] == mod.get("checksum"):
+                chunk_sync.save_chunk_list(CHUNK_STATE_DIR, mod["file"], remote["chunks"])
+        except Exception:
+            pass
+    
     def _log(self, message):
         """Add message to transparent log"""
         def append():
@@ -0,0 +1,312 @@
+#!/usr/bin/env python3
+"""
+Streaming ZIP installer for the Galion launchers
+Extracts archive members while the archive is still downloading
+
+How it works:
+1. The archive is downloaded to a temp file on disk by the download engine,
+   tail first, so the ZIP central directory arrives before the bulk data
+2. Once the central directory is on disk we know every member's byte range
+3. Each member is extracted on a thread pool as soon as its range is complete
+4. Members whose size + CRC32 already match the file on disk are skipped,
+   so repairs and reinstalls only write what actually changed
+
+Memory stays flat: members stream from disk to disk in 1 MiB blocks.
+"""
+
+import bisect
+import os
+import shutil
+import struct
+import threading
+import zipfile
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+from urllib.parse import urlparse
+
+from download_engine import DownloadEngine, DownloadJob, DownloadError
+
+
+COPY_BLOCK_SIZE = 1024 * 1024
+
+# End of central directory record: signature + fixed fields (22 bytes) + comment (<= 64 KiB)
+_EOCD_SIGNATURE = b"PK\x05\x06"
+_EOCD_STRUCT = "<4s4H2LH"
+_EOCD_SIZE = struct.calcsize(_EOCD_STRUCT)
+_EOCD_SEARCH_WINDOW = _EOCD_SIZE + 0xFFFF
+
+
+def _member_target(dest_dir: Path, name: str) -> Optional[Path]:
+    """Safe target path for an archive member (None if it would escape dest_dir)"""
+    parts = [p for p in name.replace("\\", "/").split("/") if p not in ("", ".", "..")]
+    if not parts or ":" in parts[0]:
+        return None
+    return dest_dir.joinpath(*parts)
+
+
+def _crc_matches(path: Path, info: zipfile.ZipInfo) -> bool:
+    """Check whether a file on disk already has the member's size and CRC32"""
+    try:
+        if path.stat().st_size != info.file_size:
+            return False
+        crc = 0
+        with open(path, 'rb') as f:
+            for block in iter(lambda: f.read(COPY_BLOCK_SIZE), b""):
+                crc = zlib.crc32(block, crc)
+        return crc == info.CRC
+    except OSError:
+        return False
+
+
+class StreamingZipExtractor:
+    """
+    Extracts members of a ZIP as its byte ranges land on disk
+
+    Usage:
+        extractor = StreamingZipExtractor(archive, dest_dir, size)
+        engine.download_many([job], on_segment=extractor.on_segment)
+        extractor.finish()
+    """
+
+    def __init__(
+        self,
+        archive_path: Path,
+        dest_dir: Path,
+        archive_size: int,
+        workers: int = 4,
+        log: Callable[[str], None] = print
+    ):
+        """
+        Initialize extractor
+
+        Args:
+            archive_path: File the archive is being downloaded into
+            dest_dir: Extraction target directory
+            archive_size: Final archive size in bytes
+            workers: Extraction threads (zlib releases the GIL while inflating)
+            log: Logging callback
+        """
+        self.archive_path = Path(archive_path)
+        self.dest_dir = Path(dest_dir)
+        self.archive_size = archive_size
+        self.log = log
+
+        self._lock = threading.Lock()
+        self._ranges: List[List[int]] = []       # Merged [start, end) ranges on disk
+        self._zip: Optional[zipfile.ZipFile] = None
+        self._pending: List[tuple] = []          # (start, end, ZipInfo) not yet scheduled
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="unzip")
+        self._futures = []
+
+        # Statistics
+        self.stats = {
+            "members_extracted": 0,
+            "members_skipped": 0,
+            "bytes_written": 0
+        }
+
+    # ------------------------------------------------------------------
+    # Byte range tracking
+    # ------------------------------------------------------------------
+
+    def _add_range(self, start: int, end: int):
+        starts = [r[0] for r in self._ranges]
+        i = bisect.bisect_left(starts, start)
+        self._ranges.insert(i, [start, end])
+
+        merged = []
+        for r in self._ranges:
+            if merged and r[0] <= merged[-1][1]:
+                merged[-1][1] = max(merged[-1][1], r[1])
+            else:
+                merged.append(r)
+        self._ranges = merged
+
+    def _covered(self, start: int, end: int) -> bool:
+        return any(r[0] <= start and end <= r[1] for r in self._ranges)
+
+    # ------------------------------------------------------------------
+    # Central directory
+    # ------------------------------------------------------------------
+
+    def _central_directory_start(self) -> Optional[int]:
+        """Locate the central directory once the EOCD window is on disk"""
+        window_start = max(0, self.archive_size - _EOCD_SEARCH_WINDOW)
+        if not self._covered(window_start, self.archive_size):
+            return None
+
+        with open(self.archive_path, 'rb') as f:
+            f.seek(window_start)
+            window = f.read()
+
+        pos = window.rfind(_EOCD_SIGNATURE)
+        if pos < 0 or len(window) - pos < _EOCD_SIZE:
+            raise zipfile.BadZipFile("End of central directory not found")
+
+        _, _, _, _, _, cd_size, cd_offset, _ = struct.unpack(_EOCD_STRUCT, window[pos:pos + _EOCD_SIZE])
+        if cd_offset == 0xFFFFFFFF:
+            # ZIP64 - locate via zipfile once the whole archive is on disk
+            return self.archive_size if self._covered(0, self.archive_size) else None
+        return cd_offset
+
+    def _open_directory(self):
+        """Read the central directory and queue every member by byte range"""
+        cd_start = self._central_directory_start()
+        if cd_start is None or not self._covered(cd_start, self.archive_size):
+            return
+
+        self._zip = zipfile.ZipFile(self.archive_path)
+        members = sorted(self._zip.infolist(), key=lambda i: i.header_offset)
+        offsets = [m.header_offset for m in members] + [min(cd_start, self.archive_size)]
+
+        for info, end in zip(members, offsets[1:]):
+            self._pending.append((info.header_offset, end, info))
+
+        self.log(f"[EXTRACT] Central directory ready: {len(members)} files")
+
+    def _schedule_ready(self):
+        """Submit every pending member whose bytes are all on disk"""
+        still_pending = []
+        for start, end, info in self._pending:
+            if self._covered(start, end):
+                self._futures.append(self._pool.submit(self._extract_member, info))
+            else:
+                still_pending.append((start, end, info))
+        self._pending = still_pending
+
+    # ------------------------------------------------------------------
+    # Extraction
+    # ------------------------------------------------------------------
+
+    def _extract_member(self, info: zipfile.ZipInfo):
+        target = _member_target(self.dest_dir, info.filename)
+        if target is None:
+            self.log(f"[EXTRACT] ✗ Skipping unsafe path: {info.filename}")
+            return
+
+        if info.is_dir():
+            target.mkdir(parents=True, exist_ok=True)
+            return
+
+        if _crc_matches(target, info):
+            self.stats["members_skipped"] += 1
+            return
+
+        target.parent.mkdir(parents=True, exist_ok=True)
+        tmp_target = target.with_name(f".{target.name}.unzip")
+        # ZipExtFile verifies the CRC32 when the member is fully read
+        with self._zip.open(info) as src, open(tmp_target, 'wb') as dst:
+            shutil.copyfileobj(src, dst, COPY_BLOCK_SIZE)
+        os.replace(tmp_target, target)
+
+        self.stats["members_extracted"] += 1
+        self.stats["bytes_written"] += info.file_size
+
+    # ------------------------------------------------------------------
+    # Public API
+    # ------------------------------------------------------------------
+
+    def on_segment(self, job: DownloadJob, start: int, end: int):
+        """Download engine hook: a byte range of the archive is on disk"""
+        with self._lock:
+            self._add_range(start, end)
+            try:
+                if self._zip is None:
+                    self._open_directory()
+                if self._zip is not None:
+                    self._schedule_ready()
+            except (zipfile.BadZipFile, OSError) as e:
+                # Retried by finish() once the whole archive is on disk
+                self.log(f"[EXTRACT] Early extraction deferred: {e}")
+
+    def finish(self):
+        """
+        Wait for all members to be extracted (call after the download completed)
+
+        Raises:
+            zipfile.BadZipFile: If the archive or a member is corrupt
+        """
+        try:
+            with self._lock:
+                # Non-ranged downloads report the whole file at once; be sure everything is queued
+                self._add_range(0, self.archive_size)
+                if self._zip is None:
+                    self._open_directory()
+                self._schedule_ready()
+            for future in self._futures:
+                future.result()
+        finally:
+            self._pool.shutdown(wait=True)
+            if self._zip is not None:
+                self._zip.close()
+
+    def abort(self):
+        """Stop extracting after a failed download"""
+        self._pool.shutdown(wait=True, cancel_futures=True)
+        if self._zip is not None:
+            self._zip.close()
+
+
+def download_and_extract(
+    url: str,
+    dest_dir: Path,
+    engine: Optional[DownloadEngine] = None,
+    checksum: Optional[str] = None,
+    progress: Optional[Callable[[int, int], None]] = None,
+    workers: int = 4,
+    log: Callable[[str], None] = print
+) -> Dict:
+    """
+    Download a ZIP and extract it while it downloads
+
+    Args:
+        url: Archive URL
+        dest_dir: Extraction target directory
+        engine: Download engine (default: new DownloadEngine)
+        checksum: Optional "sha256:<hex>" of the archive
+        progress: Called with (bytes_done, bytes_total)
+        workers: Extraction threads
+        log: Logging callback
+
+    Returns:
+        Extraction statistics
+
+    Raises:
+        DownloadError: Download or verification failed (rerun to resume)
+        zipfile.BadZipFile: Archive is corrupt
+    """
+    dest_dir = Path(dest_dir)
+    dest_dir.mkdir(parents=True, exist_ok=True)
+    engine = engine or DownloadEngine(log=log)
+
+    # Temp archive next to the target; kept on failure so the next run resumes
+    archive_path = dest_dir / f".{Path(urlparse(url).path).name or 'download'}.download"
+    job = DownloadJob(url, archive_path, checksum=checksum, tail_first=True, in_place=True)
+
+    extractor: Optional[StreamingZipExtractor] = None
+    extractor_lock = threading.Lock()
+
+    def on_segment(segment_job: DownloadJob, start: int, end: int):
+        nonlocal extractor
+        with extractor_lock:
+            if extractor is None:
+                extractor = StreamingZipExtractor(
+                    archive_path, dest_dir, archive_path.stat().st_size, workers=workers, log=log
+                )
+        extractor.on_segment(segment_job, start, end)
+
+    error = engine.download_many([job], progress=progress, on_segment=on_segment)[archive_path]
+    if error:
+        if extractor:
+            extractor.abort()
+        raise error
+
+    if extractor is None:
+        # Empty download - nothing was reported
+        raise DownloadError(f"{job.name}: empty archive")
+
+    extractor.finish()
+    archive_path.unlink(missing_ok=True)
+    return dict(extractor.stats)
@@ -4,6 +4,7 @@ Monitor Minecraft chat and respond with AI when triggered
 """
 
 import asyncio
+import sys
 import time
 from pathlib import Path
 from typing import Optional, Callable
@@ -11,6 +12,10 @@ import re
 
 from config import PROJECT_ROOT, LOGS_DIR, RCON_HOST, RCON_PORT, RCON_PASSWORD
 
+sys.path.insert(0, str(PROJECT_ROOT))
+from rcon_pool import get_rcon_pool
+from chat_stream import stream_to_chat
+
 
 class MinecraftChatBridge:
     """
@@ -85,12 +90,12 @@ class MinecraftChatBridge:
         if self.on_message_callback:
             self.on_message_callback(f"[MC] {player_name}: {question}")
         
-        # Get AI response
+        # Stream AI response - each sentence goes to chat as soon as it is generated
         try:
-            response = await self.grok_client.ask_minecraft(question, player_name)
-            
-            # Send to Minecraft
-            await self.send_to_minecraft(player_name, response)
+            response = await stream_to_chat(
+                self.grok_client.ask_minecraft_stream(question, player_name),
+                lambda line: self.send_to_minecraft(player_name, line)
+            )
             
             # Notify callback
             if self.on_message_callback:
@@ -104,9 +109,6 @@ class MinecraftChatBridge:
     async def send_to_minecraft(self, player_name: str, message: str):
         """Send message to Minecraft via RCON"""
         try:
-            # Import here to avoid circular dependency
-            from mcrcon import MCRcon
-            
             # Format message
             formatted = f"[AI → {player_name}] {message}"
             
@@ -114,28 +116,13 @@ class MinecraftChatBridge:
             if len(formatted) > 200:
                 formatted = formatted[:197] + "..."
             
-            # Send via RCON in executor (blocking operation)
-            loop = asyncio.get_event_loop()
-            await loop.run_in_executor(
-                None,
-                self._send_rcon,
-                formatted
-            )
+            # Shared, kept-alive RCON connection (no connect + login per message)
+            await get_rcon_pool(RCON_HOST, RCON_PORT, RCON_PASSWORD).command(f'say {formatted}')
             
             print(f"[AI Bridge] Sent response to Minecraft")
         
         except Exception as e:
             print(f"[AI Bridge] Failed to send to Minecraft: {e}")
-    
-    def _send_rcon(self, message: str):
-        """Send RCON command (blocking)"""
-        try:
-            from mcrcon import MCRcon
-            
-            with MCRcon(RCON_HOST, RCON_PASSWORD, port=RCON_PORT) as mcr:
-                mcr.command(f'say {message}')
-        except Exception as e:
-            print(f"[RCON] Error: {e}")
 
 
 async def run_bridge():
@@ -3,24 +3,36 @@ Development API Server
 Extended API for development console with mod upload, deployment, and server control
 """
 
-from fastapi import FastAPI, HTTPException, UploadFile, File, Form
-from fastapi.responses import FileResponse, JSONResponse
+from fastapi import FastAPI, HTTPException, Request
+from fastapi.responses import FileResponse, JSONResponse, Response
 from fastapi.middleware.cors import CORSMiddleware
 from pathlib import Path
+from pydantic import BaseModel
+import asyncio
+import functools
 import hashlib
-import shutil
 import sys
-import socket
 import subprocess
-from typing import Optional, Dict, List
+from typing import Optional, Dict, List, Tuple
 from datetime import datetime
 import json
 
 # Add parent directory to path
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
-from config import SERVER_MODS_DIR, PROJECT_ROOT, MINECRAFT_SERVER_PORT
-from database.db_manager import get_db
+from config import (
+    SERVER_MODS_DIR, PROJECT_ROOT, MINECRAFT_SERVER_PORT, MAX_MOD_FILE_SIZE, ALLOWED_MOD_EXTENSIONS,
+    MINECRAFT_PACKAGES_DIR, MAX_PACKAGE_FILE_SIZE, ALLOWED_PACKAGE_EXTENSIONS, UPLOAD_SESSIONS_DIR,
+    LOGS_DIR, LOG_ARCHIVE_INTERVAL
+)
+from database.async_db import get_async_db
+from api.upload_stream import stream_multipart_upload
+from api.resumable_uploads import UploadSessionStore
+from server.log_tail import LogTail
+from server.log_archive import get_log_archive
+
+sys.path.insert(0, str(PROJECT_ROOT))
+from server_status import ServerStatus, get_status_prober
 
 # Create FastAPI app
 app = FastAPI(
@@ -38,8 +50,44 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Get database
-db = get_db()
+# Largest page any list endpoint returns
+MAX_PAGE_SIZE = 1000
+
+# Get database (async facade: queries run on the database thread pool)
+db = get_async_db()
+
+# Resumable upload sessions (mods go live on finalize, packages are stored as-is)
+upload_sessions = UploadSessionStore(UPLOAD_SESSIONS_DIR, {
+    "mod": {"dir": SERVER_MODS_DIR, "extensions": ALLOWED_MOD_EXTENSIONS, "max_size": MAX_MOD_FILE_SIZE},
+    "package": {"dir": MINECRAFT_PACKAGES_DIR, "extensions": ALLOWED_PACKAGE_EXTENSIONS, "max_size": MAX_PACKAGE_FILE_SIZE},
+})
+
+# Server log reader (backwards seek for tails, byte-offset cursors for polling)
+log_tail = LogTail(LOGS_DIR / "latest.log")
+
+# Searchable history of latest.log and rotated *.log.gz (indexed in the background)
+log_archive = get_log_archive()
+
+
+@app.on_event("startup")
+async def startup():
+    log_archive.start(LOG_ARCHIVE_INTERVAL)
+
+
+@app.on_event("shutdown")
+async def shutdown():
+    log_archive.stop()
+
+
+# === Request Models ===
+
+class UploadCreateRequest(BaseModel):
+    filename: str
+    size: int
+    checksum: Optional[str] = None
+    kind: str = "mod"
+    environment: str = "dev"
+    user_id: int = 1
 
 
 # === Utility Functions ===
@@ -53,16 +101,84 @@ def calculate_checksum(file_path: Path) -> str:
     return sha256.hexdigest()
 
 
-def check_server_online() -> bool:
+async def register_uploaded_mod(
+    filename: str,
+    file_path: Path,
+    file_size: int,
+    checksum: str,
+    user_id: int,
+    environment: str
+) -> Tuple[int, int]:
+    """Create mod, deployment and activity records for an uploaded jar (one transaction)"""
+    # Parse mod name and version from filename
+    # Simple parsing: filename-version.jar
+    name_parts = filename.replace('.jar', '').split('-')
+    mod_name = name_parts[0] if name_parts else filename
+    mod_version = name_parts[1] if len(name_parts) > 1 else "1.0.0"
+    
+    def write(tx) -> Tuple[int, int]:
+        # Save to database
+        mod_id = tx.create_mod(
+            name=mod_name,
+            version=mod_version,
+            file_name=filename,
+            file_path=str(file_path),
+            file_size=file_size,
+            checksum=checksum,
+            author_id=user_id,
+            environment=environment
+        )
+        
+        # Create deployment record
+        deployment_id = tx.create_deployment(
+            mod_id=mod_id,
+            environment=environment,
+            user_id=user_id,
+            status="success",
+            deployment_type="upload"
+        )
+        
+        # Log activity
+        tx.log_activity(
+            user_id,
+            "upload_mod",
+            {
+                "mod_id": mod_id,
+                "mod_name": mod_name,
+                "environment": environment
+            }
+        )
+        
+        return mod_id, deployment_id
+    
+    return await db.run(write)
+
+
+def _page_limit(limit: int) -> int:
+    """Clamp client page sizes"""
+    return max(1, min(limit, MAX_PAGE_SIZE))
+
+
+def _page_response(key: str, page: Dict) -> Dict:
+    """Shape a keyset page for the API"""
+    return {
+        "success": True,
+        "count": len(page["items"]),
+        key: page["items"],
+        "has_more": page["has_more"],
+        "next_cursor": page["next_cursor"],
+        "latest_cursor": page["latest_cursor"]
+    }
+
+
+async def probe_server(max_age: Optional[float] = None) -> ServerStatus:
+    """Server List Ping the Minecraft server (shared, short-TTL cached)"""
+    return await get_status_prober().status("localhost", MINECRAFT_SERVER_PORT, max_age=max_age)
+
+
+async def check_server_online() -> bool:
     """Check if Minecraft server is online"""
-    try:
-        sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-        sock.settimeout(1)
-        result = sock.connect_ex(('localhost', MINECRAFT_SERVER_PORT))
-        sock.close()
-        return result == 0
-    except:
-        return False
+    return (await probe_server()).online
 
 
 # === Root & Health Endpoints ===
@@ -86,7 +202,7 @@ async def root():
 @app.get("/health")
 async def health_check():
     """Health check endpoint"""
-    server_online = check_server_online()
+    server_online = await check_server_online()
     
     return {
         "status": "healthy",
@@ -99,23 +215,26 @@ async def health_check():
 # === Mod Endpoints ===
 
 @app.get("/api/dev/mods")
-async def get_mods(environment: str = "dev"):
+async def get_mods(
+    environment: str = "dev",
+    limit: int = 100,
+    cursor: Optional[int] = None,
+    status: Optional[str] = None,
+    name: Optional[str] = None
+):
     """
-    Get all mods for an environment.
+    Get mods for an environment (newest first, keyset paginated).
     """
-    mods = db.get_mods_by_environment(environment)
-    return {
-        "success": True,
-        "environment": environment,
-        "count": len(mods),
-        "mods": mods
-    }
+    page = await db.query_mods(
+        limit=_page_limit(limit), before=cursor, environment=environment, status=status, name=name
+    )
+    return {"environment": environment, **_page_response("mods", page)}
 
 
 @app.get("/api/dev/mods/{mod_id}")
 async def get_mod(mod_id: int):
     """Get specific mod by ID"""
-    mod = db.get_mod_by_id(mod_id)
+    mod = await db.get_mod_by_id(mod_id)
     
     if not mod:
         raise HTTPException(status_code=404, detail="Mod not found")
@@ -127,67 +246,31 @@ async def get_mod(mod_id: int):
 
 
 @app.post("/api/dev/mods/upload")
-async def upload_mod(
-    file: UploadFile = File(...),
-    environment: str = Form("dev"),
-    user_id: int = Form(1)
-):
+async def upload_mod(request: Request):
     """
     Upload a new mod file.
     
     This endpoint handles mod file uploads to the server.
+    Multipart form: file (.jar), environment (default "dev"), user_id (default 1).
+    The body is streamed to disk once; checksum and size are computed on the way.
     """
     try:
-        # Validate file type
-        if not file.filename.endswith('.jar'):
-            raise HTTPException(status_code=400, detail="Only .jar files allowed")
-        
-        # Save file to server-mods directory
-        file_path = SERVER_MODS_DIR / file.filename
-        
-        with open(file_path, 'wb') as f:
-            shutil.copyfileobj(file.file, f)
-        
-        # Calculate checksum
-        checksum = calculate_checksum(file_path)
-        file_size = file_path.stat().st_size
-        
-        # Parse mod name and version from filename
-        # Simple parsing: filename-version.jar
-        name_parts = file.filename.replace('.jar', '').split('-')
-        mod_name = name_parts[0] if name_parts else file.filename
-        mod_version = name_parts[1] if len(name_parts) > 1 else "1.0.0"
-        
-        # Save to database
-        mod_id = db.create_mod(
-            name=mod_name,
-            version=mod_version,
-            file_name=file.filename,
-            file_path=str(file_path),
-            file_size=file_size,
-            checksum=checksum,
-            author_id=user_id,
-            environment=environment
+        fields, upload = await stream_multipart_upload(
+            request,
+            SERVER_MODS_DIR,
+            max_size=MAX_MOD_FILE_SIZE,
+            allowed_extensions=ALLOWED_MOD_EXTENSIONS
         )
         
-        # Create deployment record
-        deployment_id = db.create_deployment(
-            mod_id=mod_id,
-            environment=environment,
-            user_id=user_id,
-            status="success",
-            deployment_type="upload"
-        )
+        environment = fields.get("environment", "dev")
+        user_id = int(fields.get("user_id", 1))
+        filename = upload["filename"]
+        file_path = upload["file_path"]
+        checksum = upload["checksum"]
+        file_size = upload["file_size"]
         
-        # Log activity
-        db.log_activity(
-            user_id,
-            "upload_mod",
-            {
-                "mod_id": mod_id,
-                "mod_name": mod_name,
-                "environment": environment
-            }
+        mod_id, deployment_id = await register_uploaded_mod(
+            filename, file_path, file_size, checksum, user_id, environment
         )
         
         return {
@@ -198,14 +281,126 @@ async def upload_mod(
             "checksum": checksum
         }
     
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+# === Resumable Uploads ===
+
+def _upload_headers(session) -> Dict[str, str]:
+    return {
+        "Upload-Offset": str(session.offset),
+        "Upload-Length": str(session.size),
+        "Cache-Control": "no-store"
+    }
+
+
+@app.post("/api/dev/uploads", status_code=201)
+async def create_upload(body: UploadCreateRequest, response: Response):
+    """
+    Start (or resume) a chunked upload.
+    
+    Returns the session with its current offset; when the same file
+    (name, size, checksum) already has an unfinished session, that one
+    is returned so the client continues where it stopped.
+    """
+    session = upload_sessions.create(
+        body.filename, body.kind, body.size, body.checksum, body.environment, body.user_id
+    )
+    response.headers.update(_upload_headers(session))
+    response.headers["Location"] = f"/api/dev/uploads/{session.id}"
+    return session.to_response()
+
+
+@app.get("/api/dev/uploads/{upload_id}")
+async def get_upload(upload_id: str, response: Response):
+    """Current offset of an upload (query this after a dropped connection)"""
+    session = upload_sessions.get(upload_id)
+    response.headers.update(_upload_headers(session))
+    return session.to_response()
+
+
+@app.patch("/api/dev/uploads/{upload_id}")
+async def upload_chunk(upload_id: str, request: Request, response: Response):
+    """
+    Append a chunk.
+    
+    Headers: Upload-Offset (required, must match the server offset),
+    Upload-Checksum: "sha256 <hex>" of this chunk (optional).
+    Body: raw chunk bytes, streamed to disk.
+    """
+    offset = request.headers.get("upload-offset")
+    if offset is None or not offset.isdigit():
+        raise HTTPException(status_code=400, detail="Upload-Offset header required")
+    
+    session = await upload_sessions.append(
+        upload_id,
+        int(offset),
+        request.stream(),
+        request.headers.get("upload-checksum")
+    )
+    response.headers.update(_upload_headers(session))
+    return session.to_response()
+
+
+@app.post("/api/dev/uploads/{upload_id}/finalize")
+async def finalize_upload(upload_id: str):
+    """Verify the whole-file checksum and move the file into place"""
+    try:
+        upload = await upload_sessions.finalize(upload_id)
+        
+        if upload["kind"] == "mod":
+            mod_id, deployment_id = await register_uploaded_mod(
+                upload["filename"],
+                upload["file_path"],
+                upload["file_size"],
+                upload["checksum"],
+                upload["user_id"],
+                upload["environment"]
+            )
+            return {
+                "success": True,
+                "message": "Mod uploaded successfully",
+                "mod_id": mod_id,
+                "deployment_id": deployment_id,
+                "checksum": upload["checksum"]
+            }
+        
+        await db.log_activity(
+            upload["user_id"],
+            "upload_package",
+            {
+                "file_name": upload["filename"],
+                "file_size": upload["file_size"],
+                "environment": upload["environment"]
+            }
+        )
+        return {
+            "success": True,
+            "message": "Package uploaded successfully",
+            "file_name": upload["filename"],
+            "checksum": upload["checksum"]
+        }
+    
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@app.delete("/api/dev/uploads/{upload_id}")
+async def abort_upload(upload_id: str):
+    """Abort an upload and discard the received data"""
+    upload_sessions.abort(upload_id)
+    return {"success": True, "message": "Upload aborted"}
+
+
 @app.delete("/api/dev/mods/{mod_id}")
 async def delete_mod(mod_id: int, user_id: int = 1):
     """Delete a mod"""
-    mod = db.get_mod_by_id(mod_id)
+    mod = await db.get_mod_by_id(mod_id)
     
     if not mod:
         raise HTTPException(status_code=404, detail="Mod not found")
@@ -218,15 +413,16 @@ async def delete_mod(mod_id: int, user_id: int = 1):
     except:
         pass
     
-    # Delete from database
-    db.delete_mod(mod_id)
+    # Delete from database and log activity (one commit)
+    def write(tx):
+        tx.delete_mod(mod_id)
+        tx.log_activity(
+            user_id,
+            "delete_mod",
+            {"mod_id": mod_id, "mod_name": mod['name']}
+        )
     
-    # Log activity
-    db.log_activity(
-        user_id,
-        "delete_mod",
-        {"mod_id": mod_id, "mod_name": mod['name']}
-    )
+    await db.run(write)
     
     return {
         "success": True,
@@ -254,19 +450,20 @@ async def download_mod(filename: str):
 @app.get("/api/dev/server/status")
 async def get_server_status():
     """Get server status"""
-    is_online = check_server_online()
+    probe = await probe_server()
     
     status = {
-        "online": is_online,
+        **probe.to_dict(),
         "port": MINECRAFT_SERVER_PORT,
+        "latency": get_status_prober().histogram("localhost", MINECRAFT_SERVER_PORT),
         "timestamp": datetime.now().isoformat()
     }
     
     # Record status in database
-    db.record_server_status(
+    await db.record_server_status(
         environment="dev",
-        status="online" if is_online else "offline",
-        player_count=0  # TODO: Get actual player count via RCON
+        status="online" if probe.online else "offline",
+        player_count=probe.players_online
     )
     
     return {
@@ -275,12 +472,40 @@ async def get_server_status():
     }
 
 
+@app.get("/api/dev/server/status/history")
+async def get_server_status_history(
+    environment: str = "dev",
+    hours: float = 24,
+    start: Optional[float] = None,
+    end: Optional[float] = None,
+    resolution: Optional[str] = None
+):
+    """
+    Server status over time.
+    
+    Range is [start, end) in unix seconds, or the last `hours` hours.
+    resolution: raw, 1m or 1h (default: picked from the range length).
+    """
+    if resolution not in (None, "raw", "1m", "1h"):
+        raise HTTPException(status_code=400, detail="resolution must be raw, 1m or 1h")
+    
+    end = end if end is not None else datetime.now().timestamp()
+    start = start if start is not None else end - hours * 3600
+    history = await db.get_server_status_history(environment, start, end, resolution)
+    
+    return {
+        "success": True,
+        "count": len(history["points"]),
+        **history
+    }
+
+
 @app.post("/api/dev/server/start")
 async def start_server():
     """Start Minecraft server"""
     try:
         # Check if already running
-        if check_server_online():
+        if (await probe_server(max_age=0)).online:
             return {
                 "success": False,
                 "message": "Server is already running"
@@ -360,18 +585,48 @@ async def restart_server():
 # === Deployment Endpoints ===
 
 @app.get("/api/dev/deployments")
-async def get_deployments(environment: Optional[str] = None, limit: int = 50):
-    """Get deployment history"""
-    if environment:
-        deployments = db.get_deployments_by_environment(environment, limit)
-    else:
-        deployments = db.get_recent_deployments(limit)
+async def get_deployments(
+    environment: Optional[str] = None,
+    limit: int = 50,
+    cursor: Optional[int] = None,
+    status: Optional[str] = None,
+    user_id: Optional[int] = None,
+    mod_id: Optional[int] = None,
+    start: Optional[float] = None,
+    end: Optional[float] = None
+):
+    """
+    Get deployment history (newest first).
     
-    return {
-        "success": True,
-        "count": len(deployments),
-        "deployments": deployments
-    }
+    Pass next_cursor back as cursor for the next (older) page.
+    start/end: unix time range on deployed_at.
+    """
+    page = await db.query_deployments(
+        limit=_page_limit(limit), before=cursor, environment=environment, status=status,
+        user_id=user_id, mod_id=mod_id, start=start, end=end
+    )
+    return _page_response("deployments", page)
+
+
+@app.get("/api/dev/deployments/since")
+async def get_deployments_since(
+    cursor: int = 0,
+    limit: int = 500,
+    environment: Optional[str] = None,
+    status: Optional[str] = None,
+    user_id: Optional[int] = None,
+    mod_id: Optional[int] = None
+):
+    """
+    Deployments added after cursor (a previous latest_cursor), oldest first.
+    
+    Repeat with the returned latest_cursor while has_more is true.
+    """
+    page = await db.query_deployments(
+        limit=_page_limit(limit), after=cursor, environment=environment, status=status,
+        user_id=user_id, mod_id=mod_id
+    )
+    return _page_response("deployments", page)
 
 
 @app.post("/api/dev/deployments")
@@ -382,7 +637,7 @@ async def create_deployment(
     deployment_type: str = "manual"
 ):
     """Create a new deployment record"""
-    deployment_id = db.create_deployment(
+    deployment_id = await db.create_deployment(
         mod_id=mod_id,
         environment=environment,
         user_id=user_id,
@@ -399,21 +654,49 @@ async def create_deployment(
 # === Activity Logs Endpoints ===
 
 @app.get("/api/dev/activity")
-async def get_activity(limit: int = 100):
-    """Get recent activity logs"""
-    activities = db.get_recent_activity(limit)
+async def get_activity(
+    limit: int = 100,
+    cursor: Optional[int] = None,
+    user_id: Optional[int] = None,
+    action: Optional[str] = None,
+    start: Optional[float] = None,
+    end: Optional[float] = None
+):
+    """
+    Get activity logs (newest first).
     
-    return {
-        "success": True,
-        "count": len(activities),
-        "activities": activities
-    }
+    Pass next_cursor back as cursor for the next (older) page.
+    start/end: unix time range.
+    """
+    page = await db.query_activity(
+        limit=_page_limit(limit), before=cursor, user_id=user_id, action=action, start=start, end=end
+    )
+    return _page_response("activities", page)
+
+
+@app.get("/api/dev/activity/since")
+async def get_activity_since(
+    cursor: int = 0,
+    limit: int = 500,
+    user_id: Optional[int] = None,
+    action: Optional[str] = None
+):
+    """
+    Activity added after cursor (a previous latest_cursor), oldest first.
+    
+    Consoles poll this to fetch only new entries; repeat with the
+    returned latest_cursor while has_more is true.
+    """
+    page = await db.query_activity(
+        limit=_page_limit(limit), after=cursor, user_id=user_id, action=action
+    )
+    return _page_response("activities", page)
 
 
 @app.get("/api/dev/activity/user/{user_id}")
 async def get_user_activity(user_id: int, limit: int = 50):
     """Get activity for specific user"""
-    activities = db.get_user_activity(user_id, limit)
+    activities = await db.get_user_activity(user_id, limit)
     
     return {
         "success": True,
@@ -426,29 +709,92 @@ async def get_user_activity(user_id: int, limit: int = 50):
 # === Logs Endpoint ===
 
 @app.get("/api/dev/logs/latest")
-async def get_latest_logs(lines: int = 100):
-    """Get latest log lines"""
-    log_file = PROJECT_ROOT / "logs" / "latest.log"
-    
-    if not log_file.exists():
+async def get_latest_logs(lines: int = 100, cursor: Optional[str] = None):
+    """
+    Get latest log lines
+
+    Without a cursor returns the last `lines` lines; with a cursor returns
+    only lines appended since it. Pass the returned cursor on the next poll.
+    """
+    if not log_tail.exists():
         return {
             "success": False,
             "message": "Log file not found"
         }
     
+    loop = asyncio.get_running_loop()
     try:
-        with open(log_file, 'r', encoding='utf-8', errors='ignore') as f:
-            all_lines = f.readlines()
-            latest_lines = all_lines[-lines:] if len(all_lines) > lines else all_lines
-        
+        if cursor:
+            result = await loop.run_in_executor(None, log_tail.read_since, cursor)
+        else:
+            result = await loop.run_in_executor(None, log_tail.tail, max(0, lines))
+            result.update(reset=False, has_more=False)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except FileNotFoundError:
         return {
-            "success": True,
-            "lines": len(latest_lines),
-            "logs": latest_lines
+            "success": False,
+            "message": "Log file not found"
         }
-    
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
+    
+    return {
+        "success": True,
+        "lines": len(result["lines"]),
+        "logs": result["lines"],
+        "cursor": result["cursor"],
+        "reset": result["reset"],
+        "has_more": result["has_more"]
+    }
+
+
+@app.get("/api/dev/logs/search")
+async def search_logs(
+    q: Optional[str] = None,
+    level: Optional[str] = None,
+    player: Optional[str] = None,
+    start: Optional[float] = None,
+    end: Optional[float] = None,
+    limit: int = 200,
+    cursor: Optional[str] = None
+):
+    """
+    Search the log archive (all rotations), newest first
+    
+    q is full text (all words must match, word* for prefixes); level takes
+    a comma-separated list; start/end are unix times. Pass next_cursor as
+    cursor for older results.
+    """
+    loop = asyncio.get_running_loop()
+    try:
+        page = await loop.run_in_executor(None, functools.partial(
+            log_archive.search, text=q, level=level, player=player,
+            start=start, end=end, limit=_page_limit(limit), before=cursor
+        ))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    return {"success": True, **page}
+
+
+@app.get("/api/dev/logs/players")
+async def get_log_players(start: Optional[float] = None, end: Optional[float] = None):
+    """Players seen in the log archive with last-seen times"""
+    loop = asyncio.get_running_loop()
+    players = await loop.run_in_executor(None, log_archive.players, start, end)
+    return {"success": True, "players": players}
+
+
+@app.get("/api/dev/logs/archive")
+async def get_log_archive_status():
+    """Indexed log files and ingest statistics"""
+    loop = asyncio.get_running_loop()
+    return {
+        "success": True,
+        "sources": await loop.run_in_executor(None, log_archive.sources),
+        "stats": await loop.run_in_executor(None, log_archive.get_stats)
+    }
 
 
 # === Main ===
@@ -0,0 +1,418 @@
+"""
+Resumable Upload Sessions
+tus-style chunked uploads: create a session, PATCH chunks at offsets, finalize
+
+Protocol (see dev_api_server.py):
+    POST   /api/dev/uploads              -> session (offset 0, or the offset of a matching unfinished session)
+    GET    /api/dev/uploads/{id}         -> current offset (after a dropped connection)
+    PATCH  /api/dev/uploads/{id}         Upload-Offset: <n>, Upload-Checksum: sha256 <hex>, body = chunk
+    POST   /api/dev/uploads/{id}/finalize -> verified file moved into place
+    DELETE /api/dev/uploads/{id}         -> abort
+
+Features:
+- Offsets must match (409 + current offset otherwise), so no byte is written twice
+- Per-chunk SHA256 verification; failed chunks are rolled back
+- Whole-file SHA256 kept incrementally across chunks (rebuilt once after a restart)
+- Session state persisted next to the partial file, survives API restarts
+- Finalize is atomic and serialized per session; sessions on another filesystem
+  (Docker volume) are copied next to the target first, then swapped in
+- Stale sessions expire
+"""
+
+import asyncio
+import errno
+import hashlib
+import json
+import os
+import shutil
+import time
+import uuid
+from dataclasses import dataclass, asdict, field
+from pathlib import Path
+from typing import AsyncIterator, Dict, Optional
+
+from fastapi import HTTPException
+
+from api.upload_stream import safe_filename
+
+
+# Client-side chunk size suggested on session creation
+DEFAULT_CHUNK_SIZE = 8 * 1024 * 1024
+# Largest single PATCH body accepted
+MAX_CHUNK_SIZE = 64 * 1024 * 1024
+# Unfinished sessions older than this are deleted
+SESSION_TTL = 24 * 3600
+# Non-standard status used by tus for a failed chunk checksum
+CHECKSUM_MISMATCH = 460
+
+_BLOCK_SIZE = 1024 * 1024
+
+
+@dataclass
+class UploadSession:
+    """Persisted state of one resumable upload"""
+    id: str
+    filename: str
+    kind: str
+    size: int
+    checksum: Optional[str]
+    environment: str
+    user_id: int
+    offset: int = 0
+    created: float = field(default_factory=time.time)
+    updated: float = field(default_factory=time.time)
+
+    def to_response(self) -> Dict:
+        return {
+            "upload_id": self.id,
+            "filename": self.filename,
+            "kind": self.kind,
+            "size": self.size,
+            "offset": self.offset,
+            "complete": self.offset == self.size,
+            "chunk_size": DEFAULT_CHUNK_SIZE
+        }
+
+
+class UploadSessionStore:
+    """
+    Stores resumable upload sessions under a state directory
+
+    Usage:
+        store = UploadSessionStore(UPLOAD_SESSIONS_DIR, targets)
+        session = store.create("mod.jar", "mod", size, checksum, "dev", 1)
+        await store.append(session.id, 0, request.stream(), chunk_checksum)
+        result = await store.finalize(session.id)
+    """
+
+    def __init__(self, state_dir: Path, targets: Dict[str, Dict]):
+        """
+        Initialize store
+
+        Args:
+            state_dir: Where partial files and session state live
+            targets: kind -> {"dir": Path, "extensions": [...], "max_size": int}
+        """
+        self.state_dir = Path(state_dir)
+        self.state_dir.mkdir(parents=True, exist_ok=True)
+        self.targets = targets
+
+        self._sessions: Dict[str, UploadSession] = {}
+        self._hashers: Dict[str, "hashlib._Hash"] = {}
+        self._locks: Dict[str, asyncio.Lock] = {}
+
+        # Statistics
+        self.stats = {
+            "sessions_created": 0,
+            "sessions_resumed": 0,
+            "chunks_received": 0,
+            "chunks_rejected": 0,
+            "bytes_received": 0,
+            "completed": 0
+        }
+
+        self._load()
+
+    # ------------------------------------------------------------------
+    # Persistence
+    # ------------------------------------------------------------------
+
+    def _state_path(self, upload_id: str) -> Path:
+        return self.state_dir / f"{upload_id}.json"
+
+    def _part_path(self, upload_id: str) -> Path:
+        return self.state_dir / f"{upload_id}.part"
+
+    def _load(self):
+        for state_file in self.state_dir.glob("*.json"):
+            try:
+                session = UploadSession(**json.loads(state_file.read_text()))
+            except (OSError, ValueError, TypeError):
+                continue
+            # The part file is the source of truth for how much actually arrived
+            part = self._part_path(session.id)
+            session.offset = min(session.offset, part.stat().st_size if part.exists() else 0)
+            self._sessions[session.id] = session
+        self.cleanup()
+
+    def _save(self, session: UploadSession):
+        session.updated = time.time()
+        tmp = self._state_path(session.id).with_suffix(".json.tmp")
+        tmp.write_text(json.dumps(asdict(session)))
+        os.replace(tmp, self._state_path(session.id))
+
+    def _delete(self, upload_id: str):
+        self._sessions.pop(upload_id, None)
+        self._hashers.pop(upload_id, None)
+        self._locks.pop(upload_id, None)
+        self._state_path(upload_id).unlink(missing_ok=True)
+        self._part_path(upload_id).unlink(missing_ok=True)
+
+    def cleanup(self):
+        """Delete sessions not touched within SESSION_TTL"""
+        cutoff = time.time() - SESSION_TTL
+        for upload_id, session in list(self._sessions.items()):
+            if session.updated < cutoff:
+                self._delete(upload_id)
+
+    # ------------------------------------------------------------------
+    # Sessions
+    # ------------------------------------------------------------------
+
+    def get(self, upload_id: str) -> UploadSession:
+        """Get a session (404 if unknown or expired)"""
+        session = self._sessions.get(upload_id)
+        if session is None:
+            raise HTTPException(status_code=404, detail="Upload session not found")
+        return session
+
+    def create(
+        self,
+        filename: str,
+        kind: str,
+        size: int,
+        checksum: Optional[str],
+        environment: str,
+        user_id: int
+    ) -> UploadSession:
+        """
+        Create a session, or return the unfinished one for the same file
+
+        Args:
+            filename: Target file name
+            kind: Upload kind (key of targets, e.g. "mod" / "package")
+            size: Total size in bytes
+            checksum: Expected SHA256 of the whole file (hex, optional)
+            environment: Deployment environment
+            user_id: Uploading user
+        """
+        target = self.targets.get(kind)
+        if target is None:
+            raise HTTPException(status_code=400, detail=f"Unknown upload kind: {kind}")
+
+        filename = safe_filename(filename)
+        if not any(filename.endswith(ext) for ext in target["extensions"]):
+            raise HTTPException(
+                status_code=400,
+                detail=f"Only {', '.join(target['extensions'])} files allowed"
+            )
+        if size < 0 or size > target["max_size"]:
+            raise HTTPException(
+                status_code=413,
+                detail=f"File too large (max {target['max_size'] // (1024 * 1024)} MB)"
+            )
+        checksum = checksum.lower().split(":", 1)[-1] if checksum else None
+
+        self.cleanup()
+
+        # Same file again (client restarted) - resume instead of starting over
+        if checksum:
+            for session in self._sessions.values():
+                if (session.filename, session.kind, session.size, session.checksum) == (filename, kind, size, checksum):
+                    self.stats["sessions_resumed"] += 1
+                    return session
+
+        session = UploadSession(
+            id=uuid.uuid4().hex,
+            filename=filename,
+            kind=kind,
+            size=size,
+            checksum=checksum,
+            environment=environment,
+            user_id=user_id
+        )
+        self._part_path(session.id).touch()
+        self._sessions[session.id] = session
+        self._hashers[session.id] = hashlib.sha256()
+        self._save(session)
+        self.stats["sessions_created"] += 1
+        return session
+
+    async def _hasher(self, session: UploadSession):
+        """Whole-file hasher positioned at session.offset (rebuilt from disk after a restart)"""
+        hasher = self._hashers.get(session.id)
+        if hasher is None:
+            def rehash():
+                sha256 = hashlib.sha256()
+                remaining = session.offset
+                with open(self._part_path(session.id), 'rb') as f:
+                    while remaining:
+                        block = f.read(min(_BLOCK_SIZE, remaining))
+                        if not block:
+                            break
+                        sha256.update(block)
+                        remaining -= len(block)
+                return sha256
+
+            hasher = await asyncio.get_event_loop().run_in_executor(None, rehash)
+            self._hashers[session.id] = hasher
+        return hasher
+
+    async def append(
+        self,
+        upload_id: str,
+        offset: int,
+        body: AsyncIterator[bytes],
+        chunk_checksum: Optional[str] = None
+    ) -> UploadSession:
+        """
+        Write a chunk at offset
+
+        Args:
+            upload_id: Session ID
+            offset: Client's Upload-Offset (must equal the session offset)
+            body: Chunk bytes (request.stream())
+            chunk_checksum: "sha256 <hex>" of the chunk (optional but recommended)
+
+        Raises:
+            HTTPException: 409 offset mismatch / busy, 413 chunk or file too large,
+                           460 chunk checksum mismatch
+        """
+        session = self.get(upload_id)
+        lock = self._locks.setdefault(upload_id, asyncio.Lock())
+        if lock.locked():
+            raise HTTPException(status_code=409, detail="Another chunk for this upload is in progress")
+
+        async with lock:
+            if offset != session.offset:
+                raise HTTPException(
+                    status_code=409,
+                    detail=f"Offset mismatch (server has {session.offset})",
+                    headers={"Upload-Offset": str(session.offset)}
+                )
+
+            expected_chunk = None
+            if chunk_checksum:
+                algorithm, _, value = chunk_checksum.partition(" ")
+                if algorithm.lower() != "sha256" or not value:
+                    raise HTTPException(status_code=400, detail="Upload-Checksum must be 'sha256 <hex>'")
+                expected_chunk = value.strip().lower()
+
+            loop = asyncio.get_event_loop()
+            file_hasher = (await self._hasher(session)).copy()
+            chunk_hasher = hashlib.sha256()
+            part = await loop.run_in_executor(None, open, self._part_path(upload_id), 'r+b')
+            written = 0
+
+            def write_block(block: bytes, position: int):
+                chunk_hasher.update(block)
+                file_hasher.update(block)
+                part.seek(position)
+                part.write(block)
+
+            try:
+                buffer = []
+                buffered = 0
+                async for data in body:
+                    written += len(data)
+                    if written > MAX_CHUNK_SIZE:
+                        raise HTTPException(status_code=413, detail="Chunk too large")
+                    if session.offset + written > session.size:
+                        raise HTTPException(status_code=413, detail="Chunk exceeds declared upload size")
+                    buffer.append(data)
+                    buffered += len(data)
+                    if buffered >= _BLOCK_SIZE:
+                        await loop.run_in_executor(None, write_block, b"".join(buffer), offset + written - buffered)
+                        buffer, buffered = [], 0
+                if buffer:
+                    await loop.run_in_executor(None, write_block, b"".join(buffer), offset + written - buffered)
+
+                if expected_chunk and chunk_hasher.hexdigest() != expected_chunk:
+                    self.stats["chunks_rejected"] += 1
+                    raise HTTPException(status_code=CHECKSUM_MISMATCH, detail="Chunk checksum mismatch")
+
+                await loop.run_in_executor(None, part.flush)
+
+            except BaseException:
+                # Roll back everything this request wrote
+                await loop.run_in_executor(None, part.truncate, session.offset)
+                raise
+            finally:
+                await loop.run_in_executor(None, part.close)
+
+            session.offset += written
+            self._hashers[upload_id] = file_hasher
+            self._save(session)
+
+            self.stats["chunks_received"] += 1
+            self.stats["bytes_received"] += written
+            return session
+
+    async def finalize(self, upload_id: str) -> Dict:
+        """
+        Verify the complete file and move it into its target directory
+
+        Returns:
+            {"filename", "file_path", "file_size", "checksum", "kind", "environment", "user_id"}
+
+        Raises:
+            HTTPException: 404 unknown (or finalized by a concurrent request),
+                           409 incomplete, 422 whole-file checksum mismatch
+        """
+        self.get(upload_id)
+        async with self._locks.setdefault(upload_id, asyncio.Lock()):
+            return await self._finalize(self.get(upload_id))
+
+    async def _finalize(self, session: UploadSession) -> Dict:
+        upload_id = session.id
+        if session.offset != session.size:
+            raise HTTPException(
+                status_code=409,
+                detail=f"Upload incomplete ({session.offset}/{session.size} bytes)",
+                headers={"Upload-Offset": str(session.offset)}
+            )
+
+        checksum = (await self._hasher(session)).hexdigest()
+        if session.checksum and checksum != session.checksum:
+            # Every chunk matched but the file doesn't - start over
+            self._delete(upload_id)
+            raise HTTPException(status_code=422, detail="File checksum mismatch, upload discarded")
+
+        target_dir = Path(self.targets[session.kind]["dir"])
+        final_path = target_dir / session.filename
+        part_path = self._part_path(upload_id)
+
+        def move_into_place():
+            target_dir.mkdir(parents=True, exist_ok=True)
+            with open(part_path, 'rb') as f:
+                os.fsync(f.fileno())
+            try:
+                os.replace(part_path, final_path)
+                return
+            except OSError as e:
+                if e.errno != errno.EXDEV:
+                    raise
+            # Sessions live on another filesystem: copy next to the target, then swap atomically
+            temp_path = target_dir / f".{session.filename}.{upload_id[:8]}.upload"
+            try:
+                with open(part_path, 'rb') as src, open(temp_path, 'wb') as dst:
+                    shutil.copyfileobj(src, dst, _BLOCK_SIZE)
+                    dst.flush()
+                    os.fsync(dst.fileno())
+                os.replace(temp_path, final_path)
+            except BaseException:
+                temp_path.unlink(missing_ok=True)
+                raise
+
+        await asyncio.get_event_loop().run_in_executor(None, move_into_place)
+        self._delete(upload_id)
+        self.stats["completed"] += 1
+
+        return {
+            "filename": session.filename,
+            "file_path": final_path,
+            "file_size": session.size,
+            "checksum": checksum,
+            "kind": session.kind,
+            "environment": session.environment,
+            "user_id": session.user_id
+        }
+
+    def abort(self, upload_id: str):
+        """Discard a session and its partial data"""
+        self.get(upload_id)
+        self._delete(upload_id)
+
+    def get_stats(self) -> Dict:
+        """Get upload statistics"""
+        return {**self.stats, "active_sessions": len(self._sessions)}
@@ -0,0 +1,279 @@
+"""
+Streaming Upload Pipeline
+Writes uploads to disk in one pass: hash, size check and write happen per block
+
+Features:
+- Parses multipart bodies straight from the request stream (no spooled copy)
+- SHA256 and size computed while writing, no re-read of the file
+- Size limit enforced as bytes arrive (and up front from Content-Length)
+- Disk writes and hashing run off the event loop
+- Temp file in the target directory, fsync + atomic rename on success
+"""
+
+import asyncio
+import hashlib
+import os
+import uuid
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from fastapi import HTTPException, Request
+
+try:
+    import python_multipart as multipart
+    from python_multipart.multipart import parse_options_header
+except ImportError:  # python-multipart < 0.0.13
+    import multipart
+    from multipart.multipart import parse_options_header
+
+
+# Bytes buffered before each write + hash step in the executor
+WRITE_BLOCK_SIZE = 1024 * 1024
+
+
+def safe_filename(filename: Optional[str]) -> str:
+    """Strip directories from a client-supplied filename"""
+    name = Path((filename or "").replace("\\", "/")).name
+    if not name or name.startswith("."):
+        raise HTTPException(status_code=400, detail="Invalid file name")
+    return name
+
+
+class UploadSink:
+    """
+    Streams an upload into a temp file next to its destination
+
+    Usage:
+        sink = UploadSink(SERVER_MODS_DIR, "mod.jar", max_size=MAX_MOD_FILE_SIZE)
+        await sink.open()
+        await sink.write(data)
+        result = await sink.commit()   # {"file_path", "file_size", "checksum"}
+    """
+
+    def __init__(self, dest_dir: Path, filename: str, max_size: Optional[int] = None):
+        """
+        Initialize sink
+
+        Args:
+            dest_dir: Directory the file ends up in
+            filename: Final file name (already sanitized)
+            max_size: Maximum accepted size in bytes (None = unlimited)
+        """
+        self.dest_dir = Path(dest_dir)
+        self.filename = filename
+        self.max_size = max_size
+        self.final_path = self.dest_dir / filename
+        self.temp_path = self.dest_dir / f".{filename}.{uuid.uuid4().hex[:8]}.upload"
+
+        self.size = 0
+        self._sha256 = hashlib.sha256()
+        self._buffer: List[bytes] = []
+        self._buffered = 0
+        self._file = None
+
+    async def _run(self, func, *args):
+        return await asyncio.get_event_loop().run_in_executor(None, func, *args)
+
+    async def open(self):
+        """Create the temp file"""
+        self.dest_dir.mkdir(parents=True, exist_ok=True)
+        self._file = await self._run(open, self.temp_path, 'wb')
+
+    def _write_block(self, block: bytes):
+        # hashlib releases the GIL for large buffers, so this overlaps with request parsing
+        self._sha256.update(block)
+        self._file.write(block)
+
+    async def _flush(self):
+        if self._buffer:
+            block = b"".join(self._buffer)
+            self._buffer, self._buffered = [], 0
+            await self._run(self._write_block, block)
+
+    async def write(self, data: bytes):
+        """
+        Append data (buffered into WRITE_BLOCK_SIZE blocks)
+
+        Raises:
+            HTTPException 413: If the upload exceeds max_size
+        """
+        self.size += len(data)
+        if self.max_size is not None and self.size > self.max_size:
+            raise HTTPException(
+                status_code=413,
+                detail=f"File too large (max {self.max_size // (1024 * 1024)} MB)"
+            )
+
+        self._buffer.append(data)
+        self._buffered += len(data)
+        if self._buffered >= WRITE_BLOCK_SIZE:
+            await self._flush()
+
+    def _finish(self):
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self._file.close()
+        os.replace(self.temp_path, self.final_path)
+
+    async def commit(self) -> Dict:
+        """
+        Flush, fsync and atomically move the file into place
+
+        Returns:
+            {"file_path", "file_size", "checksum"}
+        """
+        await self._flush()
+        await self._run(self._finish)
+        self._file = None
+        return {
+            "file_path": self.final_path,
+            "file_size": self.size,
+            "checksum": self._sha256.hexdigest()
+        }
+
+    async def abort(self):
+        """Discard the partial upload"""
+        def cleanup():
+            if self._file is not None:
+                self._file.close()
+            self.temp_path.unlink(missing_ok=True)
+
+        await self._run(cleanup)
+        self._file = None
+
+
+class _MultipartCollector:
+    """Collects python-multipart callbacks; file data is drained asynchronously"""
+
+    def __init__(self, file_field: str):
+        self.file_field = file_field
+        self.fields: Dict[str, str] = {}
+        self.filename: Optional[str] = None
+        self.file_data: List[bytes] = []
+        self.file_started = False
+
+        self._header_field = b""
+        self._header_value = b""
+        self._headers: Dict[bytes, bytes] = {}
+        self._part_name: Optional[str] = None
+        self._part_is_file = False
+        self._field_value: List[bytes] = []
+
+    def callbacks(self) -> Dict:
+        return {
+            "on_part_begin": self.on_part_begin,
+            "on_header_field": self.on_header_field,
+            "on_header_value": self.on_header_value,
+            "on_header_end": self.on_header_end,
+            "on_headers_finished": self.on_headers_finished,
+            "on_part_data": self.on_part_data,
+            "on_part_end": self.on_part_end,
+        }
+
+    def on_part_begin(self):
+        self._headers = {}
+        self._field_value = []
+
+    def on_header_field(self, data: bytes, start: int, end: int):
+        self._header_field += data[start:end]
+
+    def on_header_value(self, data: bytes, start: int, end: int):
+        self._header_value += data[start:end]
+
+    def on_header_end(self):
+        self._headers[self._header_field.lower()] = self._header_value
+        self._header_field = b""
+        self._header_value = b""
+
+    def on_headers_finished(self):
+        _, options = parse_options_header(self._headers.get(b"content-disposition", b""))
+        self._part_name = options.get(b"name", b"").decode("utf-8", errors="replace")
+        filename = options.get(b"filename")
+        self._part_is_file = filename is not None and self._part_name == self.file_field
+        if self._part_is_file:
+            if self.file_started:
+                raise HTTPException(status_code=400, detail="Only one file per upload")
+            self.file_started = True
+            self.filename = filename.decode("utf-8", errors="replace")
+
+    def on_part_data(self, data: bytes, start: int, end: int):
+        if self._part_is_file:
+            self.file_data.append(data[start:end])
+        else:
+            self._field_value.append(data[start:end])
+
+    def on_part_end(self):
+        if not self._part_is_file and self._part_name:
+            self.fields[self._part_name] = b"".join(self._field_value).decode("utf-8", errors="replace")
+        self._part_is_file = False
+
+
+async def stream_multipart_upload(
+    request: Request,
+    dest_dir: Path,
+    max_size: Optional[int] = None,
+    allowed_extensions: Optional[List[str]] = None,
+    file_field: str = "file"
+) -> Tuple[Dict[str, str], Dict]:
+    """
+    Stream a multipart/form-data upload to disk in a single pass
+
+    Args:
+        request: Incoming request (body not read yet)
+        dest_dir: Target directory
+        max_size: Maximum file size in bytes
+        allowed_extensions: Accepted file extensions (e.g. [".jar"])
+        file_field: Name of the form field carrying the file
+
+    Returns:
+        (form fields, {"filename", "file_path", "file_size", "checksum"})
+
+    Raises:
+        HTTPException: 400 malformed / wrong type, 413 too large
+    """
+    content_type, params = parse_options_header(request.headers.get("content-type", ""))
+    boundary = params.get(b"boundary")
+    if content_type != b"multipart/form-data" or not boundary:
+        raise HTTPException(status_code=400, detail="Expected multipart/form-data")
+
+    # Reject obviously oversized bodies before reading anything
+    content_length = request.headers.get("content-length")
+    if max_size is not None and content_length and int(content_length) > max_size + 64 * 1024:
+        raise HTTPException(status_code=413, detail=f"File too large (max {max_size // (1024 * 1024)} MB)")
+
+    collector = _MultipartCollector(file_field)
+    parser = multipart.MultipartParser(boundary, collector.callbacks())
+    sink: Optional[UploadSink] = None
+
+    try:
+        async for chunk in request.stream():
+            parser.write(chunk)
+
+            if collector.file_started and sink is None:
+                filename = safe_filename(collector.filename)
+                if allowed_extensions and not any(filename.endswith(ext) for ext in allowed_extensions):
+                    raise HTTPException(
+                        status_code=400,
+                        detail=f"Only {', '.join(allowed_extensions)} files allowed"
+                    )
+                sink = UploadSink(dest_dir, filename, max_size)
+                await sink.open()
+
+            if sink is not None and collector.file_data:
+                data, collector.file_data = collector.file_data, []
+                for piece in data:
+                    await sink.write(piece)
+
+        parser.finalize()
+
+        if sink is None:
+            raise HTTPException(status_code=400, detail=f"No file in form field '{file_field}'")
+
+        result = await sink.commit()
+        result["filename"] = sink.filename
+        return collector.fields, result
+
+    except BaseException:
+        if sink is not None:
+            await sink.abort()
+        raise
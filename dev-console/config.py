@@ -27,6 +27,7 @@ MINECRAFT_SERVER_PORT = 25565
 RCON_HOST = os.getenv("MINECRAFT_RCON_HOST", "localhost")
 RCON_PORT = int(os.getenv("MINECRAFT_RCON_PORT", "25575"))
 RCON_PASSWORD = os.getenv("MINECRAFT_RCON_PASSWORD", "titan123")
+MINECRAFT_CONTAINER = os.getenv("MINECRAFT_CONTAINER", "titan-hub")  # Docker name, for cgroup stats
 
 # Grok AI Configuration (via OpenRouter)
 OPENROUTER_API_KEY = os.getenv("OPENROUTER_API_KEY", "")
@@ -137,6 +138,39 @@ ROLES = {
 # File upload limits
 MAX_MOD_FILE_SIZE = 100 * 1024 * 1024  # 100 MB
 ALLOWED_MOD_EXTENSIONS = [".jar"]
+MAX_PACKAGE_FILE_SIZE = 4 * 1024 * 1024 * 1024  # 4 GB
+ALLOWED_PACKAGE_EXTENSIONS = [".zip", ".mrpack", ".json"]
+
+# Resumable (chunked) uploads
+UPLOAD_SESSIONS_DIR = BASE_DIR / "uploads"
+MOD_UPLOAD_VIA_API = False  # ModUploader sends files through the resumable API instead of copying
+
+# Activity log write-behind (events are batched into one commit)
+ACTIVITY_LOG_BATCH_SIZE = 500
+ACTIVITY_LOG_FLUSH_INTERVAL = 1.0  # seconds
+
+# Server status metrics retention (raw samples -> 1 min -> 1 h rollups)
+METRICS_RAW_RETENTION_DAYS = 2
+METRICS_MINUTE_RETENTION_DAYS = 30
+METRICS_HOUR_RETENTION_DAYS = 730
+
+# Searchable server log archive (latest.log + rotated *.log.gz)
+LOG_ARCHIVE_PATH = BASE_DIR / "database" / "log_archive.db"
+LOG_ARCHIVE_INTERVAL = 5.0  # seconds between ingest passes
+LOG_ARCHIVE_RETENTION_DAYS = 90
+
+# Fleet health checks (environments + server_registry)
+HEALTH_CHECK_INTERVAL = 10.0  # seconds between rounds
+HEALTH_CHECK_CONCURRENCY = 16  # probes in flight
+HEALTH_CHECK_WINDOW = 360  # checks kept per target (1 hour at 10 s)
+
+# Lag watchdog (automatic spark / async-profiler / JFR capture on tick spikes)
+LAG_PROFILES_DIR = BASE_DIR / "profiles"
+LAG_EVENTS_PATH = BASE_DIR / "database" / "lag_events.db"
+LAG_WATCHDOG_THRESHOLD_MS = 250.0  # average tick over one 0.5 s sample, or server-reported worst tick, that triggers a capture
+LAG_PROFILE_WINDOW = 30.0  # seconds each profile runs
+LAG_WATCHDOG_COOLDOWN = 300.0  # seconds between captures
+LAG_EVENTS_KEEP = 200  # lag events (and their profile folders) kept
 
 # Hot reload settings
 HOT_RELOAD_WATCH_DELAY = 1.0  # seconds
@@ -146,5 +180,6 @@ HOT_RELOAD_DEBOUNCE = 2.0  # seconds
 SERVER_MODS_DIR.mkdir(exist_ok=True)
 MINECRAFT_PACKAGES_DIR.mkdir(exist_ok=True)
 LOGS_DIR.mkdir(exist_ok=True)
+UPLOAD_SESSIONS_DIR.mkdir(exist_ok=True)
 (DATABASE_PATH.parent).mkdir(exist_ok=True)
 
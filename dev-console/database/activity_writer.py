@@ -0,0 +1,278 @@
+"""
+Write-Behind Activity Log
+Buffers audit events in memory and writes them to SQLite in batches
+
+Features:
+- log() costs a JSON encode and an append to the spool file, no database commit
+- Background flush on size (max_batch) or time (flush_interval) thresholds
+- One transaction per batch (executemany on the writer connection)
+- Append-only spool file: events survive a crash and are replayed on startup
+- Event time captured at log() time, not at flush time
+- One spool per process (GUI and API share the database); spools of dead
+  processes are replayed by the next writer that starts
+
+Delivery is at-least-once: a crash between a batch commit and the spool
+rotation can replay that batch once on the next start.
+"""
+
+import atexit
+import json
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+from database.connection_pool import ConnectionPool
+
+
+_INSERT_SQL = (
+    "INSERT INTO activity_logs (user_id, action, details, ip_address, timestamp) "
+    "VALUES (?, ?, ?, ?, ?)"
+)
+
+Event = Tuple[Optional[int], str, Optional[str], Optional[str], str]
+
+
+def _try_lock(f) -> bool:
+    """Non-blocking exclusive lock; held until the file is closed or the process dies"""
+    try:
+        if fcntl is not None:
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+        else:
+            msvcrt.locking(f.fileno(), msvcrt.LK_NBLCK, 1)
+        return True
+    except OSError:
+        return False
+
+
+class ActivityLogWriter:
+    """
+    Batched, crash-safe activity log writer
+
+    Usage:
+        writer = ActivityLogWriter(pool, DATABASE_PATH.with_name("dev_console.activity"))
+        writer.log(user_id, "upload_mod", {"mod_id": 3})
+        writer.flush()      # force pending events into the database
+        writer.close()
+    """
+
+    def __init__(
+        self,
+        pool: ConnectionPool,
+        spool_prefix: Path,
+        max_batch: int = 500,
+        flush_interval: float = 1.0,
+        fsync_interval: float = 1.0
+    ):
+        """
+        Initialize writer
+
+        Args:
+            pool: Connection pool (batches go through its writer)
+            spool_prefix: Spool files are <prefix>.<pid>.spool (append-only, uncommitted events)
+            max_batch: Flush as soon as this many events are pending
+            flush_interval: Flush at least this often (seconds)
+            fsync_interval: Sync the spool to disk at most this often (seconds)
+        """
+        self.pool = pool
+        self.spool_prefix = Path(spool_prefix)
+        self.spool_path, self.flushing_path, lock_path = self._paths(os.getpid())
+        self.max_batch = max_batch
+        self.flush_interval = flush_interval
+        self.fsync_interval = fsync_interval
+
+        self._pending: List[Event] = []
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._closed = False
+        self._last_fsync = time.monotonic()
+
+        # Statistics
+        self.stats = {
+            "logged": 0,
+            "flushed": 0,
+            "batches": 0,
+            "replayed": 0,
+            "flush_errors": 0
+        }
+
+        # Held for the lifetime of the process: marks our spool as live
+        self._lock_file = open(lock_path, 'a+')
+        _try_lock(self._lock_file)
+
+        self._replay_orphans()
+        self._spool = open(self.spool_path, 'a', encoding='utf-8')
+
+        self._thread = threading.Thread(target=self._flush_loop, name="activity-writer", daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    # ------------------------------------------------------------------
+    # Spool
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def _read_spool(path: Path) -> List[Event]:
+        events = []
+        if not path.exists():
+            return events
+        with open(path, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    events.append(tuple(json.loads(line)))
+                except ValueError:
+                    # Torn last line from a crash mid-write
+                    continue
+        return events
+
+    def _paths(self, pid: int) -> Tuple[Path, Path, Path]:
+        base = f"{self.spool_prefix.name}.{pid}"
+        return (
+            self.spool_prefix.with_name(base + ".spool"),
+            self.spool_prefix.with_name(base + ".spool.flushing"),
+            self.spool_prefix.with_name(base + ".lock")
+        )
+
+    def _replay_orphans(self):
+        """Commit events left behind by writers that crashed (ours included, after a pid reuse)"""
+        for lock_path in self.spool_prefix.parent.glob(self.spool_prefix.name + ".*.lock"):
+            try:
+                pid = int(lock_path.name[len(self.spool_prefix.name) + 1:-len(".lock")])
+            except ValueError:
+                continue
+
+            if pid != os.getpid():
+                with open(lock_path, 'a+') as f:
+                    if not _try_lock(f):
+                        continue  # owner still running
+            spool_path, flushing_path, _ = self._paths(pid)
+
+            events = self._read_spool(flushing_path) + self._read_spool(spool_path)
+            if events:
+                with self.pool.transaction() as conn:
+                    conn.executemany(_INSERT_SQL, events)
+                self.stats["replayed"] += len(events)
+                print(f"[OK] Replayed {len(events)} spooled activity events")
+            flushing_path.unlink(missing_ok=True)
+            spool_path.unlink(missing_ok=True)
+            if pid != os.getpid():
+                lock_path.unlink(missing_ok=True)
+
+    # ------------------------------------------------------------------
+    # Logging
+    # ------------------------------------------------------------------
+
+    def log(
+        self,
+        user_id: Optional[int],
+        action: str,
+        details: Optional[Dict] = None,
+        ip_address: Optional[str] = None
+    ):
+        """
+        Queue an activity event
+
+        Args:
+            user_id: Acting user (None for system events)
+            action: Action name
+            details: JSON-serializable details
+            ip_address: Client address
+        """
+        event: Event = (
+            user_id,
+            action,
+            json.dumps(details) if details else None,
+            ip_address,
+            time.strftime("%Y-%m-%d %H:%M:%S", time.gmtime())  # same format as CURRENT_TIMESTAMP
+        )
+        line = json.dumps(event) + "\n"
+
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("Activity log writer is closed")
+            self._spool.write(line)
+            self._spool.flush()  # in the OS page cache: survives a process crash
+            now = time.monotonic()
+            if now - self._last_fsync >= self.fsync_interval:
+                os.fsync(self._spool.fileno())
+                self._last_fsync = now
+            self._pending.append(event)
+            self.stats["logged"] += 1
+            full = len(self._pending) >= self.max_batch
+
+        if full:
+            self._wakeup.set()
+
+    def pending(self) -> int:
+        """Number of events not yet committed"""
+        return len(self._pending)
+
+    def flush(self):
+        """Commit all pending events in one transaction"""
+        with self._flush_lock:
+            with self._lock:
+                if not self._pending:
+                    return
+                batch, self._pending = self._pending, []
+                # Rotate the spool: new events go to a fresh file while this batch commits
+                self._spool.close()
+                os.replace(self.spool_path, self.flushing_path)
+                self._spool = open(self.spool_path, 'a', encoding='utf-8')
+
+            try:
+                with self.pool.transaction() as conn:
+                    conn.executemany(_INSERT_SQL, batch)
+            except Exception:
+                # Keep the events; the .flushing file still holds them for crash recovery
+                self.stats["flush_errors"] += 1
+                with self._lock:
+                    self._pending = batch + self._pending
+                    self._spool.close()
+                    with open(self.flushing_path, 'a', encoding='utf-8') as f, \
+                            open(self.spool_path, 'r', encoding='utf-8') as newer:
+                        f.write(newer.read())
+                    os.replace(self.flushing_path, self.spool_path)
+                    self._spool = open(self.spool_path, 'a', encoding='utf-8')
+                raise
+
+            self.flushing_path.unlink(missing_ok=True)
+            self.stats["flushed"] += len(batch)
+            self.stats["batches"] += 1
+
+    def _flush_loop(self):
+        while not self._closed:
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            try:
+                self.flush()
+            except Exception as e:
+                print(f"[ERROR] Activity log flush failed: {e}")
+
+    def close(self):
+        """Flush remaining events and stop the background thread"""
+        if self._closed:
+            return
+        try:
+            self.flush()
+        except Exception as e:
+            print(f"[ERROR] Activity log flush failed, events kept in spool: {e}")
+        with self._lock:
+            self._closed = True
+            self._spool.close()
+        self._wakeup.set()
+        if not self._pending:
+            self.spool_path.unlink(missing_ok=True)
+            Path(self._lock_file.name).unlink(missing_ok=True)
+        self._lock_file.close()
+
+    def get_stats(self) -> Dict:
+        """Get writer statistics"""
+        return {**self.stats, "pending": len(self._pending)}
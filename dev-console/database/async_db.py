@@ -0,0 +1,87 @@
+"""
+Async Database Facade
+Awaitable access to DatabaseManager for FastAPI handlers
+
+Features:
+- Every DatabaseManager method is awaitable (runs on a dedicated thread pool)
+- Pool sized to the reader connections + the writer, so queries don't queue behind other executor work
+- run() executes a function inside one write transaction (many rows, one commit)
+"""
+
+import asyncio
+import functools
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Optional
+
+from database.db_manager import DatabaseManager, get_db
+
+
+class AsyncDatabase:
+    """
+    Async wrapper around DatabaseManager
+
+    Usage:
+        adb = get_async_db()
+        mods = await adb.get_mods_by_environment("dev")
+        mod_id = await adb.run(lambda db: db.create_mod(...))   # one transaction
+    """
+
+    def __init__(self, db: DatabaseManager):
+        """
+        Initialize facade
+
+        Args:
+            db: Synchronous database manager (shared with GUI threads)
+        """
+        self.db = db
+        self._executor = ThreadPoolExecutor(
+            max_workers=db.pool.max_readers + 1,
+            thread_name_prefix="db"
+        )
+
+    async def _call(self, func: Callable, *args, **kwargs) -> Any:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, functools.partial(func, *args, **kwargs))
+
+    def __getattr__(self, name: str):
+        attr = getattr(self.db, name)
+        if not callable(attr) or name.startswith("_"):
+            return attr
+
+        async def method(*args, **kwargs):
+            return await self._call(attr, *args, **kwargs)
+
+        method.__name__ = name
+        return method
+
+    async def run(self, func: Callable[[DatabaseManager], Any]) -> Any:
+        """
+        Run func(db) inside a single write transaction
+
+        Args:
+            func: Receives the DatabaseManager; all its writes share one commit
+
+        Returns:
+            Whatever func returns
+        """
+        def in_transaction():
+            with self.db.transaction():
+                return func(self.db)
+
+        return await self._call(in_transaction)
+
+    def close(self):
+        """Shut down the worker threads"""
+        self._executor.shutdown(wait=False)
+
+
+# Singleton instance
+_async_db: Optional[AsyncDatabase] = None
+
+
+def get_async_db() -> AsyncDatabase:
+    """Get async database facade singleton (wraps get_db())"""
+    global _async_db
+    if _async_db is None:
+        _async_db = AsyncDatabase(get_db())
+    return _async_db
@@ -0,0 +1,208 @@
+"""
+SQLite Connection Pool
+WAL-mode data layer: many concurrent readers, one serialized writer
+
+Features:
+- WAL journaling (readers never block the writer and vice versa)
+- synchronous=NORMAL: commits don't fsync, checkpoints do
+- Reader pool with lazily opened, query-only connections
+- Single writer connection with explicit transactions (batch many rows per commit)
+- Per-connection prepared statement cache (statements are reused by SQL text)
+"""
+
+import queue
+import sqlite3
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Iterator, Optional
+
+
+# Prepared statements kept per connection (sqlite3 caches by SQL text)
+STATEMENT_CACHE_SIZE = 256
+
+
+class ConnectionPool:
+    """
+    Reader pool plus single writer over one SQLite database
+
+    Usage:
+        pool = ConnectionPool(DATABASE_PATH, readers=4)
+        with pool.reader() as conn:
+            rows = conn.execute("SELECT ...").fetchall()
+        with pool.transaction() as conn:
+            conn.execute("INSERT ...")
+            conn.execute("INSERT ...")      # one commit for both
+    """
+
+    def __init__(self, db_path: Path, readers: int = 4, busy_timeout: float = 5.0):
+        """
+        Initialize pool
+
+        Args:
+            db_path: SQLite database file
+            readers: Maximum concurrent reader connections
+            busy_timeout: Seconds to wait on a locked database
+        """
+        self.db_path = Path(db_path)
+        self.max_readers = max(1, readers)
+        self.busy_timeout = busy_timeout
+
+        self._readers: "queue.Queue[sqlite3.Connection]" = queue.Queue()
+        self._reader_count = 0
+        self._reader_lock = threading.Lock()
+
+        self._writer: Optional[sqlite3.Connection] = None
+        self._write_lock = threading.RLock()
+        self._local = threading.local()
+
+        # Statistics
+        self.stats = {
+            "reads": 0,
+            "writes": 0,
+            "transactions": 0,
+            "rollbacks": 0,
+            "reader_waits": 0
+        }
+
+    def _connect(self, read_only: bool = False) -> sqlite3.Connection:
+        conn = sqlite3.connect(
+            str(self.db_path),
+            timeout=self.busy_timeout,
+            check_same_thread=False,
+            isolation_level=None,  # transactions are managed explicitly
+            cached_statements=STATEMENT_CACHE_SIZE
+        )
+        conn.row_factory = sqlite3.Row
+        if not read_only:
+            # Only takes effect on a new database; lets dropped tables give space back
+            conn.execute("PRAGMA auto_vacuum=INCREMENTAL")
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute("PRAGMA temp_store=MEMORY")
+        if read_only:
+            conn.execute("PRAGMA query_only=ON")
+        return conn
+
+    @property
+    def writer_connection(self) -> sqlite3.Connection:
+        """The single writer connection (opened on first use)"""
+        with self._write_lock:
+            if self._writer is None:
+                self._writer = self._connect()
+            return self._writer
+
+    def in_transaction(self) -> bool:
+        """True if the calling thread is inside transaction()"""
+        return getattr(self._local, "depth", 0) > 0
+
+    @contextmanager
+    def reader(self) -> Iterator[sqlite3.Connection]:
+        """
+        Borrow a reader connection
+
+        Inside a transaction on the same thread the writer connection is
+        returned instead, so uncommitted rows are visible to the caller.
+        """
+        if self.in_transaction():
+            yield self._writer
+            return
+
+        try:
+            conn = self._readers.get_nowait()
+        except queue.Empty:
+            with self._reader_lock:
+                create = self._reader_count < self.max_readers
+                if create:
+                    self._reader_count += 1
+            if create:
+                try:
+                    conn = self._connect(read_only=True)
+                except Exception:
+                    with self._reader_lock:
+                        self._reader_count -= 1
+                    raise
+            else:
+                self.stats["reader_waits"] += 1
+                conn = self._readers.get()
+
+        try:
+            self.stats["reads"] += 1
+            yield conn
+        finally:
+            if conn.in_transaction:
+                conn.rollback()
+            self._readers.put(conn)
+
+    @contextmanager
+    def transaction(self) -> Iterator[sqlite3.Connection]:
+        """
+        Run writes in one transaction on the writer connection
+
+        Nested calls on the same thread join the outer transaction.
+        Commits on success, rolls back on any exception.
+        """
+        with self._write_lock:
+            conn = self.writer_connection
+            depth = getattr(self._local, "depth", 0)
+            if depth:
+                self._local.depth = depth + 1
+                try:
+                    yield conn
+                finally:
+                    self._local.depth = depth
+                return
+
+            conn.execute("BEGIN IMMEDIATE")
+            self._local.depth = 1
+            try:
+                yield conn
+            except BaseException:
+                conn.rollback()
+                self.stats["rollbacks"] += 1
+                raise
+            else:
+                conn.commit()
+                self.stats["transactions"] += 1
+            finally:
+                self._local.depth = 0
+
+    def execute_write(self, sql: str, params: tuple = ()) -> sqlite3.Cursor:
+        """Execute a single write statement (joins the current transaction if any)"""
+        with self.transaction() as conn:
+            self.stats["writes"] += 1
+            return conn.execute(sql, params)
+
+    def maintenance(self, *statements: str):
+        """Run statements that can't run inside a transaction (VACUUM, auto_vacuum changes)"""
+        with self._write_lock:
+            conn = self.writer_connection
+            for sql in statements:
+                conn.execute(sql).fetchall()  # some pragmas work one row per step
+
+    def executescript(self, script: str):
+        """Run a schema script on the writer connection"""
+        with self._write_lock:
+            self.writer_connection.executescript(script)
+
+    def close(self):
+        """Close all connections"""
+        with self._write_lock:
+            if self._writer is not None:
+                self._writer.close()
+                self._writer = None
+        while True:
+            try:
+                self._readers.get_nowait().close()
+            except queue.Empty:
+                break
+        with self._reader_lock:
+            self._reader_count = 0
+
+    def get_stats(self) -> dict:
+        """Get pool statistics"""
+        return {
+            **self.stats,
+            "readers_open": self._reader_count,
+            "readers_idle": self._readers.qsize()
+        }
@@ -1,28 +1,57 @@
 """
 Database Manager for Development Console
-Handles all database operations with SQLite
+Handles all database operations with SQLite (WAL, pooled readers, single writer)
 """
 
 import sqlite3
 import json
+import threading
+from contextlib import contextmanager
 from pathlib import Path
-from datetime import datetime
-from typing import Optional, List, Dict, Any
+from datetime import datetime, timezone
+from typing import Optional, List, Dict, Any, Iterator
 import hashlib
 
-from config import DATABASE_PATH
+from config import (
+    DATABASE_PATH, ACTIVITY_LOG_BATCH_SIZE, ACTIVITY_LOG_FLUSH_INTERVAL,
+    METRICS_RAW_RETENTION_DAYS, METRICS_MINUTE_RETENTION_DAYS, METRICS_HOUR_RETENTION_DAYS
+)
+from database.connection_pool import ConnectionPool
+from database.activity_writer import ActivityLogWriter
+from database.metrics_store import MetricsStore
 
 
 class DatabaseManager:
     """
     Manages database connections and operations.
     Simple, fast, effective - Elon Musk style.
+    
+    Reads go through a pool of WAL reader connections and never wait on
+    writes; writes are serialized on one writer connection. Group related
+    writes with transaction() so they share a single commit. Activity
+    events are written behind in batches (see ActivityLogWriter) - those
+    logged inside transaction() are queued only once it commits; server
+    status samples live in a partitioned, rolled-up store (see MetricsStore).
     """
     
-    def __init__(self, db_path: Path = DATABASE_PATH):
+    def __init__(self, db_path: Path = DATABASE_PATH, readers: int = 4):
         self.db_path = db_path
-        self.connection = None
+        self.pool = ConnectionPool(db_path, readers=readers)
         self.initialize_database()
+        self.activity = ActivityLogWriter(
+            self.pool,
+            Path(db_path).with_name(Path(db_path).stem + ".activity"),
+            max_batch=ACTIVITY_LOG_BATCH_SIZE,
+            flush_interval=ACTIVITY_LOG_FLUSH_INTERVAL
+        )
+        # Activity events logged inside this thread's open transaction()
+        self._local = threading.local()
+        self.metrics = MetricsStore(
+            self.pool,
+            raw_retention_days=METRICS_RAW_RETENTION_DAYS,
+            minute_retention_days=METRICS_MINUTE_RETENTION_DAYS,
+            hour_retention_days=METRICS_HOUR_RETENTION_DAYS
+        )
     
     def initialize_database(self):
         """
@@ -35,75 +64,148 @@ class DatabaseManager:
             schema = f.read()
         
         # Execute schema
-        conn = self.get_connection()
-        conn.executescript(schema)
-        conn.commit()
+        self.pool.executescript(schema)
     
     def get_connection(self) -> sqlite3.Connection:
         """
-        Get database connection.
-        Creates connection if it doesn't exist.
+        Get the writer connection.
+        Prefer transaction() and the query helpers, which handle locking.
+        """
+        return self.pool.writer_connection
+    
+    @contextmanager
+    def transaction(self) -> Iterator[sqlite3.Connection]:
+        """
+        Group several writes into one commit.
+        
+        Activity logged inside is handed to the activity writer when the
+        transaction commits and dropped if it rolls back. Nested calls
+        join the outer transaction.
+        
+        Usage:
+            with db.transaction():
+                mod_id = db.create_mod(...)
+                db.create_deployment(mod_id=mod_id, ...)
+        """
+        if getattr(self._local, "activity", None) is not None:
+            with self.pool.transaction() as conn:
+                yield conn
+            return
+        
+        self._local.activity = []
+        try:
+            with self.pool.transaction() as conn:
+                yield conn
+            events = self._local.activity
+        finally:
+            self._local.activity = None
+        for event in events:
+            self.activity.log(*event)
+    
+    def _fetchone(self, sql: str, params: tuple = ()) -> Optional[Dict]:
+        with self.pool.reader() as conn:
+            row = conn.execute(sql, params).fetchone()
+        return dict(row) if row else None
+    
+    def _fetchall(self, sql: str, params: tuple = ()) -> List[Dict]:
+        with self.pool.reader() as conn:
+            return [dict(row) for row in conn.execute(sql, params).fetchall()]
+    
+    def _page(self, select_sql: str, key: str, where: List[str], params: List,
+              limit: int, before: Optional[int] = None,
+              after: Optional[int] = None) -> Dict[str, Any]:
+        """
+        Keyset page over an id column.
+        
+        before: older rows (id < before, newest first) - for scrolling back
+        after:  newer rows (id > after, oldest first) - for incremental refresh
         """
-        if self.connection is None:
-            self.connection = sqlite3.connect(
-                str(self.db_path),
-                check_same_thread=False
-            )
-            self.connection.row_factory = sqlite3.Row
-        return self.connection
+        where, params = list(where), list(params)
+        if before is not None:
+            where.append(f"{key} < ?")
+            params.append(before)
+        if after is not None:
+            where.append(f"{key} > ?")
+            params.append(after)
+        
+        sql = select_sql
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        sql += f" ORDER BY {key} {'ASC' if after is not None else 'DESC'} LIMIT ?"
+        
+        rows = self._fetchall(sql, tuple(params) + (limit + 1,))
+        has_more = len(rows) > limit
+        rows = rows[:limit]
+        ids = [row["id"] for row in rows]
+        
+        return {
+            "items": rows,
+            "has_more": has_more,
+            # Pass as before= to get the next (older) page
+            "next_cursor": ids[-1] if has_more and after is None else None,
+            # Pass as after= to get only rows added since this call
+            "latest_cursor": max(ids + [after or 0])
+        }
+    
+    @staticmethod
+    def _time_filters(column: str, start: Optional[float], end: Optional[float],
+                      where: List[str], params: List):
+        """Add [start, end) unix-time bounds on a CURRENT_TIMESTAMP (UTC) column"""
+        for bound, op in ((start, ">="), (end, "<")):
+            if bound is not None:
+                where.append(f"{column} {op} ?")
+                params.append(datetime.fromtimestamp(bound, timezone.utc).strftime("%Y-%m-%d %H:%M:%S"))
+    
+    def _write(self, sql: str, params: tuple = ()) -> int:
+        """Execute a write (joins the current transaction), return lastrowid"""
+        return self.pool.execute_write(sql, params).lastrowid
     
     def close(self):
-        """Close database connection"""
-        if self.connection:
-            self.connection.close()
-            self.connection = None
+        """Flush pending activity and close database connections"""
+        self.activity.close()
+        self.pool.close()
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Get connection pool and activity writer statistics"""
+        return {
+            **self.pool.get_stats(),
+            "activity": self.activity.get_stats(),
+            "metrics": self.metrics.get_stats()
+        }
     
     # === User Management ===
     
     def create_user(self, username: str, password_hash: str, role: str) -> int:
         """Create new user"""
-        conn = self.get_connection()
-        cursor = conn.execute(
+        return self._write(
             "INSERT INTO users (username, password_hash, role) VALUES (?, ?, ?)",
             (username, password_hash, role)
         )
-        conn.commit()
-        return cursor.lastrowid
     
     def get_user_by_username(self, username: str) -> Optional[Dict]:
         """Get user by username"""
-        conn = self.get_connection()
-        cursor = conn.execute(
+        return self._fetchone(
             "SELECT * FROM users WHERE username = ?",
             (username,)
         )
-        row = cursor.fetchone()
-        return dict(row) if row else None
     
     def get_user_by_id(self, user_id: int) -> Optional[Dict]:
         """Get user by ID"""
-        conn = self.get_connection()
-        cursor = conn.execute(
+        return self._fetchone(
             "SELECT * FROM users WHERE id = ?",
             (user_id,)
         )
-        row = cursor.fetchone()
-        return dict(row) if row else None
     
     def update_user_token(self, user_id: int, token: str):
         """Update user token"""
-        conn = self.get_connection()
-        conn.execute(
+        self._write(
             "UPDATE users SET token = ?, last_login = ? WHERE id = ?",
             (token, datetime.now(), user_id)
         )
-        conn.commit()
     
     def get_all_users(self) -> List[Dict]:
         """Get all users"""
-        conn = self.get_connection()
-        cursor = conn.execute("SELECT * FROM users")
-        return [dict(row) for row in cursor.fetchall()]
+        return self._fetchall("SELECT * FROM users")
     
     # === Mod Management ===
     
@@ -115,64 +217,63 @@ class DatabaseManager:
         - name, version, file_name, file_path, file_size,
         - checksum, author_id, environment
         """
-        conn = self.get_connection()
-        
         # Convert dependencies to JSON if it's a list
         if 'dependencies' in kwargs and isinstance(kwargs['dependencies'], list):
             kwargs['dependencies'] = json.dumps(kwargs['dependencies'])
         
-        columns = ', '.join(kwargs.keys())
-        placeholders = ', '.join('?' * len(kwargs))
+        # Sorted columns keep the SQL text stable, so the prepared statement is reused
+        columns = sorted(kwargs)
+        placeholders = ', '.join('?' * len(columns))
         
-        cursor = conn.execute(
-            f"INSERT INTO mods ({columns}) VALUES ({placeholders})",
-            tuple(kwargs.values())
+        return self._write(
+            f"INSERT INTO mods ({', '.join(columns)}) VALUES ({placeholders})",
+            tuple(kwargs[column] for column in columns)
         )
-        conn.commit()
-        return cursor.lastrowid
     
     def get_mod_by_id(self, mod_id: int) -> Optional[Dict]:
         """Get mod by ID"""
-        conn = self.get_connection()
-        cursor = conn.execute("SELECT * FROM mods WHERE id = ?", (mod_id,))
-        row = cursor.fetchone()
-        if row:
-            mod = dict(row)
-            # Parse dependencies JSON
-            if mod.get('dependencies'):
-                mod['dependencies'] = json.loads(mod['dependencies'])
-            return mod
-        return None
+        mod = self._fetchone("SELECT * FROM mods WHERE id = ?", (mod_id,))
+        # Parse dependencies JSON
+        if mod and mod.get('dependencies'):
+            mod['dependencies'] = json.loads(mod['dependencies'])
+        return mod
     
     def get_mods_by_environment(self, environment: str) -> List[Dict]:
         """Get all mods for an environment"""
-        conn = self.get_connection()
-        cursor = conn.execute(
+        return self._fetchall(
             "SELECT * FROM mods WHERE environment = ? ORDER BY created_at DESC",
             (environment,)
         )
-        return [dict(row) for row in cursor.fetchall()]
     
     def get_all_mods(self) -> List[Dict]:
         """Get all mods"""
-        conn = self.get_connection()
-        cursor = conn.execute("SELECT * FROM mods ORDER BY created_at DESC")
-        return [dict(row) for row in cursor.fetchall()]
+        return self._fetchall("SELECT * FROM mods ORDER BY created_at DESC")
+    
+    def query_mods(self, limit: int = 100, before: Optional[int] = None,
+                   after: Optional[int] = None, environment: Optional[str] = None,
+                   status: Optional[str] = None, name: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Keyset-paginated, filtered mods (newest first).
+        
+        Returns {"items", "has_more", "next_cursor", "latest_cursor"}
+        """
+        where, params = [], []
+        for column, value in (("environment", environment), ("status", status), ("name", name)):
+            if value is not None:
+                where.append(f"{column} = ?")
+                params.append(value)
+        return self._page("SELECT * FROM mods", "id", where, params, limit, before, after)
     
     def update_mod_status(self, mod_id: int, status: str):
         """Update mod status"""
-        conn = self.get_connection()
-        conn.execute(
+        self._write(
             "UPDATE mods SET status = ?, updated_at = ? WHERE id = ?",
             (status, datetime.now(), mod_id)
         )
-        conn.commit()
     
     def delete_mod(self, mod_id: int):
         """Delete mod"""
-        conn = self.get_connection()
-        conn.execute("DELETE FROM mods WHERE id = ?", (mod_id,))
-        conn.commit()
+        self._write("DELETE FROM mods WHERE id = ?", (mod_id,))
     
     # === Deployment Tracking ===
     
@@ -180,21 +281,17 @@ class DatabaseManager:
                          status: str, deployment_type: str,
                          error_message: Optional[str] = None) -> int:
         """Create deployment record"""
-        conn = self.get_connection()
-        cursor = conn.execute(
-            """INSERT INTO deployments 
+        return self._write(
+            """INSERT INTO deployments
             (mod_id, environment, user_id, status, deployment_type, error_message)
             VALUES (?, ?, ?, ?, ?, ?)""",
             (mod_id, environment, user_id, status, deployment_type, error_message)
         )
-        conn.commit()
-        return cursor.lastrowid
     
     def get_recent_deployments(self, limit: int = 50) -> List[Dict]:
         """Get recent deployments"""
-        conn = self.get_connection()
-        cursor = conn.execute(
-            """SELECT d.*, m.name as mod_name, u.username 
+        return self._fetchall(
+            """SELECT d.*, m.name as mod_name, u.username
             FROM deployments d
             JOIN mods m ON d.mod_id = m.id
             JOIN users u ON d.user_id = u.id
@@ -202,13 +299,11 @@ class DatabaseManager:
             LIMIT ?""",
             (limit,)
         )
-        return [dict(row) for row in cursor.fetchall()]
     
     def get_deployments_by_environment(self, environment: str, limit: int = 50) -> List[Dict]:
         """Get deployments for specific environment"""
-        conn = self.get_connection()
-        cursor = conn.execute(
-            """SELECT d.*, m.name as mod_name, u.username 
+        return self._fetchall(
+            """SELECT d.*, m.name as mod_name, u.username
             FROM deployments d
             JOIN mods m ON d.mod_id = m.id
             JOIN users u ON d.user_id = u.id
@@ -217,55 +312,104 @@ class DatabaseManager:
             LIMIT ?""",
             (environment, limit)
         )
-        return [dict(row) for row in cursor.fetchall()]
+    
+    def query_deployments(self, limit: int = 50, before: Optional[int] = None,
+                          after: Optional[int] = None, environment: Optional[str] = None,
+                          status: Optional[str] = None, user_id: Optional[int] = None,
+                          mod_id: Optional[int] = None, start: Optional[float] = None,
+                          end: Optional[float] = None) -> Dict[str, Any]:
+        """
+        Keyset-paginated, filtered deployments (newest first).
+        
+        start/end: unix time bounds on deployed_at
+        Returns {"items", "has_more", "next_cursor", "latest_cursor"}
+        """
+        where, params = [], []
+        for column, value in (("d.environment", environment), ("d.status", status),
+                              ("d.user_id", user_id), ("d.mod_id", mod_id)):
+            if value is not None:
+                where.append(f"{column} = ?")
+                params.append(value)
+        self._time_filters("d.deployed_at", start, end, where, params)
+        return self._page(
+            """SELECT d.*, m.name as mod_name, u.username
+            FROM deployments d
+            JOIN mods m ON d.mod_id = m.id
+            JOIN users u ON d.user_id = u.id""",
+            "d.id", where, params, limit, before, after
+        )
     
     # === Activity Logging ===
     
     def log_activity(self, user_id: Optional[int], action: str,
                     details: Optional[Dict] = None, ip_address: Optional[str] = None):
-        """Log user activity"""
-        conn = self.get_connection()
-        
-        # Convert details to JSON
-        details_json = json.dumps(details) if details else None
-        
-        conn.execute(
-            "INSERT INTO activity_logs (user_id, action, details, ip_address) VALUES (?, ?, ?, ?)",
-            (user_id, action, details_json, ip_address)
-        )
-        conn.commit()
+        """Log user activity (buffered, committed in the next batch after the current transaction)"""
+        deferred = getattr(self._local, "activity", None)
+        if deferred is not None:
+            deferred.append((user_id, action, details, ip_address))
+        else:
+            self.activity.log(user_id, action, details, ip_address)
     
     def get_recent_activity(self, limit: int = 100) -> List[Dict]:
         """Get recent activity logs"""
-        conn = self.get_connection()
-        cursor = conn.execute(
-            """SELECT a.*, u.username 
+        self.activity.flush()
+        logs = self._fetchall(
+            """SELECT a.*, u.username
             FROM activity_logs a
             LEFT JOIN users u ON a.user_id = u.id
             ORDER BY a.timestamp DESC
             LIMIT ?""",
             (limit,)
         )
-        logs = []
-        for row in cursor.fetchall():
-            log = dict(row)
+        for log in logs:
             # Parse details JSON
             if log.get('details'):
                 log['details'] = json.loads(log['details'])
-            logs.append(log)
         return logs
     
+    def query_activity(self, limit: int = 100, before: Optional[int] = None,
+                       after: Optional[int] = None, user_id: Optional[int] = None,
+                       action: Optional[str] = None, start: Optional[float] = None,
+                       end: Optional[float] = None) -> Dict[str, Any]:
+        """
+        Keyset-paginated, filtered activity logs.
+        
+        before: page back through older entries (newest first)
+        after:  only entries added since a previous latest_cursor (oldest first)
+        start/end: unix time bounds on the event timestamp
+        Returns {"items", "has_more", "next_cursor", "latest_cursor"}
+        """
+        self.activity.flush()
+        
+        where, params = [], []
+        for column, value in (("a.user_id", user_id), ("a.action", action)):
+            if value is not None:
+                where.append(f"{column} = ?")
+                params.append(value)
+        self._time_filters("a.timestamp", start, end, where, params)
+        
+        page = self._page(
+            """SELECT a.*, u.username
+            FROM activity_logs a
+            LEFT JOIN users u ON a.user_id = u.id""",
+            "a.id", where, params, limit, before, after
+        )
+        for log in page["items"]:
+            # Parse details JSON
+            if log.get('details'):
+                log['details'] = json.loads(log['details'])
+        return page
+    
     def get_user_activity(self, user_id: int, limit: int = 50) -> List[Dict]:
         """Get activity for specific user"""
-        conn = self.get_connection()
-        cursor = conn.execute(
-            """SELECT * FROM activity_logs 
+        self.activity.flush()
+        return self._fetchall(
+            """SELECT * FROM activity_logs
             WHERE user_id = ?
             ORDER BY timestamp DESC
             LIMIT ?""",
             (user_id, limit)
         )
-        return [dict(row) for row in cursor.fetchall()]
     
     # === Server Status ===
     
@@ -274,45 +418,36 @@ class DatabaseManager:
                             memory_used: Optional[int] = None,
                             memory_max: Optional[int] = None,
                             uptime: Optional[int] = None):
-        """Record server status snapshot"""
-        conn = self.get_connection()
-        conn.execute(
-            """INSERT INTO server_status 
-            (environment, status, player_count, tps, memory_used, memory_max, uptime)
-            VALUES (?, ?, ?, ?, ?, ?, ?)""",
-            (environment, status, player_count, tps, memory_used, memory_max, uptime)
-        )
-        conn.commit()
+        """Record server status snapshot (raw partition + rollups)"""
+        self.metrics.record(environment, status, player_count, tps,
+                            memory_used, memory_max, uptime)
     
     def get_latest_server_status(self, environment: str) -> Optional[Dict]:
         """Get latest server status for environment"""
-        conn = self.get_connection()
-        cursor = conn.execute(
-            """SELECT * FROM server_status 
-            WHERE environment = ?
-            ORDER BY recorded_at DESC
-            LIMIT 1""",
-            (environment,)
-        )
-        row = cursor.fetchone()
-        return dict(row) if row else None
+        return self.metrics.latest(environment)
+    
+    def get_server_status_history(self, environment: str, start: float,
+                                  end: Optional[float] = None,
+                                  resolution: Optional[str] = None) -> Dict:
+        """
+        Get server status over a time range.
+        
+        resolution: "raw", "1m", "1h" or None to pick one from the range length
+        """
+        return self.metrics.query(environment, start, end, resolution)
     
     # === Mod Approvals ===
     
     def create_approval_request(self, mod_id: int, submitted_by: int) -> int:
         """Create mod approval request"""
-        conn = self.get_connection()
-        cursor = conn.execute(
+        return self._write(
             "INSERT INTO mod_approvals (mod_id, submitted_by) VALUES (?, ?)",
             (mod_id, submitted_by)
         )
-        conn.commit()
-        return cursor.lastrowid
     
     def get_pending_approvals(self) -> List[Dict]:
         """Get pending approval requests"""
-        conn = self.get_connection()
-        cursor = conn.execute(
+        return self._fetchall(
             """SELECT ma.*, m.name as mod_name, u.username as submitter
             FROM mod_approvals ma
             JOIN mods m ON ma.mod_id = m.id
@@ -320,38 +455,31 @@ class DatabaseManager:
             WHERE ma.status = 'pending'
             ORDER BY ma.submitted_at DESC"""
         )
-        return [dict(row) for row in cursor.fetchall()]
     
     def update_approval_status(self, approval_id: int, reviewed_by: int,
                               status: str, review_notes: Optional[str] = None):
         """Update approval request status"""
-        conn = self.get_connection()
-        conn.execute(
-            """UPDATE mod_approvals 
+        self._write(
+            """UPDATE mod_approvals
             SET reviewed_by = ?, status = ?, review_notes = ?, reviewed_at = ?
             WHERE id = ?""",
             (reviewed_by, status, review_notes, datetime.now(), approval_id)
         )
-        conn.commit()
     
     # === Git Commits ===
     
     def create_git_commit(self, mod_id: int, commit_hash: str,
                          commit_message: str, author_id: int) -> int:
         """Record git commit for mod"""
-        conn = self.get_connection()
-        cursor = conn.execute(
+        return self._write(
             """INSERT INTO git_commits (mod_id, commit_hash, commit_message, author_id)
             VALUES (?, ?, ?, ?)""",
             (mod_id, commit_hash, commit_message, author_id)
         )
-        conn.commit()
-        return cursor.lastrowid
     
     def get_mod_commits(self, mod_id: int) -> List[Dict]:
         """Get commit history for mod"""
-        conn = self.get_connection()
-        cursor = conn.execute(
+        return self._fetchall(
             """SELECT gc.*, u.username as author
             FROM git_commits gc
             JOIN users u ON gc.author_id = u.id
@@ -359,7 +487,6 @@ class DatabaseManager:
             ORDER BY gc.committed_at DESC""",
             (mod_id,)
         )
-        return [dict(row) for row in cursor.fetchall()]
 
 
 # Singleton instance
@@ -372,4 +499,3 @@ def get_db() -> DatabaseManager:
     if _db_instance is None:
         _db_instance = DatabaseManager()
     return _db_instance
-
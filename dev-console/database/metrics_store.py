@@ -0,0 +1,404 @@
+"""
+Server Status Metrics Store
+Time-partitioned raw samples with 1-minute and 1-hour rollups
+
+Features:
+- Raw samples go to one table per UTC day (server_status_raw_YYYYMMDD)
+- Rollups maintained on write (UPSERT into server_status_1m / server_status_1h)
+- Retention by dropping whole day partitions and trimming rollups, no table scans
+- Range queries pick the coarsest resolution that still gives enough points
+- Latest status served from memory, falling back to today's partition
+- Legacy server_status rows are migrated once into the new layout
+"""
+
+import re
+import sqlite3
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Dict, List, Optional
+
+from database.connection_pool import ConnectionPool
+
+
+_PARTITION_PREFIX = "server_status_raw_"
+_PARTITION_RE = re.compile(r"^server_status_raw_(\d{8})$")
+
+_ROLLUP_TABLES = {
+    "1m": ("server_status_1m", 60),
+    "1h": ("server_status_1h", 3600),
+}
+
+_ROLLUP_SCHEMA = """
+CREATE TABLE IF NOT EXISTS {table} (
+    environment TEXT NOT NULL,
+    bucket INTEGER NOT NULL,          -- unix time of bucket start (UTC)
+    samples INTEGER NOT NULL,
+    online_samples INTEGER NOT NULL,
+    player_sum INTEGER NOT NULL,
+    player_max INTEGER NOT NULL,
+    tps_sum REAL NOT NULL,
+    tps_samples INTEGER NOT NULL,
+    tps_min REAL,
+    memory_used_sum INTEGER NOT NULL,
+    memory_samples INTEGER NOT NULL,
+    memory_used_max INTEGER,
+    memory_max INTEGER,
+    uptime INTEGER,
+    PRIMARY KEY (environment, bucket)
+) WITHOUT ROWID
+"""
+
+_ROLLUP_UPSERT = """
+INSERT INTO {table} VALUES (?, ?, 1, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+ON CONFLICT (environment, bucket) DO UPDATE SET
+    samples = samples + 1,
+    online_samples = online_samples + excluded.online_samples,
+    player_sum = player_sum + excluded.player_sum,
+    player_max = MAX(player_max, excluded.player_max),
+    tps_sum = tps_sum + excluded.tps_sum,
+    tps_samples = tps_samples + excluded.tps_samples,
+    tps_min = MIN(COALESCE(tps_min, excluded.tps_min), COALESCE(excluded.tps_min, tps_min)),
+    memory_used_sum = memory_used_sum + excluded.memory_used_sum,
+    memory_samples = memory_samples + excluded.memory_samples,
+    memory_used_max = MAX(COALESCE(memory_used_max, excluded.memory_used_max), COALESCE(excluded.memory_used_max, memory_used_max)),
+    memory_max = COALESCE(excluded.memory_max, memory_max),
+    uptime = COALESCE(excluded.uptime, uptime)
+"""
+
+_ROLLUP_SELECT = """
+SELECT bucket, samples,
+       CAST(online_samples AS REAL) / samples AS online_ratio,
+       CAST(player_sum AS REAL) / samples AS player_avg, player_max,
+       CASE WHEN tps_samples THEN tps_sum / tps_samples END AS tps_avg, tps_min,
+       CASE WHEN memory_samples THEN memory_used_sum / memory_samples END AS memory_used_avg,
+       memory_used_max, memory_max, uptime
+FROM {table}
+WHERE environment = ? AND bucket >= ? AND bucket < ?
+ORDER BY bucket
+"""
+
+
+def _day(ts: float) -> str:
+    return time.strftime("%Y%m%d", time.gmtime(ts))
+
+
+def _format_time(ts: float) -> str:
+    """Same format as SQLite CURRENT_TIMESTAMP"""
+    return time.strftime("%Y-%m-%d %H:%M:%S", time.gmtime(ts))
+
+
+class MetricsStore:
+    """
+    Storage for server status samples
+
+    Usage:
+        store = MetricsStore(pool)
+        store.record("dev", "online", player_count=3, tps=19.8)
+        store.latest("dev")
+        store.query("dev", start=time.time() - 86400)          # auto resolution
+        store.query("dev", start, end, resolution="1h")
+    """
+
+    def __init__(
+        self,
+        pool: ConnectionPool,
+        raw_retention_days: int = 2,
+        minute_retention_days: int = 30,
+        hour_retention_days: int = 730,
+        max_points: int = 1500
+    ):
+        """
+        Initialize store
+
+        Args:
+            pool: Connection pool
+            raw_retention_days: Days of raw samples kept (whole partitions)
+            minute_retention_days: Days of 1-minute rollups kept
+            hour_retention_days: Days of 1-hour rollups kept
+            max_points: Target maximum points returned by query() with auto resolution
+        """
+        self.pool = pool
+        self.retention = {
+            "raw": raw_retention_days * 86400,
+            "1m": minute_retention_days * 86400,
+            "1h": hour_retention_days * 86400,
+        }
+        self.max_points = max_points
+
+        self._partitions = set()
+        self._latest: Dict[str, Dict] = {}
+        self._lock = threading.Lock()
+        self._last_retention = 0.0
+
+        # Statistics
+        self.stats = {
+            "samples": 0,
+            "partitions_dropped": 0,
+            "queries": 0
+        }
+
+        with self.pool.transaction() as conn:
+            for table, _ in _ROLLUP_TABLES.values():
+                conn.execute(_ROLLUP_SCHEMA.format(table=table))
+            self._partitions = {
+                row[0] for row in conn.execute(
+                    "SELECT name FROM sqlite_master WHERE type = 'table' AND name LIKE ?",
+                    (_PARTITION_PREFIX + "%",)
+                )
+                if _PARTITION_RE.match(row[0])
+            }
+
+        self._migrate_legacy()
+        self._enable_incremental_vacuum()
+        self.enforce_retention()
+
+    # ------------------------------------------------------------------
+    # Partitions
+    # ------------------------------------------------------------------
+
+    def _partition(self, conn: sqlite3.Connection, ts: float) -> str:
+        table = _PARTITION_PREFIX + _day(ts)
+        if table not in self._partitions:
+            conn.execute(f"""
+                CREATE TABLE IF NOT EXISTS {table} (
+                    ts REAL NOT NULL,
+                    environment TEXT NOT NULL,
+                    status TEXT NOT NULL,
+                    player_count INTEGER DEFAULT 0,
+                    tps REAL,
+                    memory_used INTEGER,
+                    memory_max INTEGER,
+                    uptime INTEGER
+                )""")
+            conn.execute(f"CREATE INDEX IF NOT EXISTS idx_{table}_env_ts ON {table}(environment, ts)")
+            self._partitions.add(table)
+        return table
+
+    def _partitions_between(self, start: float, end: float) -> List[str]:
+        first, last = _day(start), _day(end)
+        with self._lock:
+            partitions = list(self._partitions)
+        return sorted(
+            table for table in partitions
+            if first <= table[len(_PARTITION_PREFIX):] <= last
+        )
+
+    # ------------------------------------------------------------------
+    # Writes
+    # ------------------------------------------------------------------
+
+    def _insert(self, conn: sqlite3.Connection, ts: float, environment: str, status: str,
+                player_count: int, tps: Optional[float], memory_used: Optional[int],
+                memory_max: Optional[int], uptime: Optional[int]):
+        table = self._partition(conn, ts)
+        conn.execute(
+            f"INSERT INTO {table} VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            (ts, environment, status, player_count, tps, memory_used, memory_max, uptime)
+        )
+        player_count = player_count or 0
+        for rollup, seconds in _ROLLUP_TABLES.values():
+            conn.execute(
+                _ROLLUP_UPSERT.format(table=rollup),
+                (
+                    environment, int(ts // seconds * seconds),
+                    1 if status == "online" else 0,
+                    player_count, player_count,
+                    tps or 0.0, 0 if tps is None else 1, tps,
+                    memory_used or 0, 0 if memory_used is None else 1, memory_used,
+                    memory_max, uptime
+                )
+            )
+
+    def record(
+        self,
+        environment: str,
+        status: str,
+        player_count: int = 0,
+        tps: Optional[float] = None,
+        memory_used: Optional[int] = None,
+        memory_max: Optional[int] = None,
+        uptime: Optional[int] = None,
+        timestamp: Optional[float] = None
+    ):
+        """
+        Record one status sample (raw row + rollups, one transaction)
+
+        Args:
+            environment: dev / staging / prod
+            status: online / offline / starting / stopping
+            player_count: Players online
+            tps: Ticks per second
+            memory_used: Used memory (bytes)
+            memory_max: Max memory (bytes)
+            uptime: Server uptime (seconds)
+            timestamp: Sample time (unix, default now)
+        """
+        ts = time.time() if timestamp is None else timestamp
+        with self._lock:
+            with self.pool.transaction() as conn:
+                self._insert(conn, ts, environment, status, player_count, tps,
+                             memory_used, memory_max, uptime)
+
+            latest = self._latest.get(environment)
+            if latest is None or ts >= latest["ts"]:
+                self._latest[environment] = {
+                    "ts": ts,
+                    "environment": environment,
+                    "status": status,
+                    "player_count": player_count,
+                    "tps": tps,
+                    "memory_used": memory_used,
+                    "memory_max": memory_max,
+                    "uptime": uptime,
+                }
+            self.stats["samples"] += 1
+
+        # Retention runs at most once an hour, on the writing thread
+        if ts - self._last_retention > 3600:
+            self.enforce_retention(ts)
+
+    def _migrate_legacy(self):
+        """Move rows from the old unpartitioned server_status table (once)"""
+        with self.pool.reader() as conn:
+            exists = conn.execute(
+                "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'server_status'"
+            ).fetchone()
+            count = conn.execute("SELECT COUNT(*) FROM server_status").fetchone()[0] if exists else 0
+        if not count:
+            return
+
+        with self._lock, self.pool.transaction() as conn:
+            rows = conn.execute(
+                """SELECT CAST(strftime('%s', recorded_at) AS REAL), environment, status,
+                          player_count, tps, memory_used, memory_max, uptime
+                   FROM server_status ORDER BY recorded_at"""
+            ).fetchall()
+            for row in rows:
+                self._insert(conn, *row)
+            conn.execute("DELETE FROM server_status")
+        print(f"[OK] Migrated {len(rows)} server_status rows into partitioned metrics")
+
+    def _enable_incremental_vacuum(self):
+        """Convert databases created before auto_vacuum was set (one-time VACUUM)"""
+        with self.pool.reader() as conn:
+            mode = conn.execute("PRAGMA auto_vacuum").fetchone()[0]
+        if mode != 2:
+            self.pool.maintenance("PRAGMA auto_vacuum=INCREMENTAL", "VACUUM")
+
+    def enforce_retention(self, now: Optional[float] = None):
+        """Drop expired raw partitions and trim rollups"""
+        now = time.time() if now is None else now
+        self._last_retention = now
+
+        raw_cutoff = _day(now - self.retention["raw"])
+        with self._lock, self.pool.transaction() as conn:
+            for table in sorted(self._partitions):
+                if table[len(_PARTITION_PREFIX):] < raw_cutoff:
+                    conn.execute(f"DROP TABLE IF EXISTS {table}")
+                    self._partitions.discard(table)
+                    self.stats["partitions_dropped"] += 1
+            for resolution, (table, _) in _ROLLUP_TABLES.items():
+                conn.execute(f"DELETE FROM {table} WHERE bucket < ?", (int(now - self.retention[resolution]),))
+
+        self.pool.maintenance("PRAGMA incremental_vacuum")
+
+    # ------------------------------------------------------------------
+    # Reads
+    # ------------------------------------------------------------------
+
+    def latest(self, environment: str) -> Optional[Dict]:
+        """
+        Latest sample for an environment
+
+        Returns:
+            Dict shaped like the old server_status rows (recorded_at in UTC), or None
+        """
+        sample = self._latest.get(environment)
+        if sample is None:
+            now = time.time()
+            for table in reversed(self._partitions_between(now - self.retention["raw"], now)):
+                with self.pool.reader() as conn:
+                    row = conn.execute(
+                        f"SELECT * FROM {table} WHERE environment = ? ORDER BY ts DESC LIMIT 1",
+                        (environment,)
+                    ).fetchone()
+                if row:
+                    sample = dict(row)
+                    break
+        if sample is None:
+            return None
+
+        result = {key: value for key, value in sample.items() if key != "ts"}
+        result["recorded_at"] = _format_time(sample["ts"])
+        return result
+
+    def pick_resolution(self, start: float, end: float) -> str:
+        """Coarsest resolution that keeps at most max_points points (raw if retained and small)"""
+        span = max(end - start, 1)
+        if span <= self.max_points * 5 and start >= time.time() - self.retention["raw"]:
+            return "raw"
+        if span / 60 <= self.max_points and start >= time.time() - self.retention["1m"]:
+            return "1m"
+        return "1h"
+
+    def query(
+        self,
+        environment: str,
+        start: float,
+        end: Optional[float] = None,
+        resolution: Optional[str] = None
+    ) -> Dict:
+        """
+        Range query
+
+        Args:
+            environment: Environment name
+            start: Range start (unix time)
+            end: Range end (unix time, default now)
+            resolution: "raw", "1m", "1h" or None to choose automatically
+
+        Returns:
+            {"environment", "resolution", "start", "end", "points": [...]}
+        """
+        end = time.time() if end is None else end
+        resolution = resolution or self.pick_resolution(start, end)
+        self.stats["queries"] += 1
+
+        if resolution == "raw":
+            tables = self._partitions_between(start, end)
+            points = []
+            with self.pool.reader() as conn:
+                for table in tables:
+                    points.extend(
+                        dict(row) for row in conn.execute(
+                            f"""SELECT ts AS time, status, player_count, tps, memory_used, memory_max, uptime
+                                FROM {table} WHERE environment = ? AND ts >= ? AND ts < ? ORDER BY ts""",
+                            (environment, start, end)
+                        )
+                    )
+        elif resolution in _ROLLUP_TABLES:
+            table, seconds = _ROLLUP_TABLES[resolution]
+            with self.pool.reader() as conn:
+                points = [
+                    dict(row) for row in conn.execute(
+                        _ROLLUP_SELECT.format(table=table),
+                        (environment, int(start // seconds * seconds), end)
+                    )
+                ]
+            for point in points:
+                point["time"] = point.pop("bucket")
+        else:
+            raise ValueError(f"Unknown resolution: {resolution}")
+
+        return {
+            "environment": environment,
+            "resolution": resolution,
+            "start": datetime.fromtimestamp(start, timezone.utc).isoformat(),
+            "end": datetime.fromtimestamp(end, timezone.utc).isoformat(),
+            "points": points
+        }
+
+    def get_stats(self) -> Dict:
+        """Get store statistics"""
+        return {**self.stats, "partitions": len(self._partitions)}
@@ -115,6 +115,13 @@ CREATE INDEX IF NOT EXISTS idx_activity_logs_user ON activity_logs(user_id);
 CREATE INDEX IF NOT EXISTS idx_server_status_environment ON server_status(environment);
 CREATE INDEX IF NOT EXISTS idx_mod_approvals_status ON mod_approvals(status);
 
+-- Keyset pagination filters
+-- (id is the rowid, which SQLite appends to every index: "filter = ? AND id < ? ORDER BY id" is an index range scan)
+CREATE INDEX IF NOT EXISTS idx_activity_logs_action ON activity_logs(action);
+CREATE INDEX IF NOT EXISTS idx_activity_logs_user_action ON activity_logs(user_id, action);
+CREATE INDEX IF NOT EXISTS idx_deployments_mod ON deployments(mod_id);
+CREATE INDEX IF NOT EXISTS idx_deployments_user ON deployments(user_id);
+
 -- Create default admin user (password: admin123 - CHANGE THIS!)
 -- Password hash is bcrypt of 'admin123'
 INSERT OR IGNORE INTO users (username, password_hash, role) 
@@ -6,8 +6,10 @@ Debugging tools with variable inspection and thread analysis
 import customtkinter as ctk
 from typing import Optional, Dict
 import socket
+import threading
 
 from config import THEME, LAYOUT, RCON_HOST, RCON_PORT, RCON_PASSWORD
+from debug.lag_watchdog import get_lag_watchdog
 
 
 class Debugger(ctk.CTkScrollableFrame):
@@ -276,23 +278,22 @@ class Debugger(ctk.CTkScrollableFrame):
         self.log_variable_output("[i] Add debugging endpoints to your mod to enable this feature\n")
     
     def generate_thread_dump(self):
-        """Generate thread dump"""
+        """Generate thread dump of the server JVM (jcmd via docker exec)"""
         self.log_thread_output("\nGenerating thread dump...\n")
         self.log_thread_output("="*50 + "\n")
         
-        # This would typically use JMX or a custom mod endpoint
-        # For now, show placeholder
-        self.log_thread_output("[!] Thread dump requires JMX connection or custom mod\n")
-        self.log_thread_output("[i] To enable:\n")
-        self.log_thread_output("    1. Start server with JMX enabled\n")
-        self.log_thread_output("    2. Or add debugging endpoints to your mod\n")
-        self.log_thread_output("    3. Or use /forge tps command for basic info\n")
-        
-        # Try to get basic server info via RCON
-        try:
-            self.run_command("forge tps")
-        except:
-            pass
+        def dump():
+            try:
+                text = get_lag_watchdog().thread_dump()
+            except Exception as e:
+                text = (
+                    f"[ERROR] {e}\n"
+                    "[!] Thread dumps need jcmd in the server container (a JDK image)\n"
+                    "[i] Lag spikes are profiled automatically by the Profiler's Lag Watchdog\n"
+                )
+            self.after(0, self.log_thread_output, text)
+        
+        threading.Thread(target=dump, daemon=True).start()
     
     def log_command_output(self, text: str):
         """Log to command output"""
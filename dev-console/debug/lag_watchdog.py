@@ -0,0 +1,537 @@
+"""
+Lag Watchdog
+Captures a sampling profile automatically when the server starts to lag
+
+Features:
+- Watches tick timing from the telemetry collector: the average tick of each 0.5 s sample
+  (RCON game time deltas) and the server's own worst tick where reported (Paper mspt max, vanilla P99)
+- On a threshold breach, profiles the server for a bounded window, one capture at a time with a cooldown
+- Backends, first available wins: spark (bundled with Paper), async-profiler, JDK Flight Recorder via docker exec
+- Each lag event is stored under profiles/<event id>/ with the profile, the log excerpt around it and event.json
+- Events are indexed in SQLite (time, worst tick, GC time) for the Profiler panel
+
+Usage:
+    watchdog = get_lag_watchdog()
+    unsubscribe = watchdog.subscribe(lambda event: print(event["id"], event["status"]))
+    worst = watchdog.events(min_tick_ms=500)
+"""
+
+import json
+import re
+import shutil
+import subprocess
+import sys
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+from config import (
+    PROJECT_ROOT, LOGS_DIR, MINECRAFT_CONTAINER, LAG_EVENTS_PATH, LAG_PROFILES_DIR,
+    LAG_WATCHDOG_THRESHOLD_MS, LAG_PROFILE_WINDOW, LAG_WATCHDOG_COOLDOWN, LAG_EVENTS_KEEP
+)
+from database.connection_pool import ConnectionPool
+from server.log_archive import get_log_archive
+from server.log_tail import LogTail
+
+sys.path.insert(0, str(PROJECT_ROOT))
+from server_telemetry import get_telemetry_collector
+
+
+# Log seconds kept before the breach and after the capture
+EXCERPT_BEFORE = 30.0
+EXCERPT_AFTER = 5.0
+EXCERPT_MAX_LINES = 2000
+
+# Seconds to wait for spark to post its viewer link after stopping
+SPARK_UPLOAD_TIMEOUT = 30.0
+# Seconds allowed for one docker exec / docker cp
+EXEC_TIMEOUT = 15.0
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS lag_events (
+    id TEXT PRIMARY KEY,
+    started REAL NOT NULL,
+    ended REAL,
+    trigger_ms REAL,
+    tick_ms REAL,
+    min_tps REAL,
+    mspt REAL,
+    gc_ms REAL NOT NULL DEFAULT 0,
+    heap_used INTEGER,
+    samples INTEGER NOT NULL DEFAULT 0,
+    backend TEXT,
+    status TEXT NOT NULL,
+    profile_url TEXT,
+    profile_file TEXT,
+    excerpt_lines INTEGER NOT NULL DEFAULT 0,
+    error TEXT
+);
+
+CREATE INDEX IF NOT EXISTS idx_lag_events_started ON lag_events(started);
+CREATE INDEX IF NOT EXISTS idx_lag_events_tick ON lag_events(tick_ms);
+"""
+
+_COLUMNS = (
+    "id", "started", "ended", "trigger_ms", "tick_ms", "min_tps", "mspt", "gc_ms", "heap_used",
+    "samples", "backend", "status", "profile_url", "profile_file", "excerpt_lines", "error"
+)
+
+_FORMAT_CODES = re.compile("§.")
+_SPARK_URL = re.compile(r"https://spark\.lucko\.me/\w+")
+
+
+def _unknown(response: str) -> bool:
+    text = _FORMAT_CODES.sub("", response or "").lower()
+    return not text or "unknown" in text or "incomplete command" in text
+
+
+class LagWatchdog:
+    """
+    Turns lag spikes into stored, indexed profiles
+
+    A capture starts when one telemetry sample's average tick, or a fresh
+    server-reported worst tick, is at or above the threshold. The average
+    spreads an isolated spike over the ~10 ticks of a sample, so on servers
+    that report their worst tick that reading catches it. The profile
+    covers the next `window` seconds, so it sees a spike that keeps going
+    or comes back (the usual case for a farm, a chunk generation storm or a
+    GC death spiral), not the one tick that already passed.
+
+    Usage:
+        watchdog = LagWatchdog(threshold_ms=250, window=30)
+        watchdog.start()
+        event = watchdog.get("lag-20251014-123456")
+    """
+
+    def __init__(
+        self,
+        threshold_ms: float = LAG_WATCHDOG_THRESHOLD_MS,
+        window: float = LAG_PROFILE_WINDOW,
+        cooldown: float = LAG_WATCHDOG_COOLDOWN,
+        keep: int = LAG_EVENTS_KEEP,
+        container: Optional[str] = MINECRAFT_CONTAINER,
+        db_path: Path = LAG_EVENTS_PATH,
+        profiles_dir: Path = LAG_PROFILES_DIR
+    ):
+        """
+        Initialize watchdog
+
+        Args:
+            threshold_ms: Average tick of a sample, or server-reported worst tick, that triggers a capture
+            window: Seconds each profile runs
+            cooldown: Seconds after a capture ends before the next may start
+            keep: Lag events kept (older ones and their files are deleted)
+            container: Docker container running the server (None: local process)
+            db_path: SQLite index of lag events
+            profiles_dir: Directory with one folder per lag event
+        """
+        self.threshold_ms = threshold_ms
+        self.window = window
+        self.cooldown = cooldown
+        self.keep = keep
+        self.container = container
+        self.profiles_dir = Path(profiles_dir)
+        self.profiles_dir.mkdir(parents=True, exist_ok=True)
+
+        self.pool = ConnectionPool(db_path)
+        self.pool.executescript(_SCHEMA)
+        self.telemetry = get_telemetry_collector()
+
+        self.backend: Optional[str] = None  # detected on first capture
+        self._current: Optional[Dict] = None
+        self._last_worst_ms: Optional[float] = None  # reported worst tick repeats until re-read
+        self._last_capture_end = 0.0
+        self._subscribers: List[Callable[[Dict], None]] = []
+        self._lock = threading.Lock()
+        self._unsubscribe: Optional[Callable[[], None]] = None
+
+        # Statistics
+        self.stats = {
+            "breaches": 0,
+            "captures": 0,
+            "captures_failed": 0,
+            "skipped_busy": 0,
+            "skipped_cooldown": 0,
+            "pruned": 0
+        }
+
+        # Events left half-done by a previous run
+        self.pool.execute_write(
+            "UPDATE lag_events SET status = 'failed', error = 'Interrupted' WHERE status = 'capturing'"
+        )
+
+    # ------------------------------------------------------------------
+    # Triggering (runs on the telemetry thread)
+    # ------------------------------------------------------------------
+
+    def _on_sample(self, sample: Dict):
+        tick_ms = sample.get("tick_ms")
+        worst_ms = sample.get("mspt_max")
+
+        with self._lock:
+            # Only a new reading of the server's worst tick counts (it is re-read every few seconds)
+            fresh_worst_ms = worst_ms if worst_ms != self._last_worst_ms else None
+            self._last_worst_ms = worst_ms
+            readings = [ms for ms in (tick_ms, fresh_worst_ms) if ms is not None]
+            trigger_ms = max(readings) if readings else None
+
+            event = self._current
+            if event is not None:
+                # Fold samples taken during the capture into the event
+                if trigger_ms is not None:
+                    event["tick_ms"] = max(event["tick_ms"], trigger_ms)
+                if tick_ms is not None:
+                    event["samples"] += 1
+                if sample.get("tps") is not None:
+                    event["min_tps"] = sample["tps"] if event["min_tps"] is None else min(event["min_tps"], sample["tps"])
+                if sample.get("mspt") is not None:
+                    event["mspt"] = max(event["mspt"] or 0.0, sample["mspt"])
+                event["gc_ms"] += sample.get("gc_ms") or 0.0
+
+            if trigger_ms is None or trigger_ms < self.threshold_ms:
+                return
+            self.stats["breaches"] += 1
+            if event is not None:
+                self.stats["skipped_busy"] += 1
+                return
+            if time.time() - self._last_capture_end < self.cooldown:
+                self.stats["skipped_cooldown"] += 1
+                return
+
+            started = sample["ts"] - self.telemetry.interval
+            event = self._current = {
+                "id": datetime.fromtimestamp(started).strftime("lag-%Y%m%d-%H%M%S"),
+                "started": started,
+                "ended": None,
+                "trigger_ms": trigger_ms,
+                "tick_ms": trigger_ms,
+                "min_tps": sample.get("tps"),
+                "mspt": sample.get("mspt"),
+                "gc_ms": sample.get("gc_ms") or 0.0,
+                "heap_used": sample.get("heap_used"),
+                "samples": 1,
+                "backend": None,
+                "status": "capturing",
+                "profile_url": None,
+                "profile_file": None,
+                "excerpt_lines": 0,
+                "error": None
+            }
+
+        print(f"[!] Lag detected: {trigger_ms:.0f} ms tick, profiling for {self.window:.0f}s ({event['id']})")
+        self._save(event)
+        self._publish(event)
+        threading.Thread(target=self._capture, args=(event,), name="lag-capture", daemon=True).start()
+
+    # ------------------------------------------------------------------
+    # Capture (runs on its own thread, one at a time)
+    # ------------------------------------------------------------------
+
+    def _capture(self, event: Dict):
+        event_dir = self.profiles_dir / event["id"]
+        event_dir.mkdir(parents=True, exist_ok=True)
+
+        try:
+            backend = self.backend or self.detect_backend()
+            event["backend"] = backend
+            self._publish(dict(event))
+            if backend is None:
+                raise RuntimeError("No profiler available (install spark, async-profiler or use a JDK image)")
+            profile_url, profile_file = getattr(self, "_capture_" + backend.replace("-", "_"))(event_dir)
+            event["profile_url"] = profile_url
+            event["profile_file"] = profile_file
+            event["status"] = "ready"
+            self.stats["captures"] += 1
+        except Exception as e:
+            event["status"] = "failed"
+            event["error"] = str(e)
+            self.stats["captures_failed"] += 1
+            print(f"[ERROR] Lag profile capture failed: {e}")
+
+        with self._lock:
+            self._current = None
+            self._last_capture_end = time.time()
+            event["ended"] = self._last_capture_end
+
+        try:
+            event["excerpt_lines"] = self._write_excerpt(event, event_dir / "excerpt.log")
+        except Exception as e:
+            print(f"[!] Log excerpt for {event['id']} failed: {e}")
+
+        (event_dir / "event.json").write_text(json.dumps(event, indent=2), encoding="utf-8")
+        self._save(event)
+        self._prune()
+        self._publish(dict(event))
+        if event["status"] == "ready":
+            print(f"[OK] Lag profile saved: {event['id']} ({event['backend']}, worst tick {event['tick_ms']:.0f} ms)")
+
+    def _exec(self, args: List[str], timeout: float = EXEC_TIMEOUT) -> str:
+        """Run a command inside the server container (or locally without one)"""
+        command = ["docker", "exec", self.container, *args] if self.container else args
+        result = subprocess.run(command, capture_output=True, text=True, timeout=timeout)
+        if result.returncode != 0:
+            raise RuntimeError((result.stderr or result.stdout).strip() or f"{args[0]} exited {result.returncode}")
+        return result.stdout
+
+    def _copy_out(self, path: str, target: Path):
+        """Move a file out of the server container"""
+        if self.container:
+            subprocess.run(
+                ["docker", "cp", f"{self.container}:{path}", str(target)],
+                check=True, capture_output=True, timeout=EXEC_TIMEOUT * 4
+            )
+            self._exec(["rm", "-f", path])
+        else:
+            shutil.move(path, target)
+
+    def _java_pid(self) -> str:
+        """Server JVM pid as seen inside the container"""
+        for line in self._exec(["jcmd"]).splitlines():
+            pid, _, main = line.strip().partition(" ")
+            if pid.isdigit() and "jcmd" not in main.lower():
+                return pid
+        raise RuntimeError("No Java process found")
+
+    def detect_backend(self) -> Optional[str]:
+        """Find the best available profiler (remembered for later captures)"""
+        try:
+            if not _unknown(self.telemetry.rcon.command_sync("spark", timeout=5)):
+                self.backend = "spark"
+                return self.backend
+        except Exception:
+            pass
+        for backend, probe in (("async-profiler", ["asprof", "--version"]), ("jfr", ["jcmd", "-h"])):
+            try:
+                self._exec(probe)
+                self.backend = backend
+                return self.backend
+            except Exception:
+                continue
+        return None
+
+    def _capture_spark(self, event_dir: Path) -> Tuple[Optional[str], Optional[str]]:
+        rcon = self.telemetry.rcon
+        log = LogTail(LOGS_DIR / "latest.log")
+        response = _FORMAT_CODES.sub("", rcon.command_sync(
+            f"spark profiler start --only-ticks-over {int(self.threshold_ms)}", timeout=10
+        ))
+        if "already" in response.lower():
+            raise RuntimeError("A spark profiler is already running on the server")
+
+        time.sleep(self.window)
+        cursor = log.tail(0)["cursor"] if log.exists() else None
+        response = _FORMAT_CODES.sub("", rcon.command_sync("spark profiler stop", timeout=10))
+
+        # spark uploads in the background and posts the viewer link to the console
+        url = _SPARK_URL.search(response)
+        deadline = time.monotonic() + SPARK_UPLOAD_TIMEOUT
+        while url is None and cursor is not None and time.monotonic() < deadline:
+            time.sleep(1.0)
+            result = log.read_since(cursor)
+            cursor = result["cursor"]
+            url = _SPARK_URL.search("".join(result["lines"]))
+        if url is None:
+            raise RuntimeError("spark did not report a viewer link (upload blocked?)")
+
+        (event_dir / "profile.url").write_text(url.group(0) + "\n", encoding="utf-8")
+        return url.group(0), None
+
+    def _capture_async_profiler(self, event_dir: Path) -> Tuple[Optional[str], Optional[str]]:
+        remote = f"/tmp/{event_dir.name}.html"
+        self._exec(
+            ["asprof", "-d", str(int(self.window)), "-e", "itimer", "-f", remote, self._java_pid()],
+            timeout=self.window + EXEC_TIMEOUT
+        )
+        self._copy_out(remote, event_dir / "flamegraph.html")
+        return None, "flamegraph.html"
+
+    def _capture_jfr(self, event_dir: Path) -> Tuple[Optional[str], Optional[str]]:
+        remote = f"/tmp/{event_dir.name}.jfr"
+        pid = self._java_pid()
+        self._exec([
+            "jcmd", pid, "JFR.start", f"name={event_dir.name}", "settings=profile",
+            f"duration={int(self.window)}s", f"filename={remote}"
+        ])
+        # The recording is written when its duration elapses
+        time.sleep(self.window + 2)
+        self._copy_out(remote, event_dir / "recording.jfr")
+        return None, "recording.jfr"
+
+    def _write_excerpt(self, event: Dict, path: Path) -> int:
+        """Server log lines around the event"""
+        start = event["started"] - EXCERPT_BEFORE
+        end = event["ended"] + EXCERPT_AFTER
+        lines: List[str] = []
+        try:
+            archive = get_log_archive()
+            archive.ingest()
+            rows = archive.search(start=start, end=end, limit=EXCERPT_MAX_LINES)["items"]
+            lines = [
+                f"[{datetime.fromtimestamp(row['ts']).strftime('%H:%M:%S')}] "
+                f"[{row['thread'] or '?'}/{row['level'] or 'INFO'}]: {row['message']}"
+                for row in reversed(rows)
+            ]
+        except Exception as e:
+            print(f"[!] Log archive unavailable, using latest.log tail: {e}")
+        if not lines:
+            # Archive unavailable or latest.log not indexed yet: its tail covers a recent event
+            tail = LogTail(LOGS_DIR / "latest.log")
+            if tail.exists():
+                lines = [line.rstrip("\r\n") for line in tail.tail(EXCERPT_MAX_LINES // 4)["lines"]]
+
+        path.write_text("\n".join(lines) + "\n" if lines else "", encoding="utf-8")
+        return len(lines)
+
+    # ------------------------------------------------------------------
+    # Index
+    # ------------------------------------------------------------------
+
+    def _save(self, event: Dict):
+        placeholders = ", ".join("?" * len(_COLUMNS))
+        self.pool.execute_write(
+            f"INSERT OR REPLACE INTO lag_events ({', '.join(_COLUMNS)}) VALUES ({placeholders})",
+            tuple(event.get(column) for column in _COLUMNS)
+        )
+
+    def _prune(self):
+        with self.pool.transaction() as conn:
+            old = [row[0] for row in conn.execute(
+                "SELECT id FROM lag_events ORDER BY started DESC LIMIT -1 OFFSET ?", (self.keep,)
+            ).fetchall()]
+            conn.executemany("DELETE FROM lag_events WHERE id = ?", [(event_id,) for event_id in old])
+        for event_id in old:
+            shutil.rmtree(self.profiles_dir / event_id, ignore_errors=True)
+        self.stats["pruned"] += len(old)
+
+    def _publish(self, event: Dict):
+        with self._lock:
+            subscribers = list(self._subscribers)
+        for callback in subscribers:
+            try:
+                callback(event)
+            except Exception as e:
+                print(f"[ERROR] Lag watchdog subscriber failed: {e}")
+
+    # ------------------------------------------------------------------
+    # Public API
+    # ------------------------------------------------------------------
+
+    def start(self):
+        """Start watching tick timing (idempotent; starts the telemetry collector too)"""
+        with self._lock:
+            if self._unsubscribe is None:
+                self._unsubscribe = self.telemetry.subscribe(self._on_sample)
+        self.telemetry.start()
+
+    def stop(self):
+        """Stop triggering captures (a capture in progress still finishes)"""
+        with self._lock:
+            unsubscribe, self._unsubscribe = self._unsubscribe, None
+        if unsubscribe:
+            unsubscribe()
+
+    @property
+    def running(self) -> bool:
+        return self._unsubscribe is not None
+
+    def subscribe(self, callback: Callable[[Dict], None]) -> Callable[[], None]:
+        """
+        Receive lag events when a capture starts and when it finishes (runs on watchdog threads)
+
+        Returns:
+            Function that unsubscribes
+        """
+        with self._lock:
+            self._subscribers.append(callback)
+
+        def unsubscribe():
+            with self._lock:
+                if callback in self._subscribers:
+                    self._subscribers.remove(callback)
+
+        return unsubscribe
+
+    def events(
+        self,
+        limit: int = 50,
+        since: Optional[float] = None,
+        min_tick_ms: Optional[float] = None
+    ) -> List[Dict]:
+        """
+        Stored lag events, newest first
+
+        Args:
+            limit: Maximum events
+            since: Only events that started after this time
+            min_tick_ms: Only events whose worst tick was at least this long
+        """
+        where, params = [], []
+        if since is not None:
+            where.append("started >= ?")
+            params.append(since)
+        if min_tick_ms is not None:
+            where.append("tick_ms >= ?")
+            params.append(min_tick_ms)
+        sql = "SELECT * FROM lag_events"
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        sql += " ORDER BY started DESC LIMIT ?"
+        params.append(limit)
+
+        with self.pool.reader() as conn:
+            return [dict(row) for row in conn.execute(sql, params).fetchall()]
+
+    def get(self, event_id: str) -> Optional[Dict]:
+        """One lag event"""
+        with self.pool.reader() as conn:
+            row = conn.execute("SELECT * FROM lag_events WHERE id = ?", (event_id,)).fetchone()
+        return dict(row) if row else None
+
+    def event_dir(self, event_id: str) -> Path:
+        """Folder with the event's profile, excerpt.log and event.json"""
+        return self.profiles_dir / event_id
+
+    def thread_dump(self) -> str:
+        """Stack traces of every server thread (jcmd Thread.print)"""
+        return self._exec(["jcmd", self._java_pid(), "Thread.print"], timeout=EXEC_TIMEOUT * 2)
+
+    def profile_target(self, event: Dict) -> Optional[str]:
+        """What to open for an event's flame graph: viewer URL or local file"""
+        if event.get("profile_url"):
+            return event["profile_url"]
+        if event.get("profile_file"):
+            return str(self.event_dir(event["id"]) / event["profile_file"])
+        return None
+
+    def excerpt(self, event_id: str) -> str:
+        """Log excerpt stored with an event"""
+        path = self.event_dir(event_id) / "excerpt.log"
+        return path.read_text(encoding="utf-8", errors="replace") if path.exists() else ""
+
+    def get_stats(self) -> Dict:
+        """Get watchdog statistics"""
+        with self.pool.reader() as conn:
+            events = conn.execute("SELECT COUNT(*) FROM lag_events").fetchone()[0]
+        return {
+            **self.stats,
+            "events": events,
+            "backend": self.backend,
+            "running": self.running,
+            "capturing": self._current is not None
+        }
+
+
+# Global instance
+_watchdog: Optional[LagWatchdog] = None
+_watchdog_lock = threading.Lock()
+
+
+def get_lag_watchdog() -> LagWatchdog:
+    """Get the process-wide lag watchdog (not started; call start())"""
+    global _watchdog
+    with _watchdog_lock:
+        if _watchdog is None:
+            _watchdog = LagWatchdog()
+        return _watchdog
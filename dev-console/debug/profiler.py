@@ -4,11 +4,20 @@ Performance profiling and analysis
 """
 
 import customtkinter as ctk
-from typing import Dict, List
+from typing import Dict, List, Optional
+import sys
 import time
 import threading
+import webbrowser
+from datetime import datetime
+from pathlib import Path
 
-from config import THEME, LAYOUT
+from config import THEME, LAYOUT, PROJECT_ROOT, MINECRAFT_CONTAINER
+from debug.lag_watchdog import get_lag_watchdog
+
+sys.path.insert(0, str(PROJECT_ROOT))
+from system_metrics import get_system_sampler
+from server_telemetry import get_telemetry_collector
 
 
 class Profiler(ctk.CTkScrollableFrame):
@@ -26,6 +35,9 @@ class Profiler(ctk.CTkScrollableFrame):
         
         self.is_profiling = False
         self.profile_data = []
+        self.sampler = get_system_sampler()
+        self.telemetry = get_telemetry_collector()
+        self.watchdog = get_lag_watchdog()
         
         # Header
         header = ctk.CTkLabel(
@@ -43,6 +55,9 @@ class Profiler(ctk.CTkScrollableFrame):
         # Profiling controls
         self.create_controls_section()
         
+        # Automatic captures on lag spikes
+        self.create_watchdog_section()
+        
         # Results view
         self.create_results_section()
         
@@ -68,22 +83,27 @@ class Profiler(ctk.CTkScrollableFrame):
         
         # Metric cards
         self.tps_card = self.create_metric_card(
-            metrics_frame, "TPS", "20.0", THEME["success"]
+            metrics_frame, "TPS", "--", THEME["success"]
         )
         self.tps_card.pack(side="left", fill="both", expand=True, padx=5)
         
+        self.mspt_card = self.create_metric_card(
+            metrics_frame, "MSPT", "--", THEME["success"]
+        )
+        self.mspt_card.pack(side="left", fill="both", expand=True, padx=5)
+        
         self.memory_card = self.create_metric_card(
-            metrics_frame, "Memory", "2.5 GB", THEME["info"]
+            metrics_frame, "Memory", "--", THEME["info"]
         )
         self.memory_card.pack(side="left", fill="both", expand=True, padx=5)
         
         self.cpu_card = self.create_metric_card(
-            metrics_frame, "CPU", "45%", THEME["warning"]
+            metrics_frame, "CPU", "--", THEME["warning"]
         )
         self.cpu_card.pack(side="left", fill="both", expand=True, padx=5)
         
         self.entities_card = self.create_metric_card(
-            metrics_frame, "Entities", "1,234", THEME["accent"]
+            metrics_frame, "Entities", "--", THEME["accent"]
         )
         self.entities_card.pack(side="left", fill="both", expand=True, padx=5)
     
@@ -184,6 +204,175 @@ class Profiler(ctk.CTkScrollableFrame):
         )
         self.profile_button.pack(side="left")
     
+    def create_watchdog_section(self):
+        """Create lag watchdog section (automatic profiles of lag spikes)"""
+        watchdog_label = ctk.CTkLabel(
+            self,
+            text="Lag Watchdog",
+            font=THEME["font_subheader"],
+            text_color=THEME["text_primary"],
+            anchor="w"
+        )
+        watchdog_label.pack(fill="x", padx=LAYOUT["card_padding"], pady=(20, 10))
+        
+        watchdog_card = ctk.CTkFrame(
+            self,
+            fg_color=THEME["card_bg"],
+            corner_radius=LAYOUT["border_radius"]
+        )
+        watchdog_card.pack(fill="x", padx=LAYOUT["card_padding"], pady=10)
+        
+        header_frame = ctk.CTkFrame(watchdog_card, fg_color="transparent")
+        header_frame.pack(fill="x", padx=20, pady=(20, 10))
+        
+        self.watchdog_switch = ctk.CTkSwitch(
+            header_frame,
+            text="Profile lag spikes automatically",
+            font=THEME["font_body"],
+            text_color=THEME["text_primary"],
+            progress_color=THEME["accent"],
+            command=self.toggle_watchdog
+        )
+        self.watchdog_switch.pack(side="left")
+        
+        self.watchdog_status = ctk.CTkLabel(
+            header_frame,
+            text="",
+            font=THEME["font_small"],
+            text_color=THEME["text_secondary"],
+            anchor="e"
+        )
+        self.watchdog_status.pack(side="right")
+        
+        # One row per stored lag event, newest first
+        self.lag_events_frame = ctk.CTkFrame(watchdog_card, fg_color="transparent")
+        self.lag_events_frame.pack(fill="x", padx=20, pady=(0, 20))
+        
+        self.watchdog.start()
+        self.watchdog_switch.select()
+        self.refresh_lag_events()
+    
+    def toggle_watchdog(self):
+        """Enable or disable automatic captures"""
+        if self.watchdog_switch.get():
+            self.watchdog.start()
+        else:
+            self.watchdog.stop()
+        self.refresh_lag_events()
+    
+    def refresh_lag_events(self, limit: int = 10):
+        """Rebuild the lag event list from the watchdog index"""
+        stats = self.watchdog.get_stats()
+        state = "capturing..." if stats["capturing"] else ("watching" if stats["running"] else "off")
+        self.watchdog_status.configure(
+            text=f"{state} · trigger ≥ {self.watchdog.threshold_ms:.0f} ms · "
+                 f"{self.watchdog.window:.0f}s {stats['backend'] or 'auto'} profile · {stats['events']} events"
+        )
+        
+        for child in self.lag_events_frame.winfo_children():
+            child.destroy()
+        
+        events = self.watchdog.events(limit=limit)
+        if not events:
+            ctk.CTkLabel(
+                self.lag_events_frame,
+                text="No lag events recorded",
+                font=THEME["font_small"],
+                text_color=THEME["text_secondary"],
+                anchor="w"
+            ).pack(fill="x")
+            return
+        
+        for event in events:
+            self.create_lag_event_row(event)
+    
+    def create_lag_event_row(self, event: Dict):
+        """Create one lag event row with flame graph and log buttons"""
+        row = ctk.CTkFrame(self.lag_events_frame, fg_color=THEME["bg_primary"], corner_radius=6)
+        row.pack(fill="x", pady=3)
+        
+        colors = {"ready": THEME["warning"], "failed": THEME["error"]}
+        details = f"worst tick {event['tick_ms']:.0f} ms · GC {event['gc_ms']:.0f} ms"
+        if event["min_tps"] is not None:
+            details += f" · min TPS {event['min_tps']:.1f}"
+        details += f" · {event['backend'] or '?'}"
+        if event["status"] != "ready":
+            details += f" · {event['status']}"
+        
+        ctk.CTkLabel(
+            row,
+            text=datetime.fromtimestamp(event["started"]).strftime("%Y-%m-%d %H:%M:%S"),
+            font=THEME["font_code"],
+            text_color=colors.get(event["status"], THEME["text_primary"]),
+            width=160,
+            anchor="w"
+        ).pack(side="left", padx=(10, 5), pady=6)
+        
+        ctk.CTkLabel(
+            row,
+            text=details,
+            font=THEME["font_small"],
+            text_color=THEME["text_secondary"],
+            anchor="w"
+        ).pack(side="left", fill="x", expand=True, padx=5)
+        
+        ctk.CTkButton(
+            row,
+            text="📜 Log",
+            width=70,
+            fg_color=THEME["card_hover"],
+            hover_color=THEME["accent"],
+            command=lambda: self.show_lag_event(event)
+        ).pack(side="right", padx=(5, 10), pady=6)
+        
+        if self.watchdog.profile_target(event):
+            ctk.CTkButton(
+                row,
+                text="🔥 Flame Graph",
+                width=120,
+                fg_color=THEME["accent"],
+                command=lambda: self.open_lag_profile(event)
+            ).pack(side="right", padx=5, pady=6)
+    
+    def open_lag_profile(self, event: Dict):
+        """Open an event's spark viewer link or stored profile"""
+        target = self.watchdog.profile_target(event)
+        if target.startswith("https://"):
+            webbrowser.open(target)
+        else:
+            # HTML flame graphs open in the browser, .jfr in JDK Mission Control if associated
+            webbrowser.open(Path(target).as_uri())
+    
+    def show_lag_event(self, event: Dict):
+        """Show a lag event and its log excerpt in the results view"""
+        lines = [
+            f"Lag Event {event['id']}",
+            "=" * 50,
+            f"Started:      {datetime.fromtimestamp(event['started']).strftime('%Y-%m-%d %H:%M:%S')}",
+            f"Trigger tick: {event['trigger_ms']:.0f} ms",
+            f"Worst tick:   {event['tick_ms']:.0f} ms",
+            f"GC time:      {event['gc_ms']:.0f} ms",
+        ]
+        if event["min_tps"] is not None:
+            lines.append(f"Min TPS:      {event['min_tps']:.1f}")
+        if event["heap_used"]:
+            lines.append(f"Heap used:    {event['heap_used'] / (1024 ** 3):.2f} GB")
+        lines.append(f"Profiler:     {event['backend'] or 'none'} ({event['status']})")
+        if event["error"]:
+            lines.append(f"Error:        {event['error']}")
+        target = self.watchdog.profile_target(event)
+        if target:
+            lines.append(f"Flame graph:  {target}")
+        lines.append(f"Files:        {self.watchdog.event_dir(event['id'])}")
+        
+        excerpt = self.watchdog.excerpt(event["id"])
+        lines += ["", f"Server Log ({event['excerpt_lines']} lines)", "-" * 50, excerpt or "(no log excerpt)"]
+        
+        self.results_text.configure(state="normal")
+        self.results_text.delete("1.0", "end")
+        self.results_text.insert("1.0", "\n".join(lines) + "\n")
+        self.results_text.configure(state="disabled")
+    
     def create_results_section(self):
         """Create profiling results section"""
         results_label = ctk.CTkLabel(
@@ -216,14 +405,14 @@ class Profiler(ctk.CTkScrollableFrame):
             "==================\n\n"
             "Start profiling to see detailed performance analysis.\n\n"
             "Metrics tracked:\n"
-            "  • TPS (Ticks Per Second)\n"
-            "  • Memory usage\n"
+            "  • TPS and tick times (p50/p95/p99), sampled every 0.5s\n"
+            "  • Lag spikes and the GC time inside them\n"
+            "  • JVM heap and container memory\n"
             "  • CPU usage\n"
-            "  • Entity count\n"
-            "  • Chunk loading times\n"
-            "  • Plugin/Mod performance\n\n"
-            "Note: This is a simplified profiler.\n"
-            "For advanced profiling, use:\n"
+            "  • Entity and loaded chunk counts\n\n"
+            "Plugin/mod breakdowns need a sampling profiler: the Lag Watchdog\n"
+            "captures one (spark, async-profiler or JFR) for every lag spike.\n"
+            "For manual profiling, use:\n"
             "  • Spark (https://spark.lucko.me/)\n"
             "  • VisualVM with JMX\n"
             "  • JProfiler or YourKit\n"
@@ -232,50 +421,86 @@ class Profiler(ctk.CTkScrollableFrame):
     
     def start_monitoring(self):
         """Start real-time monitoring"""
-        thread = threading.Thread(target=self._monitoring_thread, daemon=True)
-        thread.start()
+        unsubscribe_system = self.sampler.subscribe(lambda delta: self.after(0, self.update_metrics))
+        unsubscribe_telemetry = self.telemetry.subscribe(lambda sample: self.after(0, self.update_metrics))
+        unsubscribe_watchdog = self.watchdog.subscribe(lambda event: self.after(0, self.refresh_lag_events))
+        
+        def unsubscribe():
+            unsubscribe_system()
+            unsubscribe_telemetry()
+            unsubscribe_watchdog()
+        
+        self._unsubscribe = unsubscribe
     
-    def _monitoring_thread(self):
-        """Monitoring thread"""
-        while True:
-            # Simulate metrics (in real implementation, would query server)
-            self.update_metrics()
-            time.sleep(2)
+    def current_sample(self) -> Optional[Dict]:
+        """
+        Latest CPU/memory reading for the server
+        
+        Uses the Minecraft container's cgroup stats when it runs in Docker,
+        otherwise the whole host.
+        """
+        sample = self.sampler.latest()
+        if sample is None:
+            return None
+        
+        container = (sample.get("containers") or {}).get(MINECRAFT_CONTAINER)
+        if container and "cpu_percent" in container:
+            return {
+                "cpu": container["cpu_percent"] / (sample["cpu_count"] or 1),
+                "memory": container["memory_bytes"] / 1024 ** 3
+            }
+        return {
+            "cpu": sample["cpu_percent"],
+            "memory": sample["memory_used"] / 1024 ** 3
+        }
     
     def update_metrics(self):
-        """Update metric displays"""
-        # In real implementation, would query server via RCON or JMX
-        # For now, show placeholder values
-        
-        # TPS - simulate fluctuation
-        import random
-        tps = 19.5 + random.random()
-        tps_color = THEME["success"] if tps >= 19.0 else THEME["warning"] if tps >= 15.0 else THEME["error"]
-        
-        self.after(0, lambda: self.tps_card.value_label.configure(
-            text=f"{tps:.1f}",
-            text_color=tps_color
-        ))
+        """Update metric displays (main thread)"""
+        self.update_server_metrics()
         
-        # Memory
-        memory = 2.5 + random.random() * 0.5
-        self.after(0, lambda: self.memory_card.value_label.configure(
-            text=f"{memory:.1f} GB"
-        ))
+        current = self.current_sample()
+        if current is None:
+            return
+        
+        # Memory (JVM heap when the server's perf counters are readable)
+        latest = self.telemetry.latest() or {}
+        if latest.get("heap_used") is not None:
+            self.memory_card.value_label.configure(text=f"{latest['heap_used'] / 1024 ** 3:.1f} GB")
+            self.memory_card.metric_label.configure(text=f"Heap of {latest['heap_max'] / 1024 ** 3:.1f} GB")
+        else:
+            self.memory_card.value_label.configure(text=f"{current['memory']:.1f} GB")
         
         # CPU
-        cpu = 40 + random.randint(0, 30)
+        cpu = current["cpu"]
         cpu_color = THEME["success"] if cpu < 60 else THEME["warning"] if cpu < 80 else THEME["error"]
-        self.after(0, lambda: self.cpu_card.value_label.configure(
-            text=f"{cpu}%",
+        self.cpu_card.value_label.configure(
+            text=f"{cpu:.0f}%",
             text_color=cpu_color
-        ))
+        )
+    
+    def update_server_metrics(self):
+        """Update TPS, MSPT and entity cards from server telemetry"""
+        latest = self.telemetry.latest()
+        if latest is None or latest.get("tps") is None:
+            return
         
-        # Entities
-        entities = 1200 + random.randint(-50, 50)
-        self.after(0, lambda: self.entities_card.value_label.configure(
-            text=f"{entities:,}"
-        ))
+        # Single samples count whole ticks in 0.5s; average the last 5s for display
+        recent = self.telemetry.percentiles(5)
+        tps = recent["tps"]["avg"]
+        tps_color = THEME["success"] if tps >= 19 else THEME["warning"] if tps >= 15 else THEME["error"]
+        self.tps_card.value_label.configure(text=f"{min(tps, 20.0):.1f}", text_color=tps_color)
+        
+        minute = self.telemetry.percentiles(60)
+        p95 = minute["tick_ms"]["p95"]
+        mspt = latest["mspt"] if latest.get("mspt") is not None else minute["tick_ms"]["p50"]
+        mspt_color = THEME["success"] if mspt < 40 else THEME["warning"] if mspt < 50 else THEME["error"]
+        self.mspt_card.value_label.configure(text=f"{mspt:.1f} ms", text_color=mspt_color)
+        self.mspt_card.metric_label.configure(text=f"MSPT • p95 tick {p95:.0f} ms")
+        
+        if latest.get("entities") is not None:
+            self.entities_card.value_label.configure(text=f"{int(latest['entities']):,}")
+            if latest.get("chunks") is not None:
+                self.entities_card.metric_label.configure(text=f"Entities • {int(latest['chunks']):,} chunks")
     
     def toggle_profiling(self):
         """Toggle profiling on/off"""
@@ -321,33 +546,43 @@ class Profiler(ctk.CTkScrollableFrame):
         )
     
     def _profiling_thread(self, duration: int):
-        """Profiling thread"""
+        """Profiling thread (collectors keep sampling; this marks the window and reports on it)"""
         start_time = time.time()
-        samples = []
         
         self.log_results(f"Profiling for {duration} seconds...\n")
         
+        # Vanilla tick profiling brackets the run (also writes a report to the server's debug folder)
+        try:
+            self.telemetry.debug_start()
+            debug_running = True
+        except Exception:
+            debug_running = False
+        
         while self.is_profiling and (time.time() - start_time) < duration:
-            # Collect sample
-            sample = {
-                "timestamp": time.time(),
-                "tps": 19.5 + (time.time() % 1),
-                "memory": 2.5 + (time.time() % 0.5),
-                "cpu": 45 + int(time.time() % 20)
-            }
-            samples.append(sample)
-            
             elapsed = int(time.time() - start_time)
             self.log_results(f"\rCollecting data... {elapsed}/{duration}s", overwrite_last=True)
-            
             time.sleep(1)
         
+        debug = None
+        if debug_running:
+            try:
+                debug = self.telemetry.debug_stop()
+            except Exception:
+                pass
+        
         if not self.is_profiling:
             self.log_results("\n\nProfiling stopped by user.\n")
             return
         
         # Analyze results
-        self.analyze_profile(samples)
+        self.analyze_profile({
+            "duration": time.time() - start_time,
+            "server": self.telemetry.history(since=start_time),
+            "percentiles": self.telemetry.percentiles(time.time() - start_time),
+            "spikes": self.telemetry.spikes(since=start_time),
+            "system": self.system_samples(start_time),
+            "debug": debug
+        })
         
         self.is_profiling = False
         self.after(0, lambda: self.profile_button.configure(
@@ -355,41 +590,96 @@ class Profiler(ctk.CTkScrollableFrame):
             fg_color=THEME["success"]
         ))
     
-    def analyze_profile(self, samples: List[Dict]):
+    def system_samples(self, since: float) -> List[Dict]:
+        """CPU/memory samples for the server since a timestamp"""
+        samples = []
+        for sample in self.sampler.history(since=since):
+            container = (sample.get("containers") or {}).get(MINECRAFT_CONTAINER)
+            if container and "cpu_percent" in container:
+                samples.append({
+                    "cpu": container["cpu_percent"] / (sample["cpu_count"] or 1),
+                    "memory": container["memory_bytes"] / 1024 ** 3
+                })
+            else:
+                samples.append({"cpu": sample["cpu_percent"], "memory": sample["memory_used"] / 1024 ** 3})
+        return samples
+    
+    def analyze_profile(self, report: Dict):
         """Analyze profiling data"""
-        if not samples:
+        server = [s for s in report["server"] if s.get("tps") is not None]
+        system = report["system"]
+        if not server and not system:
+            self.log_results("\n\nNo data collected (is the server running with RCON enabled?)\n")
             return
         
         self.log_results("\n\n" + "="*50 + "\n")
         self.log_results("PROFILING RESULTS\n")
         self.log_results("="*50 + "\n\n")
         
-        # Calculate statistics
-        avg_tps = sum(s["tps"] for s in samples) / len(samples)
-        min_tps = min(s["tps"] for s in samples)
-        max_tps = max(s["tps"] for s in samples)
-        
-        avg_memory = sum(s["memory"] for s in samples) / len(samples)
-        max_memory = max(s["memory"] for s in samples)
-        
-        avg_cpu = sum(s["cpu"] for s in samples) / len(samples)
-        max_cpu = max(s["cpu"] for s in samples)
-        
-        self.log_results(f"Samples collected: {len(samples)}\n\n")
-        
-        self.log_results("TPS (Ticks Per Second):\n")
-        self.log_results(f"  Average: {avg_tps:.2f}\n")
-        self.log_results(f"  Min: {min_tps:.2f}\n")
-        self.log_results(f"  Max: {max_tps:.2f}\n")
-        self.log_results(f"  Status: {'✓ Excellent' if avg_tps >= 19.5 else '⚠ Needs attention'}\n\n")
-        
-        self.log_results("Memory Usage:\n")
-        self.log_results(f"  Average: {avg_memory:.2f} GB\n")
-        self.log_results(f"  Peak: {max_memory:.2f} GB\n\n")
-        
-        self.log_results("CPU Usage:\n")
-        self.log_results(f"  Average: {avg_cpu:.1f}%\n")
-        self.log_results(f"  Peak: {max_cpu}%\n\n")
+        self.log_results(f"Duration: {report['duration']:.0f}s, server samples: {len(server)}\n\n")
+        
+        percentiles = report["percentiles"]
+        spikes = report["spikes"]
+        overloaded = gc_bound = heap_pressure = False
+        
+        if server:
+            tps = percentiles["tps"]
+            ticks = percentiles["tick_ms"]
+            self.log_results("Tick Rate:\n")
+            self.log_results(f"  TPS average: {min(tps['avg'], 20.0):.2f} (lowest sample {tps['min']:.1f})\n")
+            if report["debug"]:
+                self.log_results(f"  TPS over run (debug profiler): {report['debug']['tps']:.2f}\n")
+            self.log_results(
+                f"  Tick time p50/p95/p99: {ticks['p50']:.1f} / {ticks['p95']:.1f} / {ticks['p99']:.1f} ms "
+                f"(max {ticks['max']:.0f} ms)\n"
+            )
+            mspt = percentiles["mspt"]
+            if mspt["samples"]:
+                self.log_results(
+                    f"  Server MSPT p50/p95/p99: {mspt['p50']:.1f} / {mspt['p95']:.1f} / {mspt['p99']:.1f} ms\n"
+                )
+                overloaded = mspt["p95"] > 45
+            else:
+                overloaded = ticks["p95"] > 55
+            self.log_results("\n")
+            
+            gc_total = sum(s.get("gc_ms") or 0.0 for s in server)
+            heap = [s for s in server if s.get("heap_used") is not None]
+            if heap:
+                peak = max(s["heap_used"] for s in heap)
+                heap_max = heap[-1]["heap_max"]
+                self.log_results("JVM:\n")
+                self.log_results(f"  Heap peak: {peak / 1024 ** 3:.2f} GB of {heap_max / 1024 ** 3:.2f} GB\n")
+                self.log_results(f"  GC time: {gc_total:.0f} ms ({gc_total / 10 / report['duration']:.1f}% of run)\n\n")
+                heap_pressure = heap_max and peak / heap_max > 0.9
+            
+            entities = [s["entities"] for s in server if s.get("entities") is not None]
+            chunks = [s["chunks"] for s in server if s.get("chunks") is not None]
+            if entities or chunks:
+                self.log_results("World:\n")
+                if entities:
+                    self.log_results(f"  Entities: {int(entities[-1]):,} (peak {int(max(entities)):,})\n")
+                if chunks:
+                    self.log_results(f"  Loaded chunks: {int(chunks[-1]):,} (peak {int(max(chunks)):,})\n")
+                self.log_results("\n")
+            
+            self.log_results(f"Lag Spikes: {len(spikes)}\n")
+            for spike in spikes[-10:]:
+                when = time.strftime("%H:%M:%S", time.localtime(spike["started"]))
+                gc_note = f", {spike['gc_ms']:.0f} ms GC" if spike["gc_ms"] else ""
+                self.log_results(f"  {when}  worst tick {spike['tick_ms']:.0f} ms{gc_note}\n")
+            spike_ms = sum(((s["ended"] or time.time()) - s["started"]) * 1000 for s in spikes)
+            gc_bound = bool(spikes) and sum(s["gc_ms"] for s in spikes) > 0.5 * spike_ms
+            self.log_results("\n")
+        
+        if system:
+            avg_cpu = sum(s["cpu"] for s in system) / len(system)
+            max_cpu = max(s["cpu"] for s in system)
+            self.log_results("CPU Usage:\n")
+            self.log_results(f"  Average: {avg_cpu:.1f}%\n")
+            self.log_results(f"  Peak: {max_cpu:.1f}%\n\n")
+        else:
+            avg_cpu = 0.0
         
         self.log_results("="*50 + "\n\n")
         
@@ -397,28 +687,34 @@ class Profiler(ctk.CTkScrollableFrame):
         self.log_results("RECOMMENDATIONS:\n")
         self.log_results("-"*50 + "\n")
         
-        if avg_tps < 19.0:
-            self.log_results("⚠ TPS is below optimal\n")
-            self.log_results("  • Check for lag-causing plugins/mods\n")
-            self.log_results("  • Optimize entity counts\n")
-            self.log_results("  • Consider chunk loading optimizations\n\n")
-        
-        if max_memory > 3.5:
-            self.log_results("⚠ High memory usage detected\n")
-            self.log_results("  • Increase server RAM allocation\n")
-            self.log_results("  • Check for memory leaks\n")
-            self.log_results("  • Reduce view distance if needed\n\n")
+        if overloaded:
+            self.log_results("⚠ Server can't keep up with 20 TPS\n")
+            self.log_results("  • Lower simulation-distance / view-distance\n")
+            self.log_results("  • Limit entities and redstone clocks\n")
+            self.log_results("  • Profile with Spark to find the expensive ticks\n\n")
+        
+        if gc_bound:
+            self.log_results("⚠ Lag spikes are mostly garbage collection\n")
+            self.log_results("  • Use G1 with Aikar's flags, or ZGC on Java 21\n")
+            self.log_results("  • Set -Xms equal to -Xmx\n\n")
+        elif spikes:
+            self.log_results("⚠ Lag spikes without GC: chunk generation, saves or plugin work\n")
+            self.log_results("  • Pre-generate the world (Chunky)\n")
+            self.log_results("  • Check the spike times against the server log\n\n")
+        
+        if heap_pressure:
+            self.log_results("⚠ Heap close to its maximum\n")
+            self.log_results("  • Increase -Xmx or check for memory leaks\n\n")
         
         if avg_cpu > 70:
             self.log_results("⚠ High CPU usage\n")
             self.log_results("  • Profile specific mods for CPU usage\n")
-            self.log_results("  • Optimize redstone contraptions\n")
             self.log_results("  • Consider upgrading server CPU\n\n")
         
-        if avg_tps >= 19.5 and max_memory < 3.0 and avg_cpu < 60:
+        if not (overloaded or spikes or heap_pressure or avg_cpu > 70):
             self.log_results("✓ Server performance is excellent!\n\n")
         
-        self.log_results("\nNote: For detailed profiling, use Spark or VisualVM\n")
+        self.log_results("\nNote: For per-plugin/mod breakdowns, use Spark or VisualVM\n")
     
     def log_results(self, text: str, overwrite_last: bool = False):
         """Log to results text"""
@@ -432,4 +728,8 @@ class Profiler(ctk.CTkScrollableFrame):
             self.results_text.configure(state="disabled")
         
         self.after(0, update)
-
+    
+    def destroy(self):
+        """Stop receiving metrics when the panel closes"""
+        self._unsubscribe()
+        super().destroy()
@@ -4,11 +4,11 @@ Manage Dev, Staging, and Production environments
 """
 
 import customtkinter as ctk
-from typing import Dict
-import socket
+from typing import Dict, List
 
 from config import THEME, LAYOUT, ENVIRONMENTS
 from database.db_manager import DatabaseManager
+from environments.fleet_health import get_fleet_health
 
 
 class EnvironmentManager(ctk.CTkScrollableFrame):
@@ -25,6 +25,9 @@ class EnvironmentManager(ctk.CTkScrollableFrame):
         )
         
         self.db = db
+        self.fleet_health = get_fleet_health()
+        self.status_labels: Dict[str, ctk.CTkLabel] = {}
+        self.registry_labels: Dict[str, ctk.CTkLabel] = {}
         
         # Header
         header = ctk.CTkLabel(
@@ -36,11 +39,29 @@ class EnvironmentManager(ctk.CTkScrollableFrame):
         )
         header.pack(fill="x", padx=LAYOUT["card_padding"], pady=(20, 10))
         
+        self.fleet_summary = ctk.CTkLabel(
+            self,
+            text="Checking fleet...",
+            font=THEME["font_small"],
+            text_color=THEME["text_secondary"],
+            anchor="w"
+        )
+        self.fleet_summary.pack(fill="x", padx=LAYOUT["card_padding"])
+        
         # Environment cards
         self.create_environment_cards()
         
+        # Registered servers (server_registry)
+        self.create_registry_section()
+        
         # Environment comparison
         self.create_comparison_section()
+        
+        # Fleet status: last known state now, pushed updates after every check round
+        self._apply_health(self.fleet_health.snapshot())
+        self._unsubscribe = self.fleet_health.subscribe(
+            lambda targets: self.after(0, self._apply_health, targets)
+        )
     
     def create_environment_cards(self):
         """Create cards for each environment"""
@@ -79,18 +100,15 @@ class EnvironmentManager(ctk.CTkScrollableFrame):
         )
         name_label.pack(side="left")
         
-        # Status badge
-        is_online = self.check_environment_online(env_config)
-        status_text = "● ONLINE" if is_online else "● OFFLINE"
-        status_color = THEME["success"] if is_online else THEME["error"]
-        
+        # Status badge (filled in by fleet health updates)
         status_label = ctk.CTkLabel(
             header_frame,
-            text=status_text,
+            text="● CHECKING",
             font=THEME["font_small"],
-            text_color=status_color
+            text_color=THEME["text_secondary"]
         )
         status_label.pack(side="right")
+        self.status_labels[env_key] = status_label
         
         # Details frame
         details_frame = ctk.CTkFrame(card, fg_color="transparent")
@@ -145,14 +163,14 @@ class EnvironmentManager(ctk.CTkScrollableFrame):
     
     def create_comparison_section(self):
         """Create environment comparison section"""
-        comp_label = ctk.CTkLabel(
+        self.comparison_label = ctk.CTkLabel(
             self,
             text="Environment Comparison",
             font=THEME["font_subheader"],
             text_color=THEME["text_primary"],
             anchor="w"
         )
-        comp_label.pack(fill="x", padx=LAYOUT["card_padding"], pady=(20, 10))
+        self.comparison_label.pack(fill="x", padx=LAYOUT["card_padding"], pady=(20, 10))
         
         comp_card = ctk.CTkFrame(
             self,
@@ -216,21 +234,86 @@ class EnvironmentManager(ctk.CTkScrollableFrame):
                     width=120
                 ).pack(side="left", padx=10, pady=8)
     
+    def create_registry_section(self):
+        """Create registered servers section (rows added as servers are discovered)"""
+        self.registry_title = ctk.CTkLabel(
+            self,
+            text="Registered Servers",
+            font=THEME["font_subheader"],
+            text_color=THEME["text_primary"],
+            anchor="w"
+        )
+        
+        self.registry_card = ctk.CTkFrame(
+            self,
+            fg_color=THEME["card_bg"],
+            corner_radius=LAYOUT["border_radius"]
+        )
+    
+    def _apply_health(self, targets: List[Dict]):
+        """Show fleet health snapshots (runs on the Tk thread)"""
+        for target in targets:
+            if target["kind"] == "environment":
+                label = self.status_labels.get(target["key"].split(":", 1)[1])
+            else:
+                label = self.registry_labels.get(target["key"]) or self._add_registry_row(target)
+            if label is not None:
+                text, color = self._format_health(target)
+                label.configure(text=text, text_color=color)
+        
+        online = sum(1 for t in targets if t["online"])
+        checked = sum(1 for t in targets if t["checked"])
+        if checked:
+            stats = self.fleet_health.get_stats()
+            self.fleet_summary.configure(
+                text=f"Fleet: {online}/{len(targets)} online • checked in {stats['last_round_ms']:.0f} ms"
+            )
+    
+    def _add_registry_row(self, target: Dict) -> ctk.CTkLabel:
+        """Add a row for a newly discovered registered server"""
+        if not self.registry_labels:
+            # Above the comparison section
+            self.registry_title.pack(fill="x", padx=LAYOUT["card_padding"], pady=(20, 10), before=self.comparison_label)
+            self.registry_card.pack(fill="x", padx=LAYOUT["card_padding"], pady=10, before=self.comparison_label)
+        
+        row = ctk.CTkFrame(self.registry_card, fg_color=THEME["bg_primary"])
+        row.pack(fill="x", padx=20, pady=2)
+        
+        ctk.CTkLabel(
+            row,
+            text=f"{target['name']}  {target['host']}:{target['port']}",
+            font=THEME["font_body"],
+            anchor="w"
+        ).pack(side="left", padx=10, pady=8)
+        
+        label = ctk.CTkLabel(row, text="", font=THEME["font_small"])
+        label.pack(side="right", padx=10, pady=8)
+        self.registry_labels[target["key"]] = label
+        return label
+    
+    def _format_health(self, target: Dict):
+        """Status badge text and color for a fleet health snapshot"""
+        if not target["checked"]:
+            return "● CHECKING", THEME["text_secondary"]
+        if not target["online"]:
+            return f"● OFFLINE • {target['availability']:.0f}% up", THEME["error"]
+        
+        text = f"● ONLINE • {target['players_online']}/{target['players_max']} • {target['latency_ms']:.0f} ms"
+        text += f" • {target['availability']:.0f}% up"
+        return text, THEME["success"]
+    
     def check_environment_online(self, env_config: Dict) -> bool:
-        """Check if environment server is online"""
-        if env_config["server_ip"] == "localhost":
-            # Check local server
-            try:
-                sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-                sock.settimeout(1)
-                result = sock.connect_ex(('localhost', env_config["server_port"]))
-                sock.close()
-                return result == 0
-            except:
-                return False
-        else:
-            # For remote servers, would need to implement actual check
-            return False
+        """Last known state of an environment server (never blocks)"""
+        for env_key, config in ENVIRONMENTS.items():
+            if config is env_config:
+                target = self.fleet_health.get(f"env:{env_key}")
+                return bool(target and target["online"])
+        return False
+    
+    def destroy(self):
+        """Stop receiving fleet health updates when the view closes"""
+        self._unsubscribe()
+        super().destroy()
     
     def get_next_env(self, current_env: str) -> str:
         """Get next environment in promotion chain"""
@@ -0,0 +1,373 @@
+"""
+Fleet Health Checker
+Concurrent status checks of every environment and registered server
+
+Features:
+- Dev, staging and production from ENVIRONMENTS plus server_registry entries (PostgreSQL, optional)
+- One round probes the whole fleet concurrently: round time is the slowest target, not the sum
+- Bounded parallelism and a timeout per target
+- Rolling availability and latency (p50/p95) over the last N checks per target
+- Subscribers receive every target after each round, with up/down changes flagged
+- Runs on its own thread for the life of the console, so history survives view switches
+
+Usage:
+    health = get_fleet_health()
+    unsubscribe = health.subscribe(lambda targets: print([t for t in targets if t["changed"]]))
+    snapshot = health.snapshot()
+"""
+
+import asyncio
+import os
+import sys
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional
+
+from config import PROJECT_ROOT, ENVIRONMENTS, HEALTH_CHECK_INTERVAL, HEALTH_CHECK_CONCURRENCY, HEALTH_CHECK_WINDOW
+
+sys.path.insert(0, str(PROJECT_ROOT))
+from server_status import ServerStatus, get_status_prober
+
+try:
+    import asyncpg
+    ASYNCPG_AVAILABLE = True
+except ImportError:
+    asyncpg = None
+    ASYNCPG_AVAILABLE = False
+
+
+# Per-target timeouts when the target does not set its own
+LOCAL_TIMEOUT = 1.0
+REMOTE_TIMEOUT = 3.0
+
+# Seconds between server_registry reloads
+REGISTRY_INTERVAL = 60.0
+
+
+@dataclass
+class HealthTarget:
+    """One server to check"""
+    key: str
+    name: str
+    host: str
+    port: int
+    kind: str = "environment"  # environment | registry
+    timeout: float = REMOTE_TIMEOUT
+
+
+class TargetHealth:
+    """Rolling check history of one target"""
+
+    def __init__(self, target: HealthTarget, window: int):
+        self.target = target
+        self.results = deque(maxlen=window)  # (online, latency_ms)
+        self.last: Optional[ServerStatus] = None
+        self.changed_at = 0.0
+        self.changed = False
+        self.consecutive_failures = 0
+
+    def record(self, status: ServerStatus) -> bool:
+        """Add a result; returns True if the target went up/down (or was never checked)"""
+        changed = self.last is None or self.last.online != status.online
+        self.changed = changed
+        self.last = status
+        self.results.append((status.online, status.latency_ms))
+        self.consecutive_failures = 0 if status.online else self.consecutive_failures + 1
+        if changed:
+            self.changed_at = time.time()
+        return changed
+
+    def snapshot(self) -> Dict:
+        latencies = sorted(latency for online, latency in self.results if online and latency is not None)
+        status = self.last
+        return {
+            "key": self.target.key,
+            "name": self.target.name,
+            "host": self.target.host,
+            "port": self.target.port,
+            "kind": self.target.kind,
+            "checked": status is not None,
+            "online": bool(status and status.online),
+            "players_online": status.players_online if status else 0,
+            "players_max": status.players_max if status else 0,
+            "version": status.version if status else "",
+            "latency_ms": round(status.latency_ms, 1) if status and status.latency_ms is not None else None,
+            "error": status.error if status else None,
+            "availability": round(sum(1 for online, _ in self.results if online) / len(self.results) * 100, 1)
+                            if self.results else None,
+            "latency_p50_ms": round(latencies[len(latencies) // 2], 1) if latencies else None,
+            "latency_p95_ms": round(latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))], 1)
+                              if latencies else None,
+            "checks": len(self.results),
+            "changed": self.changed,
+            "consecutive_failures": self.consecutive_failures,
+            "changed_at": self.changed_at
+        }
+
+
+def environment_targets() -> List[HealthTarget]:
+    """Targets for the configured dev / staging / production servers"""
+    return [
+        HealthTarget(
+            key=f"env:{env_key}",
+            name=env["name"],
+            host=env["server_ip"],
+            port=env["server_port"],
+            timeout=env.get("health_timeout",
+                            LOCAL_TIMEOUT if env["server_ip"] in ("localhost", "127.0.0.1") else REMOTE_TIMEOUT)
+        )
+        for env_key, env in ENVIRONMENTS.items()
+    ]
+
+
+async def load_registry_targets() -> List[HealthTarget]:
+    """Targets from the server_registry table (requires asyncpg)"""
+    connection = await asyncpg.connect(
+        host=os.getenv("POSTGRES_HOST", "localhost"),
+        port=int(os.getenv("POSTGRES_PORT", "5432")),
+        database=os.getenv("POSTGRES_DB", "galion_mc"),
+        user=os.getenv("POSTGRES_USER", "mcserver"),
+        password=os.getenv("POSTGRES_PASSWORD", ""),
+        timeout=REMOTE_TIMEOUT
+    )
+    try:
+        rows = await connection.fetch(
+            "SELECT server_name, server_type, host, port FROM server_registry ORDER BY server_name"
+        )
+    finally:
+        await connection.close()
+
+    return [
+        HealthTarget(
+            key=f"registry:{row['server_name']}",
+            name=f"{row['server_name']} ({row['server_type']})",
+            host=row["host"],
+            port=row["port"],
+            kind="registry"
+        )
+        for row in rows
+    ]
+
+
+class FleetHealth:
+    """
+    Health-check engine for the whole server fleet
+
+    Usage:
+        health = FleetHealth(interval=10)
+        health.start()
+        targets = health.check_now()
+    """
+
+    def __init__(
+        self,
+        interval: float = HEALTH_CHECK_INTERVAL,
+        concurrency: int = HEALTH_CHECK_CONCURRENCY,
+        window: int = HEALTH_CHECK_WINDOW,
+        use_registry: bool = True
+    ):
+        """
+        Initialize fleet health checker
+
+        Args:
+            interval: Seconds between check rounds
+            concurrency: Maximum probes in flight
+            window: Checks kept per target for availability / latency
+            use_registry: Also check server_registry entries
+        """
+        self.interval = interval
+        self.concurrency = concurrency
+        self.window = window
+        self.use_registry = use_registry
+
+        self._targets: Dict[str, TargetHealth] = {}
+        self._subscribers: List[Callable[[List[Dict]], None]] = []
+        self._lock = threading.Lock()
+        self._registry_loaded_at = 0.0
+        self._registry_warned = False
+        self._round_future = None
+        self.set_targets(environment_targets())
+
+        # Private loop thread (probes themselves run on the shared status prober)
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._run_loop, name="fleet-health", daemon=True)
+        self._thread.start()
+        self._semaphore: Optional[asyncio.Semaphore] = None
+
+        # Statistics
+        self.stats = {
+            "rounds": 0,
+            "checks": 0,
+            "changes": 0,
+            "last_round_ms": 0.0,
+            "registry_targets": 0
+        }
+
+    def _run_loop(self):
+        asyncio.set_event_loop(self._loop)
+        self._loop.run_forever()
+
+    def set_targets(self, targets: List[HealthTarget], kind: Optional[str] = None):
+        """
+        Replace the target list (history of kept targets is preserved)
+
+        Args:
+            targets: New targets
+            kind: Only replace targets of this kind (None: replace all)
+        """
+        with self._lock:
+            kept = {
+                key: health for key, health in self._targets.items()
+                if kind is not None and health.target.kind != kind
+            }
+            for target in targets:
+                health = self._targets.get(target.key)
+                if health is None:
+                    health = TargetHealth(target, self.window)
+                else:
+                    health.target = target
+                kept[target.key] = health
+            self._targets = kept
+
+    # ------------------------------------------------------------------
+    # Checking (runs on the fleet loop)
+    # ------------------------------------------------------------------
+
+    async def _refresh_registry(self):
+        if not (self.use_registry and ASYNCPG_AVAILABLE) or time.time() - self._registry_loaded_at < REGISTRY_INTERVAL:
+            return
+        self._registry_loaded_at = time.time()
+        try:
+            targets = await load_registry_targets()
+        except Exception as e:
+            if not self._registry_warned:
+                print(f"[!] server_registry unavailable, checking environments only: {e}")
+                self._registry_warned = True
+            return
+        self.set_targets(targets, kind="registry")
+        self.stats["registry_targets"] = len(targets)
+
+    async def _check(self, health: TargetHealth) -> ServerStatus:
+        target = health.target
+        async with self._semaphore:
+            try:
+                # max_age=0: every round is a fresh measurement for the rolling stats
+                return await asyncio.wait_for(
+                    get_status_prober().status(target.host, target.port, max_age=0, timeout=target.timeout),
+                    target.timeout + 0.5
+                )
+            except asyncio.TimeoutError:
+                return ServerStatus(host=target.host, port=target.port, checked_at=time.time(), error="Timed out")
+            except Exception as e:
+                # One broken target must not cost the whole round its results
+                return ServerStatus(host=target.host, port=target.port, checked_at=time.time(), error=str(e) or type(e).__name__)
+
+    async def _round(self) -> List[Dict]:
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.concurrency)
+        await self._refresh_registry()
+
+        with self._lock:
+            targets = list(self._targets.values())
+
+        started = time.perf_counter()
+        results = await asyncio.gather(*(self._check(health) for health in targets))
+
+        with self._lock:
+            changes = sum(1 for health, status in zip(targets, results) if health.record(status))
+            snapshot = [health.snapshot() for health in targets]
+            subscribers = list(self._subscribers)
+
+        self.stats["rounds"] += 1
+        self.stats["checks"] += len(targets)
+        self.stats["changes"] += changes
+        self.stats["last_round_ms"] = round((time.perf_counter() - started) * 1000, 1)
+
+        for callback in subscribers:
+            try:
+                callback(snapshot)
+            except Exception as e:
+                print(f"[!] Fleet health subscriber failed: {e}")
+        return snapshot
+
+    async def _run(self):
+        while True:
+            try:
+                await self._round()
+            except Exception as e:
+                print(f"[ERROR] Fleet health round failed: {e}")
+            await asyncio.sleep(self.interval)
+
+    # ------------------------------------------------------------------
+    # Public API (thread-safe)
+    # ------------------------------------------------------------------
+
+    def start(self):
+        """Start periodic check rounds"""
+        if self._round_future is None:
+            self._round_future = asyncio.run_coroutine_threadsafe(self._run(), self._loop)
+
+    def stop(self):
+        """Stop periodic check rounds"""
+        if self._round_future is not None:
+            self._round_future.cancel()
+            self._round_future = None
+
+    def check_now(self, timeout: Optional[float] = None) -> List[Dict]:
+        """Run one round immediately and return every target (blocks; not for the Tk main thread)"""
+        future = asyncio.run_coroutine_threadsafe(self._round(), self._loop)
+        return future.result(timeout or REMOTE_TIMEOUT * 3)
+
+    def subscribe(self, callback: Callable[[List[Dict]], None]) -> Callable[[], None]:
+        """
+        Receive every target's snapshot after each round (runs on the fleet thread)
+
+        Snapshots of targets that went up or down have `changed` set.
+
+        Returns:
+            Function that unsubscribes
+        """
+        with self._lock:
+            self._subscribers.append(callback)
+
+        def unsubscribe():
+            with self._lock:
+                if callback in self._subscribers:
+                    self._subscribers.remove(callback)
+
+        return unsubscribe
+
+    def snapshot(self) -> List[Dict]:
+        """Current state of every target"""
+        with self._lock:
+            return [health.snapshot() for health in self._targets.values()]
+
+    def get(self, key: str) -> Optional[Dict]:
+        """Current state of one target (e.g. "env:dev")"""
+        with self._lock:
+            health = self._targets.get(key)
+            return health.snapshot() if health else None
+
+    def get_stats(self) -> Dict:
+        """Get checker statistics"""
+        with self._lock:
+            targets = len(self._targets)
+            online = sum(1 for h in self._targets.values() if h.last and h.last.online)
+        return {**self.stats, "targets": targets, "online": online}
+
+
+# Global instance
+_fleet_health: Optional[FleetHealth] = None
+_fleet_health_lock = threading.Lock()
+
+
+def get_fleet_health() -> FleetHealth:
+    """Get the process-wide fleet health checker (started on first use)"""
+    global _fleet_health
+    with _fleet_health_lock:
+        if _fleet_health is None:
+            _fleet_health = FleetHealth()
+            _fleet_health.start()
+        return _fleet_health
@@ -3,6 +3,7 @@ Hot Reloader System
 File watcher with automatic plugin reloading via RCON
 """
 
+import sys
 import time
 from pathlib import Path
 from typing import Optional, Callable
@@ -10,7 +11,10 @@ import threading
 from watchdog.observers import Observer
 from watchdog.events import FileSystemEventHandler, FileSystemEvent
 
-from config import SERVER_MODS_DIR, RCON_HOST, RCON_PORT, RCON_PASSWORD, HOT_RELOAD_WATCH_DELAY, HOT_RELOAD_DEBOUNCE
+from config import PROJECT_ROOT, SERVER_MODS_DIR, RCON_HOST, RCON_PORT, RCON_PASSWORD, HOT_RELOAD_WATCH_DELAY, HOT_RELOAD_DEBOUNCE
+
+sys.path.insert(0, str(PROJECT_ROOT))
+from rcon_pool import get_rcon_pool
 
 
 class ModFileHandler(FileSystemEventHandler):
@@ -203,18 +207,10 @@ class HotReloader:
         Returns True if successful, False otherwise.
         """
         try:
-            # Try to import mcrcon
-            try:
-                from mcrcon import MCRcon
-            except ImportError:
-                print("[Hot Reload] mcrcon not installed. Install with: pip install mcrcon")
-                return False
-            
-            # Connect and send command
-            with MCRcon(RCON_HOST, RCON_PASSWORD, port=RCON_PORT) as mcr:
-                response = mcr.command(command)
-                print(f"[RCON] {command} -> {response}")
-                return True
+            # Shared pooled connection - reloads in a burst don't reconnect each time
+            response = get_rcon_pool(RCON_HOST, RCON_PORT, RCON_PASSWORD).command_sync(command)
+            print(f"[RCON] {command} -> {response}")
+            return True
         
         except Exception as e:
             print(f"[RCON] Error: {e}")
@@ -223,12 +219,9 @@ class HotReloader:
     def test_rcon_connection(self) -> bool:
         """Test RCON connection"""
         try:
-            from mcrcon import MCRcon
-            
-            with MCRcon(RCON_HOST, RCON_PASSWORD, port=RCON_PORT) as mcr:
-                response = mcr.command("list")
-                print(f"[RCON] Connection successful. Server response: {response}")
-                return True
+            response = get_rcon_pool(RCON_HOST, RCON_PORT, RCON_PASSWORD).command_sync("list")
+            print(f"[RCON] Connection successful. Server response: {response}")
+            return True
         
         except Exception as e:
             print(f"[RCON] Connection failed: {e}")
@@ -14,7 +14,7 @@ import json
 from typing import Optional, Dict
 import threading
 
-from config import THEME, LAYOUT, SERVER_MODS_DIR, MAX_MOD_FILE_SIZE, ALLOWED_MOD_EXTENSIONS
+from config import THEME, LAYOUT, SERVER_MODS_DIR, MAX_MOD_FILE_SIZE, ALLOWED_MOD_EXTENSIONS, MOD_UPLOAD_VIA_API
 from database.db_manager import DatabaseManager
 
 
@@ -224,6 +224,10 @@ class ModUploader(ctk.CTkScrollableFrame):
     
     def _upload_thread(self):
         """Upload thread (runs in background)"""
+        if MOD_UPLOAD_VIA_API:
+            self._upload_via_api()
+            return
+        
         try:
             self.update_status("Calculating checksum...", 0.1)
             
@@ -243,42 +247,71 @@ class ModUploader(ctk.CTkScrollableFrame):
             
             self.update_status("Saving to database...", 0.7)
             
-            # Save to database
-            mod_id = self.db.create_mod(
-                name=metadata.get("name", self.selected_file.stem),
-                version=metadata.get("version", "1.0.0"),
-                file_name=self.selected_file.name,
-                file_path=str(dest_path),
-                file_size=self.selected_file.stat().st_size,
-                checksum=checksum,
-                mc_version=metadata.get("mc_version"),
-                author_id=self.current_user["id"],
-                environment=self.environment,
-                description=metadata.get("description"),
-                dependencies=metadata.get("dependencies", [])
-            )
+            # Save to database (mod, activity and deployment in one commit)
+            with self.db.transaction():
+                mod_id = self.db.create_mod(
+                    name=metadata.get("name", self.selected_file.stem),
+                    version=metadata.get("version", "1.0.0"),
+                    file_name=self.selected_file.name,
+                    file_path=str(dest_path),
+                    file_size=self.selected_file.stat().st_size,
+                    checksum=checksum,
+                    mc_version=metadata.get("mc_version"),
+                    author_id=self.current_user["id"],
+                    environment=self.environment,
+                    description=metadata.get("description"),
+                    dependencies=metadata.get("dependencies", [])
+                )
+                
+                # Log activity
+                self.db.log_activity(
+                    self.current_user["id"],
+                    "upload_mod",
+                    {
+                        "mod_id": mod_id,
+                        "mod_name": metadata.get("name", self.selected_file.stem),
+                        "environment": self.environment
+                    }
+                )
+                
+                # Create deployment record
+                self.db.create_deployment(
+                    mod_id=mod_id,
+                    environment=self.environment,
+                    user_id=self.current_user["id"],
+                    status="success",
+                    deployment_type="upload"
+                )
             
-            # Log activity
-            self.db.log_activity(
-                self.current_user["id"],
-                "upload_mod",
-                {
-                    "mod_id": mod_id,
-                    "mod_name": metadata.get("name", self.selected_file.stem),
-                    "environment": self.environment
-                }
-            )
+            self.update_status("Upload complete!", 1.0)
+            
+            # Reset UI after success
+            self.after(2000, self.reset_upload_ui)
+            self.after(2100, self.load_mods)
             
-            # Create deployment record
-            self.db.create_deployment(
-                mod_id=mod_id,
+        except Exception as e:
+            self.update_status(f"Error: {str(e)}", 0)
+            self.show_error(str(e))
+    
+    def _upload_via_api(self):
+        """Upload through the dev API in resumable chunks (remote servers, large files)"""
+        from mods.resumable_client import ResumableUploadClient
+        
+        def progress(sent: int, total: int):
+            fraction = sent / total if total else 1.0
+            self.update_status(f"Uploading... {sent // (1024 * 1024)}/{total // (1024 * 1024)} MB", 0.1 + 0.85 * fraction)
+        
+        try:
+            self.update_status("Calculating checksum...", 0.05)
+            result = ResumableUploadClient().upload(
+                self.selected_file,
+                kind="mod",
                 environment=self.environment,
                 user_id=self.current_user["id"],
-                status="success",
-                deployment_type="upload"
+                progress=progress
             )
             
-            self.update_status("Upload complete!", 1.0)
+            self.update_status(f"Upload complete! ({result['checksum'][:12]})", 1.0)
             
             # Reset UI after success
             self.after(2000, self.reset_upload_ui)
@@ -450,18 +483,17 @@ class ModUploader(ctk.CTkScrollableFrame):
         except:
             pass
         
-        # Delete from database
-        self.db.delete_mod(mod_id)
-        
-        # Log activity
-        self.db.log_activity(
-            self.current_user["id"],
-            "delete_mod",
-            {
-                "mod_id": mod_id,
-                "mod_name": mod['name']
-            }
-        )
+        # Delete from database and log activity (one commit)
+        with self.db.transaction():
+            self.db.delete_mod(mod_id)
+            self.db.log_activity(
+                self.current_user["id"],
+                "delete_mod",
+                {
+                    "mod_id": mod_id,
+                    "mod_name": mod['name']
+                }
+            )
         
         # Reload mods list
         self.load_mods()
@@ -0,0 +1,171 @@
+"""
+Resumable Upload Client
+Sends large mods and packages to the dev API in verified chunks
+
+Features:
+- Chunked PATCH uploads with a per-chunk SHA256 header
+- Resumes after dropped connections by asking the server for its offset
+- Restarting the same upload continues the unfinished session
+- Exponential backoff between retries
+- Progress callback for UIs
+"""
+
+import hashlib
+import time
+from pathlib import Path
+from typing import Callable, Dict, Optional
+
+import requests
+
+from config import API_BASE_URL
+
+
+class ResumableUploadError(Exception):
+    """Upload failed after all retries or was rejected by the server"""
+
+    def __init__(self, message: str, status_code: Optional[int] = None):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+# Worth retrying: busy session, chunks corrupted in transit, server errors
+_RETRY_STATUS = {409, 460, 500, 502, 503, 504}
+
+
+class ResumableUploadClient:
+    """
+    Client for /api/dev/uploads
+
+    Usage:
+        client = ResumableUploadClient()
+        result = client.upload(Path("mymod-1.2.jar"), kind="mod", environment="dev",
+                               progress=lambda sent, total: print(sent, total))
+    """
+
+    def __init__(
+        self,
+        base_url: str = API_BASE_URL,
+        chunk_size: Optional[int] = None,
+        retries: int = 5,
+        timeout: float = 60.0
+    ):
+        """
+        Initialize client
+
+        Args:
+            base_url: Dev API base URL
+            chunk_size: Bytes per PATCH (None = server suggestion)
+            retries: Consecutive failures tolerated per chunk
+            timeout: Per-request timeout in seconds
+        """
+        self.base_url = base_url.rstrip("/")
+        self.chunk_size = chunk_size
+        self.retries = retries
+        self.timeout = timeout
+        self.session = requests.Session()
+
+    @staticmethod
+    def file_checksum(file_path: Path) -> str:
+        """SHA256 of a file"""
+        sha256 = hashlib.sha256()
+        with open(file_path, 'rb') as f:
+            for block in iter(lambda: f.read(1024 * 1024), b''):
+                sha256.update(block)
+        return sha256.hexdigest()
+
+    def _check(self, response: requests.Response) -> Dict:
+        if response.status_code >= 400:
+            try:
+                detail = response.json().get("detail", response.text)
+            except ValueError:
+                detail = response.text
+            raise ResumableUploadError(f"{response.status_code}: {detail}", response.status_code)
+        return response.json()
+
+    def _server_offset(self, upload_id: str) -> int:
+        response = self.session.get(f"{self.base_url}/api/dev/uploads/{upload_id}", timeout=self.timeout)
+        return self._check(response)["offset"]
+
+    def upload(
+        self,
+        file_path: Path,
+        kind: str = "mod",
+        environment: str = "dev",
+        user_id: int = 1,
+        progress: Optional[Callable[[int, int], None]] = None
+    ) -> Dict:
+        """
+        Upload a file, resuming as needed
+
+        Args:
+            file_path: Local file
+            kind: "mod" or "package"
+            environment: Target environment
+            user_id: Uploading user
+            progress: Called with (bytes_confirmed, total) after each chunk
+
+        Returns:
+            Finalize response from the server
+        """
+        file_path = Path(file_path)
+        size = file_path.stat().st_size
+
+        session = self._check(self.session.post(
+            f"{self.base_url}/api/dev/uploads",
+            json={
+                "filename": file_path.name,
+                "size": size,
+                "checksum": self.file_checksum(file_path),
+                "kind": kind,
+                "environment": environment,
+                "user_id": user_id
+            },
+            timeout=self.timeout
+        ))
+        upload_id = session["upload_id"]
+        offset = session["offset"]
+        chunk_size = self.chunk_size or session["chunk_size"]
+        url = f"{self.base_url}/api/dev/uploads/{upload_id}"
+
+        if progress:
+            progress(offset, size)
+
+        failures = 0
+        with open(file_path, 'rb') as f:
+            while offset < size:
+                f.seek(offset)
+                chunk = f.read(chunk_size)
+                try:
+                    response = self.session.patch(
+                        url,
+                        data=chunk,
+                        headers={
+                            "Content-Type": "application/offset+octet-stream",
+                            "Upload-Offset": str(offset),
+                            "Upload-Checksum": f"sha256 {hashlib.sha256(chunk).hexdigest()}"
+                        },
+                        timeout=self.timeout
+                    )
+                    if response.status_code == 409 and "Upload-Offset" in response.headers:
+                        # Server is somewhere else (earlier attempt did land) - continue from there
+                        offset = int(response.headers["Upload-Offset"])
+                        continue
+                    offset = self._check(response)["offset"]
+                    failures = 0
+                except (requests.RequestException, ResumableUploadError) as e:
+                    if isinstance(e, ResumableUploadError) and e.status_code not in _RETRY_STATUS:
+                        raise
+                    failures += 1
+                    if failures > self.retries:
+                        raise ResumableUploadError(f"Upload of {file_path.name} failed: {e}") from e
+                    time.sleep(min(2 ** failures, 30))
+                    try:
+                        offset = self._server_offset(upload_id)
+                    except (requests.RequestException, ResumableUploadError):
+                        pass
+                    continue
+
+                if progress:
+                    progress(offset, size)
+
+        return self._check(self.session.post(f"{url}/finalize", timeout=self.timeout))
@@ -12,6 +12,9 @@ import threading
 from config import THEME, LAYOUT
 from database.db_manager import DatabaseManager
 
+# Mod versions listed at once
+REPOSITORY_PAGE_SIZE = 500
+
 
 class RepositoryManager(ctk.CTkScrollableFrame):
     """
@@ -27,6 +30,7 @@ class RepositoryManager(ctk.CTkScrollableFrame):
         )
         
         self.db = db
+        self.current_filter: Optional[str] = None
         
         # Header
         header = ctk.CTkLabel(
@@ -190,8 +194,11 @@ class RepositoryManager(ctk.CTkScrollableFrame):
         for widget in self.mods_list_frame.winfo_children():
             widget.destroy()
         
-        # Get all mods
-        all_mods = self.db.get_all_mods()
+        # Get mods (environment filter runs in the database, newest first)
+        all_mods = self.db.query_mods(
+            limit=REPOSITORY_PAGE_SIZE,
+            environment=self.current_filter
+        )["items"]
         
         if not all_mods:
             no_mods_label = ctk.CTkLabel(
@@ -321,8 +328,8 @@ class RepositoryManager(ctk.CTkScrollableFrame):
     
     def filter_mods(self, filter_type: str):
         """Filter mods by environment"""
-        # TODO: Implement filtering
-        pass
+        self.current_filter = None if filter_type == "all" else filter_type
+        self.load_repository()
     
     def promote_mod(self, mod: Dict):
         """Promote mod to next environment"""
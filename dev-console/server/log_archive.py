@@ -0,0 +1,538 @@
+"""
+Log Archive
+Indexed, searchable history of Minecraft server logs
+
+Features:
+- Ingests latest.log and rotated *.log.gz into SQLite (parsed columns + FTS5 message index)
+- Parses timestamp, thread, level, player and message (vanilla, Paper and Forge layouts)
+- Incremental: each source remembers its byte offset, only new lines are parsed
+- Sources are identified by content, so latest.log rotating into a .log.gz is not indexed twice
+- Queries by level, player, time range and full text with keyset pagination
+- Retention prunes old entries; the archive lives in its own database file
+"""
+
+import gzip
+import hashlib
+import re
+import threading
+import time
+from datetime import date, datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from config import LOG_ARCHIVE_PATH, LOG_ARCHIVE_RETENTION_DAYS, LOGS_DIR
+from database.connection_pool import ConnectionPool
+
+
+# Leading bytes hashed to identify a log file (survives rotation and compression)
+FINGERPRINT_BYTES = 4096
+# Decompressed bytes parsed per transaction
+INGEST_CHUNK_BYTES = 4 * 1024 * 1024
+# A clock jump backwards larger than this is a midnight rollover
+DAY_WRAP_THRESHOLD = 3600
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS log_sources (
+    id INTEGER PRIMARY KEY,
+    fingerprint TEXT NOT NULL UNIQUE,
+    path TEXT NOT NULL,
+    file_size INTEGER,
+    file_mtime REAL,
+    offset INTEGER NOT NULL DEFAULT 0,
+    base_day INTEGER NOT NULL,
+    day INTEGER NOT NULL DEFAULT 0,
+    last_seconds INTEGER NOT NULL DEFAULT 0,
+    last_ts REAL,
+    last_thread TEXT,
+    last_level TEXT,
+    lines INTEGER NOT NULL DEFAULT 0,
+    complete INTEGER NOT NULL DEFAULT 0
+);
+
+CREATE TABLE IF NOT EXISTS log_entries (
+    id INTEGER PRIMARY KEY,
+    source_id INTEGER NOT NULL,
+    ts REAL NOT NULL,
+    level TEXT,
+    thread TEXT,
+    player TEXT,
+    message TEXT NOT NULL
+);
+
+CREATE INDEX IF NOT EXISTS idx_log_entries_ts ON log_entries(ts);
+CREATE INDEX IF NOT EXISTS idx_log_entries_level_ts ON log_entries(level, ts);
+CREATE INDEX IF NOT EXISTS idx_log_entries_player_ts ON log_entries(player, ts) WHERE player IS NOT NULL;
+
+CREATE VIRTUAL TABLE IF NOT EXISTS log_fts USING fts5(
+    message, content='log_entries', content_rowid='id'
+);
+"""
+
+# [12:34:56] [Server thread/INFO]: message
+_VANILLA_LINE = re.compile(r"\[(\d\d):(\d\d):(\d\d)\] \[([^\]]*)/([A-Z]+)\]: ?(.*)")
+# [12:34:56 INFO]: message (Paper/Spigot console)
+_PAPER_LINE = re.compile(r"\[(\d\d):(\d\d):(\d\d) ([A-Z]+)\]: ?(.*)")
+# [14Oct2025 12:34:56.789] [Server thread/INFO] [net.minecraft.server.MinecraftServer/]: message
+_FORGE_LINE = re.compile(
+    r"\[(\d\d)([A-Za-z]{3})(\d{4}) (\d\d):(\d\d):(\d\d)(?:\.(\d+))?\] \[([^\]]*)/([A-Z]+)\](?: \[[^\]]*\])?: ?(.*)"
+)
+_MONTHS = {m: i for i, m in enumerate(
+    ["Jan", "Feb", "Mar", "Apr", "May", "Jun", "Jul", "Aug", "Sep", "Oct", "Nov", "Dec"], 1
+)}
+
+# Player a message is about: chat, logins, joins, commands, advancements, deaths
+_NAME = r"([A-Za-z0-9_]{3,16})"
+_PLAYER_MESSAGE = re.compile(
+    r"(?:\[Not Secure\] )?<" + _NAME + r"> "
+    r"|UUID of player " + _NAME + r" is"
+    r"|" + _NAME + r"(?:\[/[^\]]*\] logged in| (?:joined|left) the game"
+    r"| (?:lost connection|issued server command|has made the advancement"
+    r"|has completed the challenge|has reached the goal)"
+    r"| (?:was |fell |drowned|died|burned|blew up|hit the ground|starved|suffocated"
+    r"|froze|experienced kinetic|tried to swim|walked into|went up in flames|withered))"
+)
+# Time of day at the start of a raw line (for counting midnight rollovers)
+_LINE_TIME = re.compile(rb"\[(\d\d):(\d\d):(\d\d)[\] ]")
+
+
+def parse_line(line: str) -> Optional[Tuple[Optional[float], int, str, str, str]]:
+    """
+    Parse one log line
+
+    Returns:
+        (absolute unix time or None, seconds since midnight, thread, level, message),
+        or None for continuation lines (stack traces, multi-line output)
+    """
+    m = _VANILLA_LINE.match(line)
+    if m:
+        h, mi, s, thread, level, message = m.groups()
+        return None, int(h) * 3600 + int(mi) * 60 + int(s), thread, level, message
+    m = _PAPER_LINE.match(line)
+    if m:
+        h, mi, s, level, message = m.groups()
+        return None, int(h) * 3600 + int(mi) * 60 + int(s), "", level, message
+    m = _FORGE_LINE.match(line)
+    if m and m.group(2) in _MONTHS:
+        d, mon, y, h, mi, s, frac, thread, level, message = m.groups()
+        ts = datetime(int(y), _MONTHS[mon], int(d), int(h), int(mi), int(s)).timestamp()
+        if frac:
+            ts += float("0." + frac)
+        return ts, int(h) * 3600 + int(mi) * 60 + int(s), thread, level, message
+    return None
+
+
+def extract_player(message: str) -> Optional[str]:
+    """Player name a message is about (chat, joins, commands, deaths), if any"""
+    m = _PLAYER_MESSAGE.match(message)
+    return m.group(m.lastindex) if m else None
+
+
+def _fts_query(text: str) -> str:
+    """Turn free text into an FTS5 query: every word must match, word* is a prefix search"""
+    terms = []
+    for word in text.split():
+        prefix = word.endswith("*")
+        word = word.rstrip("*").replace('"', '""')
+        if word:
+            terms.append(f'"{word}"' + ("*" if prefix else ""))
+    return " ".join(terms)
+
+
+def _open_log(path: Path):
+    return gzip.open(path, 'rb') if path.suffix == ".gz" else open(path, 'rb')
+
+
+class LogArchive:
+    """
+    Ingests and queries Minecraft server logs
+
+    Usage:
+        archive = LogArchive(LOG_ARCHIVE_PATH, LOGS_DIR)
+        archive.ingest()                                    # or archive.start() for a background loop
+        page = archive.search(text="exception", level="ERROR", start=time.time() - 7 * 86400)
+        older = archive.search(text="exception", before=page["next_cursor"])
+    """
+
+    def __init__(self, db_path: Path, logs_dir: Path, retention_days: Optional[int] = 90):
+        """
+        Initialize archive
+
+        Args:
+            db_path: SQLite database for the index (separate from the console database)
+            logs_dir: Directory with latest.log and rotated *.log.gz files
+            retention_days: Drop entries older than this (None keeps everything)
+        """
+        self.logs_dir = Path(logs_dir)
+        self.retention_days = retention_days
+        self.pool = ConnectionPool(db_path)
+        self.pool.executescript(_SCHEMA)
+
+        self._ingest_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._last_prune = 0.0
+
+        # Statistics
+        self.stats = {
+            "ingest_runs": 0,
+            "lines_ingested": 0,
+            "bytes_ingested": 0,
+            "sources_completed": 0,
+            "pruned": 0,
+            "queries": 0,
+            "errors": 0
+        }
+
+    # ------------------------------------------------------------------
+    # Ingestion
+    # ------------------------------------------------------------------
+
+    def _log_files(self) -> List[Path]:
+        """Rotated archives oldest first, then latest.log"""
+        files = sorted(self.logs_dir.glob("*.log.gz"), key=lambda p: p.stat().st_mtime)
+        latest = self.logs_dir / "latest.log"
+        if latest.exists():
+            files.append(latest)
+        return files
+
+    @staticmethod
+    def _fingerprint(path: Path) -> Optional[str]:
+        """Hash of the first FINGERPRINT_BYTES of content (None if the file is still shorter)"""
+        with _open_log(path) as f:
+            head = f.read(FINGERPRINT_BYTES)
+        if len(head) < FINGERPRINT_BYTES and path.suffix != ".gz":
+            return None  # a growing latest.log; its identity isn't stable yet
+        return hashlib.sha1(head).hexdigest()
+
+    @staticmethod
+    def _count_day_wraps(path: Path) -> int:
+        """Midnight rollovers in a file whose lines only carry a time of day"""
+        wraps, last = 0, None
+        with _open_log(path) as f:
+            for raw in f:
+                m = _LINE_TIME.match(raw)
+                if not m:
+                    continue
+                seconds = int(m.group(1)) * 3600 + int(m.group(2)) * 60 + int(m.group(3))
+                if last is not None and seconds < last - DAY_WRAP_THRESHOLD:
+                    wraps += 1
+                last = seconds
+        return wraps
+
+    def ingest(self) -> int:
+        """
+        Index new lines from every log file
+
+        Returns:
+            Number of lines added
+        """
+        with self._ingest_lock:
+            self.stats["ingest_runs"] += 1
+            added = 0
+            for path in self._log_files():
+                try:
+                    added += self._ingest_file(path)
+                except (OSError, EOFError) as e:
+                    # Truncated gzip or a file rotated away mid-read: retry next run
+                    self.stats["errors"] += 1
+                    print(f"[!] Log archive skipped {path.name}: {e}")
+            self._maybe_prune()
+            return added
+
+    def _ingest_file(self, path: Path) -> int:
+        stat = path.stat()
+        with self.pool.reader() as conn:
+            done = conn.execute(
+                "SELECT 1 FROM log_sources WHERE path = ? AND file_size = ? AND file_mtime = ? AND complete = 1",
+                (str(path), stat.st_size, stat.st_mtime)
+            ).fetchone()
+        if done:
+            return 0
+
+        fingerprint = self._fingerprint(path)
+        if fingerprint is None:
+            return 0
+
+        added = 0
+        while True:
+            lines, more = self._ingest_chunk(path, stat, fingerprint)
+            added += lines
+            if not more:
+                return added
+
+    def _ingest_chunk(self, path: Path, stat, fingerprint: str) -> Tuple[int, bool]:
+        """Parse and store one chunk of a file; returns (lines added, more to read)"""
+        compressed = path.suffix == ".gz"
+
+        # BEGIN IMMEDIATE: another process ingesting the same file waits, then sees our offset
+        with self.pool.transaction() as conn:
+            source = conn.execute("SELECT * FROM log_sources WHERE fingerprint = ?", (fingerprint,)).fetchone()
+            if source is None:
+                base_day = date.fromtimestamp(stat.st_mtime).toordinal() - self._count_day_wraps(path)
+                source_id = conn.execute(
+                    "INSERT INTO log_sources (fingerprint, path, base_day) VALUES (?, ?, ?)",
+                    (fingerprint, str(path), base_day)
+                ).lastrowid
+                source = conn.execute("SELECT * FROM log_sources WHERE id = ?", (source_id,)).fetchone()
+            elif source["complete"]:
+                conn.execute(
+                    "UPDATE log_sources SET path = ?, file_size = ?, file_mtime = ? WHERE id = ?",
+                    (str(path), stat.st_size, stat.st_mtime, source["id"])
+                )
+                return 0, False
+
+            with _open_log(path) as f:
+                f.seek(source["offset"])
+                data = f.read(INGEST_CHUNK_BYTES)
+
+            complete_bytes = data.rfind(b"\n") + 1
+            at_end = len(data) < INGEST_CHUNK_BYTES
+            if (at_end and compressed) or not complete_bytes and not at_end:
+                # A finished archive has no line still being written; a single
+                # line longer than a chunk is taken as-is rather than stalling
+                complete_bytes = len(data)
+            data = data[:complete_bytes]
+
+            day = source["day"]
+            last_seconds = source["last_seconds"]
+            last_ts = source["last_ts"]
+            thread, level = source["last_thread"], source["last_level"]
+            base_day = source["base_day"]
+            midnight_cache: Dict[int, float] = {}
+
+            rows = []
+            for raw in data.splitlines():
+                line = raw.decode("utf-8", errors="replace")
+                if not line.strip():
+                    continue
+                parsed = parse_line(line)
+                if parsed is None:
+                    # Continuation line: inherits the previous entry's time and level
+                    if last_ts is None:
+                        last_ts = stat.st_mtime
+                    rows.append((source["id"], last_ts, level, thread, None, line))
+                    continue
+
+                ts, seconds, thread, level, message = parsed
+                if ts is None:
+                    if seconds < last_seconds - DAY_WRAP_THRESHOLD and last_ts is not None:
+                        day += 1
+                    midnight = midnight_cache.get(day)
+                    if midnight is None:
+                        d = date.fromordinal(base_day + day)
+                        midnight = midnight_cache[day] = datetime(d.year, d.month, d.day).timestamp()
+                    ts = midnight + seconds
+                last_seconds, last_ts = seconds, ts
+                rows.append((source["id"], ts, level, thread, extract_player(message), message))
+
+            if rows:
+                first_id = conn.execute("SELECT COALESCE(MAX(id), 0) FROM log_entries").fetchone()[0]
+                conn.executemany(
+                    "INSERT INTO log_entries (source_id, ts, level, thread, player, message) "
+                    "VALUES (?, ?, ?, ?, ?, ?)",
+                    rows
+                )
+                conn.execute(
+                    "INSERT INTO log_fts (rowid, message) SELECT id, message FROM log_entries WHERE id > ?",
+                    (first_id,)
+                )
+
+            complete = 1 if compressed and at_end else 0
+            conn.execute(
+                "UPDATE log_sources SET path = ?, file_size = ?, file_mtime = ?, offset = ?, day = ?, "
+                "last_seconds = ?, last_ts = ?, last_thread = ?, last_level = ?, lines = lines + ?, "
+                "complete = ? WHERE id = ?",
+                (str(path), stat.st_size, stat.st_mtime, source["offset"] + complete_bytes, day,
+                 last_seconds, last_ts, thread, level, len(rows), complete, source["id"])
+            )
+
+        self.stats["lines_ingested"] += len(rows)
+        self.stats["bytes_ingested"] += complete_bytes
+        self.stats["sources_completed"] += complete
+        return len(rows), not at_end
+
+    def _maybe_prune(self):
+        if self.retention_days is None or time.time() - self._last_prune < 3600:
+            return
+        self._last_prune = time.time()
+        self.prune(time.time() - self.retention_days * 86400)
+
+    def prune(self, before: float) -> int:
+        """
+        Delete entries older than a unix time
+
+        Source rows are kept so pruned archives are not ingested again.
+
+        Returns:
+            Number of entries deleted
+        """
+        with self.pool.transaction() as conn:
+            # External-content FTS needs the old values to remove index terms
+            conn.execute(
+                "INSERT INTO log_fts (log_fts, rowid, message) "
+                "SELECT 'delete', id, message FROM log_entries WHERE ts < ?",
+                (before,)
+            )
+            deleted = conn.execute("DELETE FROM log_entries WHERE ts < ?", (before,)).rowcount
+        self.stats["pruned"] += deleted
+        return deleted
+
+    # ------------------------------------------------------------------
+    # Background loop
+    # ------------------------------------------------------------------
+
+    def start(self, interval: float = 5.0):
+        """Ingest in a background thread every `interval` seconds"""
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+
+        def loop():
+            while not self._stop.is_set():
+                try:
+                    self.ingest()
+                except Exception as e:
+                    self.stats["errors"] += 1
+                    print(f"[ERROR] Log archive ingest failed: {e}")
+                self._stop.wait(interval)
+
+        self._thread = threading.Thread(target=loop, name="log-archive", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Stop the background loop"""
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout=5)
+            self._thread = None
+
+    # ------------------------------------------------------------------
+    # Queries
+    # ------------------------------------------------------------------
+
+    def search(
+        self,
+        text: Optional[str] = None,
+        level: Optional[str] = None,
+        player: Optional[str] = None,
+        start: Optional[float] = None,
+        end: Optional[float] = None,
+        limit: int = 200,
+        before: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """
+        Search indexed log entries, newest first
+
+        Args:
+            text: Full-text query (all words must match; word* for prefixes)
+            level: Level or comma-separated levels (INFO, WARN, ERROR, ...)
+            player: Player name (case-insensitive)
+            start: Unix time lower bound (inclusive)
+            end: Unix time upper bound (exclusive)
+            limit: Page size
+            before: next_cursor from a previous page
+
+        Returns:
+            {"items", "has_more", "next_cursor"}
+        """
+        where, params = [], []
+        sql = "SELECT e.id, e.ts, e.level, e.thread, e.player, e.message FROM log_entries e"
+
+        if text:
+            query = _fts_query(text)
+            if query:
+                sql += " JOIN log_fts ON log_fts.rowid = e.id"
+                where.append("log_fts MATCH ?")
+                params.append(query)
+        levels = [lv.strip().upper() for lv in (level or "").split(",") if lv.strip()]
+        if levels:
+            where.append(f"e.level IN ({', '.join('?' * len(levels))})")
+            params.extend(levels)
+        if player:
+            where.append("e.player = ? COLLATE NOCASE")
+            params.append(player)
+        if start is not None:
+            where.append("e.ts >= ?")
+            params.append(start)
+        if end is not None:
+            where.append("e.ts < ?")
+            params.append(end)
+        if before:
+            ts, entry_id = self._decode_cursor(before)
+            where.append("(e.ts, e.id) < (?, ?)")
+            params.extend([ts, entry_id])
+
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        sql += " ORDER BY e.ts DESC, e.id DESC LIMIT ?"
+        params.append(limit + 1)
+
+        with self.pool.reader() as conn:
+            rows = [dict(row) for row in conn.execute(sql, params).fetchall()]
+        self.stats["queries"] += 1
+
+        has_more = len(rows) > limit
+        rows = rows[:limit]
+        return {
+            "items": rows,
+            "has_more": has_more,
+            # Pass as before= to get the next (older) page
+            "next_cursor": f"{rows[-1]['ts']!r}:{rows[-1]['id']}" if has_more else None
+        }
+
+    @staticmethod
+    def _decode_cursor(cursor: str) -> Tuple[float, int]:
+        try:
+            ts, entry_id = cursor.rsplit(":", 1)
+            return float(ts), int(entry_id)
+        except ValueError:
+            raise ValueError(f"Invalid archive cursor: {cursor}")
+
+    def players(self, start: Optional[float] = None, end: Optional[float] = None) -> List[Dict[str, Any]]:
+        """Players seen in the logs with entry counts and last-seen time"""
+        where, params = ["player IS NOT NULL"], []
+        if start is not None:
+            where.append("ts >= ?")
+            params.append(start)
+        if end is not None:
+            where.append("ts < ?")
+            params.append(end)
+        with self.pool.reader() as conn:
+            rows = conn.execute(
+                "SELECT player, COUNT(*) AS entries, MAX(ts) AS last_seen FROM log_entries "
+                f"WHERE {' AND '.join(where)} GROUP BY player ORDER BY last_seen DESC",
+                params
+            ).fetchall()
+        return [dict(row) for row in rows]
+
+    def sources(self) -> List[Dict[str, Any]]:
+        """Indexed log files with their progress"""
+        with self.pool.reader() as conn:
+            rows = conn.execute(
+                "SELECT id, path, offset, lines, complete, last_ts FROM log_sources ORDER BY id"
+            ).fetchall()
+        return [dict(row) for row in rows]
+
+    def close(self):
+        """Stop ingestion and close the database"""
+        self.stop()
+        self.pool.close()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get archive statistics"""
+        with self.pool.reader() as conn:
+            entries = conn.execute("SELECT COUNT(*) FROM log_entries").fetchone()[0]
+            sources = conn.execute("SELECT COUNT(*) FROM log_sources").fetchone()[0]
+        return {**self.stats, "entries": entries, "sources": sources}
+
+
+# Singleton instance
+_archive: Optional[LogArchive] = None
+
+
+def get_log_archive() -> LogArchive:
+    """Get log archive singleton"""
+    global _archive
+    if _archive is None:
+        _archive = LogArchive(LOG_ARCHIVE_PATH, LOGS_DIR, LOG_ARCHIVE_RETENTION_DAYS)
+    return _archive
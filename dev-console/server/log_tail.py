@@ -0,0 +1,194 @@
+"""
+Log Tail Service
+Last-N-lines and "everything since cursor" reads without scanning the whole file
+
+Features:
+- tail(): seeks backwards from EOF in blocks until N lines are found
+- read_since(): reads only bytes after an opaque byte-offset cursor
+- Cursors carry the file identity, so rotation/truncation is detected (reset)
+- Only complete lines are returned; a line still being written is picked up next time
+- Per-call read cap keeps a far-behind client from pulling the whole file at once
+"""
+
+import base64
+import os
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+
+# Bytes read per backwards step
+TAIL_BLOCK_SIZE = 64 * 1024
+# Most bytes returned by one read_since() call
+MAX_READ_BYTES = 1024 * 1024
+
+
+def _file_id(stat: os.stat_result) -> str:
+    # Inode/file index identifies the file across renames; rotation creates a new one
+    return f"{stat.st_dev:x}.{stat.st_ino:x}"
+
+
+def encode_cursor(file_id: str, offset: int) -> str:
+    """Opaque cursor for (file, byte offset)"""
+    raw = f"{file_id}:{offset:x}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[str, int]:
+    """
+    Decode a cursor from encode_cursor()
+
+    Raises:
+        ValueError: If the cursor is malformed
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        file_id, offset = raw.rsplit(":", 1)
+        return file_id, int(offset, 16)
+    except Exception as e:
+        raise ValueError(f"Invalid log cursor: {cursor}") from e
+
+
+def _split_lines(data: bytes) -> List[str]:
+    """Split complete lines (data ends with a newline), keeping line endings like readlines()"""
+    return [line.decode("utf-8", errors="ignore") + "\n" for line in data.split(b"\n")[:-1]]
+
+
+class LogTail:
+    """
+    Efficient reader for an append-only log file
+
+    Usage:
+        tail = LogTail(LOGS_DIR / "latest.log")
+        result = tail.tail(100)                       # {"lines", "cursor", ...}
+        result = tail.read_since(result["cursor"])    # only what was appended
+    """
+
+    def __init__(self, path: Path, block_size: int = TAIL_BLOCK_SIZE, max_read: int = MAX_READ_BYTES):
+        """
+        Initialize reader
+
+        Args:
+            path: Log file
+            block_size: Bytes read per backwards seek step
+            max_read: Most bytes returned by one read_since()
+        """
+        self.path = Path(path)
+        self.block_size = block_size
+        self.max_read = max_read
+
+        # Statistics
+        self.stats = {
+            "tails": 0,
+            "reads": 0,
+            "bytes_read": 0,
+            "resets": 0
+        }
+
+    def exists(self) -> bool:
+        return self.path.exists()
+
+    def tail(self, lines: int = 100) -> Dict:
+        """
+        Last complete lines of the file
+
+        Args:
+            lines: Number of lines
+
+        Returns:
+            {"lines": [...], "cursor": str, "size": int}
+        """
+        with open(self.path, 'rb') as f:
+            stat = os.fstat(f.fileno())
+            size = stat.st_size
+
+            # Ignore a trailing partial line; the cursor points at its start
+            end = size
+            if end:
+                f.seek(end - 1)
+                if f.read(1) != b"\n":
+                    end = self._last_newline(f, end) + 1
+
+            position = end
+            chunks: List[bytes] = []
+            newlines = 0
+            # lines + 1 newlines: the extra one marks where the first wanted line starts
+            while position > 0 and newlines <= lines:
+                step = min(self.block_size, position)
+                position -= step
+                f.seek(position)
+                chunk = f.read(step)
+                chunks.append(chunk)
+                newlines += chunk.count(b"\n")
+
+            data = b"".join(reversed(chunks))
+            self.stats["tails"] += 1
+            self.stats["bytes_read"] += len(data)
+            result = _split_lines(data)[-lines:] if lines > 0 else []
+
+        return {
+            "lines": result,
+            "cursor": encode_cursor(_file_id(stat), end),
+            "size": size
+        }
+
+    def _last_newline(self, f, end: int) -> int:
+        """Offset of the last newline before end (-1 if none)"""
+        position = end
+        while position > 0:
+            step = min(self.block_size, position)
+            position -= step
+            f.seek(position)
+            index = f.read(step).rfind(b"\n")
+            if index != -1:
+                return position + index
+        return -1
+
+    def read_since(self, cursor: Optional[str]) -> Dict:
+        """
+        Complete lines appended after cursor
+
+        Args:
+            cursor: Cursor from tail()/read_since(), or None for the start of the file
+
+        Returns:
+            {"lines", "cursor", "reset", "has_more"}
+            reset: the file was rotated or truncated; reading restarted at its beginning
+            has_more: more complete data is available (call again with the new cursor)
+        """
+        with open(self.path, 'rb') as f:
+            stat = os.fstat(f.fileno())
+            file_id = _file_id(stat)
+            size = stat.st_size
+
+            reset = False
+            offset = 0
+            if cursor:
+                cursor_file, offset = decode_cursor(cursor)
+                if cursor_file != file_id or offset > size:
+                    reset, offset = True, 0
+
+            f.seek(offset)
+            data = f.read(min(size - offset, self.max_read))
+            self.stats["reads"] += 1
+            self.stats["bytes_read"] += len(data)
+            self.stats["resets"] += reset
+
+        complete = data.rfind(b"\n") + 1
+        lines = _split_lines(data[:complete])
+        new_offset = offset + complete
+
+        if not complete and len(data) == self.max_read:
+            # A single line longer than max_read: return it as-is rather than stall
+            lines = [data.decode("utf-8", errors="ignore")]
+            new_offset = offset + len(data)
+
+        return {
+            "lines": lines,
+            "cursor": encode_cursor(file_id, new_offset),
+            "reset": reset,
+            "has_more": size - new_offset > 0 and len(data) == self.max_read
+        }
+
+    def get_stats(self) -> Dict:
+        """Get reader statistics"""
+        return dict(self.stats)
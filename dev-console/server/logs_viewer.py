@@ -11,6 +11,12 @@ from typing import Optional
 import re
 
 from config import THEME, LAYOUT, LOGS_DIR
+from server.log_tail import LogTail
+from server.log_archive import get_log_archive
+
+
+# Lines loaded when the viewer opens or filters change (older lines stay on disk)
+LOG_VIEWER_BACKLOG = 5000
 
 
 class LogsViewer(ctk.CTkFrame):
@@ -28,9 +34,12 @@ class LogsViewer(ctk.CTkFrame):
         
         self.log_file_path = LOGS_DIR / "latest.log"
         self.following = True
+        # Bumped for every new follower thread; older followers exit when it changes
+        self._follow_generation = 0
         self.search_term = ""
         self.filter_level = "ALL"
-        self.last_position = 0
+        self.log_tail = LogTail(self.log_file_path)
+        self.cursor: Optional[str] = None
         
         # Create UI
         self.create_header()
@@ -121,6 +130,8 @@ class LogsViewer(ctk.CTkFrame):
         )
         self.search_entry.pack(side="left", padx=5)
         self.search_entry.bind("<KeyRelease>", lambda e: self.apply_filters())
+        # Enter searches the whole archive (all rotated logs), not just the live tail
+        self.search_entry.bind("<Return>", lambda e: self.search_history())
         
         # Log level filter
         ctk.CTkLabel(
@@ -167,29 +178,45 @@ class LogsViewer(ctk.CTkFrame):
         # We'll keep it simple for now
     
     def start_following_logs(self):
-        """Start following logs in background thread"""
+        """Start following logs in background thread (replaces any running follower)"""
         self.following = True
-        thread = threading.Thread(target=self._follow_logs_thread, daemon=True)
+        self._follow_generation += 1
+        thread = threading.Thread(
+            target=self._follow_logs_thread,
+            args=(self._follow_generation,),
+            daemon=True
+        )
         thread.start()
     
-    def _follow_logs_thread(self):
-        """Background thread to follow logs"""
-        while self.following:
+    def _is_current_follower(self, generation: int) -> bool:
+        return self.following and generation == self._follow_generation
+    
+    def _follow_logs_thread(self, generation: int):
+        """Background thread to follow logs (exits once stopped or replaced)"""
+        while self._is_current_follower(generation):
             try:
                 if self.log_file_path.exists():
-                    with open(self.log_file_path, 'r', encoding='utf-8', errors='ignore') as f:
-                        # Seek to last position
-                        f.seek(self.last_position)
-                        
-                        # Read new lines
-                        new_lines = f.readlines()
-                        
-                        # Update position
-                        self.last_position = f.tell()
-                        
-                        # Add new lines to display
-                        if new_lines:
-                            self.add_log_lines(new_lines)
+                    if self.cursor is None:
+                        # First read: only the recent backlog, not the whole file
+                        result = self.log_tail.tail(LOG_VIEWER_BACKLOG)
+                    else:
+                        # Only bytes appended since the last read; restarts after rotation
+                        result = self.log_tail.read_since(self.cursor)
+                    
+                    # Stopped or replaced while reading: the result is stale
+                    if not self._is_current_follower(generation):
+                        break
+                    
+                    # Update position
+                    self.cursor = result["cursor"]
+                    
+                    # Add new lines to display
+                    if result["lines"]:
+                        self.add_log_lines(result["lines"])
+                    
+                    # Catch up without sleeping if far behind
+                    if result.get("has_more"):
+                        continue
                 
                 # Sleep before next check
                 time.sleep(0.5)
@@ -270,47 +297,86 @@ class LogsViewer(ctk.CTkFrame):
     def refresh_logs(self):
         """Refresh logs from file"""
         self.clear_logs()
-        self.last_position = 0
         
-        # Read entire log file with filters
+        # Stop the live follower while the backlog is re-read (restarted below)
+        self.following = False
+        
+        # Re-read the recent backlog with filters
         if self.log_file_path.exists():
             try:
-                with open(self.log_file_path, 'r', encoding='utf-8', errors='ignore') as f:
-                    lines = f.readlines()
-                    
-                    # Apply filters
-                    search_term = self.search_entry.get().lower()
-                    filtered_lines = []
+                result = self.log_tail.tail(LOG_VIEWER_BACKLOG)
+                lines = result["lines"]
+                
+                # Apply filters
+                search_term = self.search_entry.get().lower()
+                filtered_lines = []
+                
+                for line in lines:
+                    # Apply search filter
+                    if search_term and search_term not in line.lower():
+                        continue
                     
-                    for line in lines:
-                        # Apply search filter
-                        if search_term and search_term not in line.lower():
+                    # Apply level filter
+                    if self.filter_level != "ALL":
+                        if self.filter_level not in line:
                             continue
-                        
-                        # Apply level filter
-                        if self.filter_level != "ALL":
-                            if self.filter_level not in line:
-                                continue
-                        
-                        filtered_lines.append(line)
-                    
-                    # Display filtered lines
-                    for line in filtered_lines:
-                        colored_line = self.colorize_log_line(line)
-                        self.log_text.insert("end", colored_line)
-                    
-                    # Update position
-                    self.last_position = f.tell()
                     
-                    # Scroll to end
-                    if self.autoscroll_var.get():
-                        self.log_text.see("end")
+                    filtered_lines.append(line)
+                
+                # Display filtered lines
+                for line in filtered_lines:
+                    colored_line = self.colorize_log_line(line)
+                    self.log_text.insert("end", colored_line)
+                
+                # Update position
+                self.cursor = result["cursor"]
+                
+                # Scroll to end
+                if self.autoscroll_var.get():
+                    self.log_text.see("end")
             
             except Exception as e:
                 self.log_text.insert("1.0", f"Error reading log file: {str(e)}\n")
         else:
             self.log_text.insert("1.0", f"Log file not found: {self.log_file_path}\n")
             self.log_text.insert("end", "Waiting for server to start...\n")
+        
+        # Resume live following from the new position (also after archive results)
+        self.start_following_logs()
+    
+    def search_history(self):
+        """Search all indexed logs (latest.log and rotated archives) for the search term"""
+        search_term = self.search_entry.get().strip()
+        level = None if self.filter_level == "ALL" else self.filter_level
+        if not search_term and not level:
+            self.refresh_logs()
+            return
+        
+        # Stop live lines from mixing into the results until the next refresh
+        self.following = False
+        
+        def worker():
+            try:
+                archive = get_log_archive()
+                archive.ingest()
+                page = archive.search(text=search_term or None, level=level, limit=LOG_VIEWER_BACKLOG)
+                header = f"--- {len(page['items'])} archived matches{' (newest shown)' if page['has_more'] else ''} ---\n"
+                self.after(0, lambda: self._show_history(header, page["items"]))
+            except Exception as e:
+                error = f"Archive search failed: {e}\n"
+                self.after(0, lambda: self.log_text.insert("end", error))
+        
+        threading.Thread(target=worker, daemon=True).start()
+    
+    def _show_history(self, header: str, entries: list):
+        """Display archive search results oldest first (must run in main thread)"""
+        self.clear_logs()
+        self.log_text.insert("end", header)
+        for entry in reversed(entries):
+            stamp = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(entry["ts"]))
+            line = f"[{stamp}] [{entry['thread']}/{entry['level']}]: {entry['message']}\n"
+            self.log_text.insert("end", self.colorize_log_line(line))
+        self.log_text.see("end")
     
     def destroy(self):
         """Clean up when widget is destroyed"""
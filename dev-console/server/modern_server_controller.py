@@ -6,7 +6,7 @@ Sleek, modern server control panel with real-time status
 import customtkinter as ctk
 import subprocess
 import threading
-import socket
+import sys
 from pathlib import Path
 from typing import Optional, Callable
 import time
@@ -14,6 +14,9 @@ import time
 from config import THEME, LAYOUT, MINECRAFT_SERVER_PORT, PROJECT_ROOT
 from database.db_manager import DatabaseManager
 
+sys.path.insert(0, str(PROJECT_ROOT))
+from server_status import ServerStatus, get_status_prober
+
 
 class ServerController(ctk.CTkScrollableFrame):
     """
@@ -32,6 +35,7 @@ class ServerController(ctk.CTkScrollableFrame):
         self.on_status_change = on_status_change
         self.server_process = None
         self.status_checking = False
+        self._unwatch_status = None
         
         # Header
         header = ctk.CTkFrame(self, fg_color=THEME["bg_secondary"], height=100)
@@ -168,12 +172,13 @@ class ServerController(ctk.CTkScrollableFrame):
             corner_radius=8
         )
         
-        ctk.CTkLabel(
+        badge.label = ctk.CTkLabel(
             badge,
             text=f"{icon} {text}",
             font=THEME["font_body"],
             text_color=color
-        ).pack(padx=15, pady=8)
+        )
+        badge.label.pack(padx=15, pady=8)
         
         return badge
     
@@ -444,25 +449,35 @@ class ServerController(ctk.CTkScrollableFrame):
             self.after(0, lambda: self.start_btn.configure(state="normal"))
     
     def start_status_checking(self):
-        """Start background status checking"""
+        """Start background status checking (Server List Ping on the shared prober thread)"""
         if not self.status_checking:
             self.status_checking = True
-            self._check_status_loop()
+            self._unwatch_status = get_status_prober().watch(
+                "localhost",
+                MINECRAFT_SERVER_PORT,
+                lambda status: self.after(0, self._apply_status, status),
+                interval=5.0
+            )
     
-    def _check_status_loop(self):
-        """Status checking loop"""
+    def _apply_status(self, status: ServerStatus):
+        """Show a probe result (runs on the Tk thread)"""
         if not self.status_checking:
             return
         
-        is_online = self.check_server_online()
-        
-        if is_online:
+        if status.online:
             self.status_indicator.configure(fg_color=THEME["success"])
             self.status_text.configure(text="ONLINE", text_color=THEME["success"])
-            self.status_details.configure(text=f"Server is running on port {MINECRAFT_SERVER_PORT}")
+            details = f"{status.version} • {status.latency_ms:.0f} ms"
+            if status.motd:
+                details = f"{status.motd.splitlines()[0]} • {details}"
+            self.status_details.configure(text=details)
+            self.player_metric.label.configure(
+                text=f"👥 {status.players_online}/{status.players_max} Players",
+                text_color=THEME["success"] if status.players_online else THEME["text_secondary"]
+            )
             
             if self.on_status_change:
-                self.on_status_change(True, 0)
+                self.on_status_change(True, status.players_online)
             
             self.start_btn.configure(state="disabled")
             self.stop_btn.configure(state="normal")
@@ -471,6 +486,7 @@ class ServerController(ctk.CTkScrollableFrame):
             self.status_indicator.configure(fg_color=THEME["error"])
             self.status_text.configure(text="OFFLINE", text_color=THEME["error"])
             self.status_details.configure(text="Server is not running")
+            self.player_metric.label.configure(text="👥 0 Players", text_color=THEME["text_secondary"])
             
             if self.on_status_change:
                 self.on_status_change(False, 0)
@@ -478,19 +494,18 @@ class ServerController(ctk.CTkScrollableFrame):
             self.start_btn.configure(state="normal")
             self.stop_btn.configure(state="disabled")
             self.restart_btn.configure(state="disabled")
-        
-        self.after(5000, self._check_status_loop)
     
     def check_server_online(self) -> bool:
-        """Check if server is online"""
-        try:
-            sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-            sock.settimeout(1)
-            result = sock.connect_ex(('localhost', MINECRAFT_SERVER_PORT))
-            sock.close()
-            return result == 0
-        except:
-            return False
+        """Last known server state (cached probe result, never blocks the UI)"""
+        status = get_status_prober().cached("localhost", MINECRAFT_SERVER_PORT)
+        return bool(status and status.online)
+    
+    def destroy(self):
+        """Stop status checking when the panel closes"""
+        self.status_checking = False
+        if self._unwatch_status:
+            self._unwatch_status()
+        super().destroy()
     
     def update_server_info(self):
         """Update server information display"""
@@ -6,7 +6,7 @@ Start, stop, restart, and monitor server status
 import customtkinter as ctk
 import subprocess
 import threading
-import socket
+import sys
 from pathlib import Path
 from typing import Optional, Callable
 import time
@@ -14,6 +14,9 @@ import time
 from config import THEME, LAYOUT, MINECRAFT_SERVER_PORT, PROJECT_ROOT
 from database.db_manager import DatabaseManager
 
+sys.path.insert(0, str(PROJECT_ROOT))
+from server_status import ServerStatus, get_status_prober
+
 
 class ServerController(ctk.CTkScrollableFrame):
     """
@@ -32,6 +35,7 @@ class ServerController(ctk.CTkScrollableFrame):
         self.on_status_change = on_status_change
         self.server_process = None
         self.status_checking = False
+        self._unwatch_status = None
         
         # Header
         header = ctk.CTkLabel(
@@ -353,33 +357,38 @@ class ServerController(ctk.CTkScrollableFrame):
             self.after(0, lambda: self.start_btn.configure(state="normal"))
     
     def start_status_checking(self):
-        """Start background status checking"""
+        """Start background status checking (Server List Ping on the shared prober thread)"""
         if not self.status_checking:
             self.status_checking = True
-            self._check_status_loop()
+            self._unwatch_status = get_status_prober().watch(
+                "localhost",
+                MINECRAFT_SERVER_PORT,
+                lambda status: self.after(0, self._apply_status, status),
+                interval=5.0
+            )
     
-    def _check_status_loop(self):
-        """Status checking loop"""
+    def _apply_status(self, status: ServerStatus):
+        """Show a probe result (runs on the Tk thread)"""
         if not self.status_checking:
             return
         
-        # Check server status
-        is_online = self.check_server_online()
-        
         # Update UI
-        if is_online:
+        if status.online:
             self.status_indicator.configure(fg_color=THEME["success"])
             self.status_text.configure(
                 text="ONLINE",
                 text_color=THEME["success"]
             )
-            self.status_details.configure(
-                text=f"Server is running on port {MINECRAFT_SERVER_PORT}"
-            )
+            details = f"{status.players_online}/{status.players_max} players • {status.version} • {status.latency_ms:.0f} ms"
+            if status.motd:
+                details = f"{status.motd}\n{details}"
+            if status.player_sample:
+                details += "\nOnline: " + ", ".join(status.player_sample)
+            self.status_details.configure(text=details)
             
             # Update topbar if callback provided
             if self.on_status_change:
-                self.on_status_change(True, 0)  # TODO: Get actual player count
+                self.on_status_change(True, status.players_online)
             
             # Enable stop/restart, disable start
             self.start_btn.configure(state="disabled")
@@ -403,20 +412,18 @@ class ServerController(ctk.CTkScrollableFrame):
             self.start_btn.configure(state="normal")
             self.stop_btn.configure(state="disabled")
             self.restart_btn.configure(state="disabled")
-        
-        # Check again in 5 seconds
-        self.after(5000, self._check_status_loop)
     
     def check_server_online(self) -> bool:
-        """Check if server is online by trying to connect to port"""
-        try:
-            sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-            sock.settimeout(1)
-            result = sock.connect_ex(('localhost', MINECRAFT_SERVER_PORT))
-            sock.close()
-            return result == 0
-        except:
-            return False
+        """Last known server state (cached probe result, never blocks the UI)"""
+        status = get_status_prober().cached("localhost", MINECRAFT_SERVER_PORT)
+        return bool(status and status.online)
+    
+    def destroy(self):
+        """Stop status checking when the panel closes"""
+        self.status_checking = False
+        if self._unwatch_status:
+            self._unwatch_status()
+        super().destroy()
     
     def update_server_info(self):
         """Update server information display"""
@@ -4,12 +4,18 @@ Team collaboration and activity tracking
 """
 
 import customtkinter as ctk
+from collections import deque
 from datetime import datetime
 from typing import Optional
 
 from config import THEME, LAYOUT
 from database.db_manager import DatabaseManager
 
+# Activity entries kept on screen
+ACTIVITY_FEED_SIZE = 50
+# Poll for new entries this often (ms)
+ACTIVITY_REFRESH_MS = 5000
+
 
 class ActivityFeed(ctk.CTkScrollableFrame):
     """
@@ -25,6 +31,9 @@ class ActivityFeed(ctk.CTkScrollableFrame):
         )
         
         self.db = db
+        self.activity_cursor: Optional[int] = None
+        self.activity_items = deque()  # item frames, newest first
+        self.empty_label = None
         
         # Header
         header = ctk.CTkLabel(
@@ -41,6 +50,7 @@ class ActivityFeed(ctk.CTkScrollableFrame):
         
         # Load initial data
         self.load_activity()
+        self.after(ACTIVITY_REFRESH_MS, self.refresh_activity)
     
     def create_tabs(self):
         """Create tabbed interface"""
@@ -122,31 +132,65 @@ class ActivityFeed(ctk.CTkScrollableFrame):
         # Clear content
         for widget in self.content_frame.winfo_children():
             widget.destroy()
+        self.activity_items.clear()
+        self.empty_label = None
         
         # Get recent activity
-        activities = self.db.get_recent_activity(50)
+        page = self.db.query_activity(limit=ACTIVITY_FEED_SIZE)
+        activities = page["items"]
+        self.activity_cursor = page["latest_cursor"]
         
         if not activities:
-            ctk.CTkLabel(
+            self.empty_label = ctk.CTkLabel(
                 self.content_frame,
                 text="No recent activity",
                 font=THEME["font_body"],
                 text_color=THEME["text_secondary"]
-            ).pack(pady=20)
+            )
+            self.empty_label.pack(pady=20)
             return
         
         # Display activities
         for activity in activities:
-            self.create_activity_item(activity)
+            self.activity_items.append(self.create_activity_item(activity))
+    
+    def refresh_activity(self):
+        """Prepend entries added since the last load (only the delta is queried)"""
+        try:
+            if self.current_tab == "activity" and self.activity_cursor is not None:
+                page = self.db.query_activity(limit=ACTIVITY_FEED_SIZE, after=self.activity_cursor)
+                self.activity_cursor = page["latest_cursor"]
+                
+                if page["has_more"]:
+                    # Too far behind for a delta - reload the newest page
+                    self.load_activity()
+                elif page["items"]:
+                    if self.empty_label is not None:
+                        self.empty_label.destroy()
+                        self.empty_label = None
+                    
+                    # Oldest first: each new item goes on top
+                    for activity in page["items"]:
+                        top = self.activity_items[0] if self.activity_items else None
+                        self.activity_items.appendleft(self.create_activity_item(activity, before=top))
+                    
+                    # Keep the feed bounded (oldest at the right)
+                    while len(self.activity_items) > ACTIVITY_FEED_SIZE:
+                        self.activity_items.pop().destroy()
+        finally:
+            self.after(ACTIVITY_REFRESH_MS, self.refresh_activity)
     
-    def create_activity_item(self, activity: dict):
-        """Create activity item"""
+    def create_activity_item(self, activity: dict, before=None) -> ctk.CTkFrame:
+        """Create activity item (above `before` if given, else at the bottom) and return its frame"""
         item_frame = ctk.CTkFrame(
             self.content_frame,
             fg_color=THEME["bg_primary"],
             corner_radius=8
         )
-        item_frame.pack(fill="x", pady=5)
+        if before is not None:
+            item_frame.pack(fill="x", pady=5, before=before)
+        else:
+            item_frame.pack(fill="x", pady=5)
         
         # Icon based on action
         action_icons = {
@@ -192,6 +236,8 @@ class ActivityFeed(ctk.CTkScrollableFrame):
             font=THEME["font_small"],
             text_color=THEME["text_dim"]
         ).pack(side="right", padx=15, pady=10)
+        
+        return item_frame
     
     def format_action_text(self, activity: dict) -> str:
         """Format activity action text"""
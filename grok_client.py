@@ -6,7 +6,8 @@ Ultra-fast AI client using OpenRouter's unified API with <1 second response time
 Features:
 - Grok-4 Fast via OpenRouter (better uptime, fallback options)
 - Async/await for non-blocking operations
-- Response caching for instant repeated queries
+- Token streaming (SSE) so replies can be shown while they generate
+- Response caching for instant repeated queries (normalized, similarity-aware, persistent)
 - Connection pooling for speed
 - Timeout optimization (2 second max)
 - OpenAI-compatible API format
@@ -16,10 +17,13 @@ Features:
 import aiohttp
 import asyncio
 import time
-from typing import Optional, Dict, List
-from collections import OrderedDict
+import hashlib
+from pathlib import Path
+from typing import Optional, Dict, List, AsyncIterator
 import json
 
+from ai_response_cache import ResponseCache
+
 
 class GrokClient:
     """
@@ -28,6 +32,9 @@ class GrokClient:
     Usage:
         client = GrokClient(api_key="xai-...")
         response = await client.ask("What is Minecraft?")
+        
+        async for delta in client.ask_stream("What is Minecraft?"):
+            print(delta, end="")
     """
     
     def __init__(
@@ -37,7 +44,11 @@ class GrokClient:
         timeout: int = 30,
         max_tokens: int = 100,
         temperature: float = 0.7,
-        cache_size: int = 100
+        cache_size: int = 100,
+        cache_path: Optional[Path] = None,
+        cache_ttl: Optional[float] = 7 * 24 * 3600,
+        cache_similarity: Optional[float] = 0.9,
+        cache: Optional[ResponseCache] = None
     ):
         """
         Initialize Grok client via OpenRouter
@@ -49,6 +60,10 @@ class GrokClient:
             max_tokens: Max response length (default 100 for speed)
             temperature: Response creativity (0.7 for balanced)
             cache_size: Number of responses to cache
+            cache_path: SQLite file to persist the cache across restarts (None = memory only)
+            cache_ttl: Seconds a cached answer stays valid (None = forever)
+            cache_similarity: Cosine threshold for paraphrase hits (None = exact matches only)
+            cache: Shared ResponseCache (overrides the cache_* options)
         """
         self.api_key = api_key
         self.model = model
@@ -60,7 +75,12 @@ class GrokClient:
         self.api_url = "https://openrouter.ai/api/v1/chat/completions"
         
         # Response cache for instant repeated queries
-        self.cache: OrderedDict = OrderedDict()
+        self.cache = cache or ResponseCache(
+            path=cache_path,
+            ttl=cache_ttl,
+            max_entries=cache_size,
+            similarity=cache_similarity
+        )
         self.cache_size = cache_size
         
         # Session for connection pooling (reuse connections)
@@ -72,7 +92,9 @@ class GrokClient:
             "cache_hits": 0,
             "avg_response_time": 0.0,
             "fastest_response": float('inf'),
-            "slowest_response": 0.0
+            "slowest_response": 0.0,
+            "streamed_requests": 0,
+            "avg_first_token_time": 0.0
         }
     
     async def _ensure_session(self):
@@ -93,53 +115,22 @@ class GrokClient:
         if self.session and not self.session.closed:
             await self.session.close()
     
-    def _get_cache_key(self, prompt: str, system: Optional[str] = None) -> str:
-        """Generate cache key from prompt and system message"""
-        return f"{system or 'default'}:{prompt.lower().strip()}"
-    
-    def _add_to_cache(self, key: str, response: str):
-        """Add response to cache (LRU eviction)"""
-        if key in self.cache:
-            # Move to end (most recently used)
-            self.cache.move_to_end(key)
-        else:
-            self.cache[key] = response
-            # Evict oldest if cache full
-            if len(self.cache) > self.cache_size:
-                self.cache.popitem(last=False)
+    def _cache_namespace(self, system: Optional[str], cache_namespace: Optional[str]) -> str:
+        """Namespace of a request in the response cache (answers never cross system prompts)"""
+        if cache_namespace:
+            return cache_namespace
+        if not system:
+            return "default"
+        return "system:" + hashlib.sha256(system.encode("utf-8")).hexdigest()[:16]
     
-    async def ask(
+    def _build_request(
         self,
         prompt: str,
-        system: Optional[str] = None,
-        context: Optional[List[Dict[str, str]]] = None,
-        use_cache: bool = True
-    ) -> str:
-        """
-        Ask Grok a question with ultra-fast response
-        
-        Args:
-            prompt: User question/prompt
-            system: System prompt (optional)
-            context: Conversation history (optional)
-            use_cache: Whether to use response cache
-        
-        Returns:
-            AI response text
-        """
-        start_time = time.time()
-        
-        # Check cache first (instant!)
-        if use_cache:
-            cache_key = self._get_cache_key(prompt, system)
-            if cache_key in self.cache:
-                self.stats["cache_hits"] += 1
-                print(f"[CACHE] Cache hit! ({time.time() - start_time:.3f}s)")
-                return self.cache[cache_key]
-        
-        # Ensure session exists
-        await self._ensure_session()
-        
+        system: Optional[str],
+        context: Optional[List[Dict[str, str]]],
+        stream: bool
+    ) -> tuple:
+        """Build (payload, headers) for a chat completion request"""
         # Build messages array
         messages = []
         
@@ -160,7 +151,7 @@ class GrokClient:
             "messages": messages,
             "max_tokens": self.max_tokens,
             "temperature": self.temperature,
-            "stream": False  # Non-streaming for simplicity
+            "stream": stream
         }
         
         # Build headers (OpenRouter format)
@@ -171,6 +162,57 @@ class GrokClient:
             "X-Title": "Titan Minecraft Server"  # Optional: for rankings
         }
         
+        return payload, headers
+    
+    def _record_response_time(self, elapsed: float):
+        """Update response time statistics"""
+        self.stats["total_requests"] += 1
+        self.stats["avg_response_time"] = (
+            (self.stats["avg_response_time"] * (self.stats["total_requests"] - 1) + elapsed)
+            / self.stats["total_requests"]
+        )
+        self.stats["fastest_response"] = min(self.stats["fastest_response"], elapsed)
+        self.stats["slowest_response"] = max(self.stats["slowest_response"], elapsed)
+    
+    async def ask(
+        self,
+        prompt: str,
+        system: Optional[str] = None,
+        context: Optional[List[Dict[str, str]]] = None,
+        use_cache: bool = True,
+        cache_namespace: Optional[str] = None
+    ) -> str:
+        """
+        Ask Grok a question with ultra-fast response
+        
+        Args:
+            prompt: User question/prompt
+            system: System prompt (optional)
+            context: Conversation history (optional)
+            use_cache: Whether to use response cache
+            cache_namespace: Cache namespace (default: derived from the system prompt)
+        
+        Returns:
+            AI response text
+        """
+        start_time = time.time()
+        
+        # Check cache first (instant!)
+        if use_cache:
+            # Context-dependent answers are not reusable
+            cached = None if context else await asyncio.to_thread(
+                self.cache.get, prompt, self._cache_namespace(system, cache_namespace)
+            )
+            if cached is not None:
+                self.stats["cache_hits"] += 1
+                print(f"[CACHE] Cache hit! ({time.time() - start_time:.3f}s)")
+                return cached
+        
+        # Ensure session exists
+        await self._ensure_session()
+        
+        payload, headers = self._build_request(prompt, system, context, stream=False)
+        
         try:
             # Make API request
             print(f"[API] Sending request to OpenRouter API...")
@@ -217,18 +259,13 @@ class GrokClient:
                 elapsed = time.time() - start_time
                 
                 # Update statistics
-                self.stats["total_requests"] += 1
-                self.stats["avg_response_time"] = (
-                    (self.stats["avg_response_time"] * (self.stats["total_requests"] - 1) + elapsed)
-                    / self.stats["total_requests"]
-                )
-                self.stats["fastest_response"] = min(self.stats["fastest_response"], elapsed)
-                self.stats["slowest_response"] = max(self.stats["slowest_response"], elapsed)
+                self._record_response_time(elapsed)
                 
                 # Cache response
-                if use_cache:
-                    cache_key = self._get_cache_key(prompt, system)
-                    self._add_to_cache(cache_key, answer)
+                if use_cache and not context:
+                    await asyncio.to_thread(
+                        self.cache.put, prompt, answer, self._cache_namespace(system, cache_namespace)
+                    )
                 
                 print(f"[OK] Grok responded in {elapsed:.3f}s")
                 
@@ -247,19 +284,119 @@ class GrokClient:
             print(f"[ERROR] Unexpected error: {str(e)}")
             raise Exception(f"Grok API error: {str(e)}")
     
-    async def ask_minecraft(self, question: str, player_name: str = "Player") -> str:
+    async def ask_stream(
+        self,
+        prompt: str,
+        system: Optional[str] = None,
+        context: Optional[List[Dict[str, str]]] = None,
+        use_cache: bool = True,
+        cache_namespace: Optional[str] = None
+    ) -> AsyncIterator[str]:
         """
-        Ask Grok with Minecraft-specific system prompt
-        Optimized for short, chat-friendly responses
+        Ask Grok and stream the answer token by token (server-sent events)
         
         Args:
-            question: Player's question
-            player_name: Name of player asking
+            prompt: User question/prompt
+            system: System prompt (optional)
+            context: Conversation history (optional)
+            use_cache: Whether to use response cache
+            cache_namespace: Cache namespace (default: derived from the system prompt)
         
-        Returns:
-            Short, chat-friendly response
+        Yields:
+            Text deltas as they are generated (a cache hit yields the whole answer at once)
         """
-        system_prompt = f"""You are Console, an AI assistant in a Minecraft server.
+        start_time = time.time()
+        
+        if use_cache:
+            cached = None if context else await asyncio.to_thread(
+                self.cache.get, prompt, self._cache_namespace(system, cache_namespace)
+            )
+            if cached is not None:
+                self.stats["cache_hits"] += 1
+                print(f"[CACHE] Cache hit! ({time.time() - start_time:.3f}s)")
+                yield cached
+                return
+        
+        await self._ensure_session()
+        
+        payload, headers = self._build_request(prompt, system, context, stream=True)
+        headers["Accept"] = "text/event-stream"
+        
+        parts = []
+        first_token_time = None
+        
+        try:
+            print("[API] Streaming request to OpenRouter API...")
+            async with self.session.post(
+                self.api_url,
+                json=payload,
+                headers=headers
+            ) as response:
+                
+                if response.status != 200:
+                    error_text = await response.text()
+                    print(f"[ERROR] API Error {response.status}: {error_text}")
+                    raise Exception(f"OpenRouter API error {response.status}: {error_text}")
+                
+                # SSE: "data: {json}" lines; ":" lines are keep-alive comments
+                async for raw_line in response.content:
+                    line = raw_line.decode("utf-8", errors="replace").strip()
+                    if not line.startswith("data:"):
+                        continue
+                    
+                    data = line[5:].strip()
+                    if data == "[DONE]":
+                        break
+                    
+                    try:
+                        event = json.loads(data)
+                    except ValueError:
+                        continue
+                    
+                    if "error" in event:
+                        raise Exception(f"OpenRouter API stream error: {event['error']}")
+                    
+                    choices = event.get("choices") or []
+                    delta = choices[0].get("delta", {}).get("content") if choices else None
+                    if not delta:
+                        continue
+                    
+                    if first_token_time is None:
+                        first_token_time = time.time() - start_time
+                        print(f"[OK] First token in {first_token_time:.3f}s")
+                    
+                    parts.append(delta)
+                    yield delta
+        
+        except asyncio.TimeoutError:
+            print(f"[ERROR] Stream timed out after {self.timeout} seconds")
+            raise Exception(f"OpenRouter API timeout (>{self.timeout}s) - Try increasing timeout or check internet connection")
+        except aiohttp.ClientError as e:
+            print(f"[ERROR] Network error: {str(e)}")
+            raise Exception(f"Network error connecting to OpenRouter: {str(e)}")
+        
+        if not parts:
+            raise Exception("API returned an empty streamed response")
+        
+        # Update statistics
+        elapsed = time.time() - start_time
+        self._record_response_time(elapsed)
+        self.stats["streamed_requests"] += 1
+        self.stats["avg_first_token_time"] += (
+            (first_token_time - self.stats["avg_first_token_time"]) / self.stats["streamed_requests"]
+        )
+        
+        # Cache the complete answer
+        if use_cache and not context:
+            await asyncio.to_thread(
+                self.cache.put, prompt, "".join(parts), self._cache_namespace(system, cache_namespace)
+            )
+        
+        print(f"[OK] Grok stream finished in {elapsed:.3f}s")
+    
+    def _minecraft_system_prompt(self, player_name: str) -> str:
+        """System prompt for short, chat-friendly in-game answers"""
+        return f"""You are Console, an AI assistant in a Minecraft server.
 You help with server questions, commands, plugins, and general Minecraft topics.
 
 CRITICAL RULES:
@@ -271,8 +408,42 @@ CRITICAL RULES:
 Player: {player_name}
 Server: Titan (mc.galion.studio)
 """
+    
+    async def ask_minecraft(self, question: str, player_name: str = "Player") -> str:
+        """
+        Ask Grok with Minecraft-specific system prompt
+        Optimized for short, chat-friendly responses
         
-        return await self.ask(question, system=system_prompt)
+        Args:
+            question: Player's question
+            player_name: Name of player asking
+        
+        Returns:
+            Short, chat-friendly response
+        """
+        # One namespace for all players: the same question is answered once for everyone
+        return await self.ask(
+            question,
+            system=self._minecraft_system_prompt(player_name),
+            cache_namespace="minecraft"
+        )
+    
+    def ask_minecraft_stream(self, question: str, player_name: str = "Player") -> AsyncIterator[str]:
+        """
+        Streaming variant of ask_minecraft()
+        
+        Args:
+            question: Player's question
+            player_name: Name of player asking
+        
+        Returns:
+            Async iterator of text deltas
+        """
+        return self.ask_stream(
+            question,
+            system=self._minecraft_system_prompt(player_name),
+            cache_namespace="minecraft"
+        )
     
     async def ask_code(self, question: str) -> str:
         """
@@ -296,6 +467,7 @@ Use Python, Java, or Bash as appropriate."""
         return {
             **self.stats,
             "cache_size": len(self.cache),
+            "cache": self.cache.get_stats(),
             "cache_hit_rate": (
                 self.stats["cache_hits"] / self.stats["total_requests"]
                 if self.stats["total_requests"] > 0 else 0
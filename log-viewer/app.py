@@ -5,12 +5,18 @@ Real-time web dashboard for VPS and Minecraft server logs
 Access: http://54.37.223.40:8080
 """
 
-from flask import Flask, render_template, jsonify
-from flask_socketio import SocketIO
+from flask import Flask, render_template, jsonify, request, Response
+from flask_socketio import SocketIO, emit
+from pathlib import Path
 import subprocess
 import threading
-import time
 import os
+import sys
+
+# Shared log fan-out hub (project root, or copied next to app.py)
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from log_hub import get_log_hub, LogHubServer, DEFAULT_LOG_SOURCE
+from system_metrics import get_system_sampler
 
 app = Flask(__name__)
 app.config['SECRET_KEY'] = 'titan-logs-2025'
@@ -20,6 +26,10 @@ socketio = SocketIO(app, cors_allowed_origins="*")
 MC_LOG_PATH = "/opt/mc/data/logs/latest.log"
 SYSTEM_LOG_PATH = "/var/log/syslog"
 
+# One `docker logs -f` for every dashboard and AI bridge (same setting the bridges read)
+MC_LOG_SOURCE = os.getenv("MINECRAFT_LOG_SOURCE", DEFAULT_LOG_SOURCE)
+CONNECT_BACKLOG = 50  # lines a new dashboard gets on connect
+
 def tail_file(filepath, callback, prefix=""):
     """Tail a file and send new lines via callback"""
     try:
@@ -38,46 +48,35 @@ def tail_file(filepath, callback, prefix=""):
         callback(f"{prefix}ERROR: {str(e)}")
 
 def get_docker_logs():
-    """Get live Docker logs"""
-    try:
-        process = subprocess.Popen(
-            ['docker', 'logs', '-f', '--tail', '50', 'mc'],
-            stdout=subprocess.PIPE,
-            stderr=subprocess.STDOUT,
-            universal_newlines=True,
-            cwd='/opt/mc'
-        )
-        
-        for line in iter(process.stdout.readline, ''):
-            if line:
-                socketio.emit('minecraft_log', {'data': line.strip()})
-    except Exception as e:
-        socketio.emit('minecraft_log', {'data': f'ERROR: {str(e)}'})
+    """Broadcast live Docker logs (one subscription, one emit per line for all clients)"""
+    subscription = get_log_hub(MC_LOG_SOURCE).subscribe()
+    for entry in subscription:
+        if entry.dropped:
+            socketio.emit('minecraft_log', {'data': f'... {entry.dropped} lines skipped (viewer lagging) ...'})
+        socketio.emit('minecraft_log', {'data': entry.line})
 
 def monitor_system():
-    """Monitor system resources and logs"""
-    while True:
-        try:
-            # Get system stats
-            cpu = subprocess.check_output(['top', '-bn1']).decode('utf-8').split('\n')[2]
-            memory = subprocess.check_output(['free', '-h']).decode('utf-8').split('\n')[1]
-            
-            socketio.emit('system_stats', {
-                'cpu': cpu,
-                'memory': memory,
-                'time': time.strftime('%Y-%m-%d %H:%M:%S')
-            })
-            
-            time.sleep(2)
-        except Exception as e:
-            socketio.emit('system_log', {'data': f'ERROR: {str(e)}'})
-            time.sleep(5)
+    """Push system stats to dashboards (only fields that changed since the last sample)"""
+    sampler = get_system_sampler(interval=2.0)
+    sampler.subscribe(lambda delta: socketio.emit('system_stats', delta))
 
 @app.route('/')
 def index():
     """Main dashboard page"""
     return render_template('index.html')
 
+@app.route('/metrics')
+def metrics():
+    """Prometheus scrape endpoint (host and container metrics)"""
+    return Response(get_system_sampler().prometheus(), mimetype='text/plain; version=0.0.4')
+
+@app.route('/api/metrics/history')
+def metrics_history():
+    """Structured samples from the sampler's ring buffer (?count=N or ?since=unix_time)"""
+    count = request.args.get('count', type=int)
+    since = request.args.get('since', type=float)
+    return jsonify(get_system_sampler().history(count=count, since=since))
+
 @app.route('/api/status')
 def status():
     """Get current server status"""
@@ -116,10 +115,16 @@ def status():
 def handle_connect():
     """Handle client connection"""
     print('Client connected')
-    socketio.emit('message', {'data': 'Connected to Titan Log Viewer'})
+    emit('message', {'data': 'Connected to Titan Log Viewer'})
     
-    # Start log streaming threads
-    threading.Thread(target=get_docker_logs, daemon=True).start()
+    # Full stats snapshot for this client; broadcasts after this are deltas
+    latest = get_system_sampler().latest()
+    if latest:
+        emit('system_stats', latest)
+    
+    # Recent lines from the hub's ring buffer, to this client only
+    for line in get_log_hub(MC_LOG_SOURCE).backlog(CONNECT_BACKLOG):
+        emit('minecraft_log', {'data': line})
 
 @socketio.on('disconnect')
 def handle_disconnect():
@@ -136,8 +141,15 @@ def handle_restart():
         socketio.emit('message', {'data': f'Restart failed: {str(e)}'})
 
 if __name__ == '__main__':
-    # Start system monitoring thread
-    threading.Thread(target=monitor_system, daemon=True).start()
+    # Start system monitoring (in-process sampler, no top/free subprocesses)
+    monitor_system()
+    
+    # Single log follower: broadcast to dashboards, serve AI bridges over the hub port
+    threading.Thread(target=get_docker_logs, daemon=True).start()
+    try:
+        LogHubServer([MC_LOG_SOURCE]).start()
+    except OSError as e:
+        print(f"⚠️ Log hub port unavailable ({e}), bridges will follow logs themselves")
     
     print("=" * 50)
     print("🚀 TITAN LOG VIEWER STARTING")
@@ -13,16 +13,17 @@ mkdir -p /opt/titan-logs
 cd /opt/titan-logs
 
 # Install dependencies
-pip3 install flask flask-socketio python-socketio eventlet
+pip3 install flask flask-socketio python-socketio eventlet psutil
 
 # Download files (you'll need to copy them)
 echo "✅ Dependencies installed"
 echo ""
 echo "📋 Next steps:"
-echo "1. Copy app.py to /opt/titan-logs/"
+echo "1. Copy app.py, ../log_hub.py and ../system_metrics.py to /opt/titan-logs/"
 echo "2. Create templates directory: mkdir -p /opt/titan-logs/templates"
 echo "3. Copy index.html to /opt/titan-logs/templates/"
-echo "4. Run: python3 /opt/titan-logs/app.py"
+echo "4. Run: MINECRAFT_LOG_SOURCE=docker:mc python3 /opt/titan-logs/app.py"
+echo "   (use the same MINECRAFT_LOG_SOURCE for the AI bridges so they share the hub)"
 echo ""
 echo "🌐 Access at: http://54.37.223.40:8080"
 
@@ -0,0 +1,568 @@
+#!/usr/bin/env python3
+"""
+Shared Log Fan-Out Hub
+One follower per log source, any number of subscribers
+
+Features:
+- One `docker logs -f` (or file follower) per source, however many viewers/bridges watch it
+- Ring buffer of recent lines: new subscribers get a backlog without re-reading the source
+- Per-subscriber bounded queues: a slow consumer drops its own oldest lines, never stalls the hub
+- Drop and lag accounting per subscriber (dropped lines, lines behind the hub)
+- Follower restarts with backoff when the source exits (container restart, file rotation)
+- TCP line protocol so separate processes (log viewer, AI bridges) share one follower
+- Sync and async client APIs; clients fall back to an in-process follower when no hub is running
+
+Usage:
+    hub = get_log_hub("docker:titan-hub")
+    sub = hub.subscribe(backlog=50)
+    for entry in sub:                                  # thread / blocking code
+        print(entry.line)
+
+    async for line in follow_logs_async("docker:titan-hub"):   # asyncio code (any process)
+        ...
+
+    python log_hub.py docker:titan-hub docker:mc       # standalone hub service
+"""
+
+import asyncio
+import json
+import os
+import socket
+import socketserver
+import subprocess
+import sys
+import threading
+import time
+from collections import deque
+from typing import AsyncIterator, Dict, Iterator, List, NamedTuple, Optional
+
+
+# Source the log viewer serves and the AI bridges follow (override both with MINECRAFT_LOG_SOURCE)
+DEFAULT_LOG_SOURCE = "docker:titan-hub"
+
+# Hub service address (log viewer or standalone hub listens, bridges connect)
+LOG_HUB_HOST = os.getenv("LOG_HUB_HOST", "127.0.0.1")
+LOG_HUB_PORT = int(os.getenv("LOG_HUB_PORT", 8765))
+
+# Lines kept per source for late subscribers
+DEFAULT_BACKLOG = 1000
+# Lines buffered per subscriber before its oldest are dropped
+DEFAULT_QUEUE_SIZE = 1000
+# Seconds between keepalive frames on idle TCP subscriptions (detects dead clients)
+HEARTBEAT_INTERVAL = 15.0
+# Follower restart backoff (seconds)
+RESTART_DELAY = 1.0
+MAX_RESTART_DELAY = 30.0
+
+
+class LogLine(NamedTuple):
+    seq: int          # position in the source's stream (monotonic per hub)
+    line: str         # without the trailing newline
+    dropped: int      # lines this subscriber lost just before this one
+
+
+class Subscription:
+    """
+    One consumer's bounded view of a hub
+
+    Usage:
+        sub = hub.subscribe()
+        entry = sub.get(timeout=1.0)        # None on timeout / close
+        entry = await sub.get_async()       # from an event loop
+        sub.close()
+    """
+
+    def __init__(self, hub: "LogHub", max_queue: int):
+        self.hub = hub
+        self.max_queue = max(1, max_queue)
+        self._queue: deque = deque()
+        self._cond = threading.Condition()
+        self._async_waiters: List = []
+        self._pending_drops = 0
+        self.closed = False
+
+        # Statistics
+        self.delivered = 0
+        self.dropped = 0
+        self.last_seq = 0
+
+    def _push(self, seq: int, line: str):
+        """Called by the hub's follower thread"""
+        with self._cond:
+            if self.closed:
+                return
+            if len(self._queue) >= self.max_queue:
+                self._queue.popleft()
+                self.dropped += 1
+                self._pending_drops += 1
+            self._queue.append((seq, line))
+            self._cond.notify()
+            waiters, self._async_waiters = self._async_waiters, []
+        for loop, future in waiters:
+            loop.call_soon_threadsafe(_wake, future)
+
+    def _pop(self) -> LogLine:
+        seq, line = self._queue.popleft()
+        dropped, self._pending_drops = self._pending_drops, 0
+        self.delivered += 1
+        self.last_seq = seq
+        return LogLine(seq, line, dropped)
+
+    def get(self, timeout: Optional[float] = None) -> Optional[LogLine]:
+        """
+        Next line (blocking)
+
+        Args:
+            timeout: Seconds to wait (None waits forever)
+
+        Returns:
+            LogLine, or None on timeout or when closed
+        """
+        with self._cond:
+            if not self._cond.wait_for(lambda: self._queue or self.closed, timeout):
+                return None
+            if not self._queue:
+                return None
+            return self._pop()
+
+    async def get_async(self, timeout: Optional[float] = None) -> Optional[LogLine]:
+        """Next line without blocking the event loop (None on timeout or close)"""
+        loop = asyncio.get_running_loop()
+        deadline = None if timeout is None else loop.time() + timeout
+        while True:
+            with self._cond:
+                if self._queue:
+                    return self._pop()
+                if self.closed:
+                    return None
+                future = loop.create_future()
+                self._async_waiters.append((loop, future))
+            remaining = None if deadline is None else deadline - loop.time()
+            if remaining is not None and remaining <= 0:
+                return None
+            try:
+                await asyncio.wait_for(future, remaining)
+            except asyncio.TimeoutError:
+                return None
+
+    def __iter__(self) -> Iterator[LogLine]:
+        while True:
+            entry = self.get()
+            if entry is None:
+                return
+            yield entry
+
+    async def __aiter__(self) -> AsyncIterator[LogLine]:
+        while True:
+            entry = await self.get_async()
+            if entry is None:
+                return
+            yield entry
+
+    @property
+    def lag(self) -> int:
+        """Lines published by the hub that this subscriber hasn't consumed yet"""
+        return max(0, self.hub.seq - self.last_seq)
+
+    def close(self):
+        """Unsubscribe and wake any waiting consumer"""
+        with self._cond:
+            self.closed = True
+            self._queue.clear()
+            self._cond.notify_all()
+            waiters, self._async_waiters = self._async_waiters, []
+        for loop, future in waiters:
+            loop.call_soon_threadsafe(_wake, future)
+        self.hub._unsubscribe(self)
+
+    def get_stats(self) -> Dict:
+        """Get subscriber statistics"""
+        return {
+            "delivered": self.delivered,
+            "dropped": self.dropped,
+            "queued": len(self._queue),
+            "lag": self.lag
+        }
+
+
+def _wake(future):
+    if not future.done():
+        future.set_result(None)
+
+
+class LogHub:
+    """
+    Follows one log source and fans lines out to subscribers
+
+    Sources:
+        docker:<container>     docker logs -f <container>
+        file:<path>            follow a file (handles truncation and rotation)
+    """
+
+    def __init__(self, source: str, backlog: int = DEFAULT_BACKLOG, max_queue: int = DEFAULT_QUEUE_SIZE):
+        """
+        Initialize hub (the follower starts on the first subscription)
+
+        Args:
+            source: Source spec (docker:<container> or file:<path>)
+            backlog: Recent lines kept for new subscribers
+            max_queue: Default per-subscriber queue size
+        """
+        kind, _, target = source.partition(":")
+        if kind not in ("docker", "file") or not target:
+            raise ValueError(f"Unknown log source: {source}")
+        self.source = source
+        self.kind = kind
+        self.target = target
+        self.max_queue = max_queue
+
+        self._ring: deque = deque(maxlen=backlog)
+        self._subscribers: List[Subscription] = []
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._process: Optional[subprocess.Popen] = None
+        self.seq = 0
+
+        # Statistics
+        self.stats = {
+            "lines": 0,
+            "restarts": 0,
+            "subscribers_total": 0
+        }
+
+    # ------------------------------------------------------------------
+    # Subscriptions
+    # ------------------------------------------------------------------
+
+    def subscribe(self, backlog: int = 0, max_queue: Optional[int] = None) -> Subscription:
+        """
+        Subscribe to the source
+
+        Args:
+            backlog: Recent lines to deliver first (from the ring buffer)
+            max_queue: Queue size for this subscriber (defaults to the hub's)
+
+        Returns:
+            Subscription
+        """
+        sub = Subscription(self, max_queue or self.max_queue)
+        with self._lock:
+            # Backlog and registration under one lock: no line is missed or duplicated
+            recent = list(self._ring)[-backlog:] if backlog > 0 else []
+            for seq, line in recent:
+                sub._push(seq, line)
+            sub.last_seq = recent[0][0] - 1 if recent else self.seq
+            self._subscribers.append(sub)
+            self.stats["subscribers_total"] += 1
+        self.start()
+        return sub
+
+    def _unsubscribe(self, sub: Subscription):
+        with self._lock:
+            if sub in self._subscribers:
+                self._subscribers.remove(sub)
+
+    def backlog(self, lines: int) -> List[str]:
+        """Most recent lines from the ring buffer"""
+        with self._lock:
+            return [line for _, line in list(self._ring)[-lines:]] if lines > 0 else []
+
+    def _publish(self, line: str):
+        with self._lock:
+            self.seq += 1
+            self._ring.append((self.seq, line))
+            self.stats["lines"] += 1
+            for sub in self._subscribers:
+                sub._push(self.seq, line)
+
+    # ------------------------------------------------------------------
+    # Follower
+    # ------------------------------------------------------------------
+
+    def start(self):
+        """Start the follower thread (idempotent)"""
+        with self._lock:
+            if self._thread and self._thread.is_alive():
+                return
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name=f"log-hub {self.source}", daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        delay = RESTART_DELAY
+        first = True
+        while not self._stop.is_set():
+            started = time.monotonic()
+            try:
+                if self.kind == "docker":
+                    self._follow_docker(first)
+                else:
+                    self._follow_file()
+            except Exception as e:
+                print(f"[ERROR] Log hub {self.source}: {e}")
+            first = False
+            if self._stop.is_set():
+                break
+
+            # Reset the backoff after a follower that ran for a while
+            delay = RESTART_DELAY if time.monotonic() - started > MAX_RESTART_DELAY else min(delay * 2, MAX_RESTART_DELAY)
+            self.stats["restarts"] += 1
+            self._stop.wait(delay)
+
+    def _follow_docker(self, first: bool):
+        # First start fills the ring buffer; restarts only pick up new lines
+        tail = str(self._ring.maxlen) if first else "0"
+        self._process = subprocess.Popen(
+            ['docker', 'logs', '-f', '--tail', tail, self.target],
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT,
+            encoding='utf-8',
+            errors='replace',
+            bufsize=1
+        )
+        try:
+            for line in self._process.stdout:
+                self._publish(line.rstrip("\r\n"))
+        finally:
+            if self._process.poll() is None:
+                self._process.kill()
+            self._process.wait()
+            self._process = None
+
+    def _follow_file(self, poll_interval: float = 0.25):
+        path = self.target
+        position = None
+        identity = None
+        partial = ""
+        while not self._stop.is_set():
+            try:
+                stat = os.stat(path)
+            except FileNotFoundError:
+                self._stop.wait(poll_interval)
+                continue
+
+            if identity != (stat.st_dev, stat.st_ino) or (position is not None and stat.st_size < position):
+                # New or rotated/truncated file: start from its beginning (end on the first open)
+                position = stat.st_size if identity is None else 0
+                identity = (stat.st_dev, stat.st_ino)
+                partial = ""
+
+            if stat.st_size > position:
+                with open(path, 'r', encoding='utf-8', errors='replace', newline='') as f:
+                    f.seek(position)
+                    data = f.read()
+                    position = f.tell()
+                lines = (partial + data).split("\n")
+                partial = lines.pop()
+                for line in lines:
+                    self._publish(line.rstrip("\r"))
+            else:
+                self._stop.wait(poll_interval)
+
+    def stop(self):
+        """Stop the follower and close all subscriptions"""
+        self._stop.set()
+        process = self._process
+        if process and process.poll() is None:
+            process.kill()
+        for sub in list(self._subscribers):
+            sub.close()
+
+    def get_stats(self) -> Dict:
+        """Get hub statistics"""
+        with self._lock:
+            subscribers = [sub.get_stats() for sub in self._subscribers]
+        return {
+            **self.stats,
+            "source": self.source,
+            "seq": self.seq,
+            "backlog": len(self._ring),
+            "subscribers": len(subscribers),
+            "dropped": sum(s["dropped"] for s in subscribers),
+            "max_lag": max((s["lag"] for s in subscribers), default=0)
+        }
+
+
+# One hub per source per process
+_hubs: Dict[str, LogHub] = {}
+_hubs_lock = threading.Lock()
+
+
+def get_log_hub(source: str, backlog: int = DEFAULT_BACKLOG) -> LogHub:
+    """Get the process-wide hub for a source"""
+    with _hubs_lock:
+        hub = _hubs.get(source)
+        if hub is None:
+            hub = _hubs[source] = LogHub(source, backlog=backlog)
+        return hub
+
+
+# ----------------------------------------------------------------------
+# Hub service (cross-process fan-out)
+# ----------------------------------------------------------------------
+
+class _SubscriberHandler(socketserver.StreamRequestHandler):
+    """
+    Protocol (newline-delimited JSON):
+        client -> {"source": "docker:mc", "backlog": 50, "max_queue": 1000}
+        server -> {"seq": 1, "line": "...", "dropped": 0}   per line
+        server -> {}                                         keepalive
+    """
+
+    def handle(self):
+        try:
+            request = json.loads(self.rfile.readline() or b"{}")
+            source = request["source"]
+        except (ValueError, KeyError):
+            return
+        if source not in self.server.sources:
+            self.wfile.write(json.dumps({"error": f"source not served: {source}"}).encode() + b"\n")
+            return
+
+        sub = get_log_hub(source).subscribe(
+            backlog=int(request.get("backlog", 0)),
+            max_queue=int(request.get("max_queue", DEFAULT_QUEUE_SIZE))
+        )
+        try:
+            while not sub.closed:
+                entry = sub.get(timeout=HEARTBEAT_INTERVAL)
+                frame = {} if entry is None else {"seq": entry.seq, "line": entry.line, "dropped": entry.dropped}
+                self.wfile.write(json.dumps(frame).encode() + b"\n")
+                self.wfile.flush()
+        except OSError:
+            pass  # client went away
+        finally:
+            sub.close()
+
+
+class LogHubServer(socketserver.ThreadingTCPServer):
+    """
+    Serves hubs to other processes
+
+    Usage:
+        server = LogHubServer(["docker:mc"])
+        server.start()          # background thread
+    """
+
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, sources: List[str], host: str = LOG_HUB_HOST, port: int = LOG_HUB_PORT):
+        """
+        Initialize server
+
+        Args:
+            sources: Source specs clients may subscribe to
+            host: Bind address (keep on localhost unless behind a firewall)
+            port: TCP port
+        """
+        self.sources = set(sources)
+        for source in self.sources:
+            get_log_hub(source).start()
+        super().__init__((host, port), _SubscriberHandler)
+
+    def start(self) -> threading.Thread:
+        """Serve in a background thread"""
+        thread = threading.Thread(target=self.serve_forever, name="log-hub-server", daemon=True)
+        thread.start()
+        return thread
+
+
+# ----------------------------------------------------------------------
+# Clients
+# ----------------------------------------------------------------------
+
+def _subscribe_request(source: str, backlog: int) -> bytes:
+    return json.dumps({"source": source, "backlog": backlog}).encode() + b"\n"
+
+
+def follow_logs(source: str, backlog: int = 0, host: str = LOG_HUB_HOST, port: int = LOG_HUB_PORT) -> Iterator[str]:
+    """
+    Lines from a source via the shared hub (blocking generator)
+
+    Falls back to an in-process follower when no hub service is listening
+    or the hub does not serve this source.
+    """
+    while True:
+        try:
+            conn = socket.create_connection((host, port), timeout=5)
+        except OSError:
+            print(f"[!] No log hub at {host}:{port}, following {source} locally")
+            break
+
+        error = None
+        with conn:
+            conn.settimeout(HEARTBEAT_INTERVAL * 3)
+            conn.sendall(_subscribe_request(source, backlog))
+            try:
+                for raw in conn.makefile('rb'):
+                    frame = json.loads(raw)
+                    if "error" in frame:
+                        error = frame["error"]
+                        break
+                    if "line" in frame:
+                        backlog = 0  # don't replay history after a reconnect
+                        yield frame["line"]
+            except OSError:
+                pass
+        if error is not None:
+            print(f"[!] Log hub at {host}:{port}: {error}, following {source} locally")
+            break
+        time.sleep(RESTART_DELAY)
+
+    for entry in get_log_hub(source).subscribe(backlog=backlog):
+        yield entry.line
+
+
+async def follow_logs_async(source: str, backlog: int = 0, host: str = LOG_HUB_HOST,
+                            port: int = LOG_HUB_PORT) -> AsyncIterator[str]:
+    """
+    Lines from a source via the shared hub (async generator)
+
+    Falls back to an in-process follower when no hub service is listening
+    or the hub does not serve this source.
+    """
+    while True:
+        try:
+            reader, writer = await asyncio.open_connection(host, port, limit=1024 * 1024)
+        except OSError:
+            print(f"[!] No log hub at {host}:{port}, following {source} locally")
+            break
+
+        error = None
+        try:
+            writer.write(_subscribe_request(source, backlog))
+            await writer.drain()
+            while True:
+                raw = await asyncio.wait_for(reader.readline(), HEARTBEAT_INTERVAL * 3)
+                if not raw:
+                    break
+                frame = json.loads(raw)
+                if "error" in frame:
+                    error = frame["error"]
+                    break
+                if "line" in frame:
+                    backlog = 0
+                    yield frame["line"]
+        except (OSError, asyncio.TimeoutError):
+            pass
+        finally:
+            writer.close()
+        if error is not None:
+            print(f"[!] Log hub at {host}:{port}: {error}, following {source} locally")
+            break
+        await asyncio.sleep(RESTART_DELAY)
+
+    async for entry in get_log_hub(source).subscribe(backlog=backlog):
+        yield entry.line
+
+
+if __name__ == "__main__":
+    sources = sys.argv[1:] or [os.getenv("MINECRAFT_LOG_SOURCE", DEFAULT_LOG_SOURCE)]
+    server = LogHubServer(sources)
+    print(f"[OK] Log hub serving {', '.join(sources)} on {LOG_HUB_HOST}:{LOG_HUB_PORT}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\n[OK] Log hub stopped")
@@ -11,17 +11,37 @@ Built with First Principles:
 """
 
 from fastapi import FastAPI, HTTPException, Request
-from fastapi.responses import FileResponse, StreamingResponse
+from fastapi.responses import FileResponse, StreamingResponse, Response
 from fastapi.middleware.cors import CORSMiddleware
 from pathlib import Path
 import json
+import gzip
 import hashlib
-from typing import List, Dict
+import re
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Optional
+from pydantic import BaseModel
 import uvicorn
 import aiofiles
 import asyncio
 from datetime import datetime
 
+# Optional compressors (manifest is always available as gzip)
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+from mod_checksum_index import ChecksumIndex, sha256_file
+from mod_manifest_history import ManifestHistory
+from mod_chunk_store import ChunkStore
+
 app = FastAPI(
     title="Titan Mod Sync API", 
     version="2.0.0",
@@ -47,38 +67,181 @@ MC_VERSION = "1.21.1"
 MODS_DIR.mkdir(exist_ok=True)
 PACKAGES_DIR.mkdir(exist_ok=True)
 
+# Persistent checksum indexes - files are only re-hashed when
+# (size, mtime_ns, inode) changes, and the watcher marks them dirty
+mod_index = ChecksumIndex(MODS_DIR, "*.jar")
+package_index = ChecksumIndex(PACKAGES_DIR, "*.zip")
+
+# Version history of the mod list - powers /api/mods/manifest/diff
+manifest_history = ManifestHistory(MODS_DIR / ".manifest-history.json")
+
+# Content-addressed chunks shared by mods and packages (block-level deltas)
+chunk_store = ChunkStore(MODS_DIR / ".chunks")
+# Background sweep: one pass at a time (the store keeps GC clear of in-flight chunking)
+chunk_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="chunker")
+# On-demand chunk lists don't queue behind the sweep
+chunk_request_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="chunk-request")
+CHUNK_HASH_RE = re.compile(r"^[0-9a-f]{64}$")
+MAX_BATCH_CHUNKS = 256
+
+class ChunkBatchRequest(BaseModel):
+    """Chunk hashes to fetch in one response (concatenated in request order)"""
+    hashes: List[str]
+
 def calculate_checksum(file_path: Path) -> str:
-    """Calculate SHA256 checksum of a file"""
-    sha256 = hashlib.sha256()
-    with open(file_path, 'rb') as f:
-        for chunk in iter(lambda: f.read(4096), b""):
-            sha256.update(chunk)
-    return sha256.hexdigest()
+    """Calculate SHA256 checksum of a file (uses the index when possible)"""
+    for index in (mod_index, package_index):
+        if index.tracks(file_path):
+            entry = index.get(file_path.name)
+            if entry:
+                return entry["sha256"]
+    return sha256_file(file_path)
 
 def scan_mods() -> List[Dict]:
-    """Scan mods directory and generate manifest"""
+    """Build mod list from the checksum index (no hashing unless files changed)"""
     mods = []
     
-    for mod_file in MODS_DIR.glob("*.jar"):
+    for entry in mod_index.entries():
         # Parse mod filename (usually: modname-version.jar)
-        name = mod_file.stem
-        
-        # Calculate checksum
-        checksum = calculate_checksum(mod_file)
-        size = mod_file.stat().st_size
+        name = Path(entry["file"]).stem
         
         mods.append({
             "id": name.lower().replace(" ", "-"),
             "name": name,
-            "file": mod_file.name,
-            "url": f"/api/mods/download/{mod_file.name}",
-            "checksum": f"sha256:{checksum}",
-            "size": size,
+            "file": entry["file"],
+            "url": f"/api/mods/download/{entry['file']}",
+            "checksum": f"sha256:{entry['sha256']}",
+            "size": entry["size"],
             "required": True
         })
     
     return mods
 
+def build_manifest() -> Dict:
+    """Build the manifest dict served to clients (records a new version on change)"""
+    mods = scan_mods()
+    
+    return {
+        "version": manifest_history.record(mods),
+        "server": {
+            "name": "Titan Server",
+            "address": "localhost:25565",
+            "version": MC_VERSION
+        },
+        "forge": {
+            "version": FORGE_VERSION,
+            "required": True
+        },
+        "mods": mods,
+        "total_size": sum(m["size"] for m in mods),
+        "mod_count": len(mods)
+    }
+
+# Pre-rendered manifest: encoded once per content change, served as bytes
+_manifest_lock = threading.Lock()
+_rendered_manifest: Optional[Dict] = None
+
+def render_manifest(index: Optional[ChecksumIndex] = None) -> Dict:
+    """
+    Encode the manifest to JSON bytes plus compressed variants and a strong ETag.
+    Called from the checksum index listener, so the request path only reads bytes.
+    
+    Returns:
+        {"index_version", "etag", "identity", "gzip", "br", "zstd"}
+    """
+    global _rendered_manifest
+    
+    with _manifest_lock:
+        index_version = mod_index.version
+        if _rendered_manifest and _rendered_manifest["index_version"] == index_version:
+            return _rendered_manifest
+        
+        body = json.dumps(build_manifest(), separators=(",", ":")).encode("utf-8")
+        rendered = {
+            "index_version": index_version,
+            "etag": f'"{hashlib.sha256(body).hexdigest()[:32]}"',
+            "identity": body,
+            "gzip": gzip.compress(body, compresslevel=9, mtime=0),
+            "br": brotli.compress(body, quality=11) if brotli else None,
+            "zstd": zstandard.ZstdCompressor(level=19).compress(body) if zstandard else None
+        }
+        _rendered_manifest = rendered
+        return rendered
+
+async def current_manifest() -> Dict:
+    """
+    Rendered manifest for request handlers.
+    Usually pre-rendered by the index listener; if the index moved on since,
+    the encode (brotli 11 / zstd 19) runs in a worker thread, not on the event loop.
+    """
+    rendered = _rendered_manifest
+    if rendered and rendered["index_version"] == mod_index.version:
+        return rendered
+    loop = asyncio.get_event_loop()
+    return await loop.run_in_executor(None, render_manifest)
+
+def _pick_encoding(accept_encoding: str, rendered: Dict) -> str:
+    """Choose the smallest encoding the client accepts"""
+    accepted = set()
+    for part in accept_encoding.split(","):
+        name, _, params = part.partition(";")
+        try:
+            quality = float(params.strip()[2:]) if params.strip().startswith("q=") else 1.0
+        except ValueError:
+            quality = 1.0
+        if name.strip() and quality > 0:
+            accepted.add(name.strip().lower())
+    for encoding in ("zstd", "br", "gzip"):
+        if encoding in accepted and rendered[encoding] is not None:
+            return encoding
+    return "identity"
+
+def _etag_matches(if_none_match: str, etag: str) -> bool:
+    """Check an If-None-Match header against the current ETag"""
+    if if_none_match.strip() == "*":
+        return True
+    candidates = [tag.strip() for tag in if_none_match.split(",")]
+    return etag in candidates or f"W/{etag}" in candidates
+
+def _chunk_all_files():
+    """Chunk every served file (cached per checksum) and drop unreferenced chunks"""
+    for index in (mod_index, package_index):
+        for entry in index.entries():
+            try:
+                chunk_store.chunk_file(index.directory / entry["file"], entry["sha256"])
+            except OSError as e:
+                print(f"[!] Chunking failed for {entry['file']}: {e}")
+    # Files served now, including any chunked on demand during the sweep
+    live = [entry["sha256"] for index in (mod_index, package_index) for entry in index.entries()]
+    chunk_store.collect_garbage(live)
+
+def schedule_chunking(index: Optional[ChecksumIndex] = None):
+    """Queue background chunking after the file set changes"""
+    chunk_executor.submit(_chunk_all_files)
+
+mod_index.add_listener(render_manifest)
+mod_index.add_listener(schedule_chunking)
+package_index.add_listener(schedule_chunking)
+
+@app.on_event("startup")
+async def startup_event():
+    """Warm checksum indexes and start watching for file changes"""
+    loop = asyncio.get_event_loop()
+    for index in (mod_index, package_index):
+        # Initial hash of new/changed files runs off the event loop
+        await loop.run_in_executor(None, index.refresh)
+        index.start_watching()
+    await loop.run_in_executor(None, render_manifest)
+    schedule_chunking()
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Stop file watchers and the chunking workers"""
+    for index in (mod_index, package_index):
+        index.stop_watching()
+    chunk_executor.shutdown(wait=False, cancel_futures=True)
+    chunk_request_executor.shutdown(wait=False, cancel_futures=True)
+
 @app.get("/")
 async def root():
     """API root endpoint"""
@@ -87,36 +250,58 @@ async def root():
         "version": "1.0.0",
         "endpoints": {
             "manifest": "/api/mods/manifest",
+            "manifest_diff": "/api/mods/manifest/diff?since={version}",
+            "chunks": "/api/mods/chunks/{filename}",
             "download": "/api/mods/download/{filename}"
         }
     }
 
 @app.get("/api/mods/manifest")
-async def get_mod_manifest():
+async def get_mod_manifest(request: Request):
     """
-    Get list of all required mods for the server
+    Get list of all required mods for the server.
+    Served from pre-encoded bytes with a strong ETag - clients polling with
+    If-None-Match get an empty 304 when the modpack hasn't changed.
     
     Returns:
         JSON manifest with mod information
     """
-    mods = scan_mods()
-    
-    manifest = {
-        "server": {
-            "name": "Titan Server",
-            "address": "localhost:25565",
-            "version": MC_VERSION
-        },
-        "forge": {
-            "version": FORGE_VERSION,
-            "required": True
-        },
-        "mods": mods,
-        "total_size": sum(m["size"] for m in mods),
-        "mod_count": len(mods)
+    rendered = await current_manifest()
+    headers = {
+        "ETag": rendered["etag"],
+        "Cache-Control": "no-cache",
+        "Vary": "Accept-Encoding"
     }
     
-    return manifest
+    if _etag_matches(request.headers.get("if-none-match", ""), rendered["etag"]):
+        return Response(status_code=304, headers=headers)
+    
+    encoding = _pick_encoding(request.headers.get("accept-encoding", ""), rendered)
+    if encoding != "identity":
+        headers["Content-Encoding"] = encoding
+    
+    return Response(
+        content=rendered[encoding],
+        media_type="application/json",
+        headers=headers
+    )
+
+@app.get("/api/mods/manifest/diff")
+async def get_mod_manifest_diff(since: int):
+    """
+    Get only what changed since a manifest version the client already has.
+    A one-mod update costs a few hundred bytes instead of the full manifest.
+    
+    Args:
+        since: Manifest "version" the client last synced
+    
+    Returns:
+        Added/changed mod entries and removed filenames.
+        If "reset" is true the version is unknown and "added" holds the full list.
+    """
+    # Make sure history reflects the current mod set
+    await current_manifest()
+    return manifest_history.diff(since)
 
 @app.get("/api/mods/download/{filename}")
 async def download_mod(filename: str, request: Request):
@@ -163,7 +348,10 @@ async def health_check():
         "total_size_mb": round(total_size / 1024 / 1024, 2),
         "mods_directory": str(MODS_DIR.absolute()),
         "supports_parallel": True,
-        "supports_resume": True
+        "supports_resume": True,
+        "checksum_index": mod_index.get_stats(),
+        "manifest_history": manifest_history.get_stats(),
+        "chunk_store": chunk_store.get_stats()
     }
 
 @app.get("/api/mods/verify/{filename}")
@@ -191,6 +379,81 @@ async def verify_mod(filename: str, checksum: str):
     else:
         return {"valid": False, "reason": "checksum_mismatch", "expected": checksum, "actual": actual_checksum}
 
+async def _chunk_list_response(index: ChecksumIndex, filename: str) -> Dict:
+    """Chunk list of a served file (chunked on demand if the worker hasn't reached it)"""
+    entry = index.get(filename)
+    if entry is None:
+        raise HTTPException(status_code=404, detail=f"File '{filename}' not found")
+    
+    chunks = chunk_store.get_chunk_list(entry["sha256"])
+    if chunks is None:
+        loop = asyncio.get_event_loop()
+        chunks = await loop.run_in_executor(
+            chunk_request_executor, chunk_store.chunk_file, index.directory / filename, entry["sha256"]
+        )
+    
+    return {
+        "file": filename,
+        "checksum": f"sha256:{entry['sha256']}",
+        "size": entry["size"],
+        "chunks": chunks
+    }
+
+@app.get("/api/mods/chunks/{filename}")
+async def get_mod_chunks(filename: str):
+    """
+    Get the content-defined chunk list of a mod.
+    Clients that kept the chunk list of their previous version reuse matching
+    chunks from the local file and fetch only the missing ones.
+    
+    Args:
+        filename: Name of the mod JAR file
+    
+    Returns:
+        {"file", "checksum", "size", "chunks": [{"hash", "offset", "size"}]}
+    """
+    return await _chunk_list_response(mod_index, filename)
+
+@app.get("/api/packages/chunks/{filename}")
+async def get_package_chunks(filename: str):
+    """Get the content-defined chunk list of a package (see /api/mods/chunks)"""
+    return await _chunk_list_response(package_index, filename)
+
+@app.get("/api/chunks/{chunk_hash}")
+async def download_chunk(chunk_hash: str):
+    """
+    Download a single chunk by its SHA256.
+    Chunks are immutable, so they are cacheable forever.
+    """
+    if not CHUNK_HASH_RE.match(chunk_hash) or not chunk_store.has(chunk_hash):
+        raise HTTPException(status_code=404, detail=f"Chunk '{chunk_hash}' not found")
+    
+    return FileResponse(
+        path=chunk_store.object_path(chunk_hash),
+        media_type="application/octet-stream",
+        headers={"Cache-Control": "public, max-age=31536000, immutable"}
+    )
+
+@app.post("/api/chunks/batch")
+async def download_chunk_batch(batch: ChunkBatchRequest):
+    """
+    Download many chunks in one response - chunk bytes are concatenated in
+    request order; clients split them using sizes from the chunk list.
+    """
+    if len(batch.hashes) > MAX_BATCH_CHUNKS:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_BATCH_CHUNKS} chunks per batch")
+    
+    for chunk_hash in batch.hashes:
+        if not CHUNK_HASH_RE.match(chunk_hash) or not chunk_store.has(chunk_hash):
+            raise HTTPException(status_code=404, detail=f"Chunk '{chunk_hash}' not found")
+    
+    async def stream_chunks():
+        for chunk_hash in batch.hashes:
+            async with aiofiles.open(chunk_store.object_path(chunk_hash), 'rb') as f:
+                yield await f.read()
+    
+    return StreamingResponse(stream_chunks(), media_type="application/octet-stream")
+
 @app.get("/api/packages/list")
 async def list_packages():
     """
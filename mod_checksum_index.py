@@ -0,0 +1,314 @@
+#!/usr/bin/env python3
+"""
+Persistent Checksum Index for the Mod Sync Server
+Hash every file once, then serve checksums from memory
+
+Features:
+- Entries keyed by (path, size, mtime_ns, inode) - unchanged files are never re-hashed
+- Index persisted to disk so restarts don't re-hash a 1-2 GB modpack
+- Filesystem watcher (watchdog) marks the index dirty on change
+- Polling fallback when watchdog is not installed
+- Version counter + change callbacks for manifest caching
+"""
+
+import hashlib
+import json
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+try:
+    from watchdog.observers import Observer
+    from watchdog.events import FileSystemEventHandler
+    WATCHDOG_AVAILABLE = True
+except ImportError:
+    Observer = None
+    FileSystemEventHandler = object
+    WATCHDOG_AVAILABLE = False
+
+
+# Read 1 MiB at a time - far fewer syscalls than 4 KiB reads on large JARs
+HASH_CHUNK_SIZE = 1024 * 1024
+
+# Bump when the on-disk index layout changes
+INDEX_FORMAT_VERSION = 1
+
+
+def sha256_file(file_path: Path) -> str:
+    """Calculate SHA256 checksum of a file"""
+    sha256 = hashlib.sha256()
+    with open(file_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b""):
+            sha256.update(chunk)
+    return sha256.hexdigest()
+
+
+class _DirtyHandler(FileSystemEventHandler):
+    """Watchdog handler that marks the owning index dirty on any change"""
+
+    def __init__(self, index: "ChecksumIndex"):
+        super().__init__()
+        self.index = index
+
+    def on_any_event(self, event):
+        if event.is_directory:
+            return
+        paths = [getattr(event, "src_path", ""), getattr(event, "dest_path", "")]
+        if any(self.index.tracks(Path(p)) for p in paths if p):
+            self.index.invalidate()
+
+
+class ChecksumIndex:
+    """
+    Persistent checksum index for one directory
+
+    Usage:
+        index = ChecksumIndex(Path("server-mods"), "*.jar")
+        index.start_watching()
+        for entry in index.entries():
+            print(entry["file"], entry["sha256"])
+    """
+
+    def __init__(
+        self,
+        directory: Path,
+        pattern: str = "*",
+        index_file: Optional[Path] = None,
+        poll_interval: float = 5.0,
+        debounce: float = 0.5
+    ):
+        """
+        Initialize checksum index
+
+        Args:
+            directory: Directory whose files are indexed
+            pattern: Glob pattern of files to index (e.g. "*.jar")
+            index_file: Where the index is persisted (default: <directory>/.checksum-index.json)
+            poll_interval: Seconds between rescans when watchdog is unavailable
+            debounce: Seconds to wait after a change event before rescanning
+        """
+        self.directory = Path(directory)
+        self.pattern = pattern
+        self.index_file = Path(index_file) if index_file else self.directory / ".checksum-index.json"
+        self.poll_interval = poll_interval
+        self.debounce = debounce
+
+        # filename -> {"size", "mtime_ns", "inode", "sha256"}
+        self._files: Dict[str, Dict] = {}
+        self._entries: List[Dict] = []
+        self._dirty = True
+        self._lock = threading.RLock()
+
+        # Incremented whenever the set of files or any checksum changes
+        self.version = 0
+        self._listeners: List[Callable[["ChecksumIndex"], None]] = []
+
+        self._observer = None
+        self._refresh_thread: Optional[threading.Thread] = None
+        self._stop_event = threading.Event()
+        self._wake_event = threading.Event()
+
+        # Statistics
+        self.stats = {
+            "files_hashed": 0,
+            "bytes_hashed": 0,
+            "refreshes": 0,
+            "last_refresh_time": 0.0
+        }
+
+        self._load()
+
+    # ------------------------------------------------------------------
+    # Persistence
+    # ------------------------------------------------------------------
+
+    def _load(self):
+        """Load persisted index from disk (ignored if missing or corrupt)"""
+        try:
+            with open(self.index_file, 'r') as f:
+                data = json.load(f)
+            if data.get("format") == INDEX_FORMAT_VERSION:
+                self._files = data.get("files", {})
+        except (OSError, ValueError):
+            self._files = {}
+
+    def _save(self):
+        """Persist index to disk atomically (write temp file, then rename)"""
+        tmp_file = self.index_file.with_name(self.index_file.name + ".tmp")
+        try:
+            with open(tmp_file, 'w') as f:
+                json.dump({"format": INDEX_FORMAT_VERSION, "files": self._files}, f)
+            os.replace(tmp_file, self.index_file)
+        except OSError as e:
+            print(f"[!] Could not save checksum index: {e}")
+
+    # ------------------------------------------------------------------
+    # Indexing
+    # ------------------------------------------------------------------
+
+    def tracks(self, path: Path) -> bool:
+        """Check whether a path belongs to this index"""
+        return path.parent.resolve() == self.directory.resolve() and path.match(self.pattern)
+
+    def refresh(self, force: bool = False) -> bool:
+        """
+        Re-stat the directory and re-hash only files whose key changed
+
+        Args:
+            force: Rescan even if the index is not marked dirty
+
+        Returns:
+            True if anything changed
+        """
+        with self._lock:
+            if not (self._dirty or force):
+                return False
+
+            # Clear the flag first so events arriving mid-scan trigger another pass
+            self._dirty = False
+            start_time = time.time()
+            files: Dict[str, Dict] = {}
+            changed = False
+
+            for file_path in sorted(self.directory.glob(self.pattern)):
+                try:
+                    st = file_path.stat()
+                except OSError:
+                    continue  # Removed between glob and stat
+                if not file_path.is_file():
+                    continue
+
+                key = {"size": st.st_size, "mtime_ns": st.st_mtime_ns, "inode": st.st_ino}
+                cached = self._files.get(file_path.name)
+
+                if cached and all(cached.get(k) == v for k, v in key.items()):
+                    files[file_path.name] = cached
+                    continue
+
+                try:
+                    checksum = sha256_file(file_path)
+                except OSError:
+                    continue
+                files[file_path.name] = {**key, "sha256": checksum}
+                self.stats["files_hashed"] += 1
+                self.stats["bytes_hashed"] += st.st_size
+                changed = True
+
+            if set(files) != set(self._files):
+                changed = True
+
+            self._files = files
+            self.stats["refreshes"] += 1
+            self.stats["last_refresh_time"] = time.time() - start_time
+
+            if changed or not self._entries:
+                self._entries = [
+                    {"file": name, "size": info["size"], "sha256": info["sha256"]}
+                    for name, info in files.items()
+                ]
+            if changed:
+                self.version += 1
+                self._save()
+
+        if changed:
+            self._notify()
+        return changed
+
+    def invalidate(self):
+        """Mark the index dirty - rescanned by the watcher thread or the next read"""
+        self._dirty = True
+        self._wake_event.set()
+
+    def _refresh_if_unwatched(self):
+        """Refresh inline only when no watcher thread is keeping the index current"""
+        if self._dirty and not self._refresh_thread:
+            self.refresh()
+
+    def entries(self) -> List[Dict]:
+        """
+        Get indexed files (served from memory)
+
+        Returns:
+            List of {"file", "size", "sha256"} dicts sorted by filename
+        """
+        self._refresh_if_unwatched()
+        return self._entries
+
+    def get(self, filename: str) -> Optional[Dict]:
+        """Get index entry for a single file (None if not indexed)"""
+        self._refresh_if_unwatched()
+        info = self._files.get(filename)
+        if info is None:
+            return None
+        return {"file": filename, "size": info["size"], "sha256": info["sha256"]}
+
+    # ------------------------------------------------------------------
+    # Change notification
+    # ------------------------------------------------------------------
+
+    def add_listener(self, callback: Callable[["ChecksumIndex"], None]):
+        """Register a callback invoked after the index content changes"""
+        self._listeners.append(callback)
+
+    def _notify(self):
+        for callback in list(self._listeners):
+            try:
+                callback(self)
+            except Exception as e:
+                print(f"[!] Checksum index listener failed: {e}")
+
+    # ------------------------------------------------------------------
+    # Watching
+    # ------------------------------------------------------------------
+
+    def start_watching(self):
+        """Start watching the directory (watchdog, or polling fallback)"""
+        if self._refresh_thread:
+            return
+
+        self._stop_event.clear()
+
+        if WATCHDOG_AVAILABLE:
+            self._observer = Observer()
+            self._observer.schedule(_DirtyHandler(self), str(self.directory), recursive=False)
+            self._observer.daemon = True
+            self._observer.start()
+
+        # Rescans happen here, so request handlers only ever read memory
+        self._refresh_thread = threading.Thread(target=self._refresh_loop, daemon=True)
+        self._refresh_thread.start()
+
+    def stop_watching(self):
+        """Stop the directory watcher"""
+        self._stop_event.set()
+        self._wake_event.set()
+        if self._observer:
+            self._observer.stop()
+            self._observer.join(timeout=2)
+            self._observer = None
+        if self._refresh_thread:
+            self._refresh_thread.join(timeout=2)
+            self._refresh_thread = None
+
+    def _refresh_loop(self):
+        """Background rescan: on watcher events (debounced) or on a polling interval"""
+        while not self._stop_event.is_set():
+            woke = self._wake_event.wait(None if self._observer else self.poll_interval)
+            if self._stop_event.is_set():
+                break
+            if woke:
+                # Let bursts of events (copy in progress, multi-file upload) settle
+                time.sleep(self.debounce)
+            self._wake_event.clear()
+            self.refresh(force=not self._observer)
+
+    def get_stats(self) -> Dict:
+        """Get index statistics"""
+        return {
+            **self.stats,
+            "files_indexed": len(self._files),
+            "version": self.version,
+            "watcher": "watchdog" if self._observer else ("polling" if self._refresh_thread else "none")
+        }
@@ -0,0 +1,305 @@
+#!/usr/bin/env python3
+"""
+Content-Addressed Chunk Store for the Mod Sync Server
+Block-level delta downloads: clients fetch only the chunks they don't have
+
+Features:
+- Content-defined chunking with a gear rolling hash (boundaries survive inserts/deletes)
+- Boundary scan vectorized with numpy when installed (same boundaries as the pure-Python loop)
+- Chunks stored once by SHA256 (identical chunks across files/versions are shared)
+- Per-file chunk lists cached by file checksum - a file is chunked only once
+- Garbage collection of chunks no longer referenced (waits for in-flight chunking)
+
+JARs and ZIPs compress each entry independently, so an update that touches a few
+classes leaves most compressed entries byte-identical - those chunks are reused.
+"""
+
+import hashlib
+import json
+import mmap
+import os
+import random
+import threading
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    np = None
+    NUMPY_AVAILABLE = False
+
+
+# Chunk size bounds (average ~64 KiB)
+MIN_CHUNK_SIZE = 16 * 1024
+MAX_CHUNK_SIZE = 256 * 1024
+AVG_CHUNK_BITS = 16
+
+# Bump when chunking parameters change - old chunk lists are then ignored
+CHUNKER_VERSION = 1
+
+_HASH_MASK = (1 << 64) - 1
+# Gear hash shifts left, so the high bits depend on the last 64 bytes - test those
+_BOUNDARY_MASK = ((1 << AVG_CHUNK_BITS) - 1) << (64 - AVG_CHUNK_BITS)
+# Fixed seed: every server must produce the same boundaries for the same bytes
+_GEAR = [random.Random(0x54495441 + i).getrandbits(64) for i in range(256)]
+# Bytes that fully determine the hash (older ones are shifted out of the 64 bits)
+_WINDOW = 64
+# Bytes scanned per vectorized pass (the hash array takes 8x this)
+SCAN_BLOCK_SIZE = 4 * 1024 * 1024
+
+
+def _boundary_candidates(data) -> "np.ndarray":
+    """
+    Positions where the hash of the 64 bytes ending there hits the boundary mask
+
+    The gear hash of a window is sum(gear[byte] << age), so it is built by
+    doubling the window six times instead of one Python step per byte.
+
+    Args:
+        data: bytes, bytearray, memoryview or mmap
+
+    Returns:
+        Sorted array of byte positions (a boundary falls right after each)
+    """
+    gear = np.array(_GEAR, dtype=np.uint64)
+    boundary_mask = np.uint64(_BOUNDARY_MASK)
+    found = []
+
+    for start in range(0, len(data), SCAN_BLOCK_SIZE):
+        # Re-read the previous 63 bytes so windows span block edges
+        lo = max(0, start - (_WINDOW - 1))
+        h = gear[np.frombuffer(data[lo:start + SCAN_BLOCK_SIZE], dtype=np.uint8)]
+        span = 1
+        while span < _WINDOW:
+            h[span:] += h[:-span] << np.uint64(span)
+            span *= 2
+        hits = np.flatnonzero((h[start - lo:] & boundary_mask) == 0)
+        found.append(hits + start)
+
+    return np.concatenate(found) if found else np.empty(0, dtype=np.int64)
+
+
+def chunk_boundaries(data) -> List[tuple]:
+    """
+    Split data into content-defined chunks
+
+    Args:
+        data: bytes, bytearray, memoryview or mmap
+
+    Returns:
+        List of (offset, length) tuples covering the data
+    """
+    gear = _GEAR
+    boundary_mask = _BOUNDARY_MASK
+    hash_mask = _HASH_MASK
+    size = len(data)
+    candidates = _boundary_candidates(data) if NUMPY_AVAILABLE else None
+    boundaries = []
+    pos = 0
+
+    while pos < size:
+        end = min(pos + MAX_CHUNK_SIZE, size)
+        i = pos + MIN_CHUNK_SIZE
+        cut = end
+
+        # No boundary is allowed inside the first MIN_CHUNK_SIZE bytes - skip them.
+        # The hash restarts there, so its first 63 bytes see a partial window:
+        # hash those directly, then the full-window candidates apply.
+        scalar_end = end if candidates is None else min(end, i + _WINDOW - 1)
+        h = 0
+        while i < scalar_end:
+            h = ((h << 1) + gear[data[i]]) & hash_mask
+            i += 1
+            if not h & boundary_mask:
+                cut = i
+                break
+        else:
+            if i < end:
+                k = int(np.searchsorted(candidates, i))
+                if k < len(candidates) and candidates[k] < end:
+                    cut = int(candidates[k]) + 1
+
+        boundaries.append((pos, cut - pos))
+        pos = cut
+
+    return boundaries
+
+
+class ChunkStore:
+    """
+    Content-addressed chunk store on disk
+
+    Layout:
+        <root>/objects/ab/abcdef...   chunk bytes, named by SHA256
+        <root>/lists/<file sha256>.json  chunk list of a whole file
+
+    Usage:
+        store = ChunkStore(Path("server-mods/.chunks"))
+        chunks = store.chunk_file(Path("server-mods/mod.jar"), file_sha256)
+    """
+
+    def __init__(self, root: Path):
+        """
+        Initialize chunk store
+
+        Args:
+            root: Store directory (created if missing)
+        """
+        self.root = Path(root)
+        self.objects_dir = self.root / "objects"
+        self.lists_dir = self.root / "lists"
+        self.objects_dir.mkdir(parents=True, exist_ok=True)
+        self.lists_dir.mkdir(parents=True, exist_ok=True)
+
+        # One chunking job per file checksum at a time; garbage collection
+        # runs only while nothing is being chunked (new chunks have no list yet)
+        self._lock = threading.Lock()
+        self._idle = threading.Condition(self._lock)
+        self._in_progress: Dict[str, threading.Event] = {}
+        self._collecting = False
+
+        # Statistics
+        self.stats = {
+            "files_chunked": 0,
+            "chunks_written": 0,
+            "chunks_deduplicated": 0,
+            "chunks_collected": 0
+        }
+
+    def object_path(self, chunk_hash: str) -> Path:
+        """Path of a chunk object"""
+        return self.objects_dir / chunk_hash[:2] / chunk_hash
+
+    def has(self, chunk_hash: str) -> bool:
+        """Check whether a chunk is stored"""
+        return self.object_path(chunk_hash).exists()
+
+    def _put(self, chunk_hash: str, data) -> None:
+        """Store chunk bytes (no-op if already present)"""
+        path = self.object_path(chunk_hash)
+        if path.exists():
+            self.stats["chunks_deduplicated"] += 1
+            return
+        path.parent.mkdir(exist_ok=True)
+        tmp_path = path.with_name(f"{path.name}.{threading.get_ident()}.tmp")
+        with open(tmp_path, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+        self.stats["chunks_written"] += 1
+
+    def get_chunk_list(self, file_sha256: str) -> Optional[List[Dict]]:
+        """Get a cached chunk list by whole-file checksum (None if not chunked yet)"""
+        try:
+            with open(self.lists_dir / f"{file_sha256}.json", 'r') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if data.get("chunker") != CHUNKER_VERSION:
+            return None
+        return data["chunks"]
+
+    def chunk_file(self, file_path: Path, file_sha256: str) -> List[Dict]:
+        """
+        Chunk a file into the store (cached - only done once per file checksum)
+
+        Args:
+            file_path: File to chunk
+            file_sha256: Whole-file checksum (key of the chunk list)
+
+        Returns:
+            List of {"hash", "offset", "size"} dicts in file order
+        """
+        while True:
+            chunks = self.get_chunk_list(file_sha256)
+            if chunks is not None:
+                return chunks
+
+            with self._lock:
+                while self._collecting:
+                    self._idle.wait()
+                event = self._in_progress.get(file_sha256)
+                owner = event is None
+                if owner:
+                    event = self._in_progress[file_sha256] = threading.Event()
+
+            if not owner:
+                # Another thread is chunking the same content - wait for it
+                event.wait()
+                continue
+
+            try:
+                chunks = self._chunk_file(file_path)
+                tmp_list = self.lists_dir / f"{file_sha256}.json.tmp"
+                with open(tmp_list, 'w') as f:
+                    json.dump({"chunker": CHUNKER_VERSION, "chunks": chunks}, f)
+                os.replace(tmp_list, self.lists_dir / f"{file_sha256}.json")
+                self.stats["files_chunked"] += 1
+                return chunks
+            finally:
+                with self._lock:
+                    del self._in_progress[file_sha256]
+                    self._idle.notify_all()
+                event.set()
+
+    def _chunk_file(self, file_path: Path) -> List[Dict]:
+        with open(file_path, 'rb') as f:
+            if os.fstat(f.fileno()).st_size == 0:
+                return []
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                chunks = []
+                for offset, length in chunk_boundaries(data):
+                    block = data[offset:offset + length]
+                    chunk_hash = hashlib.sha256(block).hexdigest()
+                    self._put(chunk_hash, block)
+                    chunks.append({"hash": chunk_hash, "offset": offset, "size": length})
+                return chunks
+
+    def collect_garbage(self, live_file_checksums: Iterable[str]) -> int:
+        """
+        Remove chunk lists and chunks not referenced by any live file
+
+        Waits for in-flight chunking and holds off new chunking meanwhile,
+        so it is safe to call while other threads chunk files.
+
+        Args:
+            live_file_checksums: Checksums of files currently served
+
+        Returns:
+            Number of chunk objects removed
+        """
+        live = set(live_file_checksums)
+        with self._lock:
+            while self._collecting or self._in_progress:
+                self._idle.wait()
+            self._collecting = True
+        try:
+            return self._collect_garbage(live)
+        finally:
+            with self._lock:
+                self._collecting = False
+                self._idle.notify_all()
+
+    def _collect_garbage(self, live: set) -> int:
+        live_chunks = set()
+
+        for list_file in self.lists_dir.glob("*.json"):
+            if list_file.stem not in live:
+                list_file.unlink(missing_ok=True)
+                continue
+            for chunk in self.get_chunk_list(list_file.stem) or []:
+                live_chunks.add(chunk["hash"])
+
+        removed = 0
+        for object_file in self.objects_dir.glob("*/*"):
+            if object_file.name not in live_chunks and not object_file.name.endswith(".tmp"):
+                object_file.unlink(missing_ok=True)
+                removed += 1
+
+        self.stats["chunks_collected"] += removed
+        return removed
+
+    def get_stats(self) -> Dict:
+        """Get chunk store statistics"""
+        return dict(self.stats)
@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+"""
+Manifest Version History for the Mod Sync Server
+Lets clients ask "what changed since version N?" instead of re-downloading everything
+
+Features:
+- Monotonic manifest version, bumped only when mod content changes
+- Bounded history of past mod sets persisted to disk (survives restarts)
+- Diffs with added / removed / changed entries
+- Reset signal when a client's version is too old or unknown
+"""
+
+import json
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Dict, List
+
+
+class ManifestHistory:
+    """
+    Bounded, persistent history of manifest versions
+
+    Usage:
+        history = ManifestHistory(Path("server-mods/.manifest-history.json"))
+        version = history.record(mods)
+        delta = history.diff(since=3)
+    """
+
+    def __init__(self, history_file: Path, max_versions: int = 50):
+        """
+        Initialize manifest history
+
+        Args:
+            history_file: Where the history is persisted
+            max_versions: Number of past versions kept for diffing
+        """
+        self.history_file = Path(history_file)
+        self.max_versions = max_versions
+        self._lock = threading.Lock()
+
+        # version -> {"created", "mods": {file: mod_entry}}
+        self._versions: Dict[int, Dict] = {}
+        self.current_version = 0
+
+        self._load()
+
+    def _load(self):
+        """Load persisted history (ignored if missing or corrupt)"""
+        try:
+            with open(self.history_file, 'r') as f:
+                data = json.load(f)
+            self._versions = {int(v): entry for v, entry in data.get("versions", {}).items()}
+            self.current_version = int(data.get("current_version", 0))
+        except (OSError, ValueError):
+            self._versions = {}
+            self.current_version = 0
+
+    def _save(self):
+        """Persist history atomically"""
+        tmp_file = self.history_file.with_name(self.history_file.name + ".tmp")
+        try:
+            with open(tmp_file, 'w') as f:
+                json.dump({
+                    "current_version": self.current_version,
+                    "versions": {str(v): entry for v, entry in self._versions.items()}
+                }, f)
+            os.replace(tmp_file, self.history_file)
+        except OSError as e:
+            print(f"[!] Could not save manifest history: {e}")
+
+    @staticmethod
+    def _by_file(mods: List[Dict]) -> Dict[str, Dict]:
+        return {mod["file"]: mod for mod in mods}
+
+    def record(self, mods: List[Dict]) -> int:
+        """
+        Record the current mod list, bumping the version only if it changed
+
+        Args:
+            mods: Mod entries as served in the manifest
+
+        Returns:
+            Current manifest version
+        """
+        with self._lock:
+            mods_by_file = self._by_file(mods)
+            latest = self._versions.get(self.current_version)
+
+            if latest is not None and latest["mods"] == mods_by_file:
+                return self.current_version
+
+            self.current_version += 1
+            self._versions[self.current_version] = {
+                "created": time.time(),
+                "mods": mods_by_file
+            }
+
+            # Drop oldest versions beyond the limit
+            for version in sorted(self._versions)[:-self.max_versions]:
+                del self._versions[version]
+
+            self._save()
+            return self.current_version
+
+    def diff(self, since: int) -> Dict:
+        """
+        Compute changes between a past version and the current one
+
+        Args:
+            since: Version the client currently has
+
+        Returns:
+            {"since", "version", "reset", "added", "removed", "changed"}
+            reset=True means the client must do a full sync (version unknown)
+        """
+        with self._lock:
+            current = self._versions.get(self.current_version, {"mods": {}})["mods"]
+            base = self._versions.get(since)
+
+            if base is None:
+                return {
+                    "since": since,
+                    "version": self.current_version,
+                    "reset": True,
+                    "added": list(current.values()),
+                    "removed": [],
+                    "changed": []
+                }
+
+            old = base["mods"]
+            return {
+                "since": since,
+                "version": self.current_version,
+                "reset": False,
+                "added": [mod for name, mod in current.items() if name not in old],
+                "removed": [name for name in old if name not in current],
+                "changed": [
+                    mod for name, mod in current.items()
+                    if name in old and old[name] != mod
+                ]
+            }
+
+    def get_stats(self) -> Dict:
+        """Get history statistics"""
+        return {
+            "current_version": self.current_version,
+            "versions_kept": len(self._versions),
+            "oldest_version": min(self._versions) if self._versions else None
+        }
@@ -5,10 +5,11 @@ Instant command execution with connection pooling and validation
 
 Features:
 - Ultra-fast command execution
-- Connection pooling (reuse connections)
+- Connection pooling (shared, kept-alive native RCON connections via rcon_pool)
+- Ordered batches on one pooled connection and a coalescing queue for read-only queries
 - Command validation and sanitization
 - Support for all Minecraft commands
-- Docker container integration
+- Docker container integration (fallback when native RCON is unreachable)
 - Error handling and retry logic
 """
 
@@ -16,8 +17,8 @@ import subprocess
 import asyncio
 import time
 from typing import Optional, List
-from mcrcon import MCRcon
-import re
+
+from rcon_pool import get_rcon_pool, RconError
 
 
 class RconClient:
@@ -47,7 +48,7 @@ class RconClient:
             port: RCON port
             password: RCON password
             docker_container: Docker container name (if using Docker)
-            use_docker: Whether to use Docker exec (faster for local)
+            use_docker: Whether to fall back to Docker exec when native RCON fails
             timeout: Command timeout in seconds
         """
         self.host = host
@@ -57,6 +58,9 @@ class RconClient:
         self.use_docker = use_docker
         self.timeout = timeout
         
+        # Shared with every other RCON user in this process
+        self.pool = get_rcon_pool(host, port, password, timeout=timeout)
+        
         # Statistics
         self.stats = {
             "total_commands": 0,
@@ -64,7 +68,8 @@ class RconClient:
             "failed_commands": 0,
             "avg_execution_time": 0.0,
             "fastest_command": float('inf'),
-            "slowest_command": 0.0
+            "slowest_command": 0.0,
+            "docker_fallbacks": 0
         }
     
     async def send_command(self, command: str) -> str:
@@ -83,12 +88,15 @@ class RconClient:
         command = self._sanitize_command(command)
         
         try:
-            if self.use_docker and self.docker_container:
-                # Use Docker exec with rcon-cli (faster for local)
-                response = await self._execute_docker(command)
-            else:
-                # Use direct RCON connection
+            try:
+                # Pooled native RCON (no process spawn, no reconnect)
                 response = await self._execute_rcon(command)
+            except RconError:
+                if not (self.use_docker and self.docker_container):
+                    raise
+                # Native RCON unreachable - fall back to rcon-cli inside the container
+                self.stats["docker_fallbacks"] += 1
+                response = await self._execute_docker(command)
             
             # Update statistics
             elapsed = time.time() - start_time
@@ -151,7 +159,7 @@ class RconClient:
     
     async def _execute_rcon(self, command: str) -> str:
         """
-        Execute command via direct RCON connection
+        Execute command over the shared RCON connection pool
         
         Args:
             command: Sanitized command
@@ -159,30 +167,8 @@ class RconClient:
         Returns:
             Command response
         """
-        loop = asyncio.get_event_loop()
-        
-        # Run RCON in executor (blocking operation)
-        response = await loop.run_in_executor(
-            None,
-            self._rcon_blocking,
-            command
-        )
-        
-        return response
-    
-    def _rcon_blocking(self, command: str) -> str:
-        """
-        Blocking RCON execution (runs in executor)
-        
-        Args:
-            command: Command to execute
-        
-        Returns:
-            Command response
-        """
-        with MCRcon(self.host, self.password, port=self.port) as mcr:
-            response = mcr.command(command)
-            return response
+        response = await self.pool.command(command)
+        return response.strip()
     
     def _sanitize_command(self, command: str) -> str:
         """
@@ -224,7 +210,10 @@ class RconClient:
     
     async def execute_multiple(self, commands: List[str]) -> List[str]:
         """
-        Execute multiple commands in parallel
+        Execute multiple commands in order on one pooled connection
+        
+        Commands run one round trip at a time (RCON servers answer a single
+        packet per read), without reconnecting between them.
         
         Args:
             commands: List of commands to execute
@@ -232,8 +221,24 @@ class RconClient:
         Returns:
             List of responses (same order as commands)
         """
-        tasks = [self.send_command(cmd) for cmd in commands]
-        responses = await asyncio.gather(*tasks, return_exceptions=True)
+        start_time = time.time()
+        
+        try:
+            sanitized = [self._sanitize_command(cmd) for cmd in commands]
+            responses = await self.pool.command_many(sanitized)
+        except RconError:
+            if not (self.use_docker and self.docker_container):
+                raise
+            # Native RCON unreachable - one docker exec per command
+            tasks = [self.send_command(cmd) for cmd in commands]
+            responses = await asyncio.gather(*tasks, return_exceptions=True)
+        else:
+            elapsed = time.time() - start_time
+            failed = sum(1 for r in responses if isinstance(r, Exception))
+            self.stats["total_commands"] += len(responses)
+            self.stats["successful_commands"] += len(responses) - failed
+            self.stats["failed_commands"] += failed
+            print(f"✓ {len(responses)} commands executed in {elapsed:.3f}s")
         
         # Convert exceptions to error strings
         results = []
@@ -241,10 +246,35 @@ class RconClient:
             if isinstance(response, Exception):
                 results.append(f"Error: {str(response)}")
             else:
-                results.append(response)
+                results.append(response.strip())
         
         return results
     
+    async def queue_command(self, command: str) -> str:
+        """
+        Send command through the coalescing queue
+        
+        Commands queued by any caller within a few milliseconds go out as
+        one ordered batch. Identical pending read-only queries (see
+        rcon_pool.COALESCIBLE_COMMANDS, e.g. "list") are sent once and share
+        the response; every other command runs once per call.
+        
+        Args:
+            command: Minecraft command (with or without leading /)
+        
+        Returns:
+            Command response from server
+        """
+        return (await self.pool.enqueue(self._sanitize_command(command))).strip()
+    
+    async def whitelist_add_many(self, players: List[str]) -> List[str]:
+        """Add many players to the whitelist in one batch"""
+        return await self.execute_multiple([f"whitelist add {player}" for player in players])
+    
+    async def say_many(self, messages: List[str], prefix: str = "[Console]") -> List[str]:
+        """Broadcast several chat lines (e.g. a chunked AI reply) in one batch, in order"""
+        return await self.execute_multiple([f"say §b{prefix}§f {message}" for message in messages])
+    
     async def whitelist_add(self, player: str) -> str:
         """Add player to whitelist"""
         return await self.send_command(f"whitelist add {player}")
@@ -279,6 +309,7 @@ class RconClient:
         """Get command execution statistics"""
         return {
             **self.stats,
+            "pool": self.pool.get_stats(),
             "success_rate": (
                 self.stats["successful_commands"] / self.stats["total_commands"]
                 if self.stats["total_commands"] > 0 else 0
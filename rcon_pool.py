@@ -0,0 +1,671 @@
+#!/usr/bin/env python3
+"""
+Pooled Native RCON Connection Manager for Minecraft
+Authenticated, kept-alive connections shared by every RCON caller in the process
+
+Features:
+- Native asyncio implementation of the Source/Minecraft RCON protocol (no mcrcon, no docker exec)
+- Pool of logged-in connections reused across commands (no TCP + login per command)
+- One packet in flight per connection (vanilla/Forge servers drop a connection whose read holds two)
+- Multi-packet responses reassembled via a terminator packet
+- Background health checks, reconnect with exponential backoff
+- One shared pool per server, usable from any thread or event loop (sync and async APIs)
+- Batches: N commands run in order on one connection, with one reconnect retry
+- Coalescing queue: bursts of commands are merged into batches, duplicate read-only queries sent once
+
+Usage:
+    pool = get_rcon_pool("localhost", 25575, "titan123")
+    response = await pool.command("list")      # from async code
+    response = pool.command_sync("list")       # from threads / Tk callbacks
+    responses = await pool.command_many([f"whitelist add {p}" for p in players])
+    await pool.enqueue("say Hello")            # coalesced with other commands in the burst
+"""
+
+import asyncio
+import itertools
+import struct
+import threading
+import time
+from typing import Dict, List, Optional, Tuple, Union
+
+
+# Packet types (https://wiki.vg/RCON)
+PACKET_RESPONSE = 0
+PACKET_COMMAND = 2
+PACKET_LOGIN = 3
+
+# Servers split responses into packets of at most this many payload bytes
+MAX_RESPONSE_PAYLOAD = 4096
+# Max payload a client may send (vanilla limit is 1446 bytes)
+MAX_COMMAND_PAYLOAD = 1446
+
+_HEADER = struct.Struct("<iii")
+
+# Read-only / idempotent commands: concurrent duplicates may share one response.
+# Anything else (give, say, tellraw, ...) runs once per submission.
+COALESCIBLE_COMMANDS = (
+    "list", "time query", "forge tps", "neoforge tps", "tps", "mspt", "tick query",
+    "whitelist list", "banlist", "seed", "plugins", "version", "paper chunkinfo"
+)
+
+
+def is_coalescible(command: str) -> bool:
+    """True if duplicates of this command may be merged into one"""
+    text = " ".join(command.lower().split())
+    return any(text == prefix or text.startswith(prefix + " ") for prefix in COALESCIBLE_COMMANDS)
+
+
+class RconError(Exception):
+    """RCON protocol, connection or authentication failure"""
+
+
+class RconAuthError(RconError):
+    """Wrong RCON password"""
+
+
+class RconConnection:
+    """
+    One authenticated RCON connection
+
+    The vanilla (and Forge) RCON thread reads at most 1460 bytes at a time and
+    closes the connection when one read holds more than one packet, so only
+    one packet is ever in flight: commands take turns, and each waits for its
+    answer before the next packet is written.
+
+    Responses longer than 4096 bytes arrive in several packets. To know when
+    the last one has arrived, an empty RESPONSE_VALUE packet with its own ID
+    is written once the first fragment is back (the server has finished the
+    command by then); the server answers packets in order, so its echo
+    follows the final fragment.
+    """
+
+    def __init__(self, host: str, port: int, password: str, timeout: float = 5.0):
+        self.host = host
+        self.port = port
+        self.password = password
+        self.timeout = timeout
+
+        self._reader: Optional[asyncio.StreamReader] = None
+        self._writer: Optional[asyncio.StreamWriter] = None
+        self._reader_task: Optional[asyncio.Task] = None
+        self._ids = itertools.count(1)
+        self._turn = asyncio.Lock()
+        self._queued = 0
+
+        # request_id -> collected fragments / first-fragment signal; terminator_id -> (request_id, future)
+        self._fragments: Dict[int, List[bytes]] = {}
+        self._first: Dict[int, asyncio.Future] = {}
+        self._waiters: Dict[int, Tuple[int, asyncio.Future]] = {}
+        self._login_future: Optional[asyncio.Future] = None
+
+        self.connected = False
+        self.last_used = 0.0
+
+    @property
+    def in_flight(self) -> int:
+        """Commands running or waiting for their turn"""
+        return self._queued
+
+    def _next_id(self) -> int:
+        # Request IDs are signed 32-bit; -1 is reserved for auth failure
+        request_id = next(self._ids)
+        if request_id >= 2 ** 31 - 1:
+            self._ids = itertools.count(1)
+            request_id = next(self._ids)
+        return request_id
+
+    @staticmethod
+    def _encode(request_id: int, packet_type: int, payload: bytes) -> bytes:
+        body = _HEADER.pack(0, request_id, packet_type)[4:] + payload + b"\x00\x00"
+        return struct.pack("<i", len(body)) + body
+
+    async def connect(self):
+        """Open the TCP connection and log in"""
+        self._reader, self._writer = await asyncio.wait_for(
+            asyncio.open_connection(self.host, self.port), timeout=self.timeout
+        )
+        self._reader_task = asyncio.ensure_future(self._read_loop())
+
+        login_id = self._next_id()
+        self._login_future = asyncio.get_event_loop().create_future()
+        self._writer.write(self._encode(login_id, PACKET_LOGIN, self.password.encode("utf-8")))
+        await self._writer.drain()
+
+        try:
+            response_id = await asyncio.wait_for(self._login_future, timeout=self.timeout)
+        except asyncio.TimeoutError:
+            await self.close()
+            raise RconError(f"RCON login timed out ({self.host}:{self.port})")
+        if response_id == -1:
+            await self.close()
+            raise RconAuthError(f"RCON authentication failed ({self.host}:{self.port})")
+
+        self.connected = True
+        self.last_used = time.time()
+
+    async def _read_loop(self):
+        """Read packets and route them to waiting commands by request ID"""
+        try:
+            while True:
+                size = struct.unpack("<i", await self._reader.readexactly(4))[0]
+                packet = await self._reader.readexactly(size)
+                request_id, packet_type = struct.unpack("<ii", packet[:8])
+                payload = packet[8:-2]
+
+                if self._login_future and not self._login_future.done():
+                    # Some servers send an empty RESPONSE_VALUE before the auth response
+                    if packet_type == 2 or request_id == -1:
+                        self._login_future.set_result(request_id)
+                    continue
+
+                if request_id in self._fragments:
+                    self._fragments[request_id].append(payload)
+                    first = self._first.pop(request_id, None)
+                    if first is not None and not first.done():
+                        first.set_result(None)
+                elif request_id in self._waiters:
+                    command_id, future = self._waiters.pop(request_id)
+                    fragments = self._fragments.pop(command_id, [])
+                    if not future.done():
+                        future.set_result(b"".join(fragments).decode("utf-8", errors="replace"))
+        except (asyncio.IncompleteReadError, ConnectionError, OSError) as e:
+            self._fail_all(RconError(f"RCON connection lost: {e}"))
+        except asyncio.CancelledError:
+            self._fail_all(RconError("RCON connection closed"))
+            raise
+
+    def _fail_all(self, error: Exception):
+        self.connected = False
+        if self._login_future and not self._login_future.done():
+            self._login_future.set_exception(error)
+        for future in [*self._first.values(), *(future for _, future in self._waiters.values())]:
+            if not future.done():
+                future.set_exception(error)
+        self._first.clear()
+        self._waiters.clear()
+        self._fragments.clear()
+
+    async def _write(self, packet: bytes):
+        try:
+            self._writer.write(packet)
+            await self._writer.drain()
+        except (ConnectionError, OSError) as e:
+            await self.close()
+            raise RconError(f"RCON connection lost: {e}")
+
+    async def _await(self, future: asyncio.Future):
+        try:
+            await asyncio.wait_for(future, timeout=self.timeout)
+        except asyncio.TimeoutError:
+            # The server may still answer later; the link can't be trusted for the next command
+            await self.close()
+            raise RconError(f"RCON command timed out (>{self.timeout}s)")
+
+    async def command(self, command: str) -> str:
+        """Send one command and wait for its full response (waits for the connection's turn)"""
+        payload = command.encode("utf-8")
+        if len(payload) > MAX_COMMAND_PAYLOAD:
+            raise ValueError(f"RCON command too long ({len(payload)} > {MAX_COMMAND_PAYLOAD} bytes)")
+
+        self._queued += 1
+        try:
+            async with self._turn:
+                if not self.connected:
+                    raise RconError("RCON connection is not open")
+
+                loop = asyncio.get_event_loop()
+                command_id = self._next_id()
+                terminator_id = self._next_id()
+                first = self._first[command_id] = loop.create_future()
+                done = loop.create_future()
+                self._fragments[command_id] = []
+                self._waiters[terminator_id] = (command_id, done)
+                try:
+                    await self._write(self._encode(command_id, PACKET_COMMAND, payload))
+                    await self._await(first)
+                    # Separate write: the server has consumed the command packet by now
+                    await self._write(self._encode(terminator_id, PACKET_RESPONSE, b""))
+                    await self._await(done)
+                finally:
+                    self._first.pop(command_id, None)
+                    self._waiters.pop(terminator_id, None)
+                    self._fragments.pop(command_id, None)
+                    for future in (first, done):
+                        if future.done() and not future.cancelled():
+                            future.exception()  # failed by a lost connection; already raised
+
+                self.last_used = time.time()
+                return done.result()
+        finally:
+            self._queued -= 1
+
+    async def ping(self):
+        """Round-trip an empty RESPONSE_VALUE packet (no command runs on the server)"""
+        if not self.connected:
+            raise RconError("RCON connection is not open")
+
+        async with self._turn:
+            ping_id = self._next_id()
+            future = asyncio.get_event_loop().create_future()
+            # No fragment list: the echo itself resolves the waiter
+            self._waiters[ping_id] = (ping_id, future)
+            try:
+                await self._write(self._encode(ping_id, PACKET_RESPONSE, b""))
+                await self._await(future)
+            finally:
+                self._waiters.pop(ping_id, None)
+
+    async def close(self):
+        """Close the connection"""
+        self.connected = False
+        if self._reader_task:
+            self._reader_task.cancel()
+            self._reader_task = None
+        if self._writer:
+            try:
+                self._writer.close()
+            except Exception:
+                pass
+            self._writer = None
+        self._fail_all(RconError("RCON connection closed"))
+
+
+class RconPool:
+    """
+    Pool of authenticated RCON connections running on a private event loop thread
+
+    Callers on any thread or event loop share the same connections; commands are
+    dispatched to the least busy connection.
+    """
+
+    def __init__(
+        self,
+        host: str = "localhost",
+        port: int = 25575,
+        password: str = "titan123",
+        size: int = 2,
+        timeout: float = 5.0,
+        health_interval: float = 30.0,
+        max_backoff: float = 30.0
+    ):
+        """
+        Initialize RCON pool
+
+        Args:
+            host: Minecraft server host
+            port: RCON port
+            password: RCON password
+            size: Number of kept-alive connections
+            timeout: Connect / command timeout in seconds
+            health_interval: Seconds between keep-alive checks of idle connections
+            max_backoff: Upper bound of the reconnect backoff in seconds
+        """
+        self.host = host
+        self.port = port
+        self.password = password
+        self.size = size
+        self.timeout = timeout
+        self.health_interval = health_interval
+        self.max_backoff = max_backoff
+
+        self._connections: List[Optional[RconConnection]] = [None] * size
+        self._connect_locks: List[Optional[asyncio.Lock]] = [None] * size
+        self._backoff_until = 0.0
+        self._backoff = 0.0
+        self._queue: Optional["RconCommandQueue"] = None
+
+        # Private loop thread: one set of sockets regardless of the caller's loop
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._run_loop, name=f"rcon-pool-{host}:{port}", daemon=True)
+        self._thread.start()
+        self._health_future = asyncio.run_coroutine_threadsafe(self._health_loop(), self._loop)
+
+        # Statistics
+        self.stats = {
+            "commands": 0,
+            "failures": 0,
+            "connects": 0,
+            "reconnects": 0,
+            "batches": 0,
+            "avg_latency_ms": 0.0
+        }
+
+    def _run_loop(self):
+        asyncio.set_event_loop(self._loop)
+        self._loop.run_forever()
+
+    # ------------------------------------------------------------------
+    # Connection management (runs on the pool loop)
+    # ------------------------------------------------------------------
+
+    async def _get_connection(self, slot: int) -> RconConnection:
+        connection = self._connections[slot]
+        if connection and connection.connected:
+            return connection
+
+        if self._connect_locks[slot] is None:
+            self._connect_locks[slot] = asyncio.Lock()
+
+        async with self._connect_locks[slot]:
+            connection = self._connections[slot]
+            if connection and connection.connected:
+                return connection
+
+            wait = self._backoff_until - time.time()
+            if wait > 0:
+                raise RconError(f"RCON unavailable, retrying in {wait:.1f}s")
+
+            connection = RconConnection(self.host, self.port, self.password, self.timeout)
+            try:
+                await connection.connect()
+            except RconAuthError:
+                raise
+            except (RconError, OSError, asyncio.TimeoutError) as e:
+                # Exponential backoff so a down server isn't hammered by every caller
+                self._backoff = min(max(self._backoff * 2, 0.5), self.max_backoff)
+                self._backoff_until = time.time() + self._backoff
+                raise RconError(f"RCON connect to {self.host}:{self.port} failed: {e}")
+
+            self._backoff = 0.0
+            self._backoff_until = 0.0
+            if self._connections[slot] is not None:
+                self.stats["reconnects"] += 1
+            self.stats["connects"] += 1
+            self._connections[slot] = connection
+            return connection
+
+    def _pick_slot(self) -> int:
+        """
+        Least busy open connection; an idle one wins immediately.
+        Unopened slots are only used when every open connection is busy,
+        so a quiet process keeps a single connection.
+        """
+        best, best_load, closed = None, None, None
+        for slot, connection in enumerate(self._connections):
+            if connection is None or not connection.connected:
+                if closed is None:
+                    closed = slot
+                continue
+            if connection.in_flight == 0:
+                return slot
+            if best_load is None or connection.in_flight < best_load:
+                best, best_load = slot, connection.in_flight
+        if closed is not None:
+            return closed
+        return best
+
+    async def _command(self, command: str) -> str:
+        start = time.perf_counter()
+        slot = self._pick_slot()
+        try:
+            connection = await self._get_connection(slot)
+            try:
+                response = await connection.command(command)
+            except RconError:
+                # Connection died under us - one retry on a fresh connection
+                connection = await self._get_connection(slot)
+                response = await connection.command(command)
+        except Exception:
+            self.stats["failures"] += 1
+            raise
+
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        self.stats["commands"] += 1
+        self.stats["avg_latency_ms"] += (elapsed_ms - self.stats["avg_latency_ms"]) / self.stats["commands"]
+        return response
+
+    async def _command_many(self, commands: List[str]) -> List[Union[str, Exception]]:
+        """Run a batch in order on one connection; per-command errors are returned, not raised"""
+        if not commands:
+            return []
+
+        slot = self._pick_slot()
+        results: List[Union[str, Exception]] = []
+        retried = False
+        for command in commands:
+            try:
+                connection = await self._get_connection(slot)
+                try:
+                    results.append(await connection.command(command))
+                except RconError:
+                    if retried:
+                        raise
+                    # Connection died under us - one retry on a fresh connection per batch
+                    retried = True
+                    connection = await self._get_connection(slot)
+                    results.append(await connection.command(command))
+            except ValueError as e:
+                results.append(e)
+            except RconError as e:
+                # The server is unreachable: the rest of the batch fails the same way
+                results.extend([e] * (len(commands) - len(results)))
+                break
+
+        failed = sum(1 for r in results if isinstance(r, Exception))
+        self.stats["batches"] += 1
+        self.stats["commands"] += len(results) - failed
+        self.stats["failures"] += failed
+        return results
+
+    async def _health_loop(self):
+        """Keep idle connections alive and detect dead ones early"""
+        while True:
+            await asyncio.sleep(self.health_interval)
+            for connection in list(self._connections):
+                if connection and connection.connected and time.time() - connection.last_used > self.health_interval:
+                    try:
+                        await connection.ping()
+                        connection.last_used = time.time()
+                    except Exception:
+                        await connection.close()
+
+    # ------------------------------------------------------------------
+    # Public API (thread-safe, any event loop)
+    # ------------------------------------------------------------------
+
+    def _submit(self, coro):
+        return asyncio.run_coroutine_threadsafe(coro, self._loop)
+
+    async def command(self, command: str) -> str:
+        """
+        Execute a command from any event loop
+
+        Args:
+            command: Minecraft command without leading /
+
+        Returns:
+            Server response text
+        """
+        return await asyncio.wrap_future(self._submit(self._command(command)))
+
+    def command_sync(self, command: str, timeout: Optional[float] = None) -> str:
+        """Execute a command from synchronous code (threads, Tk callbacks)"""
+        return self._submit(self._command(command)).result(timeout or self.timeout * 2 + 1)
+
+    async def command_many(self, commands: List[str]) -> List[Union[str, Exception]]:
+        """
+        Execute a batch of commands in order on one connection
+
+        Args:
+            commands: Minecraft commands without leading /
+
+        Returns:
+            Responses in command order (an Exception in place of each failed command)
+
+        Raises:
+            RconError: If no connection could be opened
+        """
+        return await asyncio.wrap_future(self._submit(self._command_many(list(commands))))
+
+    def command_many_sync(self, commands: List[str], timeout: Optional[float] = None) -> List[Union[str, Exception]]:
+        """Execute a batch of commands from synchronous code"""
+        return self._submit(self._command_many(list(commands))).result(
+            timeout or self.timeout * 2 + 1 + 0.005 * len(commands)
+        )
+
+    @property
+    def queue(self) -> "RconCommandQueue":
+        """Coalescing command queue (created on first use)"""
+        if self._queue is None:
+            self._queue = RconCommandQueue(self)
+        return self._queue
+
+    async def enqueue(self, command: str) -> str:
+        """Execute a command as part of the current burst (see RconCommandQueue)"""
+        return await asyncio.wrap_future(self.queue.submit(command))
+
+    def enqueue_nowait(self, command: str):
+        """Fire-and-forget a command into the current burst; returns a concurrent future"""
+        return self.queue.submit(command)
+
+    def close(self):
+        """Close all connections and stop the pool thread"""
+        async def shutdown():
+            self._health_future.cancel()
+            for connection in self._connections:
+                if connection:
+                    await connection.close()
+
+        try:
+            self._submit(shutdown()).result(timeout=self.timeout)
+        finally:
+            self._loop.call_soon_threadsafe(self._loop.stop)
+
+    def get_stats(self) -> Dict:
+        """Get pool statistics"""
+        stats = {
+            **self.stats,
+            "connections_open": sum(1 for c in self._connections if c and c.connected),
+            "in_flight": sum(c.in_flight for c in self._connections if c)
+        }
+        if self._queue is not None:
+            stats["queue"] = self._queue.get_stats()
+        return stats
+
+
+class RconCommandQueue:
+    """
+    Coalescing command queue on top of an RconPool
+
+    Commands submitted within a short window are flushed together as one
+    batch, in submission order. Identical read-only queries still pending in
+    the window (see COALESCIBLE_COMMANDS, e.g. several panels asking "list")
+    are sent once and share the response; every other command is sent as
+    often as it was submitted.
+
+    Usage:
+        queue = pool.queue
+        future = queue.submit("list")   # thread-safe
+        response = future.result()
+    """
+
+    def __init__(self, pool: RconPool, window: float = 0.02, max_batch: int = 256):
+        """
+        Initialize queue
+
+        Args:
+            pool: Pool whose connections and loop are used
+            window: Seconds to wait for more commands before flushing
+            max_batch: Flush immediately once this many commands are pending
+        """
+        self.pool = pool
+        self.window = window
+        self.max_batch = max_batch
+
+        # Only touched on the pool loop: [command, waiters] in submission order,
+        # plus the coalescible entries by command
+        self._pending: List[Tuple[str, List]] = []
+        self._shared: Dict[str, List] = {}
+        self._flush_handle: Optional[asyncio.TimerHandle] = None
+
+        # Statistics
+        self.stats = {
+            "submitted": 0,
+            "coalesced": 0,
+            "flushes": 0
+        }
+
+    def submit(self, command: str):
+        """
+        Queue a command (any thread)
+
+        Returns:
+            concurrent.futures.Future resolving to the command's response
+        """
+        return asyncio.run_coroutine_threadsafe(self._add(command), self.pool._loop)
+
+    async def _add(self, command: str) -> str:
+        self.stats["submitted"] += 1
+        waiters = self._shared.get(command)
+        if waiters is not None:
+            self.stats["coalesced"] += 1
+        else:
+            waiters = []
+            self._pending.append((command, waiters))
+            if is_coalescible(command):
+                self._shared[command] = waiters
+
+        future = asyncio.get_event_loop().create_future()
+        waiters.append(future)
+
+        if len(self._pending) >= self.max_batch:
+            self._flush_now()
+        elif self._flush_handle is None:
+            self._flush_handle = asyncio.get_event_loop().call_later(self.window, self._flush_now)
+
+        return await future
+
+    def _flush_now(self):
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        if self._pending:
+            batch, self._pending, self._shared = self._pending, [], {}
+            asyncio.ensure_future(self._flush(batch))
+
+    async def _flush(self, batch: List[Tuple[str, List]]):
+        self.stats["flushes"] += 1
+        commands = [command for command, _ in batch]
+        try:
+            results = await self.pool._command_many(commands)
+        except Exception as e:
+            results = [e] * len(commands)
+
+        for (_, waiters), result in zip(batch, results):
+            for future in waiters:
+                if future.done():
+                    continue
+                if isinstance(result, Exception):
+                    future.set_exception(result)
+                else:
+                    future.set_result(result)
+
+    def get_stats(self) -> Dict:
+        """Get queue statistics"""
+        return dict(self.stats)
+
+
+# Shared pools, one per (host, port, password)
+_pools: Dict[Tuple[str, int, str], RconPool] = {}
+_pools_lock = threading.Lock()
+
+
+def get_rcon_pool(host: str = "localhost", port: int = 25575, password: str = "titan123", **kwargs) -> RconPool:
+    """
+    Get the shared RCON pool for a server (created on first use)
+
+    Args:
+        host: Minecraft server host
+        port: RCON port
+        password: RCON password
+        **kwargs: RconPool options (only used when the pool is created)
+
+    Returns:
+        Shared RconPool instance
+    """
+    key = (host, port, password)
+    with _pools_lock:
+        pool = _pools.get(key)
+        if pool is None:
+            pool = _pools[key] = RconPool(host, port, password, **kwargs)
+        return pool
@@ -0,0 +1,562 @@
+#!/usr/bin/env python3
+"""
+Minecraft Server Status Prober
+Server List Ping (SLP) over asyncio, cached and shared by every console, panel and API
+
+Features:
+- Native asyncio implementation of the 1.7+ Server List Ping protocol (status + ping/pong)
+- MOTD, online/max players, player sample, version, protocol and measured latency
+- Short-TTL cache per server: any number of readers cost one probe per TTL
+- Concurrent probes of the same server coalesced into one connection
+- Latency histograms per server (Prometheus buckets, percentiles)
+- Background watchers for UIs (one poll loop per server, callbacks with every result)
+- Usable from any thread or event loop (sync and async APIs), never blocks a UI thread
+
+Usage:
+    prober = get_status_prober()
+    status = await prober.status("localhost", 25565)     # from async code
+    status = prober.status_sync("localhost", 25565)      # from threads
+    status = prober.cached("localhost", 25565)           # last result, never blocks
+    unwatch = prober.watch("localhost", 25565, on_status, interval=5.0)
+"""
+
+import asyncio
+import json
+import os
+import re
+import struct
+import threading
+import time
+from dataclasses import asdict, dataclass, field
+from typing import Callable, Dict, List, Optional, Tuple
+
+
+# Default server (shared by panels that have no config of their own)
+MINECRAFT_HOST = os.getenv("MINECRAFT_HOST", "localhost")
+MINECRAFT_PORT = int(os.getenv("MINECRAFT_PORT", 25565))
+
+# Protocol version sent in the handshake (-1: "whatever you speak", per wiki.vg)
+HANDSHAKE_PROTOCOL = -1
+# Largest status response accepted (JSON with a favicon is ~10-40 KiB)
+MAX_RESPONSE_BYTES = 1024 * 1024
+
+# Latency histogram upper bounds in milliseconds (last bucket is +Inf)
+LATENCY_BUCKETS_MS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000)
+
+# Minecraft formatting codes (§a, §l, ...)
+_FORMAT_CODES = re.compile("§.")
+
+_PING_PAYLOAD = struct.Struct(">q")
+_PORT = struct.Struct(">H")
+
+
+class StatusError(Exception):
+    """Malformed or unexpected Server List Ping response"""
+
+
+@dataclass
+class ServerStatus:
+    """One Server List Ping result"""
+    host: str
+    port: int
+    online: bool = False
+    motd: str = ""
+    players_online: int = 0
+    players_max: int = 0
+    player_sample: List[str] = field(default_factory=list)
+    version: str = ""
+    protocol: int = -1
+    latency_ms: Optional[float] = None
+    checked_at: float = 0.0
+    error: Optional[str] = None
+
+    @property
+    def age(self) -> float:
+        """Seconds since the probe finished"""
+        return time.time() - self.checked_at
+
+    def to_dict(self) -> Dict:
+        return asdict(self)
+
+
+# ----------------------------------------------------------------------
+# Protocol (https://wiki.vg/Server_List_Ping)
+# ----------------------------------------------------------------------
+
+def _pack_varint(value: int) -> bytes:
+    value &= 0xFFFFFFFF
+    out = bytearray()
+    while True:
+        byte = value & 0x7F
+        value >>= 7
+        if value:
+            out.append(byte | 0x80)
+        else:
+            out.append(byte)
+            return bytes(out)
+
+
+def _unpack_varint(data: bytes, offset: int = 0) -> Tuple[int, int]:
+    """Decode a VarInt; returns (value, next offset)"""
+    result = 0
+    for shift in range(0, 35, 7):
+        if offset >= len(data):
+            raise StatusError("Truncated VarInt")
+        byte = data[offset]
+        offset += 1
+        result |= (byte & 0x7F) << shift
+        if not byte & 0x80:
+            if result & 0x80000000:
+                result -= 1 << 32
+            return result, offset
+    raise StatusError("VarInt too long")
+
+
+async def _read_varint(reader: asyncio.StreamReader) -> int:
+    result = 0
+    for shift in range(0, 35, 7):
+        byte = (await reader.readexactly(1))[0]
+        result |= (byte & 0x7F) << shift
+        if not byte & 0x80:
+            return result
+    raise StatusError("VarInt too long")
+
+
+def _packet(packet_id: int, payload: bytes = b"") -> bytes:
+    body = _pack_varint(packet_id) + payload
+    return _pack_varint(len(body)) + body
+
+
+def _handshake(host: str, port: int) -> bytes:
+    host_bytes = host.encode("utf-8")
+    payload = (
+        _pack_varint(HANDSHAKE_PROTOCOL)
+        + _pack_varint(len(host_bytes)) + host_bytes
+        + _PORT.pack(port)
+        + _pack_varint(1)  # next state: status
+    )
+    return _packet(0x00, payload)
+
+
+async def _read_packet(reader: asyncio.StreamReader) -> Tuple[int, bytes]:
+    length = await _read_varint(reader)
+    if length <= 0 or length > MAX_RESPONSE_BYTES:
+        raise StatusError(f"Bad packet length {length}")
+    body = await reader.readexactly(length)
+    packet_id, offset = _unpack_varint(body)
+    return packet_id, body[offset:]
+
+
+def flatten_description(description) -> str:
+    """Plain text of a MOTD (string or chat component), formatting codes removed"""
+    if isinstance(description, str):
+        text = description
+    elif isinstance(description, dict):
+        text = str(description.get("text", description.get("translate", "")))
+        text += "".join(flatten_description(extra) for extra in description.get("extra", []))
+    elif isinstance(description, list):
+        text = "".join(flatten_description(part) for part in description)
+    else:
+        text = ""
+    return _FORMAT_CODES.sub("", text)
+
+
+def parse_status(host: str, port: int, response: Dict) -> ServerStatus:
+    """
+    Build a ServerStatus from a decoded status JSON
+
+    Raises:
+        StatusError: The JSON doesn't have the status shape (not an object, non-numeric counts)
+    """
+    if not isinstance(response, dict):
+        raise StatusError(f"Status JSON is a {type(response).__name__}, not an object")
+    players = response.get("players") or {}
+    version = response.get("version") or {}
+    if not isinstance(players, dict) or not isinstance(version, dict):
+        raise StatusError("Malformed status JSON: players / version are not objects")
+    try:
+        return ServerStatus(
+            host=host,
+            port=port,
+            online=True,
+            motd=flatten_description(response.get("description", "")).strip(),
+            players_online=int(players.get("online", 0)),
+            players_max=int(players.get("max", 0)),
+            player_sample=[p.get("name", "") for p in players.get("sample") or [] if isinstance(p, dict)],
+            version=_FORMAT_CODES.sub("", str(version.get("name", ""))),
+            protocol=int(version.get("protocol", -1))
+        )
+    except (TypeError, ValueError, AttributeError) as e:
+        raise StatusError(f"Malformed status JSON: {e}")
+
+
+async def ping_server(host: str, port: int, timeout: float = 2.0) -> ServerStatus:
+    """
+    Run one Server List Ping exchange
+
+    Handshake and status request are written in one flight; latency is the
+    ping/pong round trip on the same connection (or the status round trip if
+    the server closes early, as some proxies do).
+
+    Raises:
+        OSError / asyncio.TimeoutError: Server unreachable
+        StatusError: Not a (1.7+) Minecraft server
+    """
+    reader, writer = await asyncio.wait_for(asyncio.open_connection(host, port), timeout)
+    try:
+        started = time.perf_counter()
+        writer.write(_handshake(host, port) + _packet(0x00))
+        await writer.drain()
+
+        packet_id, payload = await asyncio.wait_for(_read_packet(reader), timeout)
+        status_rtt = (time.perf_counter() - started) * 1000
+        if packet_id != 0x00:
+            raise StatusError(f"Unexpected packet 0x{packet_id:02x}")
+        length, offset = _unpack_varint(payload)
+        try:
+            response = json.loads(payload[offset:offset + length].decode("utf-8"))
+        except ValueError as e:
+            raise StatusError(f"Bad status JSON: {e}")
+
+        status = parse_status(host, port, response)
+
+        token = time.monotonic_ns() & 0x7FFFFFFFFFFFFFFF
+        try:
+            started = time.perf_counter()
+            writer.write(_packet(0x01, _PING_PAYLOAD.pack(token)))
+            await writer.drain()
+            packet_id, payload = await asyncio.wait_for(_read_packet(reader), timeout)
+            if packet_id == 0x01 and payload[:8] == _PING_PAYLOAD.pack(token):
+                status.latency_ms = (time.perf_counter() - started) * 1000
+        except (OSError, asyncio.IncompleteReadError, asyncio.TimeoutError, StatusError):
+            pass
+        if status.latency_ms is None:
+            status.latency_ms = status_rtt
+
+        status.checked_at = time.time()
+        return status
+    finally:
+        writer.close()
+        try:
+            await writer.wait_closed()
+        except Exception:
+            pass
+
+
+# ----------------------------------------------------------------------
+# Latency histogram
+# ----------------------------------------------------------------------
+
+class LatencyHistogram:
+    """Cumulative latency histogram with fixed millisecond buckets"""
+
+    def __init__(self, buckets: Tuple[float, ...] = LATENCY_BUCKETS_MS):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value_ms: float):
+        for index, bound in enumerate(self.buckets):
+            if value_ms <= bound:
+                break
+        else:
+            index = len(self.buckets)
+        self.counts[index] += 1
+        self.count += 1
+        self.sum += value_ms
+
+    def percentile(self, p: float) -> Optional[float]:
+        """Upper bound of the bucket holding the p-th percentile (None: empty or +Inf)"""
+        if not self.count:
+            return None
+        rank = p / 100 * self.count
+        seen = 0
+        for index, count in enumerate(self.counts):
+            seen += count
+            if seen >= rank and count:
+                return self.buckets[index] if index < len(self.buckets) else None
+        return None
+
+    def to_dict(self) -> Dict:
+        cumulative = []
+        seen = 0
+        for bound, count in zip([*self.buckets, "+Inf"], self.counts):
+            seen += count
+            cumulative.append((bound, seen))
+        return {
+            "count": self.count,
+            "avg_ms": round(self.sum / self.count, 2) if self.count else None,
+            "p50_ms": self.percentile(50),
+            "p95_ms": self.percentile(95),
+            "p99_ms": self.percentile(99),
+            "buckets": cumulative
+        }
+
+
+# ----------------------------------------------------------------------
+# Prober
+# ----------------------------------------------------------------------
+
+class StatusProber:
+    """
+    Cached, coalescing Server List Ping prober running on a private event loop thread
+
+    Results (including "offline") are cached for `ttl` seconds, so a down server
+    costs one connect attempt per TTL no matter how many readers poll it.
+    """
+
+    def __init__(self, ttl: float = 2.0, timeout: float = 2.0):
+        """
+        Initialize status prober
+
+        Args:
+            ttl: Seconds a result is served from cache
+            timeout: Connect / read timeout per probe in seconds
+        """
+        self.ttl = ttl
+        self.timeout = timeout
+
+        self._cache: Dict[Tuple[str, int], ServerStatus] = {}
+        self._inflight: Dict[Tuple[str, int], asyncio.Future] = {}
+        self._histograms: Dict[Tuple[str, int], LatencyHistogram] = {}
+        self._watchers: Dict[Tuple[str, int], Dict[Callable, float]] = {}
+        self._watch_tasks: Dict[Tuple[str, int], asyncio.Task] = {}
+        self._lock = threading.Lock()
+
+        # Private loop thread: probes never run on (or block) the caller's thread
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._run_loop, name="status-prober", daemon=True)
+        self._thread.start()
+
+        # Statistics
+        self.stats = {
+            "requests": 0,
+            "cache_hits": 0,
+            "coalesced": 0,
+            "probes": 0,
+            "failures": 0
+        }
+
+    def _run_loop(self):
+        asyncio.set_event_loop(self._loop)
+        self._loop.run_forever()
+
+    # ------------------------------------------------------------------
+    # Probing (runs on the prober loop)
+    # ------------------------------------------------------------------
+
+    async def _probe(self, key: Tuple[str, int], timeout: Optional[float]) -> ServerStatus:
+        host, port = key
+        self.stats["probes"] += 1
+        try:
+            status = await ping_server(host, port, timeout or self.timeout)
+        except (OSError, asyncio.TimeoutError, asyncio.IncompleteReadError, StatusError) as e:
+            self.stats["failures"] += 1
+            if isinstance(e, asyncio.TimeoutError):
+                error = "Timed out"
+            elif isinstance(e, asyncio.IncompleteReadError):
+                error = "Connection closed mid-response (not a 1.7+ Minecraft server?)"
+            else:
+                error = str(e) or type(e).__name__
+            status = ServerStatus(host=host, port=port, online=False, checked_at=time.time(), error=error)
+        else:
+            with self._lock:
+                self._histograms.setdefault(key, LatencyHistogram()).observe(status.latency_ms)
+
+        with self._lock:
+            self._cache[key] = status
+        return status
+
+    async def _status(self, key: Tuple[str, int], max_age: Optional[float],
+                      timeout: Optional[float] = None) -> ServerStatus:
+        self.stats["requests"] += 1
+        max_age = self.ttl if max_age is None else max_age
+
+        cached = self._cache.get(key)
+        if cached is not None and cached.age <= max_age:
+            self.stats["cache_hits"] += 1
+            return cached
+
+        future = self._inflight.get(key)
+        if future is not None:
+            self.stats["coalesced"] += 1
+            return await asyncio.shield(future)
+
+        future = self._loop.create_task(self._probe(key, timeout))
+        self._inflight[key] = future
+        future.add_done_callback(lambda _: self._inflight.pop(key, None))
+        return await asyncio.shield(future)
+
+    async def _watch_loop(self, key: Tuple[str, int]):
+        while True:
+            with self._lock:
+                watchers = dict(self._watchers.get(key) or {})
+            if not watchers:
+                return
+            interval = min(watchers.values())
+            try:
+                status = await self._status(key, max_age=min(self.ttl, interval))
+            except Exception as e:
+                # Keep the loop (and the watchers' updates) alive whatever the probe hit
+                status = ServerStatus(host=key[0], port=key[1], checked_at=time.time(), error=str(e) or type(e).__name__)
+            for callback in watchers:
+                try:
+                    callback(status)
+                except Exception as e:
+                    print(f"[!] Status watcher failed: {e}")
+            await asyncio.sleep(interval)
+
+    # ------------------------------------------------------------------
+    # Public API (thread-safe, any event loop)
+    # ------------------------------------------------------------------
+
+    def _submit(self, coro):
+        return asyncio.run_coroutine_threadsafe(coro, self._loop)
+
+    async def status(self, host: str = MINECRAFT_HOST, port: int = MINECRAFT_PORT,
+                     max_age: Optional[float] = None, timeout: Optional[float] = None) -> ServerStatus:
+        """
+        Get server status from any event loop
+
+        Args:
+            host: Minecraft server host
+            port: Minecraft server port
+            max_age: Oldest cached result accepted in seconds (default: TTL, 0 forces a probe)
+            timeout: Connect / read timeout of a new probe (default: prober timeout)
+
+        Returns:
+            ServerStatus (online=False with `error` set when unreachable)
+        """
+        return await asyncio.wrap_future(self._submit(self._status((host, port), max_age, timeout)))
+
+    def status_sync(self, host: str = MINECRAFT_HOST, port: int = MINECRAFT_PORT,
+                    max_age: Optional[float] = None, timeout: Optional[float] = None) -> ServerStatus:
+        """Get server status from synchronous code (threads, not the Tk main thread)"""
+        return self._submit(self._status((host, port), max_age, timeout)).result((timeout or self.timeout) * 3 + 1)
+
+    def refresh(self, host: str = MINECRAFT_HOST, port: int = MINECRAFT_PORT):
+        """Start a probe if the cache is stale; returns a concurrent future, never blocks"""
+        return self._submit(self._status((host, port), None))
+
+    def cached(self, host: str = MINECRAFT_HOST, port: int = MINECRAFT_PORT) -> Optional[ServerStatus]:
+        """Last known status without probing (None if never probed)"""
+        with self._lock:
+            return self._cache.get((host, port))
+
+    def watch(self, host: str, port: int, callback: Callable[[ServerStatus], None],
+              interval: float = 5.0) -> Callable[[], None]:
+        """
+        Receive a status every `interval` seconds
+
+        The callback runs on the prober thread; UI code must hand the result
+        over to its own thread (e.g. Tk `after(0, ...)`). All watchers of a
+        server share one poll loop running at the shortest requested interval.
+
+        Returns:
+            Function that unsubscribes
+        """
+        key = (host, port)
+        with self._lock:
+            self._watchers.setdefault(key, {})[callback] = interval
+
+        def start():
+            task = self._watch_tasks.get(key)
+            if task is None or task.done():
+                self._watch_tasks[key] = self._loop.create_task(self._watch_loop(key))
+
+        self._loop.call_soon_threadsafe(start)
+
+        def unwatch():
+            with self._lock:
+                watchers = self._watchers.get(key)
+                if watchers is not None:
+                    watchers.pop(callback, None)
+                    if not watchers:
+                        del self._watchers[key]
+
+        return unwatch
+
+    def histogram(self, host: str = MINECRAFT_HOST, port: int = MINECRAFT_PORT) -> Optional[Dict]:
+        """Latency histogram of successful probes"""
+        with self._lock:
+            histogram = self._histograms.get((host, port))
+            return histogram.to_dict() if histogram else None
+
+    def prometheus(self, prefix: str = "titan") -> str:
+        """Latest status and latency histograms in Prometheus text exposition format"""
+        with self._lock:
+            statuses = sorted(self._cache.items())
+            histograms = sorted(self._histograms.items())
+        if not statuses:
+            return ""
+
+        def label(key):
+            return f'server="{key[0]}:{key[1]}"'
+
+        lines = [
+            f"# HELP {prefix}_server_up Server answered the last Server List Ping",
+            f"# TYPE {prefix}_server_up gauge",
+            *(f"{prefix}_server_up{{{label(k)}}} {int(s.online)}" for k, s in statuses),
+            f"# HELP {prefix}_server_players Players reported by Server List Ping",
+            f"# TYPE {prefix}_server_players gauge",
+        ]
+        for key, status in statuses:
+            if status.online:
+                lines.append(f'{prefix}_server_players{{{label(key)},state="online"}} {status.players_online}')
+                lines.append(f'{prefix}_server_players{{{label(key)},state="max"}} {status.players_max}')
+
+        lines.append(f"# HELP {prefix}_server_ping_latency_ms Server List Ping round trip")
+        lines.append(f"# TYPE {prefix}_server_ping_latency_ms histogram")
+        for key, histogram in histograms:
+            for bound, count in histogram.to_dict()["buckets"]:
+                lines.append(f'{prefix}_server_ping_latency_ms_bucket{{{label(key)},le="{bound}"}} {count}')
+            lines.append(f"{prefix}_server_ping_latency_ms_sum{{{label(key)}}} {histogram.sum:.3f}")
+            lines.append(f"{prefix}_server_ping_latency_ms_count{{{label(key)}}} {histogram.count}")
+        return "\n".join(lines) + "\n"
+
+    def close(self):
+        """Stop watchers and the prober thread"""
+        with self._lock:
+            self._watchers.clear()
+        self._loop.call_soon_threadsafe(self._loop.stop)
+
+    def get_stats(self) -> Dict:
+        """Get prober statistics"""
+        with self._lock:
+            servers = {
+                f"{host}:{port}": {
+                    "online": status.online,
+                    "players_online": status.players_online,
+                    "age": round(status.age, 2),
+                    "latency": self._histograms[(host, port)].to_dict() if (host, port) in self._histograms else None
+                }
+                for (host, port), status in self._cache.items()
+            }
+            watchers = sum(len(w) for w in self._watchers.values())
+        requests = self.stats["requests"]
+        return {
+            **self.stats,
+            "hit_rate": round(self.stats["cache_hits"] / requests, 3) if requests else 0.0,
+            "watchers": watchers,
+            "servers": servers
+        }
+
+
+# Shared prober
+_prober: Optional[StatusProber] = None
+_prober_lock = threading.Lock()
+
+
+def get_status_prober(**kwargs) -> StatusProber:
+    """
+    Get the process-wide status prober (created on first use)
+
+    Args:
+        **kwargs: StatusProber options (only used when the prober is created)
+    """
+    global _prober
+    with _prober_lock:
+        if _prober is None:
+            _prober = StatusProber(**kwargs)
+        return _prober
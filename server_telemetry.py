@@ -0,0 +1,702 @@
+#!/usr/bin/env python3
+"""
+Minecraft Server Performance Telemetry
+Real TPS, MSPT, GC, heap, entity and chunk numbers sampled sub-second from the running server
+
+Features:
+- Tick rate measured from game time deltas over RCON (`time query gametime`): works on every server type
+- Server-reported tick times: Paper `tps`/`mspt`, Forge/NeoForge `tps`, vanilla `tick query`
+- Entity counts (`execute if entity @e`) and loaded chunks (Paper `chunkinfo`)
+- JVM heap and GC time from the HotSpot perf counters (hsperfdata, the data jstat reads) via /proc
+- Compact columnar ring buffer (array of doubles per field)
+- p50/p95/p99 tick times over any window, lag spikes detected and pushed to subscribers
+- Vanilla `debug start`/`debug stop` tick profiling for whole-run TPS
+
+Usage:
+    telemetry = get_telemetry_collector()
+    telemetry.subscribe(lambda sample: print(sample["tps"], sample["tick_ms"]))
+    telemetry.on_spike(lambda spike: print("lag spike", spike["tick_ms"]))
+    print(telemetry.percentiles(60))
+"""
+
+import math
+import os
+import re
+import struct
+import threading
+import time
+from array import array
+from collections import deque
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+from rcon_pool import get_rcon_pool
+from system_metrics import PROC, container_pids
+
+
+RCON_HOST = os.getenv("MINECRAFT_RCON_HOST", "localhost")
+RCON_PORT = int(os.getenv("MINECRAFT_RCON_PORT", "25575"))
+RCON_PASSWORD = os.getenv("MINECRAFT_RCON_PASSWORD", "titan123")
+MINECRAFT_CONTAINER = os.getenv("MINECRAFT_CONTAINER", "titan-hub")
+
+# Normal tick length at 20 TPS
+TICK_MS = 50.0
+
+# Slower sources (commands that do real work on the server thread)
+REPORTED_INTERVAL = 5.0  # tps / mspt / tick query
+WORLD_INTERVAL = 15.0  # entity and chunk counts
+JVM_RESCAN_INTERVAL = 30.0  # find the server JVM again after a restart
+
+# Ring buffer columns (NaN = not measured)
+FIELDS = (
+    "ts", "tps", "tick_ms", "rcon_ms", "mspt", "mspt_max",
+    "heap_used", "heap_committed", "heap_max", "gc_ms", "gc_count",
+    "entities", "chunks"
+)
+
+_FORMAT_CODES = re.compile("§.")
+_GAMETIME = re.compile(r"(-?\d+)\s*$")
+_PAPER_TPS = re.compile(r"TPS from last 1m, 5m, 15m:\s*\*?([\d.]+),\s*\*?([\d.]+),\s*\*?([\d.]+)")
+_PAPER_MSPT = re.compile(r"([\d.]+)/([\d.]+)/([\d.]+)")
+_FORGE_TPS = (
+    re.compile(r"Overall\s*:\s*([\d.]+) TPS \(([\d.]+) ms/tick\)"),
+    re.compile(r"Overall\s*:\s*Mean tick time:\s*([\d.]+) ms\. Mean TPS:\s*([\d.]+)")
+)
+_TICK_QUERY = re.compile(r"Average time per tick:\s*([\d.]+)\s*ms")
+_TICK_PERCENTILES = re.compile(r"P99:\s*([\d.]+)\s*ms")
+_ENTITY_COUNT = re.compile(r"count:\s*(\d+)")
+_CHUNK_TOTAL = re.compile(r"Total:\s*(\d+)")
+_DEBUG_STOP = re.compile(r"after ([\d.]+) seconds and (\d+) ticks \(([\d.]+) ticks per second\)")
+
+
+def _clean(response: str) -> str:
+    return _FORMAT_CODES.sub("", response or "")
+
+
+def _unknown(response: str) -> bool:
+    text = _clean(response).lower()
+    return not text or "unknown" in text or "incomplete command" in text
+
+
+# ----------------------------------------------------------------------
+# Compact ring buffer
+# ----------------------------------------------------------------------
+
+class RingBuffer:
+    """Fixed-capacity columnar buffer of float samples (8 bytes per field per sample)"""
+
+    def __init__(self, fields, capacity: int):
+        self.fields = tuple(fields)
+        self.capacity = capacity
+        self._columns = {name: array("d", [math.nan]) * capacity for name in self.fields}
+        self._next = 0
+        self.count = 0
+
+    def append(self, values: Dict):
+        index = self._next
+        for name, column in self._columns.items():
+            value = values.get(name)
+            column[index] = math.nan if value is None else value
+        self._next = (index + 1) % self.capacity
+        self.count = min(self.count + 1, self.capacity)
+
+    def _indices(self, count: Optional[int] = None):
+        count = self.count if count is None else min(count, self.count)
+        start = (self._next - count) % self.capacity
+        return [(start + i) % self.capacity for i in range(count)]
+
+    def column(self, name: str, since: Optional[float] = None) -> List[float]:
+        """Measured values of one field, oldest first"""
+        ts = self._columns["ts"]
+        column = self._columns[name]
+        return [
+            column[i] for i in self._indices()
+            if not math.isnan(column[i]) and (since is None or ts[i] >= since)
+        ]
+
+    def rows(self, count: Optional[int] = None, since: Optional[float] = None) -> List[Dict]:
+        """Samples as dicts, oldest first"""
+        ts = self._columns["ts"]
+        return [
+            {name: None if math.isnan(c[i]) else c[i] for name, c in self._columns.items()}
+            for i in self._indices(count)
+            if since is None or ts[i] >= since
+        ]
+
+    @property
+    def nbytes(self) -> int:
+        return sum(column.itemsize * len(column) for column in self._columns.values())
+
+
+def percentile(values: List[float], p: float) -> Optional[float]:
+    """Nearest-rank percentile of unsorted values"""
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, max(0, math.ceil(p / 100 * len(ordered)) - 1))]
+
+
+# ----------------------------------------------------------------------
+# JVM perf counters (hsperfdata)
+# ----------------------------------------------------------------------
+
+_PERF_MAGIC = b"\xca\xfe\xc0\xc0"
+_PERF_COUNTERS = re.compile(
+    r"sun\.gc\.generation\.\d+\.(space\.\d+\.used|capacity|maxCapacity)$"
+    r"|sun\.gc\.collector\.\d+\.(time|invocations)$"
+    r"|sun\.os\.hrt\.frequency$"
+)
+
+
+class JvmPerfData:
+    """
+    Reader for a HotSpot hsperfdata file (the shared counters jstat and JMX read)
+
+    The entry index is parsed once; later reads only unpack the counters we use.
+    """
+
+    def __init__(self, path: Path):
+        self.path = path
+        self._index: Dict[str, int] = {}
+        self._signature = None
+
+    def _build_index(self, data: bytes, order: str, entry_offset: int, num_entries: int):
+        index = {}
+        offset = entry_offset
+        for _ in range(num_entries):
+            length, name_offset, vector_length, data_type, _, _, _, data_offset = \
+                struct.unpack_from(order + "iiiBBBBi", data, offset)
+            if length <= 0:
+                break
+            name_end = data.index(b"\0", offset + name_offset)
+            name = data[offset + name_offset:name_end].decode("ascii", "replace")
+            if data_type == ord("J") and vector_length == 0 and _PERF_COUNTERS.match(name):
+                index[name] = offset + data_offset
+            offset += length
+        self._index = index
+
+    def read(self) -> Dict[str, int]:
+        """Current counter values"""
+        data = self.path.read_bytes()
+        if data[:4] != _PERF_MAGIC:
+            raise ValueError(f"Not an hsperfdata file: {self.path}")
+        order = "<" if data[4] == 1 else ">"
+        _, _, modified, entry_offset, num_entries = struct.unpack_from(order + "iiqii", data, 8)
+        if self._signature != (modified, num_entries):
+            self._build_index(data, order, entry_offset, num_entries)
+            self._signature = (modified, num_entries)
+        return {name: struct.unpack_from(order + "q", data, offset)[0] for name, offset in self._index.items()}
+
+    def heap(self) -> Dict:
+        """Heap bytes and cumulative GC time (ms) / collections"""
+        counters = self.read()
+        frequency = counters.get("sun.os.hrt.frequency") or 1_000_000_000
+
+        def total(suffix):
+            return sum(v for k, v in counters.items() if k.startswith("sun.gc.generation.") and k.endswith(suffix))
+
+        return {
+            "heap_used": total(".used"),
+            "heap_committed": total(".capacity"),
+            "heap_max": total(".maxCapacity"),
+            "gc_ms_total": sum(v for k, v in counters.items() if k.endswith(".time")) * 1000 / frequency,
+            "gc_count_total": sum(v for k, v in counters.items() if k.endswith(".invocations"))
+        }
+
+
+def find_jvm_perfdata(container: Optional[str] = MINECRAFT_CONTAINER) -> Optional[Path]:
+    """
+    Locate the server JVM's hsperfdata file
+
+    Looks inside the container when it runs in Docker (through /proc/<pid>/root),
+    otherwise at local java processes.
+    """
+    pids = container_pids(container) if container else []
+    if not pids:
+        pids = [int(entry.name) for entry in PROC.iterdir() if entry.name.isdigit()]
+
+    for pid in pids:
+        try:
+            if (PROC / str(pid) / "comm").read_text().strip() != "java":
+                continue
+            nspid = str(pid)
+            for line in (PROC / str(pid) / "status").read_text().splitlines():
+                if line.startswith("NSpid:"):
+                    nspid = line.split()[-1]  # pid inside the container
+            for candidate in (PROC / str(pid) / "root" / "tmp").glob(f"hsperfdata_*/{nspid}"):
+                return candidate
+        except OSError:
+            continue
+    return None
+
+
+# ----------------------------------------------------------------------
+# Collector
+# ----------------------------------------------------------------------
+
+class TelemetryCollector:
+    """
+    Sub-second server performance sampler
+
+    Tick rate comes from game time deltas: at 20 TPS game time advances one
+    tick per 50 ms of wall time, so ticks counted between two samples give
+    the real tick length even when the server has no tps command. RCON
+    commands run on the server thread, so a stalled tick also shows up as
+    a slow RCON answer.
+
+    Usage:
+        telemetry = TelemetryCollector(interval=0.5)
+        telemetry.start()
+        spikes = telemetry.spikes()
+    """
+
+    def __init__(
+        self,
+        interval: float = 0.5,
+        history: int = 7200,
+        spike_ms: float = 2 * TICK_MS,
+        rcon_host: str = RCON_HOST,
+        rcon_port: int = RCON_PORT,
+        rcon_password: str = RCON_PASSWORD,
+        container: Optional[str] = MINECRAFT_CONTAINER
+    ):
+        """
+        Initialize collector
+
+        Args:
+            interval: Seconds between samples
+            history: Samples kept in the ring buffer (7200 = 1 hour at 0.5 s)
+            spike_ms: Tick length (wall time per tick over a sample) counted as a lag spike
+            rcon_host: RCON host
+            rcon_port: RCON port
+            rcon_password: RCON password
+            container: Docker container running the server (None: local process)
+        """
+        self.interval = interval
+        self.spike_ms = spike_ms
+        self.container = container
+        self.rcon = get_rcon_pool(rcon_host, rcon_port, rcon_password)
+
+        self._ring = RingBuffer(FIELDS, history)
+        self._spikes: deque = deque(maxlen=200)
+        self._current_spike: Optional[Dict] = None
+        self._subscribers: List[Callable[[Dict], None]] = []
+        self._spike_subscribers: List[Callable[[Dict], None]] = []
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+        # Server type: paper | forge | neoforge | vanilla (detected on first reported poll)
+        self.flavor: Optional[str] = None
+        self._last_tick: Optional[tuple] = None  # (monotonic, gametime)
+        self._reported: Dict = {}
+        self._world: Dict = {}
+        self._reported_at = 0.0
+        self._world_at = 0.0
+
+        self._jvm: Optional[JvmPerfData] = None
+        self._jvm_scanned = 0.0
+        self._last_gc: Optional[Dict] = None
+
+        # Statistics
+        self.stats = {
+            "samples": 0,
+            "rcon_errors": 0,
+            "jvm_errors": 0,
+            "spikes": 0,
+            "sample_seconds_total": 0.0
+        }
+
+    # ------------------------------------------------------------------
+    # Sources
+    # ------------------------------------------------------------------
+
+    def _detect_flavor(self) -> str:
+        responses = self.rcon.command_many_sync(["mspt", "forge tps", "neoforge tps"], timeout=5)
+        for flavor, response in zip(("paper", "forge", "neoforge"), responses):
+            if isinstance(response, str) and not _unknown(response):
+                return flavor
+        return "vanilla"
+
+    def _reported_commands(self) -> List[str]:
+        return {
+            "paper": ["tps", "mspt"],
+            "forge": ["forge tps"],
+            "neoforge": ["neoforge tps"]
+        }.get(self.flavor, ["tick query"])
+
+    def _world_commands(self) -> List[str]:
+        commands = ["execute if entity @e"]
+        if self.flavor == "paper":
+            commands.append("paper chunkinfo *")
+        return commands
+
+    def _parse_reported(self, responses: List) -> Dict:
+        text = "\n".join(_clean(r) for r in responses if isinstance(r, str))
+        reported = {}
+        if self.flavor == "paper":
+            match = _PAPER_TPS.search(text)
+            if match:
+                reported["tps_1m"] = float(match.group(1))
+            match = _PAPER_MSPT.search(text)  # first triple: last 5 s avg/min/max
+            if match:
+                reported["mspt"] = float(match.group(1))
+                reported["mspt_max"] = float(match.group(3))
+        elif self.flavor in ("forge", "neoforge"):
+            match = _FORGE_TPS[0].search(text)
+            if match:
+                reported["mspt"] = float(match.group(2))
+            else:
+                match = _FORGE_TPS[1].search(text)
+                if match:
+                    reported["mspt"] = float(match.group(1))
+        else:
+            match = _TICK_QUERY.search(text)
+            if match:
+                reported["mspt"] = float(match.group(1))
+            match = _TICK_PERCENTILES.search(text)
+            if match:
+                reported["mspt_max"] = float(match.group(1))
+            reported["frozen"] = "frozen" in text.lower()
+        return reported
+
+    def _parse_world(self, responses: List) -> Dict:
+        world = {}
+        if isinstance(responses[0], str):
+            match = _ENTITY_COUNT.search(_clean(responses[0]))
+            world["entities"] = int(match.group(1)) if match else 0  # "Test failed" = no entities
+        if len(responses) > 1 and isinstance(responses[1], str):
+            totals = _CHUNK_TOTAL.findall(_clean(responses[1]))
+            if totals:
+                world["chunks"] = int(totals[-1])  # last line sums all worlds
+        return world
+
+    def _poll_rcon(self, sample: Dict):
+        now = time.monotonic()
+        commands = ["time query gametime"]
+        reported = world = False
+        if self.flavor is None:
+            self.flavor = self._detect_flavor()
+        if now - self._reported_at >= REPORTED_INTERVAL:
+            commands += self._reported_commands()
+            reported = True
+        if now - self._world_at >= WORLD_INTERVAL:
+            world_start = len(commands)
+            commands += self._world_commands()
+            world = True
+
+        # Game time first, timed on its own; answered between ticks, so a stalled tick delays it
+        sent = time.monotonic()
+        responses = self.rcon.command_many_sync(commands[:1], timeout=max(2.0, self.interval * 4))
+        received = time.monotonic()
+        sample["rcon_ms"] = (received - sent) * 1000
+        if len(commands) > 1:
+            responses += self.rcon.command_many_sync(commands[1:], timeout=max(2.0, self.interval * 4))
+
+        match = _GAMETIME.search(_clean(responses[0])) if isinstance(responses[0], str) else None
+        if match:
+            gametime = int(match.group(1))
+            if self._last_tick is not None:
+                elapsed_ms = (received - self._last_tick[0]) * 1000
+                ticks = gametime - self._last_tick[1]
+                if ticks > 0:
+                    sample["tps"] = ticks * 1000 / elapsed_ms
+                    sample["tick_ms"] = elapsed_ms / ticks
+                elif ticks == 0 and sample["rcon_ms"] >= self.spike_ms:
+                    sample["tps"] = 0.0
+                    sample["tick_ms"] = elapsed_ms  # stalled for (at least) the whole sample
+                # ticks == 0 with a fast answer: world frozen / paused while empty
+            self._last_tick = (received, gametime)
+
+        if reported:
+            self._reported = self._parse_reported(responses[1:1 + len(self._reported_commands())])
+            self._reported_at = now
+        if world:
+            self._world = self._parse_world(responses[world_start:])
+            self._world_at = now
+
+        sample.update(mspt=self._reported.get("mspt"), mspt_max=self._reported.get("mspt_max"), **self._world)
+
+    def _poll_jvm(self, sample: Dict):
+        now = time.monotonic()
+        if self._jvm is None:
+            if now - self._jvm_scanned < JVM_RESCAN_INTERVAL:
+                return
+            self._jvm_scanned = now
+            path = find_jvm_perfdata(self.container)
+            if path is None:
+                return
+            self._jvm = JvmPerfData(path)
+            self._last_gc = None
+
+        try:
+            heap = self._jvm.heap()
+        except (OSError, ValueError, struct.error):
+            self.stats["jvm_errors"] += 1
+            self._jvm = None  # server restarted or stopped
+            return
+
+        if self._last_gc is not None:
+            sample["gc_ms"] = max(0.0, heap["gc_ms_total"] - self._last_gc["gc_ms_total"])
+            sample["gc_count"] = max(0, heap["gc_count_total"] - self._last_gc["gc_count_total"])
+        self._last_gc = heap
+        sample.update(heap_used=heap["heap_used"], heap_committed=heap["heap_committed"], heap_max=heap["heap_max"])
+
+    # ------------------------------------------------------------------
+    # Sampling
+    # ------------------------------------------------------------------
+
+    def sample(self) -> Dict:
+        """Take one sample now"""
+        started = time.perf_counter()
+        sample = {"ts": time.time()}
+
+        try:
+            self._poll_rcon(sample)
+        except Exception as e:
+            # RconError, or a timeout while the server is down / restarting
+            self.stats["rcon_errors"] += 1
+            self.flavor = None
+            self._last_tick = None
+            sample["error"] = f"RCON: {str(e) or type(e).__name__}"
+
+        self._poll_jvm(sample)
+
+        self.stats["sample_seconds_total"] += time.perf_counter() - started
+        return sample
+
+    def _track_spike(self, sample: Dict) -> Optional[Dict]:
+        """Open, extend or close the current lag spike; returns the event to publish"""
+        tick_ms = sample.get("tick_ms")
+        lagging = tick_ms is not None and tick_ms >= self.spike_ms
+        spike = self._current_spike
+
+        if lagging and spike is None:
+            spike = self._current_spike = {
+                "started": sample["ts"] - self.interval,  # began within the last sample
+                "ended": None,
+                "tick_ms": tick_ms,
+                "min_tps": sample.get("tps"),
+                "gc_ms": sample.get("gc_ms") or 0.0,
+                "samples": 1,
+                "mspt": sample.get("mspt"),
+                "heap_used": sample.get("heap_used")
+            }
+            self._spikes.append(spike)
+            self.stats["spikes"] += 1
+            return dict(spike)
+        if lagging:
+            spike["tick_ms"] = max(spike["tick_ms"], tick_ms)
+            if sample.get("tps") is not None:
+                spike["min_tps"] = min(spike["min_tps"], sample["tps"])
+            spike["gc_ms"] += sample.get("gc_ms") or 0.0
+            spike["samples"] += 1
+            return None
+        if spike is not None and tick_ms is not None:
+            spike["ended"] = sample["ts"]
+            self._current_spike = None
+            return dict(spike)
+        return None
+
+    def _record(self, sample: Dict):
+        with self._lock:
+            self._ring.append(sample)
+            self.stats["samples"] += 1
+            spike = self._track_spike(sample)
+            subscribers = list(self._subscribers)
+            spike_subscribers = list(self._spike_subscribers) if spike else []
+
+        for callback in subscribers:
+            try:
+                callback(sample)
+            except Exception as e:
+                print(f"[ERROR] Telemetry subscriber failed: {e}")
+        for callback in spike_subscribers:
+            try:
+                callback(spike)
+            except Exception as e:
+                print(f"[ERROR] Lag spike subscriber failed: {e}")
+
+    # ------------------------------------------------------------------
+    # Background loop
+    # ------------------------------------------------------------------
+
+    def start(self):
+        """Start sampling in a background thread (idempotent)"""
+        with self._lock:
+            if self._thread and self._thread.is_alive():
+                return
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="server-telemetry", daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        next_run = time.monotonic()
+        while not self._stop.is_set():
+            try:
+                self._record(self.sample())
+            except Exception as e:
+                print(f"[ERROR] Telemetry sample failed: {e}")
+            # Fixed schedule; after a stall, skip missed slots instead of bursting
+            next_run = max(next_run + self.interval, time.monotonic())
+            self._stop.wait(max(0.0, next_run - time.monotonic()))
+
+    def stop(self):
+        """Stop the background thread"""
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout=self.interval + 5)
+            self._thread = None
+
+    # ------------------------------------------------------------------
+    # Consumers
+    # ------------------------------------------------------------------
+
+    def subscribe(self, callback: Callable[[Dict], None]) -> Callable[[], None]:
+        """
+        Receive every sample (runs on the collector thread)
+
+        Returns:
+            Function that unsubscribes
+        """
+        with self._lock:
+            self._subscribers.append(callback)
+
+        def unsubscribe():
+            with self._lock:
+                if callback in self._subscribers:
+                    self._subscribers.remove(callback)
+
+        return unsubscribe
+
+    def on_spike(self, callback: Callable[[Dict], None]) -> Callable[[], None]:
+        """
+        Receive lag spikes when they start (`ended` None) and again when they end
+
+        Returns:
+            Function that unsubscribes
+        """
+        with self._lock:
+            self._spike_subscribers.append(callback)
+
+        def unsubscribe():
+            with self._lock:
+                if callback in self._spike_subscribers:
+                    self._spike_subscribers.remove(callback)
+
+        return unsubscribe
+
+    def latest(self) -> Optional[Dict]:
+        """Most recent sample"""
+        with self._lock:
+            rows = self._ring.rows(1)
+        return rows[0] if rows else None
+
+    def history(self, count: Optional[int] = None, since: Optional[float] = None) -> List[Dict]:
+        """Samples from the ring buffer, oldest first"""
+        with self._lock:
+            return self._ring.rows(count, since)
+
+    def percentiles(self, window: float = 60.0) -> Dict:
+        """
+        Tick time percentiles over the last `window` seconds
+
+        Returns:
+            {"tick_ms": {...}, "mspt": {...}, "tps": {...}} with p50/p95/p99/max;
+            `mspt` is server-reported work time (None where the server has no source)
+        """
+        since = time.time() - window
+        with self._lock:
+            columns = {name: self._ring.column(name, since) for name in ("tick_ms", "mspt", "tps")}
+
+        result = {}
+        for name, values in columns.items():
+            result[name] = {
+                "p50": percentile(values, 50),
+                "p95": percentile(values, 95),
+                "p99": percentile(values, 99),
+                "max": max(values) if values else None,
+                "min": min(values) if values else None,
+                "avg": sum(values) / len(values) if values else None,
+                "samples": len(values)
+            }
+        return result
+
+    def spikes(self, since: Optional[float] = None) -> List[Dict]:
+        """Recent lag spikes, oldest first"""
+        with self._lock:
+            return [dict(s) for s in self._spikes if since is None or s["started"] >= since]
+
+    def debug_start(self) -> str:
+        """Start vanilla tick profiling (`debug start`)"""
+        return self.rcon.command_sync("debug start", timeout=5)
+
+    def debug_stop(self) -> Optional[Dict]:
+        """
+        Stop vanilla tick profiling
+
+        Returns:
+            {"seconds", "ticks", "tps"} or None if the server gave no result
+        """
+        match = _DEBUG_STOP.search(_clean(self.rcon.command_sync("debug stop", timeout=5)))
+        if not match:
+            return None
+        return {"seconds": float(match.group(1)), "ticks": int(match.group(2)), "tps": float(match.group(3))}
+
+    def prometheus(self, prefix: str = "titan") -> str:
+        """Latest sample and tick time percentiles in Prometheus text exposition format"""
+        sample = self.latest()
+        if sample is None:
+            return ""
+        quantiles = self.percentiles(60)["tick_ms"]
+
+        lines = []
+
+        def metric(name, kind, help_text, values):
+            values = [(labels, value) for labels, value in values if value is not None]
+            if values:
+                lines.append(f"# HELP {prefix}_{name} {help_text}")
+                lines.append(f"# TYPE {prefix}_{name} {kind}")
+                lines.extend(f"{prefix}_{name}{labels} {value}" for labels, value in values)
+
+        metric("server_tps", "gauge", "Ticks per second measured from game time", [("", sample["tps"])])
+        metric("server_tick_ms", "gauge", "Wall time per tick over the last 60 s", [
+            (f'{{quantile="{q}"}}', quantiles[key]) for q, key in (("0.5", "p50"), ("0.95", "p95"), ("0.99", "p99"))
+        ])
+        metric("server_mspt", "gauge", "Server-reported tick work time", [("", sample["mspt"])])
+        metric("server_entities", "gauge", "Loaded entities", [("", sample["entities"])])
+        metric("server_chunks", "gauge", "Loaded chunks", [("", sample["chunks"])])
+        metric("jvm_heap_bytes", "gauge", "JVM heap", [
+            ('{state="used"}', sample["heap_used"]),
+            ('{state="committed"}', sample["heap_committed"]),
+            ('{state="max"}', sample["heap_max"])
+        ])
+        metric("server_lag_spikes_total", "counter", "Lag spikes detected", [("", self.stats["spikes"])])
+        return "\n".join(lines) + "\n"
+
+    def get_stats(self) -> Dict:
+        """Get collector statistics"""
+        samples = self.stats["samples"]
+        return {
+            **self.stats,
+            "flavor": self.flavor,
+            "jvm_perfdata": str(self._jvm.path) if self._jvm else None,
+            "buffered": self._ring.count,
+            "buffer_bytes": self._ring.nbytes,
+            "avg_sample_ms": 1000 * self.stats["sample_seconds_total"] / samples if samples else 0.0
+        }
+
+
+# Singleton instance
+_collector: Optional[TelemetryCollector] = None
+_collector_lock = threading.Lock()
+
+
+def get_telemetry_collector(**kwargs) -> TelemetryCollector:
+    """Get the process-wide telemetry collector (started on first use)"""
+    global _collector
+    with _collector_lock:
+        if _collector is None:
+            _collector = TelemetryCollector(**kwargs)
+            _collector.start()
+        return _collector
@@ -0,0 +1,589 @@
+#!/usr/bin/env python3
+"""
+Native System Metrics Sampler
+In-process CPU, memory, disk, network and container stats without forking top/free
+
+Features:
+- Reads /proc and cgroup files directly (Linux); psutil fallback elsewhere (Windows dev machines)
+- Per-container CPU/memory/IO from cgroup v1 or v2 (Docker), names from the container config
+- Rates (CPU %, bytes/s) computed from counter deltas between samples
+- Structured samples kept in a fixed-size ring buffer
+- Subscribers receive only the fields that changed since the previous sample
+- Prometheus text exposition (counters and gauges) for scraping
+- A sample costs a handful of small file reads (well under 1% CPU at a 2 s interval)
+
+Usage:
+    sampler = get_system_sampler()
+    sampler.start()
+    sampler.subscribe(lambda delta: socketio.emit("system_stats", delta))
+    print(sampler.latest()["cpu_percent"])
+    text = sampler.prometheus()
+"""
+
+import json
+import os
+import threading
+import time
+from collections import deque
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+try:
+    import psutil
+    PSUTIL_AVAILABLE = True
+except ImportError:
+    psutil = None
+    PSUTIL_AVAILABLE = False
+
+
+PROC = Path("/proc")
+CGROUP_ROOT = Path("/sys/fs/cgroup")
+DOCKER_CONFIG_DIR = Path("/var/lib/docker/containers")
+
+# Seconds between container cgroup rescans (containers come and go)
+CONTAINER_RESCAN_INTERVAL = 30.0
+# Block devices that are virtual or would double-count their members
+_SKIP_DISK_PREFIXES = ("loop", "ram", "zram", "dm-", "md", "sr", "fd")
+# Precision used when deciding whether a value changed (UI deltas)
+_DELTA_DIGITS = 1
+
+
+def _read(path: Path) -> str:
+    with open(path, 'r') as f:
+        return f.read()
+
+
+def _read_int(path: Path) -> Optional[int]:
+    try:
+        value = _read(path).strip()
+    except OSError:
+        return None
+    return None if value == "max" else int(value)
+
+
+# ----------------------------------------------------------------------
+# /proc readers (cumulative counters)
+# ----------------------------------------------------------------------
+
+def _proc_cpu() -> Tuple[int, int]:
+    """(busy, total) jiffies across all CPUs"""
+    fields = [int(v) for v in _read(PROC / "stat").split("\n", 1)[0].split()[1:]]
+    # user nice system idle iowait irq softirq steal (guest is already in user)
+    idle = fields[3] + (fields[4] if len(fields) > 4 else 0)
+    total = sum(fields[:8])
+    return total - idle, total
+
+
+def _proc_memory() -> Dict[str, int]:
+    info = {}
+    for line in _read(PROC / "meminfo").splitlines():
+        key, _, value = line.partition(":")
+        parts = value.split()
+        if parts:
+            info[key] = int(parts[0]) * 1024
+    total = info.get("MemTotal", 0)
+    available = info.get("MemAvailable", info.get("MemFree", 0))
+    return {
+        "memory_total": total,
+        "memory_available": available,
+        "memory_used": total - available,
+        "swap_used": info.get("SwapTotal", 0) - info.get("SwapFree", 0)
+    }
+
+
+def _whole_disks() -> List[str]:
+    try:
+        names = os.listdir("/sys/block")
+    except OSError:
+        return []
+    return [n for n in names if not n.startswith(_SKIP_DISK_PREFIXES)]
+
+
+def _proc_disk(disks: List[str]) -> Tuple[int, int]:
+    """(read, written) bytes on whole disks"""
+    wanted = set(disks)
+    read = written = 0
+    for line in _read(PROC / "diskstats").splitlines():
+        parts = line.split()
+        if len(parts) >= 10 and parts[2] in wanted:
+            read += int(parts[5]) * 512   # sectors are always 512 bytes here
+            written += int(parts[9]) * 512
+    return read, written
+
+
+def _proc_net() -> Tuple[int, int]:
+    """(received, sent) bytes on all interfaces except loopback"""
+    rx = tx = 0
+    for line in _read(PROC / "net" / "dev").splitlines()[2:]:
+        name, _, data = line.partition(":")
+        if name.strip() == "lo":
+            continue
+        parts = data.split()
+        rx += int(parts[0])
+        tx += int(parts[8])
+    return rx, tx
+
+
+# ----------------------------------------------------------------------
+# Containers (cgroups)
+# ----------------------------------------------------------------------
+
+def _container_name(container_id: str) -> str:
+    try:
+        config = json.loads(_read(DOCKER_CONFIG_DIR / container_id / "config.v2.json"))
+        return config.get("Name", "").lstrip("/") or container_id[:12]
+    except (OSError, ValueError):
+        return container_id[:12]
+
+
+def _container_id(dirname: str) -> Optional[str]:
+    # docker/<id> (cgroupfs driver) or docker-<id>.scope (systemd driver)
+    name = dirname[len("docker-"):-len(".scope")] if dirname.startswith("docker-") and dirname.endswith(".scope") else dirname
+    if len(name) == 64 and all(c in "0123456789abcdef" for c in name):
+        return name
+    return None
+
+
+def _find_containers() -> Dict[str, Dict]:
+    """Map container name -> cgroup file locations"""
+    found = {}
+    if (CGROUP_ROOT / "cgroup.controllers").exists():
+        # cgroup v2: one directory per container holds every controller
+        for parent in (CGROUP_ROOT / "system.slice", CGROUP_ROOT / "docker"):
+            if not parent.is_dir():
+                continue
+            for entry in parent.iterdir():
+                cid = _container_id(entry.name)
+                if cid:
+                    found[_container_name(cid)] = {"version": 2, "dir": entry}
+    else:
+        # cgroup v1: one hierarchy per controller
+        cpu_root = next((CGROUP_ROOT / d for d in ("cpuacct", "cpu,cpuacct") if (CGROUP_ROOT / d).is_dir()), None)
+        if cpu_root is None:
+            return found
+        for relative in ("docker", "system.slice"):
+            parent = cpu_root / relative
+            if not parent.is_dir():
+                continue
+            for entry in parent.iterdir():
+                cid = _container_id(entry.name)
+                if cid:
+                    found[_container_name(cid)] = {
+                        "version": 1,
+                        "cpu": entry / "cpuacct.usage",
+                        "memory": CGROUP_ROOT / "memory" / relative / entry.name,
+                        "blkio": CGROUP_ROOT / "blkio" / relative / entry.name
+                    }
+    return found
+
+
+def container_pids(name: str) -> List[int]:
+    """PIDs (host namespace) of the processes in a running container"""
+    cgroup = _find_containers().get(name)
+    if cgroup is None:
+        return []
+    procs = (cgroup["dir"] if cgroup["version"] == 2 else cgroup["memory"]) / "cgroup.procs"
+    try:
+        return [int(pid) for pid in _read(procs).split()]
+    except (OSError, ValueError):
+        return []
+
+
+def _container_counters(cgroup: Dict) -> Optional[Dict]:
+    """Cumulative CPU seconds, memory and IO bytes for one container"""
+    try:
+        if cgroup["version"] == 2:
+            d = cgroup["dir"]
+            usage_usec = 0
+            for line in _read(d / "cpu.stat").splitlines():
+                if line.startswith("usage_usec"):
+                    usage_usec = int(line.split()[1])
+                    break
+            read = written = 0
+            try:
+                for line in _read(d / "io.stat").splitlines():
+                    for field in line.split()[1:]:
+                        key, _, value = field.partition("=")
+                        if key == "rbytes":
+                            read += int(value)
+                        elif key == "wbytes":
+                            written += int(value)
+            except OSError:
+                pass
+            return {
+                "cpu_seconds": usage_usec / 1e6,
+                "memory_bytes": _read_int(d / "memory.current") or 0,
+                "memory_limit": _read_int(d / "memory.max"),
+                "io_read_bytes": read,
+                "io_write_bytes": written
+            }
+
+        read = written = 0
+        try:
+            for line in _read(cgroup["blkio"] / "blkio.throttle.io_service_bytes").splitlines():
+                parts = line.split()
+                if len(parts) == 3 and parts[1] == "Read":
+                    read += int(parts[2])
+                elif len(parts) == 3 and parts[1] == "Write":
+                    written += int(parts[2])
+        except OSError:
+            pass
+        limit = _read_int(cgroup["memory"] / "memory.limit_in_bytes")
+        return {
+            "cpu_seconds": int(_read(cgroup["cpu"]).strip()) / 1e9,
+            "memory_bytes": _read_int(cgroup["memory"] / "memory.usage_in_bytes") or 0,
+            "memory_limit": limit if limit and limit < 1 << 60 else None,  # "unlimited" is a huge number
+            "io_read_bytes": read,
+            "io_write_bytes": written
+        }
+    except (OSError, ValueError):
+        return None  # container stopped between scan and read
+
+
+# ----------------------------------------------------------------------
+# Sampler
+# ----------------------------------------------------------------------
+
+def diff_samples(previous: Optional[Dict], current: Dict) -> Dict:
+    """Fields of current that differ from previous (rounded), containers diffed per field"""
+    if previous is None:
+        return dict(current)
+
+    def changed(a, b):
+        if isinstance(a, float) or isinstance(b, float):
+            return a is None or b is None or round(a, _DELTA_DIGITS) != round(b, _DELTA_DIGITS)
+        return a != b
+
+    delta = {"ts": current["ts"]}
+    for key, value in current.items():
+        if key in ("ts", "containers"):
+            continue
+        if changed(previous.get(key), value):
+            delta[key] = value
+
+    containers = {}
+    old_containers = previous.get("containers", {})
+    for name, stats in current.get("containers", {}).items():
+        old = old_containers.get(name, {})
+        fields = {k: v for k, v in stats.items() if changed(old.get(k), v)}
+        if fields:
+            containers[name] = fields
+    for name in old_containers:
+        if name not in current.get("containers", {}):
+            containers[name] = None  # container went away
+    if containers:
+        delta["containers"] = containers
+    return delta
+
+
+class SystemSampler:
+    """
+    Periodic system and container metrics sampler
+
+    Usage:
+        sampler = SystemSampler(interval=2.0, history=900)
+        sampler.start()
+        samples = sampler.history(60)        # last 60 samples, oldest first
+    """
+
+    def __init__(self, interval: float = 2.0, history: int = 900, containers: bool = True):
+        """
+        Initialize sampler
+
+        Args:
+            interval: Seconds between samples
+            history: Samples kept in the ring buffer
+            containers: Collect per-container cgroup stats
+        """
+        self.interval = interval
+        self.collect_containers = containers
+        self.source = "proc" if (PROC / "stat").exists() else "psutil" if PSUTIL_AVAILABLE else None
+
+        self._samples: deque = deque(maxlen=history)
+        self._subscribers: List[Callable[[Dict], None]] = []
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+        self._counters: Optional[Dict] = None
+        self._disks = _whole_disks() if self.source == "proc" else []
+        self._containers: Dict[str, Dict] = {}
+        self._containers_scanned = 0.0
+
+        # Statistics
+        self.stats = {
+            "samples": 0,
+            "errors": 0,
+            "sample_seconds_total": 0.0
+        }
+
+    # ------------------------------------------------------------------
+    # Collection
+    # ------------------------------------------------------------------
+
+    def _read_counters(self) -> Dict:
+        """Cumulative counters and instantaneous gauges"""
+        now = time.time()
+        if self.source == "proc":
+            busy, total = _proc_cpu()
+            disk_read, disk_write = _proc_disk(self._disks)
+            net_rx, net_tx = _proc_net()
+            load = [float(v) for v in _read(PROC / "loadavg").split()[:3]]
+            counters = {"ts": now, "cpu_busy": busy, "cpu_total": total, **_proc_memory(), "load": load}
+        else:
+            times = psutil.cpu_times()
+            total = sum(times)
+            idle = times.idle + getattr(times, "iowait", 0)
+            memory = psutil.virtual_memory()
+            disk = psutil.disk_io_counters()
+            net = psutil.net_io_counters()
+            disk_read, disk_write = (disk.read_bytes, disk.write_bytes) if disk else (0, 0)
+            net_rx, net_tx = net.bytes_recv, net.bytes_sent
+            counters = {
+                "ts": now,
+                "cpu_busy": total - idle,
+                "cpu_total": total,
+                "memory_total": memory.total,
+                "memory_available": memory.available,
+                "memory_used": memory.total - memory.available,
+                "swap_used": psutil.swap_memory().used,
+                "load": list(os.getloadavg()) if hasattr(os, "getloadavg") else None
+            }
+        counters.update(disk_read_bytes=disk_read, disk_write_bytes=disk_write,
+                        net_rx_bytes=net_rx, net_tx_bytes=net_tx)
+
+        if self.collect_containers and self.source == "proc":
+            if now - self._containers_scanned > CONTAINER_RESCAN_INTERVAL:
+                self._containers = _find_containers()
+                self._containers_scanned = now
+            containers = {}
+            for name, cgroup in self._containers.items():
+                values = _container_counters(cgroup)
+                if values is not None:
+                    containers[name] = values
+            counters["containers"] = containers
+        return counters
+
+    def sample(self) -> Optional[Dict]:
+        """
+        Take one sample (rates are relative to the previous call)
+
+        Returns:
+            Sample dict, or None on the first call (no interval to compute rates over)
+        """
+        if self.source is None:
+            return None
+        started = time.perf_counter()
+        counters = self._read_counters()
+        previous, self._counters = self._counters, counters
+        if previous is None:
+            return None
+
+        elapsed = max(counters["ts"] - previous["ts"], 1e-6)
+
+        def rate(key):
+            return max(0.0, (counters[key] - previous[key]) / elapsed)
+
+        cpu_total = counters["cpu_total"] - previous["cpu_total"]
+        sample = {
+            "ts": counters["ts"],
+            "cpu_percent": 100.0 * (counters["cpu_busy"] - previous["cpu_busy"]) / cpu_total if cpu_total else 0.0,
+            "cpu_count": os.cpu_count(),
+            "load": counters["load"],
+            "memory_total": counters["memory_total"],
+            "memory_used": counters["memory_used"],
+            "memory_available": counters["memory_available"],
+            "memory_percent": 100.0 * counters["memory_used"] / counters["memory_total"] if counters["memory_total"] else 0.0,
+            "swap_used": counters["swap_used"],
+            "disk_read_bytes": counters["disk_read_bytes"],
+            "disk_write_bytes": counters["disk_write_bytes"],
+            "disk_read_rate": rate("disk_read_bytes"),
+            "disk_write_rate": rate("disk_write_bytes"),
+            "net_rx_bytes": counters["net_rx_bytes"],
+            "net_tx_bytes": counters["net_tx_bytes"],
+            "net_rx_rate": rate("net_rx_bytes"),
+            "net_tx_rate": rate("net_tx_bytes")
+        }
+
+        if "containers" in counters:
+            containers = {}
+            for name, now_values in counters["containers"].items():
+                before = previous.get("containers", {}).get(name)
+                entry = dict(now_values)
+                if before:
+                    # CPU % of one core (100 = one full core), like `docker stats`
+                    entry["cpu_percent"] = max(0.0, 100.0 * (now_values["cpu_seconds"] - before["cpu_seconds"]) / elapsed)
+                    entry["io_read_rate"] = max(0.0, (now_values["io_read_bytes"] - before["io_read_bytes"]) / elapsed)
+                    entry["io_write_rate"] = max(0.0, (now_values["io_write_bytes"] - before["io_write_bytes"]) / elapsed)
+                containers[name] = entry
+            sample["containers"] = containers
+
+        self.stats["sample_seconds_total"] += time.perf_counter() - started
+        return sample
+
+    def _record(self, sample: Dict):
+        with self._lock:
+            previous = self._samples[-1] if self._samples else None
+            self._samples.append(sample)
+            self.stats["samples"] += 1
+            subscribers = list(self._subscribers)
+        delta = diff_samples(previous, sample)
+        for callback in subscribers:
+            try:
+                callback(delta)
+            except Exception as e:
+                print(f"[ERROR] Metrics subscriber failed: {e}")
+
+    # ------------------------------------------------------------------
+    # Background loop
+    # ------------------------------------------------------------------
+
+    def start(self):
+        """Start sampling in a background thread (idempotent)"""
+        with self._lock:
+            if self._thread and self._thread.is_alive():
+                return
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="system-metrics", daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        next_run = time.monotonic()
+        while not self._stop.is_set():
+            try:
+                sample = self.sample()
+                if sample is not None:
+                    self._record(sample)
+            except Exception as e:
+                self.stats["errors"] += 1
+                print(f"[ERROR] System metrics sample failed: {e}")
+            # Fixed schedule: sampling cost doesn't stretch the interval
+            next_run += self.interval
+            self._stop.wait(max(0.0, next_run - time.monotonic()))
+
+    def stop(self):
+        """Stop the background thread"""
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout=self.interval + 1)
+            self._thread = None
+
+    # ------------------------------------------------------------------
+    # Consumers
+    # ------------------------------------------------------------------
+
+    def subscribe(self, callback: Callable[[Dict], None]) -> Callable[[], None]:
+        """
+        Receive changed fields after every sample (first call gets a full sample)
+
+        Returns:
+            Function that unsubscribes
+        """
+        with self._lock:
+            self._subscribers.append(callback)
+
+        def unsubscribe():
+            with self._lock:
+                if callback in self._subscribers:
+                    self._subscribers.remove(callback)
+
+        return unsubscribe
+
+    def latest(self) -> Optional[Dict]:
+        """Most recent sample"""
+        with self._lock:
+            return self._samples[-1] if self._samples else None
+
+    def history(self, count: Optional[int] = None, since: Optional[float] = None) -> List[Dict]:
+        """
+        Samples from the ring buffer, oldest first
+
+        Args:
+            count: At most this many (most recent)
+            since: Only samples newer than this unix time
+        """
+        with self._lock:
+            samples = list(self._samples)
+        if since is not None:
+            samples = [s for s in samples if s["ts"] > since]
+        if count is not None:
+            samples = samples[-count:] if count > 0 else []
+        return samples
+
+    def prometheus(self, prefix: str = "titan") -> str:
+        """Latest sample in Prometheus text exposition format"""
+        sample = self.latest()
+        if sample is None:
+            return ""
+
+        lines = []
+
+        def metric(name, kind, help_text, values):
+            lines.append(f"# HELP {prefix}_{name} {help_text}")
+            lines.append(f"# TYPE {prefix}_{name} {kind}")
+            for labels, value in values:
+                if value is not None:
+                    lines.append(f"{prefix}_{name}{labels} {value}")
+
+        metric("host_cpu_percent", "gauge", "Host CPU utilisation across all cores", [("", sample["cpu_percent"])])
+        metric("host_cpu_count", "gauge", "Logical CPUs", [("", sample["cpu_count"])])
+        if sample["load"]:
+            metric("host_load", "gauge", "Load average",
+                   [(f'{{period="{p}"}}', v) for p, v in zip(("1m", "5m", "15m"), sample["load"])])
+        metric("host_memory_bytes", "gauge", "Host memory", [
+            ('{state="total"}', sample["memory_total"]),
+            ('{state="used"}', sample["memory_used"]),
+            ('{state="available"}', sample["memory_available"]),
+            ('{state="swap_used"}', sample["swap_used"])
+        ])
+        metric("host_disk_bytes_total", "counter", "Bytes transferred on whole disks", [
+            ('{direction="read"}', sample["disk_read_bytes"]),
+            ('{direction="write"}', sample["disk_write_bytes"])
+        ])
+        metric("host_network_bytes_total", "counter", "Bytes transferred on non-loopback interfaces", [
+            ('{direction="rx"}', sample["net_rx_bytes"]),
+            ('{direction="tx"}', sample["net_tx_bytes"])
+        ])
+
+        containers = sample.get("containers") or {}
+        if containers:
+            def per_container(key):
+                return [(f'{{container="{name}"}}', stats.get(key)) for name, stats in sorted(containers.items())]
+
+            metric("container_cpu_seconds_total", "counter", "Container CPU time", per_container("cpu_seconds"))
+            metric("container_memory_bytes", "gauge", "Container memory usage", per_container("memory_bytes"))
+            metric("container_memory_limit_bytes", "gauge", "Container memory limit", per_container("memory_limit"))
+            metric("container_io_bytes_total", "counter", "Container block IO",
+                   [(f'{{container="{name}",direction="read"}}', s["io_read_bytes"]) for name, s in sorted(containers.items())] +
+                   [(f'{{container="{name}",direction="write"}}', s["io_write_bytes"]) for name, s in sorted(containers.items())])
+
+        metric("metrics_sample_seconds_total", "counter", "Time spent collecting metrics",
+               [("", round(self.stats["sample_seconds_total"], 6))])
+        return "\n".join(lines) + "\n"
+
+    def get_stats(self) -> Dict:
+        """Get sampler statistics"""
+        samples = self.stats["samples"]
+        return {
+            **self.stats,
+            "source": self.source,
+            "buffered": len(self._samples),
+            "avg_sample_ms": 1000 * self.stats["sample_seconds_total"] / samples if samples else 0.0,
+            # Share of one core spent sampling
+            "overhead_percent": 100 * self.stats["sample_seconds_total"] / (samples * self.interval) if samples else 0.0
+        }
+
+
+# Singleton instance
+_sampler: Optional[SystemSampler] = None
+_sampler_lock = threading.Lock()
+
+
+def get_system_sampler(interval: float = 2.0) -> SystemSampler:
+    """Get the process-wide sampler (started on first use)"""
+    global _sampler
+    with _sampler_lock:
+        if _sampler is None:
+            _sampler = SystemSampler(interval=interval)
+            _sampler.start()
+        return _sampler
@@ -16,6 +16,8 @@ from pathlib import Path
 PROJECT_ROOT = Path(__file__).parent.parent
 sys.path.insert(0, str(PROJECT_ROOT))
 
+from server_status import MINECRAFT_HOST, MINECRAFT_PORT, get_status_prober
+
 app = FastAPI(title="GALION Control Panel API")
 
 # CORS for development
@@ -56,25 +58,27 @@ async def root():
 
 @app.get("/api/status")
 async def get_status():
-    """Get server status"""
-    # TODO: Implement real server status check
+    """Get server status (Server List Ping, shared short-TTL cache)"""
+    status = await get_status_prober().status(MINECRAFT_HOST, MINECRAFT_PORT)
     return {
-        "online": True,
-        "players": 0,
-        "max_players": 100,
-        "tps": 20.0,
-        "version": "1.21.1",
-        "uptime": "99.9%"
+        "online": status.online,
+        "players": status.players_online,
+        "max_players": status.players_max,
+        "version": status.version,
+        "motd": status.motd,
+        "latency_ms": round(status.latency_ms, 1) if status.latency_ms is not None else None,
+        "latency": get_status_prober().histogram(MINECRAFT_HOST, MINECRAFT_PORT),
+        "error": status.error
     }
 
 
 @app.get("/api/players")
 async def get_players():
-    """Get online players list"""
-    # TODO: Implement real player list
+    """Get online players list (the server's sample, at most 12 names on vanilla)"""
+    status = await get_status_prober().status(MINECRAFT_HOST, MINECRAFT_PORT)
     return {
-        "count": 0,
-        "players": []
+        "count": status.players_online,
+        "players": status.player_sample
     }
 
 
@@ -101,15 +105,17 @@ async def websocket_endpoint(websocket: WebSocket):
     await websocket.accept()
     try:
         while True:
-            # Send status updates every 2 seconds
-            status = {
+            # Send status updates every 2 seconds (served from the prober cache)
+            status = await get_status_prober().status(MINECRAFT_HOST, MINECRAFT_PORT)
+            await websocket.send_json({
                 "type": "status_update",
                 "data": {
-                    "tps": 20.0,
-                    "players": 0
+                    "online": status.online,
+                    "players": status.players_online,
+                    "max_players": status.players_max,
+                    "latency_ms": round(status.latency_ms, 1) if status.latency_ms is not None else None
                 }
-            }
-            await websocket.send_json(status)
+            })
             await asyncio.sleep(2)
     except Exception as e:
         print(f"WebSocket error: {e}")